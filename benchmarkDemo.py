@@ -0,0 +1,24 @@
+import sys
+
+from simulation.benchmarkSuite import BenchmarkSuite
+
+if __name__ == "__main__" :
+
+    # 사용법 : python benchmarkDemo.py [결과 JSON] [기준 JSON]
+    # 기준 JSON 을 지정하면 허용 비율보다 나빠진 항목을 출력하고 종료 코드 1 로 끝난다.
+    resultFilePath      :str = sys.argv[1] if len(sys.argv) > 1 else "bench/benchmarkResult.json"
+    baselineFilePath    :str = sys.argv[2] if len(sys.argv) > 2 else None
+
+    suite   = BenchmarkSuite()
+    result  = suite.run()
+    BenchmarkSuite.save(result, resultFilePath)
+    print(f"결과 저장 : {resultFilePath}")
+
+    if baselineFilePath != None:
+        regressionList = suite.compare(result, BenchmarkSuite.load(baselineFilePath))
+
+        for regression in regressionList:
+            print(f"성능 저하 : {regression}")
+
+        print(f"기준 비교 : {baselineFilePath} / 성능 저하 {len(regressionList)}건")
+        sys.exit(1 if len(regressionList) > 0 else 0)
@@ -0,0 +1,16 @@
+class DeviceRecordKind():
+    '''
+    장비 통신 기록 파일(DeviceRecordManager)의 기록 종류
+    '''
+    # 장비 이름 등록 (값 : 이름)
+    DEVICE                      :int = 1
+    # 함수 이름 등록 (값 : 이름)
+    METHOD                      :int = 2
+    # 통신 변수 함수 호출 (값 : 인자 목록)
+    CALL                        :int = 3
+    # 함수 반환 (값 : 반환값)
+    RETURN                      :int = 4
+    # 함수 예외 (값 : (예외 클래스 이름, 메시지))
+    RAISE                       :int = 5
+    # 장비가 호출한 콜백 (값 : (콜백을 전달한 인자 위치, 콜백 인자 목록)), 생성자 이벤트 콜백은 함수 이름 "__init__"
+    CALLBACK                    :int = 6
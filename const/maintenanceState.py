@@ -0,0 +1,11 @@
+class MaintenanceState():
+    '''
+    드롱기별 유지보수(찌꺼기 통 비우기, 휴면 해제) 진행 상태
+    '''
+    IDLE                        :int = 0
+    # 찌꺼기 통을 열고 비우는 중 (일정 시간 후 닫기)
+    CONTAINER_OPENED            :int = 1
+    # 찌꺼기 통 닫기 명령 후 드롱기 상태 확인 대기
+    CONTAINER_CLOSING           :int = 2
+    # 휴면 해제 명령 후 드롱기 상태 확인 대기
+    WAKING_UP                   :int = 3
@@ -0,0 +1,18 @@
+class OrderState():
+    '''
+    주문 음료(메뉴)별 제조 진행 상태
+    '''
+    BREW_BEFORE                 :int = -1
+    BREW_START                  :int = 0
+    BREW_COMPLETE               :int = 1
+    PICKUP_ENABLE               :int = 2
+    # 중간 거치대에 컵 전달 완료, 배정된 드롱기가 비기를 대기
+    CUP_READY                   :int = 3
+    # (미리 준비) Indy7L 이 컵을 받아 든 채로 대기, 아이스는 얼음을 받기 전
+    CUP_PREPARED                :int = 4
+    # (미리 준비) Indy7L 이 컵을 받아(아이스는 얼음까지) 든 채로 중간 거치대B 전달 대기
+    CUP_STAGED                  :int = 5
+    # (직접 제조 라인) Indy7L 이 미리 준비한 컵으로 추출 ~ 픽업대 전달까지 직접 제조 중
+    DIRECT_MAKE                 :int = 6
+    # (직접 제조 라인) 담당 픽업대가 사용 중이라, Indy7L 이 추출이 끝난 일반 라인 음료를 직접 제조 라인의 픽업대로 옮기는 중
+    DIRECT_PICKUP               :int = 7
@@ -0,0 +1,14 @@
+class PlcSignalTable():
+    '''
+    ### PLC 신호 이름 -> MELSEC 디바이스 주소 \n
+    - 신호 이름은 셀 상태(CellStateData) 항목 이름이며, PlcProcessImageManager 가 주기마다 한 번에 읽어 바뀐 신호만 셀 상태에 반영한다.
+    - 비트 디바이스 : "M6", "X1A" (X, Y, B 는 16진수 번호) / 워드 디바이스 : "D100" / 워드의 비트 : "D100.3" (0 ~ F)
+    - 새 신호는 CellStateData 에 항목을 추가하고 여기에 주소만 추가하면 된다. (가까운 주소는 같은 읽기 요청으로 묶인다)
+    - 셀 구성에 따라 바뀌는 드롱기 트레이/픽업대 센서 주소는 셀 구성 파일(topology)에만 두며, CellTopologyManager.getPlcSignalDict 가 이 표와 합친다.
+    '''
+
+    SIGNAL_DICT                 :dict[str, str] = {
+        # 컵 감지 센서 : 감지(1), 미감지(0)
+        "hasCupOnMiddleATray"       : "M0",
+        "hasCupOnMiddleBTray"       : "M1",
+    }
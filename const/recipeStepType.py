@@ -0,0 +1,18 @@
+class RecipeStepType():
+    '''
+    레시피 동작 단계 종류 (RecipeTable.PROCESS_DICT 의 단계 값)
+    '''
+    # 로봇 프로그램 실행 (값 : 프로그램 번호)
+    ROBOT                       :int = 0
+    GRIPPER_HOLD                :int = 1
+    GRIPPER_RELEASE             :int = 2
+    # 컵 디스펜서 컵 배출 (값 : 디스펜서 명령 코드)
+    DISPENSE_CUP                :int = 3
+    # 드롱기 추출 명령 (값 : TPMSysFuncManager 추출 함수 이름)
+    BREW                        :int = 4
+    # 대기 (값 : 초)
+    SLEEP                       :int = 5
+    # 셀 상태가 조건을 만족할 때까지 대기 (값 : {CellStateData 항목 이름 : 값})
+    WAIT_STATE                  :int = 6
+    # 셀 상태가 조건을 만족하거나, 학습된 p99 대기 시간이 지날 때까지 대기 (값 : ({CellStateData 항목 이름 : 값}, 샘플이 부족할 때의 대기 초))
+    CONFIRM_STATE               :int = 7
@@ -0,0 +1,187 @@
+from const.delonghiState import DelonghiState
+from const.recipeStepType import RecipeStepType as Step
+
+
+
+
+class RecipeTable():
+    '''
+    ### 메뉴별 레시피와 공정별 동작 순서 \n
+    - MENU_DICT : 메뉴 번호 -> 메뉴 정보 (이름, 컵 종류, 얼음 받는 시간, 추출 함수, 라인 배정용 예상 시간)
+    - CUP_DICT : 컵 종류 -> Indy7L 컵 받는 위치 프로그램 번호, 컵 디스펜서 명령 코드
+    - PROCESS_DICT : 공정 이름 -> 동작 순서. 각 단계는 (단계 종류, 값[, 포함 조건[, 이름]])
+        - 각 항목은 이전 항목의 모든 단계가 끝난 후 시작한다. 단계 목록 [단계, 단계, ...] 항목은 서로 다른 장비(로봇 팔, 그리퍼, 드롱기)에서 동시에 실행한다.
+        - 값이 "$key" 이면 메뉴 정보(컵 정보 포함)의 key 값을 사용한다. (ex. "$cupProgramId")
+        - 셀 상태 key 가 "@key" 이면 장비 묶음의 셀 상태 이름을 사용한다. (ex. "@pickupTray" -> 1번 라인 "hasCupOnPickupBTray")
+        - 포함 조건이 "key" 이면 메뉴 정보의 key 값이 있을 때(0, False, None 이 아닐 때), "!key" 이면 없을 때만 포함한다.
+        - WAIT_STATE 단계는 장비를 사용하지 않고, 셀 상태가 조건을 만족하면 끝난다. (장소를 사용하는 단계 바로 앞에 둔다. 얼음처럼 들고 기다리면 안 되는 재료는 받기 전에 둔다)
+        - CONFIRM_STATE 단계는 고정 대기 대신 사용한다. 셀 상태가 조건을 만족하거나, 조건 확인까지 걸린 시간의 p99(기본값보다 짧지 않게, 학습 전에는 기본값)가 지나면 끝난다.
+    - 새 메뉴는 MENU_DICT 에 항목만 추가하면 된다. (ex. 카페라떼 : "cup" : "hot", "brewFuncName" : "brewDelonghiLatte")
+    '''
+
+    MENU_DICT                   :dict[int, dict] = {
+        1000 : {
+            "name"              : "핫 아메리카노",
+            "cup"               : "hot",
+            "iceSec"            : 0.0,
+            "brewFuncName"      : "brewDelonghiAmericano",
+            # 추출 시간, Indy7L 컵 전달 시간(컵 배출 ~ 중간 거치대), 컵이 중간 거치대에서 라인을 기다려도 되는 최대 시간
+            "brewSec"           : 45.0,
+            "cupDeliverySec"    : 20.0,
+            "cupHoldLimitSec"   : float("inf"),
+            # 미리 준비한 컵의 남은 전달 시간 : 얼음 받기(제빙기 이동 + 얼음), 컵을 든 위치 ~ 중간 거치대
+            "iceStageSec"       : 0.0,
+            "cupHandoffSec"     : 7.0,
+        },
+        1001 : {
+            "name"              : "아이스 아메리카노",
+            "cup"               : "ice",
+            "iceSec"            : 8.0,
+            "brewFuncName"      : "brewDelonghiEspresso",
+            "brewSec"           : 25.0,
+            "cupDeliverySec"    : 34.0,
+            # 얼음이 녹으므로 짧게
+            "cupHoldLimitSec"   : 10.0,
+            "iceStageSec"       : 14.0,
+            "cupHandoffSec"     : 7.0,
+        },
+    }
+
+    CUP_DICT                    :dict[str, dict] = {
+        "hot"                   : {"cupProgramId" : 1, "dispenserCode" : "0203410201034A"},
+        "ice"                   : {"cupProgramId" : 2, "dispenserCode" : "02034101010349"},
+    }
+
+    PROCESS_DICT                :dict[str, list] = {
+        # 멀티 공정 : Indy7L 이 컵을 받아 든 채로 대기 (라인 배정 전에 미리 준비)
+        "multiCupStage" : [
+            # 컵 받는 위치로 이동하면서 그리퍼 닫기
+            [(Step.GRIPPER_HOLD,    None), (Step.ROBOT, "$cupProgramId")],
+            (Step.DISPENSE_CUP,     "$dispenserCode"),
+            # 아이스 : 거치대A 에 컵을 내려놓고 다시 잡기
+            (Step.ROBOT,            11,                 "iceSec"),
+            (Step.GRIPPER_RELEASE,  None,               "iceSec"),
+            (Step.GRIPPER_HOLD,     None,               "iceSec"),
+        ],
+        # 멀티 공정 : (아이스) 미리 준비한 컵에 제빙기에서 얼음 받기. 얼음이 녹지 않도록 라인이 비는 시간에 맞춰 시작
+        "multiIceStage" : [
+            (Step.ROBOT,            14,                 "iceSec"),
+            (Step.SLEEP,            "$iceSec",          "iceSec",       "waitIce"),
+        ],
+        # 멀티 공정 : 미리 준비한 컵을 중간 거치대B 에 전달 -> 홈 위치로 이동
+        "multiCupHandoff" : [
+            # 이전 컵을 라인 로봇이 가져갈 때까지 컵을 든 채로 대기 (중간 거치대B 인계)
+            (Step.WAIT_STATE,       {"hasCupOnMiddleBTray" : 0}, None, "waitMiddleBTrayEmpty"),
+            (Step.ROBOT,            22,                 "iceSec"),
+            (Step.ROBOT,            21,                 "!iceSec"),
+            (Step.GRIPPER_RELEASE,  None),
+            (Step.ROBOT,            23),
+        ],
+        # 멀티 공정 : 라인 로봇이 중간 거치대B 의 컵을 드롱기로 P&P -> 추출 시작 & 홈 위치로 이동
+        "multiBrew" : [
+            [(Step.GRIPPER_RELEASE, None), (Step.ROBOT, 1)],
+            (Step.GRIPPER_HOLD,     None),
+            (Step.WAIT_STATE,       {"@delonghiTray" : 0, "@delonghiStatus" : DelonghiState.READY}, None, "waitDelonghiReady"),
+            (Step.ROBOT,            2),
+            (Step.GRIPPER_RELEASE,  None),
+            # 추출 시작과 동시에 홈 위치로 이동
+            [(Step.BREW, "$brewFuncName"), (Step.ROBOT, 3)],
+        ],
+        # 멀티 공정 : 라인 로봇이 드롱기의 음료컵을 픽업대로 P&P -> 홈 위치로 이동
+        "multiPickup" : [
+            [(Step.GRIPPER_RELEASE, None), (Step.ROBOT, 4)],
+            (Step.GRIPPER_HOLD,     None),
+            (Step.WAIT_STATE,       {"@pickupTray" : 0}, None, "waitPickupTrayEmpty"),
+            (Step.ROBOT,            5),
+            (Step.GRIPPER_RELEASE,  None),
+            (Step.ROBOT,            6),
+        ],
+        # 멀티 공정 (직접 제조 라인) : Indy7L 이 미리 준비한 컵을 드롱기에 놓고 추출된 음료를 픽업대A 에 내려놓기 (단독 공정의 컵 준비 이후 단계)
+        # 주의 : 단독 공정의 프로그램(15~18)을 다른 시작 자세에서 실행한다. 셀에서 경로를 확인하기 전에는 셀 구성에 직접 제조 라인을 추가하지 않는다
+        "multiDirectBrew" : [
+            # 핫 : 거치대A 에 컵을 내려놓고 다시 잡기 (아이스는 얼음 받기 전에 이미 다시 잡음)
+            (Step.ROBOT,            11,                 "!iceSec"),
+            (Step.GRIPPER_RELEASE,  None,               "!iceSec"),
+            (Step.GRIPPER_HOLD,     None,               "!iceSec"),
+            (Step.WAIT_STATE,       {"@delonghiTray" : 0, "@delonghiStatus" : DelonghiState.READY}, None, "waitDelonghiReady"),
+            (Step.ROBOT,            15,                 "iceSec"),
+            (Step.ROBOT,            16,                 "!iceSec"),
+            (Step.BREW,             "$brewFuncName"),
+            (Step.CONFIRM_STATE,    ({"@delonghiStatus" : DelonghiState.NOT_READY}, 2.0), None, "confirmBrewStart"),
+            (Step.WAIT_STATE,       {"@pickupTray" : 0, "@delonghiStatus" : DelonghiState.READY}, None, "waitBrewComplete"),
+            (Step.ROBOT,            17),
+            (Step.GRIPPER_RELEASE,  None),
+            (Step.ROBOT,            18),
+        ],
+        # 멀티 공정 (직접 제조 라인) : 일반 라인의 픽업대가 사용 중일 때 Indy7L 이 드롱기의 음료컵을 픽업대A 로 P&P -> 홈 위치로 이동
+        "multiDirectPickup" : [
+            (Step.GRIPPER_RELEASE,  None),
+            (Step.ROBOT,            15,                 "iceSec"),
+            (Step.ROBOT,            16,                 "!iceSec"),
+            (Step.GRIPPER_HOLD,     None),
+            (Step.WAIT_STATE,       {"@pickupTray" : 0}, None, "waitPickupTrayEmpty"),
+            (Step.ROBOT,            17),
+            (Step.GRIPPER_RELEASE,  None),
+            (Step.ROBOT,            18),
+        ],
+        # 단독 공정 : Indy7L 이 컵을 들고 1번 드롱기에서 추출된 음료를 받아 픽업대A 에 내려놓기
+        "singleMake" : [
+            # 드롱기가 준비된 후 컵 받기 시작 (유지보수/오류 중에 컵(얼음)을 든 채로 대기하지 않도록)
+            (Step.WAIT_STATE,       {"@delonghiTray" : 0, "@delonghiStatus" : DelonghiState.READY}, None, "waitDelonghiReady"),
+            [(Step.GRIPPER_HOLD,    None), (Step.ROBOT, "$cupProgramId")],
+            (Step.DISPENSE_CUP,     "$dispenserCode"),
+            (Step.ROBOT,            11),
+            (Step.GRIPPER_RELEASE,  None),
+            (Step.GRIPPER_HOLD,     None),
+            # 아이스 : 제빙기에서 얼음 받기
+            (Step.ROBOT,            14,                 "iceSec"),
+            (Step.SLEEP,            "$iceSec",          "iceSec",       "waitIce"),
+            (Step.ROBOT,            15,                 "iceSec"),
+            (Step.ROBOT,            16,                 "!iceSec"),
+            (Step.BREW,             "$brewFuncName"),
+            # 드롱기가 추출을 시작(NOT_READY)했는지 확인한 후 추출 완료(READY)를 기다린다
+            (Step.CONFIRM_STATE,    ({"@delonghiStatus" : DelonghiState.NOT_READY}, 2.0), None, "confirmBrewStart"),
+            (Step.WAIT_STATE,       {"@pickupTray" : 0, "@delonghiStatus" : DelonghiState.READY}, None, "waitBrewComplete"),
+            (Step.ROBOT,            17),
+            (Step.GRIPPER_RELEASE,  None),
+            (Step.ROBOT,            18),
+        ],
+        # 단독 공정 (파이프라인) : 다음 음료의 컵을 받아 거치대A 에 내려놓기 (이전 음료가 추출되는 동안 진행)
+        "singleCupStage" : [
+            [(Step.GRIPPER_HOLD,    None), (Step.ROBOT, "$cupProgramId")],
+            (Step.DISPENSE_CUP,     "$dispenserCode"),
+            (Step.ROBOT,            11),
+            (Step.GRIPPER_RELEASE,  None),
+        ],
+        # 단독 공정 (파이프라인) : 거치대A 의 컵을 다시 잡아(아이스는 얼음까지) 1번 드롱기 트레이에 내려놓고, 추출 시작과 동시에 홈 위치로 이동
+        # 파이프라인 전용 Indy7L 프로그램 (로봇에 티칭하고 셀에서 경로를 확인한 후 파이프라인 모드 사용)
+        #   31/32 : 1번 드롱기 트레이에 컵(아이스/핫)을 내려놓은 자세에서 열린 그리퍼를 컵 밖으로 빼며 홈 위치로 이동 (추출과 동시에 실행)
+        #   33/34 : 홈 위치에서 1번 드롱기 트레이에 놓인 음료컵(아이스/핫)을 잡는 자세로 이동
+        "singleBrew" : [
+            # 드롱기가 준비된 후 컵 받기 시작 (유지보수/오류 중에 컵(얼음)을 든 채로 대기하지 않도록)
+            (Step.WAIT_STATE,       {"@delonghiTray" : 0, "@delonghiStatus" : DelonghiState.READY}, None, "waitDelonghiReady"),
+            (Step.ROBOT,            11),
+            (Step.GRIPPER_HOLD,     None),
+            (Step.ROBOT,            14,                 "iceSec"),
+            (Step.SLEEP,            "$iceSec",          "iceSec",       "waitIce"),
+            (Step.ROBOT,            15,                 "iceSec"),
+            (Step.ROBOT,            16,                 "!iceSec"),
+            (Step.GRIPPER_RELEASE,  None),
+            [(Step.BREW, "$brewFuncName"), (Step.ROBOT, 31, "iceSec"), (Step.ROBOT, 32, "!iceSec")],
+            (Step.CONFIRM_STATE,    ({"@delonghiStatus" : DelonghiState.NOT_READY}, 2.0), None, "confirmBrewStart"),
+        ],
+        # 단독 공정 (파이프라인) : 추출이 끝나면 1번 드롱기 트레이의 음료컵을 픽업대A 로 P&P (다음 컵이 거치대A 에 있으면 바로 'singleBrew')
+        "singlePickup" : [
+            (Step.WAIT_STATE,       {"@delonghiStatus" : DelonghiState.READY}, None, "waitBrewComplete"),
+            (Step.ROBOT,            33,                 "iceSec"),
+            (Step.ROBOT,            34,                 "!iceSec"),
+            (Step.GRIPPER_HOLD,     None),
+            (Step.WAIT_STATE,       {"@pickupTray" : 0}, None, "waitPickupTrayEmpty"),
+            (Step.ROBOT,            17),
+            (Step.GRIPPER_RELEASE,  None),
+        ],
+        # 단독 공정 (파이프라인) : 다음 음료가 없으면 픽업대A 에서 홈 위치로 이동
+        "singleHome" : [
+            (Step.ROBOT,            18),
+        ],
+    }
@@ -0,0 +1,33 @@
+class CellStateData():
+    '''
+    셀 전체(트레이 센서 + 드롱기 상태)의 한 시점 상태 (snapshot)
+    - CellStateManager 가 상태가 바뀔 때마다 새 객체를 만들어 교체하므로, 받은 객체의 값은 바뀌지 않는다. (수정 금지)
+    '''
+
+    def __init__(self):
+        # 상태 변경 번호 (값이 바뀔 때마다 1씩 증가)
+        self.version                    :int        = 0
+
+        # 센서 상태 : 감지(1), 미감지(0)
+        self.hasCupOnMiddleATray        :int        = 1
+        self.hasCupOnMiddleBTray        :int        = 1
+        self.hasCupOnDelonghi01Tray     :int        = 1
+        self.hasCupOnDelonghi02Tray     :int        = 1
+        self.hasCupOnPickupATray        :int        = 1
+        self.hasCupOnPickupBTray        :int        = 1
+        self.hasCupOnPickupCTray        :int        = 1
+
+        # 드롱기 상태 (DelonghiState), 미확인 -1
+        self.delonghi01Status           :int        = -1
+        self.delonghi02Status           :int        = -1
+
+        # 장비별 마지막 샘플을 읽은 시간 (time.monotonic 기준) ex. {"PLC" : 12.3, "1번 드롱기" : 12.1}
+        self.sampleTimeDict             :dict[str, float] = {}
+
+
+
+    def getSampleTime(self, sampleName:str) -> float:
+        '''
+        sampleName 장비의 마지막 샘플 시간, 샘플 없음 -1
+        '''
+        return self.sampleTimeDict.get(sampleName, -1)
@@ -0,0 +1,86 @@
+class RobotTopologyData():
+    '''
+    로봇 팔 1대와 그리퍼의 통신 설정
+    '''
+
+    def __init__(self, name:str, address:list, gripperName:str, gripperAddress:list, isURRobot:bool = False):
+        # 통신 변수/명령 쓰레드 이름 (ex. "UR5"), 연결 인자 (ex. ["192.168.3.102", 502])
+        self.name                       :str        = name
+        self.address                    :list       = address
+        self.gripperName                :str        = gripperName
+        self.gripperAddress             :list       = gripperAddress
+        # UR 로봇이면 sendURCmd, 아니면 sendIndyModbusCmd 로 프로그램 실행
+        self.isURRobot                  :bool       = isURRobot
+
+
+
+
+class DelonghiTopologyData():
+    '''
+    드롱기 1대의 통신 설정과 셀 상태 이름
+    '''
+
+    def __init__(self, num:int, name:str, address:list, statusKey:str, trayKey:str, trayAddress:str):
+        # 드롱기 번호 (라인 번호, 유지보수 번호), 통신 변수 이름 (ex. "1번 드롱기")
+        self.num                        :int        = num
+        self.name                       :str        = name
+        # BLE 연결 인자 (BLEVar.connect 인자 순서 : MAC 주소, UUID 목록)
+        self.address                    :list       = address
+        # 셀 상태 이름 : 드롱기 상태, 드롱기 트레이 컵 감지 센서 (PLC 주소)
+        self.statusKey                  :str        = statusKey
+        self.trayKey                    :str        = trayKey
+        self.trayAddress                :str        = trayAddress
+
+
+
+
+class TrayTopologyData():
+    '''
+    픽업대 1개의 컵 감지 센서와 주문 UI 표시 위치
+    '''
+
+    def __init__(self, name:str, sensorKey:str, sensorAddress:str, uiSlot:str):
+        # 픽업대 이름 (ex. "B"), 셀 상태 이름 (ex. "hasCupOnPickupBTray"), PLC 주소 (ex. "M4")
+        self.name                       :str        = name
+        self.sensorKey                  :str        = sensorKey
+        self.sensorAddress              :str        = sensorAddress
+        # 주문 UI 의 픽업대 표시 위치 (ex. 'b')
+        self.uiSlot                     :str        = uiSlot
+
+
+
+
+class LaneTopologyData():
+    '''
+    제조 라인 1개 (라인 로봇 + 드롱기 + 픽업대)
+    '''
+
+    def __init__(self, laneNum:int, robotName:str, delonghiNum:int, pickupTrayName:str, isDirect:bool = False):
+        # 라인 번호 (설정 파일의 라인 순서, 1 부터)
+        self.laneNum                    :int        = laneNum
+        self.robotName                  :str        = robotName
+        self.delonghiNum                :int        = delonghiNum
+        self.pickupTrayName             :str        = pickupTrayName
+        # 직접 제조 라인 : 컵 전달 로봇이 미리 준비한 컵을 중간 거치대를 거치지 않고 직접 추출 ~ 픽업대까지 제조 (컵 전달 역할이 한가할 때만 사용)
+        self.isDirect                   :bool       = isDirect
+
+
+
+
+class CellTopologyData():
+    '''
+    ### 셀 구성 (로봇, 드롱기, 픽업대, 제조 라인, 장비 주소)
+    - CellTopologyManager 가 설정 파일(JSON)에서 만든다. 필드 설명은 topology/multiProcessTopology.json 참고
+    '''
+
+    def __init__(self):
+        self.robotDict                  :dict[str, RobotTopologyData]   = {}
+        self.delonghiDict               :dict[int, DelonghiTopologyData] = {}
+        self.trayDict                   :dict[str, TrayTopologyData]    = {}
+        self.laneList                   :list[LaneTopologyData]         = []
+
+        # 컵을 받아 중간 거치대B 로 전달하는 로봇
+        self.cupRobotName               :str        = ""
+
+        # 로봇/드롱기 외 장비 이름 -> 연결 인자 (ex. "PLC" : ["192.168.3.60", 9988])
+        self.deviceAddressDict          :dict[str, list] = {}
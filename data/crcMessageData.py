@@ -0,0 +1,24 @@
+import time
+
+
+
+
+class CRCMessageData():
+    '''
+    CRC 서버로 보낼 주문 완료 메시지 1건과 전송 상태
+    '''
+
+    def __init__(self, storeId:int, orderId:int, createTime:float = None, attemptNum:int = 0):
+        self.storeId                    :int        = storeId
+        self.orderId                    :int        = orderId
+        # 메시지를 만든 시간 (time.time 기준, 스풀 파일에 함께 저장되어 재시작 후에도 유지)
+        self.createTime                 :float      = time.time() if createTime == None else createTime
+        # 전송 시도 횟수
+        self.attemptNum                 :int        = attemptNum
+
+    def toDict(self) -> dict:
+        return {"storeId" : self.storeId, "orderId" : self.orderId, "createTime" : self.createTime, "attemptNum" : self.attemptNum}
+
+    @staticmethod
+    def fromDict(valueDict:dict) -> "CRCMessageData":
+        return CRCMessageData(valueDict["storeId"], valueDict["orderId"], valueDict["createTime"], valueDict["attemptNum"])
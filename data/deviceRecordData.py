@@ -0,0 +1,20 @@
+class DeviceRecordData():
+    '''
+    장비 통신 기록 1개 (통신 변수 함수 호출/반환/예외, 장비가 호출한 콜백)
+    '''
+
+    def __init__(self, kind:int, seq:int, time:float, deviceName:str, methodName:str, value):
+        # DeviceRecordKind
+        self.kind                       :int        = kind
+        # 호출 순번 (CALL 과 RETURN/RAISE 짝 맞추기), 그 외 0
+        self.seq                        :int        = seq
+        # 기록 시작 후 경과 시간 (time.monotonic 기준, 초)
+        self.time                       :float      = time
+        self.deviceName                 :str        = deviceName
+        self.methodName                 :str        = methodName
+        # 인자 목록 / 반환값 / 예외 / 콜백 인자 (DeviceRecordKind 참고)
+        self.value                                  = value
+        # CALL : 짝이 되는 RETURN/RAISE 까지 걸린 시간(초), 짝이 없으면 -1
+        self.elapsedSec                 :float      = -1
+        # CALL : 짝이 되는 RETURN/RAISE 기록
+        self.result                     :"DeviceRecordData" = None
@@ -0,0 +1,22 @@
+from data.orderData import DrinkJobData
+
+
+
+
+class LaneStateData():
+    '''
+    제조 라인(로봇 + 드롱기 + 픽업대) 1개의 현재 상태
+    - ex. 1번 라인 : UR5 + 1번 드롱기 + 픽업대B / 2번 라인 : Indy7R + 2번 드롱기 + 픽업대C
+    '''
+
+    def __init__(self, delonghiNum:int, laneNum:int = -1):
+        self.delonghiNum                :int            = delonghiNum
+        # 셀 구성의 라인 번호 (같은 드롱기를 여러 라인이 사용할 수 있음), 미지정 -1
+        self.laneNum                    :int            = laneNum
+        self.delonghiStatus             :int            = -1
+        self.hasCupOnDelonghiTray       :int            = 1
+        self.hasCupOnPickupTray         :int            = 1
+        # 라인에서 제조 중인 음료 (드롱기에 컵이 놓인 후 픽업대로 옮겨질 때까지, 같은 드롱기를 사용하는 다른 라인의 음료 포함), 없으면 None
+        self.drinkJob                   :DrinkJobData   = None
+        # 라인 로봇이 현재 동작을 마치는 예상 시간 (time.monotonic 기준)
+        self.robotBusyUntil             :float          = 0.0
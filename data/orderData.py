@@ -0,0 +1,79 @@
+import time
+
+from const.orderState import OrderState
+
+from data.recipeData import RecipeRunData
+
+
+
+
+class DrinkJobData():
+    '''
+    주문에 포함된 음료 1잔의 제조 정보
+    '''
+
+    def __init__(self, orderId:int, orderNumber:int, menuIndex:int, menuId:int):
+        self.orderId                    :int        = orderId
+        self.orderNumber                :int        = orderNumber
+        self.menuIndex                  :int        = menuIndex
+        self.menuId                     :int        = menuId
+        # 픽업대 수보다 많은 음료를 주문한 경우 나누어 제조하는 순번 (이전 순번의 음료가 모두 픽업 가능해야 시작)
+        self.cycleIndex                 :int        = 0
+        self.state                      :int        = OrderState.BREW_BEFORE
+        # 음료를 제조하는 드롱기 번호 (1, 2), 라인 번호 (셀 구성의 라인 순서, 1 부터), 미지정 -1
+        self.delonghiNum                :int        = -1
+        self.laneNum                    :int        = -1
+        # 추출 시작 시간 (time.monotonic 기준), 미시작 -1
+        self.brewStartTime              :float      = -1
+        # 진행 중인 로봇 동작(레시피 실행 계획) (동작이 끝나면 nextState 로 변경), 없으면 None
+        self.recipeRun                  :RecipeRunData = None
+        self.nextState                  :int        = OrderState.BREW_BEFORE
+
+
+
+
+class OrderData():
+    '''
+    CRC 서버에서 수신한 주문 1건의 정보
+    '''
+
+    def __init__(self, orderId:int, orderNumber:int, menuIdList:list[int], cycleDrinkNum:int = 0, receiveTime:float = None):
+        self.orderId                    :int        = orderId
+        self.orderNumber                :int        = orderNumber
+        # 주문을 받은 시간 (time.time 기준)
+        self.receiveTime                :float      = time.time() if receiveTime == None else receiveTime
+        self.drinkJobList               :list[DrinkJobData] = [
+            DrinkJobData(orderId, orderNumber, menuIndex, menuId) for menuIndex, menuId in enumerate(menuIdList) if menuId != -1
+        ]
+
+        # cycleDrinkNum 잔씩 나누어 제조 (0 이면 나누지 않음)
+        if cycleDrinkNum > 0:
+            for jobIndex, drinkJob in enumerate(self.drinkJobList):
+                drinkJob.cycleIndex = jobIndex // cycleDrinkNum
+
+    def isCompleted(self) -> bool:
+        return all(drinkJob.state == OrderState.PICKUP_ENABLE for drinkJob in self.drinkJobList)
+
+    def isCycleReady(self, cycleIndex:int) -> bool:
+        '''
+        cycleIndex 이전 순번의 음료가 모두 픽업 가능 상태인지 여부
+        '''
+        return all(drinkJob.state == OrderState.PICKUP_ENABLE for drinkJob in self.drinkJobList if drinkJob.cycleIndex < cycleIndex)
+
+
+
+
+class IntakeOrderData():
+    '''
+    주문 접수 대기열(OrderIntakeManager)에서 제조를 기다리는 주문 1건의 정보
+    '''
+
+    def __init__(self, orderId:int, orderNumber:int, menuIdList:list[int], priority:int = 0):
+        self.orderId                    :int        = orderId
+        self.orderNumber                :int        = orderNumber
+        # 제조할 메뉴 목록 (빈 메뉴 -1 제외)
+        self.menuIdList                 :list[int]  = [menuId for menuId in menuIdList if menuId != -1]
+        # 우선순위 (클수록 먼저 제조, 기본 0)
+        self.priority                   :int        = priority
+        # CRC 서버에서 주문을 받은 시간 (time.time 기준)
+        self.receiveTime                :float      = time.time()
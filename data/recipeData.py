@@ -0,0 +1,100 @@
+from concurrent.futures import Future
+
+
+
+
+class RecipeDeviceData():
+    '''
+    레시피를 실행하는 장비 묶음 (로봇 + 그리퍼 + 드롱기)
+    - ex. 1번 라인 : UR5 + UR5 그리퍼 + 1번 드롱기 / 컵 전달 : Indy7L + Indy7L 그리퍼
+    '''
+
+    def __init__(self, robotName:str, robotComm, gripperComm, isURRobot:bool = False, delonghiName:str = "", delonghiComm = None, stateKeyDict:dict[str, str] = None):
+        self.robotName                  :str        = robotName
+        self.robotComm                              = robotComm
+        self.gripperComm                            = gripperComm
+        # UR 로봇이면 sendURCmd, 아니면 sendIndyModbusCmd 로 프로그램 실행
+        self.isURRobot                  :bool       = isURRobot
+        # 추출 명령을 받을 드롱기, 없으면 ""/None
+        self.delonghiName               :str        = delonghiName
+        self.delonghiComm                           = delonghiComm
+        # 레시피의 "@key" 셀 상태 이름 -> CellStateData 항목 이름 (ex. {"pickupTray" : "hasCupOnPickupBTray"})
+        self.stateKeyDict               :dict[str, str] = {} if stateKeyDict == None else stateKeyDict
+
+
+
+
+class RecipeStepData():
+    '''
+    실행 계획의 동작 1단계 (실행 함수와 인자, 선행 단계가 미리 정해진 상태)
+    '''
+
+    def __init__(self, stepType:int, name:str, deviceName:str, programId:int, func, args:tuple, resourceComm = None):
+        # RecipeStepType
+        self.stepType                   :int        = stepType
+        # 동작 구간 기록용 이름, 장비 이름, 로봇 프로그램 번호(없으면 -1)
+        self.name                       :str        = name
+        self.deviceName                 :str        = deviceName
+        self.programId                  :int        = programId
+        # 실행 함수와 인자. WAIT_STATE 단계는 셀 상태 조건 함수 func(snapshot) -> bool
+        self.func                                   = func
+        self.args                       :tuple      = args
+        # 단계를 실행하는 장비(명령 쓰레드)의 통신 변수 (로봇 팔, 그리퍼, 드롱기), WAIT_STATE 단계는 None
+        self.resourceComm                           = resourceComm
+        # CONFIRM_STATE 단계 : 학습된 대기 시간이 없을 때의 최대 대기 시간(초)
+        self.defaultSec                 :float      = 0.0
+        # 먼저 끝나야 하는 단계 번호 (실행 계획의 stepList 순번)
+        self.dependIndexList            :tuple[int] = ()
+
+
+
+
+class RecipePlanData():
+    '''
+    메뉴 1개를 공정 1개에서 장비 1묶음으로 실행하는 계획 (RecipeManager 가 만들어 재사용)
+    '''
+
+    def __init__(self, menuId:int, menuName:str, processName:str, device:RecipeDeviceData, stepList:tuple[RecipeStepData]):
+        self.menuId                     :int        = menuId
+        self.menuName                   :str        = menuName
+        self.processName                :str        = processName
+        self.device                     :RecipeDeviceData = device
+        self.stepList                   :tuple[RecipeStepData] = stepList
+
+
+
+
+class RecipeRunData():
+    '''
+    실행 계획 1회의 진행 상태 (RecipeManager.startRun() 으로 만들고 advanceRun() 으로 진행)
+    '''
+
+    def __init__(self, plan:RecipePlanData, context:tuple, startTime:float):
+        self.plan                       :RecipePlanData = plan
+        # 단계 실행 구간 기록용 주문 정보 (orderId, menuIndex)
+        self.context                    :tuple      = context
+        # 시작/종료 시간 (time.monotonic 기준), 진행 중이면 종료 -1
+        self.startTime                  :float      = startTime
+        self.endTime                    :float      = -1
+        # 셀 상태 대기 단계에서 보낸 시간 (실행 시간 학습에서 제외)
+        self.waitSec                    :float      = 0.0
+        # CONFIRM_STATE 단계가 시간 초과로 끝나는 가장 빠른 시간, 없으면 inf (이 시간에 다시 advanceRun 호출)
+        self.wakeTime                   :float      = float("inf")
+        # 실행 중인 단계 번호 -> 명령 Future
+        self.futureDict                 :dict[int, Future] = {}
+        self.doneIndexSet               :set[int]   = set()
+        # 조건을 기다리기 시작한 WAIT_STATE 단계 번호 -> 시작 시간 (time.monotonic 기준)
+        self.waitStartTimeDict          :dict[int, float] = {}
+        # 실패한 단계의 예외, 없으면 None
+        self.exception                  :Exception  = None
+
+
+
+    def isDone(self) -> bool:
+        '''
+        모든 단계가 끝났거나, 실패 후 실행 중인 단계가 모두 끝났는지 여부
+        '''
+        if self.exception != None:
+            return len(self.futureDict) == 0
+
+        return len(self.doneIndexSet) == len(self.plan.stepList)
@@ -0,0 +1,25 @@
+class TraceSpanData():
+    '''
+    장비 동작 1회(로봇 이동, 그리퍼, 컵 배출, 추출 등)의 실행 구간 기록
+    '''
+
+    def __init__(self, name:str, deviceName:str, startTime:float, endTime:float, programId:int = -1, orderId:int = -1, menuIndex:int = -1):
+        # 동작 이름 (ex. sendIndyModbusCmd, holdDHGripper, brewDelonghiAmericano)
+        self.name                       :str        = name
+        # 동작을 수행한 장비 이름 (ex. Indy7L, UR5, 1번 드롱기)
+        self.deviceName                 :str        = deviceName
+        # 시작/종료 시간 (time.monotonic 기준)
+        self.startTime                  :float      = startTime
+        self.endTime                    :float      = endTime
+        # 로봇 프로그램 번호, 없으면 -1
+        self.programId                  :int        = programId
+        # 동작을 요청한 주문/음료 정보, 없으면 -1
+        self.orderId                    :int        = orderId
+        self.menuIndex                  :int        = menuIndex
+        # 동작 중 발생한 오류 메시지, 정상 종료 ""
+        self.error                      :str        = ""
+
+
+
+    def getElapsedSec(self) -> float:
+        return self.endTime - self.startTime
@@ -0,0 +1,140 @@
+import threading
+import copy
+import time
+
+from data.cellStateData import CellStateData
+
+
+
+
+class CellStateManager():
+    '''
+    ### 셀 상태(트레이 센서 + 드롱기 상태) 저장소 \n
+    - 상태 읽기 쓰레드는 update() 로 값을 한 번에 반영하고, 다른 쓰레드는 getSnapshot() 으로 전체 상태를 같은 시점 기준으로 읽는다.
+    - 값이 바뀔 때마다 version 이 1씩 증가하며, 바뀐 값만 새 snapshot 에 반영된다. (이전 snapshot 은 그대로 유지)
+    - subscribe() 로 등록한 콜백은 관심 있는 값이 바뀔 때만 호출되고, waitFor()/waitChanged() 는 조건을 만족할 때까지 polling 없이 대기한다.
+    '''
+
+
+
+    def __init__(self, extraValueDict:dict = None):
+        '''
+        - extraValueDict : CellStateData 에 없는 값 이름 -> 초기값 (ex. 셀 구성에 추가한 3번 드롱기 {"delonghi03Status" : -1})
+        '''
+        self.__cond                     :threading.Condition = threading.Condition()
+        self.__snapshot                 :CellStateData = CellStateData()
+
+        for key, value in (extraValueDict or {}).items():
+            if hasattr(self.__snapshot, key) == False:
+                setattr(self.__snapshot, key, value)
+
+        # 값 이름별 마지막으로 바뀐 version
+        self.__keyVersionDict           :dict[str, int] = {}
+        # (관심 있는 값 이름 set, 콜백) 목록. 값 이름 set 이 None 이면 모든 변경
+        self.__subscriberList           :list       = []
+
+
+
+    def getSnapshot(self) -> CellStateData:
+        '''
+        현재 셀 상태 (반환된 객체는 이후 update 에 영향을 받지 않는다)
+        '''
+        with self.__cond:
+            return self.__snapshot
+
+
+
+    def getVersion(self) -> int:
+        with self.__cond:
+            return self.__snapshot.version
+
+
+
+    def update(self, valueDict:dict, sampleName:str = None) -> set:
+        '''
+        ### 여러 값을 한 번에 반영
+        - valueDict : 값 이름(CellStateData 의 속성 이름) -> 값. ex. {"hasCupOnMiddleBTray" : 0, "hasCupOnPickupBTray" : 1}
+        - sampleName : 값을 읽은 장비 이름. 지정하면 값이 바뀌지 않아도 샘플 시간은 기록된다. (version 은 증가하지 않음)
+        - 반환값 : 바뀐 값 이름 set
+        '''
+        with self.__cond:
+            prevSnapshot    :CellStateData  = self.__snapshot
+            changedKeySet   :set            = set()
+
+            for key, value in valueDict.items():
+                if hasattr(prevSnapshot, key) == False:
+                    raise KeyError(f"알 수 없는 셀 상태 : {key}")
+
+                if getattr(prevSnapshot, key) != value:
+                    changedKeySet.add(key)
+
+            if len(changedKeySet) == 0 and sampleName == None:
+                return changedKeySet
+
+            snapshot                :CellStateData  = copy.copy(prevSnapshot)
+            snapshot.sampleTimeDict = dict(prevSnapshot.sampleTimeDict)
+
+            if sampleName != None:
+                snapshot.sampleTimeDict[sampleName] = time.monotonic()
+
+            if len(changedKeySet) > 0:
+                snapshot.version += 1
+
+                for key in changedKeySet:
+                    setattr(snapshot, key, valueDict[key])
+                    self.__keyVersionDict[key] = snapshot.version
+
+            self.__snapshot = snapshot
+            self.__cond.notify_all()
+
+            callbackList :list = [
+                callback for keySet, callback in self.__subscriberList
+                if len(changedKeySet) > 0 and (keySet == None or len(keySet & changedKeySet) > 0)
+            ]
+
+        # 콜백은 lock 밖에서 호출 (콜백 안에서 getSnapshot/update 가능)
+        for callback in callbackList:
+            callback(snapshot, changedKeySet)
+
+        return changedKeySet
+
+
+
+    def subscribe(self, callback, keyList:list[str] = None):
+        '''
+        ### 상태 변경 콜백 등록
+        - keyList 의 값 중 하나라도 바뀌면 update() 를 호출한 쓰레드에서 callback(snapshot, changedKeySet) 호출
+        - keyList 가 None 이면 모든 변경에 호출
+        '''
+        with self.__cond:
+            self.__subscriberList.append((None if keyList == None else set(keyList), callback))
+
+
+
+    def waitFor(self, predicate, timeoutSec:float = None) -> CellStateData:
+        '''
+        ### predicate(snapshot) 이 True 가 될 때까지 대기
+        - 반환값 : 조건을 만족한 snapshot, timeoutSec 이 지나면 None
+        '''
+        with self.__cond:
+            isDone :bool = self.__cond.wait_for(lambda: predicate(self.__snapshot) == True, timeoutSec)
+            return self.__snapshot if isDone == True else None
+
+
+
+    def waitChanged(self, version:int, keyList:list[str] = None, timeoutSec:float = None) -> CellStateData:
+        '''
+        ### version 이후 keyList 의 값이 바뀔 때까지 대기 (keyList 가 None 이면 모든 값)
+        - 반환값 : 현재 snapshot (timeoutSec 이 지난 경우 포함)
+        '''
+        with self.__cond:
+            self.__cond.wait_for(lambda: self.__getChangedVersion(keyList) > version, timeoutSec)
+            return self.__snapshot
+
+
+
+    def __getChangedVersion(self, keyList:list[str]) -> int:
+        if keyList == None:
+            return self.__snapshot.version
+
+        return max([self.__keyVersionDict.get(key, 0) for key in keyList], default = 0)
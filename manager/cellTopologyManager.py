@@ -0,0 +1,143 @@
+import json
+
+from const.plcSignalTable import PlcSignalTable
+
+from data.cellTopologyData import CellTopologyData, RobotTopologyData, DelonghiTopologyData, TrayTopologyData, LaneTopologyData
+
+
+
+
+class CellTopologyManager():
+    '''
+    ### 셀 구성(topology) 설정 파일 클래스 \n
+    - 로봇, 드롱기, 픽업대, 제조 라인(라인 로봇 + 드롱기 + 픽업대), 장비 주소를 JSON 파일에서 읽어 CellTopologyData 로 만든다.
+    - 라인 수는 설정 파일의 "lanes" 항목 수이며, 드롱기/픽업대/라인을 추가해도 컨트롤러 코드는 바뀌지 않는다.
+    - 직접 제조 라인("isDirect")은 컵 전달 로봇이 드롱기/픽업대를 직접 사용하는 라인이며, 드롱기는 일반 라인과 같이 사용할 수 있다.
+    - 설정 오류(없는 로봇/드롱기/픽업대 참조, 중복 사용)는 불러올 때 ValueError 로 알린다.
+    - 드롱기/픽업대 센서는 셀 상태 이름과 PLC 주소를 함께 설정하므로, getPlcSignalDict/getCellStateValueDict 로 PLC 읽기와 셀 상태에 추가한다.
+      (센서 주소는 셀 구성 파일에만 두며, PlcSignalTable 의 신호 이름과 겹치면 불러올 때 ValueError)
+    '''
+
+
+
+    def __init__(self, filePath:str):
+        self.__filePath                 :str        = filePath
+
+
+
+    def load(self) -> CellTopologyData:
+        '''
+        ### filePath 의 셀 구성 불러오기
+        - 파일이 없거나 형식이 잘못되면 예외 (OSError, KeyError, ValueError)
+        '''
+        with open(self.__filePath, "r", encoding = "utf-8") as topologyFile:
+            config :dict = json.load(topologyFile)
+
+        topology :CellTopologyData = CellTopologyData()
+
+        for robot in config["robots"]:
+            topology.robotDict[robot["name"]] = RobotTopologyData(
+                robot["name"], robot["address"], robot["gripperName"], robot["gripperAddress"], robot.get("isURRobot", False)
+            )
+
+        for delonghi in config["delonghis"]:
+            topology.delonghiDict[delonghi["num"]] = DelonghiTopologyData(
+                delonghi["num"], delonghi["name"], delonghi["address"], delonghi["statusKey"], delonghi["trayKey"], delonghi["trayAddress"]
+            )
+
+        for tray in config["pickupTrays"]:
+            topology.trayDict[tray["name"]] = TrayTopologyData(tray["name"], tray["sensorKey"], tray["sensorAddress"], tray["uiSlot"])
+
+        for laneIndex, lane in enumerate(config["lanes"]):
+            topology.laneList.append(LaneTopologyData(laneIndex + 1, lane["robot"], lane["delonghi"], lane["pickupTray"], lane.get("isDirect", False)))
+
+        topology.cupRobotName       = config["cupRobot"]
+        topology.deviceAddressDict  = dict(config["devices"])
+
+        self.__validate(topology)
+        return topology
+
+
+
+    @staticmethod
+    def getPlcSignalDict(topology:CellTopologyData) -> dict[str, str]:
+        '''
+        PLC 신호 이름 -> PLC 주소 (PlcSignalTable + 드롱기 트레이/픽업대 컵 감지 센서)
+        '''
+        signalDict :dict[str, str] = dict(PlcSignalTable.SIGNAL_DICT)
+        signalDict.update({delonghi.trayKey : delonghi.trayAddress for delonghi in topology.delonghiDict.values()})
+        signalDict.update({tray.sensorKey : tray.sensorAddress for tray in topology.trayDict.values()})
+        return signalDict
+
+
+
+    @staticmethod
+    def getCellStateValueDict(topology:CellTopologyData) -> dict[str, int]:
+        '''
+        셀 구성이 사용하는 셀 상태 이름 -> 초기값 (CellStateManager 의 extraValueDict)
+        - 드롱기 상태 미확인(-1), 컵 감지 센서는 읽기 전까지 감지(1)
+        '''
+        valueDict :dict[str, int] = {}
+        for delonghi in topology.delonghiDict.values():
+            valueDict[delonghi.statusKey]   = -1
+            valueDict[delonghi.trayKey]     = 1
+
+        valueDict.update({tray.sensorKey : 1 for tray in topology.trayDict.values()})
+        return valueDict
+
+
+
+    @staticmethod
+    def getLaneStateKeyDict(topology:CellTopologyData, lane:LaneTopologyData) -> dict[str, str]:
+        '''
+        라인 레시피(RecipeDeviceData.stateKeyDict)의 "@key" -> 셀 상태 이름
+        '''
+        delonghi    :DelonghiTopologyData   = topology.delonghiDict[lane.delonghiNum]
+
+        return {
+            "delonghiTray"      : delonghi.trayKey,
+            "delonghiStatus"    : delonghi.statusKey,
+            "pickupTray"        : topology.trayDict[lane.pickupTrayName].sensorKey,
+        }
+
+
+
+    def __validate(self, topology:CellTopologyData):
+        '''
+        ### 참조/중복 확인
+        - 라인의 로봇/드롱기/픽업대가 정의되어 있고, 픽업대는 라인 1개에서만 사용해야 한다.
+        - 드롱기는 일반 라인 1개, 직접 제조 라인 1개까지 같이 사용할 수 있다.
+        - 일반 라인 로봇은 컵 전달 로봇과 달라야 하고(컵을 든 채로 대기하므로), 직접 제조 라인 로봇은 컵 전달 로봇이어야 한다.
+        - 센서 이름은 드롱기/픽업대마다 달라야 하고, PlcSignalTable 의 신호 이름과 겹치면 안 된다.
+        '''
+        if len(topology.laneList) == 0:
+            raise ValueError(f"{self.__filePath} : 제조 라인 없음")
+
+        if topology.cupRobotName not in topology.robotDict:
+            raise ValueError(f"{self.__filePath} : 알 수 없는 컵 전달 로봇 {topology.cupRobotName}")
+
+        # (드롱기 번호, 직접 제조 여부)
+        usedDelonghiSet     :set[tuple[int, bool]] = set()
+        usedTrayNameSet     :set[str] = set()
+
+        for lane in topology.laneList:
+
+            if lane.robotName not in topology.robotDict or (lane.robotName == topology.cupRobotName) != lane.isDirect:
+                raise ValueError(f"{self.__filePath} : 라인 로봇 오류 {lane.robotName}")
+
+            if lane.delonghiNum not in topology.delonghiDict or (lane.delonghiNum, lane.isDirect) in usedDelonghiSet:
+                raise ValueError(f"{self.__filePath} : 라인 드롱기 오류 {lane.delonghiNum}")
+
+            if lane.pickupTrayName not in topology.trayDict or lane.pickupTrayName in usedTrayNameSet:
+                raise ValueError(f"{self.__filePath} : 라인 픽업대 오류 {lane.pickupTrayName}")
+
+            usedDelonghiSet.add((lane.delonghiNum, lane.isDirect))
+            usedTrayNameSet.add(lane.pickupTrayName)
+
+        sensorKeyList :list[str] = [delonghi.trayKey for delonghi in topology.delonghiDict.values()] + [tray.sensorKey for tray in topology.trayDict.values()]
+        for sensorKey in sensorKeyList:
+            if sensorKeyList.count(sensorKey) > 1 or sensorKey in PlcSignalTable.SIGNAL_DICT:
+                raise ValueError(f"{self.__filePath} : 센서 이름 중복 {sensorKey}")
+
+        if all(lane.isDirect == True for lane in topology.laneList):
+            raise ValueError(f"{self.__filePath} : 일반 제조 라인 없음")
@@ -0,0 +1,363 @@
+import threading
+import json
+import time
+import os
+from collections import deque
+
+from cdrutils.log import CDRLog
+
+from data.crcMessageData import CRCMessageData
+
+from manager.tpmSysFuncManager import TPMSysFuncManager
+
+
+
+
+class CRCPublishManager():
+    '''
+    ### CRC 서버 메시지 전송 클래스 \n
+    - 커피 제조 쓰레드는 publishOrderComplete 로 메시지를 대기열에 넣고 바로 반환하며, 클라우드 브로커 전송(TLS 왕복)은 전송 쓰레드에서 진행한다.
+    - 전송 쓰레드는 batchWindowSec 동안 모인 메시지를 한 번에 꺼내, 같은 주문의 중복 메시지를 합친 후 순서대로 보낸다.
+      (CRC 프로토콜은 주문 1건씩 완료를 보내므로 여러 주문을 한 메시지로 합치지는 않는다)
+    - 연결이 끊겼거나 전송에 실패하면 보내지 못한 메시지를 스풀 파일(spoolFilePath)에 저장하고, retrySec 부터 maxRetrySec 까지 간격을 늘려 다시 보낸다.
+      스풀 파일의 메시지는 새 메시지보다 먼저 보내며, 프로그램을 다시 시작해도 이어서 보낸다.
+    - 스풀 파일의 메시지는 전송이 확인된 후에 스풀 파일에서 지운다. (전송 중에 종료되면 다음 실행에서 다시 보낸다)
+    - 대기열이 maxQueueNum 을 넘으면 새 메시지는 스풀 파일에 저장한다. (메모리 사용량 제한)
+    - 전송은 publishCRCOrderComplete 가 True 를 반환한 경우만 성공으로 본다.
+    '''
+
+
+
+    def __init__(self, tpmSysFuncManager:TPMSysFuncManager, crcComm, spoolFilePath:str, maxQueueNum:int = 100, batchWindowSec:float = 0.05,
+                 retrySec:float = 1.0, maxRetrySec:float = 60.0, stopTimeoutSec:float = 5.0):
+        # config 변수 선언 ------------------------
+        self.__tpmSysFuncManager        :TPMSysFuncManager = tpmSysFuncManager
+        self.__crcComm                              = crcComm
+        self.__spoolFilePath            :str        = spoolFilePath
+        self.__maxQueueNum              :int        = maxQueueNum
+        self.__batchWindowSec           :float      = batchWindowSec
+        self.__initRetrySec             :float      = retrySec
+        self.__maxRetrySec              :float      = maxRetrySec
+        # 스풀 파일에서 한 번에 꺼내 보낼 최대 메시지 수
+        self.__maxSpoolBatchNum         :int        = maxQueueNum
+        # 종료 시 전송 중인 메시지의 전송 완료를 기다리는 최대 시간
+        self.__stopTimeoutSec           :float      = stopTimeoutSec
+
+        # 일반 변수 선언 --------------------------
+        self.__cond                     :threading.Condition = threading.Condition()
+        self.__queue                    :deque      = deque()
+        # 전송 쓰레드가 대기열에서 꺼내 전송 중인 메시지 (전송 완료 또는 스풀 저장 전, 종료 시 스풀 파일에 저장)
+        self.__inFlightList             :list[CRCMessageData] = []
+        # 스풀 파일 읽기/쓰기 (전송 중에는 잡지 않는다)
+        self.__spoolLock                :threading.Lock = threading.Lock()
+        self.__spoolNum                 :int        = 0
+        # 다음 재시도 간격, 재시도 시간 (time.monotonic 기준, 실패가 없으면 0)
+        self.__retrySec                 :float      = retrySec
+        self.__retryTime                :float      = 0.0
+        self.__sentNum                  :int        = 0
+        self.__failNum                  :int        = 0
+        # 마지막으로 보낸 메시지의 생성 ~ 전송 완료 시간
+        self.__lastDelaySec             :float      = 0.0
+        self.__isRunning                :bool       = False
+        self.__isSenderRunning          :bool       = False
+
+
+
+    def start(self):
+        '''
+        ### 전송 쓰레드 시작 (이전 실행에서 보내지 못한 스풀 파일의 메시지부터 보낸다)
+        '''
+        with self.__spoolLock:
+            try:
+                self.__spoolNum = len(self.__readSpool())
+
+            except Exception as e:
+                CDRLog.print(f"CRC 스풀 파일 읽기 실패 : {self.__spoolFilePath} : {e}")
+                self.__spoolNum = 0
+
+        if self.__spoolNum > 0:
+            CDRLog.print(f"CRC 스풀 메시지 {self.__spoolNum}건 다시 전송")
+
+        self.__isRunning        = True
+        self.__isSenderRunning  = True
+        threading.Thread(target = self.__senderThreadHandler, daemon = True).start()
+
+
+
+    def stop(self):
+        '''
+        ### 전송 쓰레드 종료, 보내지 못한 메시지는 스풀 파일에 저장 (다음 실행에서 전송)
+        - 전송 중인 메시지가 있으면 최대 stopTimeoutSec 동안 전송 쓰레드가 끝나기를 기다린다.
+        - 그래도 끝나지 않으면 전송 중인 메시지도 스풀 파일에 저장한다. (전송이 확인되지 않았으므로 다음 실행에서 다시 보낼 수 있다)
+        '''
+        with self.__cond:
+            self.__isRunning = False
+            self.__cond.notify_all()
+            self.__cond.wait_for(lambda: self.__isSenderRunning == False, self.__stopTimeoutSec)
+
+            messageList :list[CRCMessageData] = self.__inFlightList + list(self.__queue)
+            self.__inFlightList = []
+            self.__queue.clear()
+
+        if len(messageList) > 0:
+            self.__saveSpool(messageList)
+
+
+
+    def publishOrderComplete(self, storeId:int, orderId:int):
+        '''
+        ### 주문 완료 메시지 전송 요청 (기다리지 않고 바로 반환)
+        '''
+        message :CRCMessageData = CRCMessageData(storeId, orderId)
+
+        with self.__cond:
+            if len(self.__queue) < self.__maxQueueNum:
+                self.__queue.append(message)
+                self.__cond.notify_all()
+                return
+
+        # 대기열이 가득 참 (브로커 장애가 길어짐) -> 스풀 파일에 저장
+        self.__saveSpool([message])
+
+
+
+    def getQueueNum(self) -> int:
+        '''
+        보내지 못한 메시지 수 (대기열 + 전송 중 + 스풀 파일)
+        '''
+        return len(self.__queue) + len(self.__inFlightList) + self.__spoolNum
+
+
+
+    def getSpoolNum(self) -> int:
+        return self.__spoolNum
+
+
+
+    def getSentNum(self) -> int:
+        return self.__sentNum
+
+
+
+    def getFailNum(self) -> int:
+        '''
+        전송 실패(재시도) 횟수
+        '''
+        return self.__failNum
+
+
+
+    def getLastDelaySec(self) -> float:
+        return self.__lastDelaySec
+
+
+
+    def __senderThreadHandler(self):
+        '''
+        ### 전송 쓰레드 (보낼 메시지가 있고 재시도 시간이 지나면 모아서 전송)
+        '''
+        try:
+            while True:
+
+                with self.__cond:
+
+                    while self.__isRunning == True:
+
+                        waitSec :float = self.__retryTime - time.monotonic()
+                        if (len(self.__queue) > 0 or self.__spoolNum > 0) and waitSec <= 0:
+                            break
+
+                        self.__cond.wait(waitSec if waitSec > 0 else None)
+
+                    if self.__isRunning == False:
+                        break
+
+                # 연속으로 완료된 주문의 메시지를 한 번에 보내도록 잠시 모은다
+                time.sleep(self.__batchWindowSec)
+
+                self.__sendNext()
+
+        finally:
+            with self.__cond:
+                self.__isSenderRunning = False
+                self.__cond.notify_all()
+
+
+
+    def __sendNext(self):
+        '''
+        ### 메시지를 모아 전송하고, 결과에 맞게 스풀 파일 갱신 / 재시도 시간 설정
+        '''
+        spoolList, memoryList = self.__takeBatch()
+        messageList     :list[CRCMessageData] = spoolList + memoryList
+        unsentList      :list[CRCMessageData] = self.__sendBatch(messageList)
+        sentNum         :int                  = len(messageList) - len(unsentList)
+
+        with self.__cond:
+            # 종료(stop) 중에 전송이 늦어지면 stop 이 전송 중인 메시지를 스풀 파일에 저장한다
+            isMemoryOwned   :bool = self.__inFlightList is memoryList
+            self.__inFlightList = []
+
+        # 보낸 스풀 메시지는 지우고, 보내지 못한 메시지는 재시도 전에 종료되어도 남도록 스풀 파일 앞쪽(새로 저장된 메시지보다 앞)에 저장
+        keepList :list[CRCMessageData] = unsentList if isMemoryOwned == True else unsentList[:max(0, len(spoolList) - sentNum)]
+        if len(spoolList) > 0 or len(keepList) > 0:
+            self.__replaceSpoolHead(len(spoolList), keepList)
+
+        if len(unsentList) > 0:
+            self.__failNum += 1
+
+            if self.__retryTime == 0.0:
+                CDRLog.print(f"CRC 메시지 전송 실패 : {len(unsentList)}건 스풀 저장, {self.__retrySec:.0f}초 후 재시도")
+
+            with self.__cond:
+                self.__retryTime    = time.monotonic() + self.__retrySec
+                self.__retrySec     = min(self.__retrySec * 2, self.__maxRetrySec)
+
+        elif self.__retryTime != 0.0:
+            CDRLog.print(f"CRC 메시지 전송 복구 : 남은 메시지 {self.getQueueNum()}건")
+
+            with self.__cond:
+                self.__retryTime    = 0.0
+                self.__retrySec     = self.__initRetrySec
+
+
+
+    def __takeBatch(self) -> tuple[list[CRCMessageData], list[CRCMessageData]]:
+        '''
+        ### 보낼 메시지 꺼내기 (스풀 파일에 남은 메시지가 있으면 더 오래된 스풀 메시지부터)
+        - 반환값 : (스풀 파일 앞쪽의 메시지, 대기열에서 꺼낸 메시지)
+        - 스풀 메시지는 스풀 파일에 그대로 두고, 전송 후 __replaceSpoolHead 로 지운다.
+        - 스풀 파일에 maxSpoolBatchNum 보다 많은 메시지가 있으면, 대기열의 메시지는 순서를 지키도록 스풀 파일 뒤에 저장한다.
+        '''
+        with self.__cond:
+            memoryList :list[CRCMessageData] = list(self.__queue)
+            self.__queue.clear()
+            self.__inFlightList = memoryList
+
+        spoolList   :list[CRCMessageData] = []
+        isSpoolFull :bool                 = False
+
+        with self.__spoolLock:
+            if self.__spoolNum > 0:
+                try:
+                    allSpoolList :list[CRCMessageData] = self.__readSpool()
+                    spoolList   = allSpoolList[:self.__maxSpoolBatchNum]
+                    isSpoolFull = len(allSpoolList) > self.__maxSpoolBatchNum
+
+                except Exception as e:
+                    CDRLog.print(f"CRC 스풀 파일 읽기 실패 : {self.__spoolFilePath} : {e}")
+
+        if isSpoolFull == True and len(memoryList) > 0:
+            self.__saveSpool(memoryList)
+            with self.__cond:
+                self.__inFlightList = []
+            memoryList = []
+
+        return spoolList, memoryList
+
+
+
+    def __sendBatch(self, messageList:list[CRCMessageData]) -> list[CRCMessageData]:
+        '''
+        ### 메시지를 순서대로 전송
+        - 같은 주문의 메시지는 1건만 보낸다. (이미 보낸 주문의 메시지는 보낸 것으로 처리)
+        - 반환값 : 보내지 못한 메시지 (연결이 끊겼거나 전송에 실패한 메시지부터 끝까지)
+        '''
+        if len(messageList) > 0 and self.__crcComm.isConnected() == False:
+            return messageList
+
+        orderIdSet :set[tuple[int, int]] = set()
+
+        for messageIndex, message in enumerate(messageList):
+
+            if (message.storeId, message.orderId) in orderIdSet:
+                continue
+
+            message.attemptNum += 1
+
+            try:
+                isSent :bool = self.__tpmSysFuncManager.publishCRCOrderComplete(self.__crcComm, message.storeId, message.orderId) == True
+
+            except Exception as e:
+                CDRLog.print(f"CRC 주문 완료 전송 오류 : orderId {message.orderId} : {e}")
+                isSent = False
+
+            if isSent == False:
+                return messageList[messageIndex:]
+
+            orderIdSet.add((message.storeId, message.orderId))
+            self.__sentNum      += 1
+            self.__lastDelaySec = time.time() - message.createTime
+
+        return []
+
+
+
+    def __replaceSpoolHead(self, headNum:int, messageList:list[CRCMessageData]):
+        '''
+        ### 스풀 파일 앞쪽 headNum 개의 메시지(전송한 스풀 메시지)를 messageList(보내지 못한 메시지)로 교체
+        '''
+        with self.__spoolLock:
+            try:
+                spoolList :list[CRCMessageData] = self.__readSpool() if self.__spoolNum > 0 else []
+                self.__writeSpool(messageList + spoolList[headNum:])
+
+            except Exception as e:
+                CDRLog.print(f"CRC 스풀 파일 저장 실패 : {self.__spoolFilePath} : {e}")
+
+
+
+    def __saveSpool(self, messageList:list[CRCMessageData]):
+        '''
+        ### 스풀 파일 뒤에 메시지 저장
+        '''
+        with self.__spoolLock:
+            try:
+                dirPath :str = os.path.dirname(self.__spoolFilePath)
+                if dirPath != "":
+                    os.makedirs(dirPath, exist_ok = True)
+
+                with open(self.__spoolFilePath, "a", encoding = "utf-8") as spoolFile:
+                    for message in messageList:
+                        spoolFile.write(json.dumps(message.toDict()) + "\n")
+
+                self.__spoolNum += len(messageList)
+
+            except Exception as e:
+                CDRLog.print(f"CRC 스풀 파일 저장 실패 : {self.__spoolFilePath} : {e}")
+
+
+
+    def __readSpool(self) -> list[CRCMessageData]:
+        '''
+        스풀 파일의 메시지 (spoolLock 안에서 호출, 파일이 없으면 빈 목록)
+        '''
+        if os.path.exists(self.__spoolFilePath) == False:
+            return []
+
+        with open(self.__spoolFilePath, "r", encoding = "utf-8") as spoolFile:
+            return [CRCMessageData.fromDict(json.loads(line)) for line in spoolFile if line.strip() != ""]
+
+
+
+    def __writeSpool(self, messageList:list[CRCMessageData]):
+        '''
+        ### 스풀 파일을 messageList 로 교체 (spoolLock 안에서 호출, 비어 있으면 파일 삭제)
+        - 저장 중 종료되어도 이전 파일이 깨지지 않도록 임시 파일에 쓴 후 교체
+        '''
+        if len(messageList) == 0:
+            if os.path.exists(self.__spoolFilePath) == True:
+                os.remove(self.__spoolFilePath)
+            self.__spoolNum = 0
+            return
+
+        dirPath :str = os.path.dirname(self.__spoolFilePath)
+        if dirPath != "":
+            os.makedirs(dirPath, exist_ok = True)
+
+        with open(self.__spoolFilePath + ".tmp", "w", encoding = "utf-8") as spoolFile:
+            for message in messageList:
+                spoolFile.write(json.dumps(message.toDict()) + "\n")
+        os.replace(self.__spoolFilePath + ".tmp", self.__spoolFilePath)
+
+        self.__spoolNum = len(messageList)
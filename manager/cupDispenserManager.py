@@ -0,0 +1,49 @@
+import time
+
+from variable.tcpipVar import TcpIPVar
+
+from cdrutils.log import CDRLog
+
+from data.mainData import MainData
+
+from manager.traceManager import TraceManager
+
+
+
+
+class CupDispenserManager():
+    '''
+    ### 컵 자판기 관리 클래스 \n
+    - 컵 배출 명령을 전송에 성공할 때까지 보내고, 컵이 나올 때까지(dispenseWaitSec) 기다린다.
+    - 컵 배출 명령 ~ 컵 배출 대기 구간은 "컵디스펜서" 장비의 동작 구간으로 기록한다.
+    '''
+
+
+
+    def __init__(self, cupDispenserComm:TcpIPVar, traceManager:TraceManager, dispenseWaitSec:float = 3.0, retryIntervalSec:float = 0.1):
+        self.__cupDispenserComm         :TcpIPVar   = cupDispenserComm
+        self.__traceManager             :TraceManager = traceManager
+        self.__dispenseWaitSec          :float      = dispenseWaitSec
+        self.__retryIntervalSec         :float      = retryIntervalSec
+
+
+
+    def dispense(self, dispenserCode:str):
+        '''
+        ### 컵 배출 명령 (dispenserCode : RecipeTable.CUP_DICT 의 컵 종류별 명령 코드)
+        - 프로그램이 종료되면 전송을 중단한다.
+        '''
+        writeTcpIpResult    :bool           = False
+
+        with self.__traceManager.span("reqDispensingCup", "컵디스펜서"):
+
+            while MainData.isRunningTPMProgram == True:
+
+                writeTcpIpResult = self.__cupDispenserComm.write(dispenserCode, 1)
+
+                if writeTcpIpResult == False:
+                    time.sleep(self.__retryIntervalSec)
+                    CDRLog.print(f"컵디스펜서 컵 배출 명령 전송 실패 ({dispenserCode})")
+                else:
+                    time.sleep(self.__dispenseWaitSec)
+                    break
@@ -0,0 +1,181 @@
+import threading
+import heapq
+import time
+
+from cdrutils.log import CDRLog
+
+from const.delonghiState import DelonghiState
+from const.maintenanceState import MaintenanceState
+
+from manager.tpmSysFuncManager import TPMSysFuncManager
+
+
+
+
+class DelonghiMaintenanceInfo():
+    '''
+    드롱기별 유지보수 진행 상태
+    '''
+
+    def __init__(self, delonghiNum:int, delonghiComm):
+        self.delonghiNum                :int        = delonghiNum
+        self.delonghiComm                           = delonghiComm
+        self.state                      :int        = MaintenanceState.IDLE
+        # 현재 상태의 제한 시간 (time.monotonic 기준). 지나도 오류가 계속되면 명령을 다시 보낸다
+        self.deadlineTime               :float      = 0.0
+
+
+
+
+class DelonghiMaintenanceManager():
+    '''
+    ### 드롱기 유지보수 관리 클래스 \n
+    - 드롱기 오류 상태(찌꺼기 통 가득/열림, 휴면)에 따라 찌꺼기 통 개폐, 휴면 해제 명령을 보낸다.
+    - handleStatus() 는 상태 전이만 판단하고 바로 반환하며, 실제 명령은 유지보수 쓰레드에서 예약된 시간에 실행된다.
+      (ex. 찌꺼기 통 열기 -> containerOpenSec 후 닫기)
+    - 따라서 상태 읽기 쓰레드와 다른 드롱기 라인은 유지보수 중에도 멈추지 않는다.
+    '''
+
+
+
+    def __init__(self, containerComm, tpmSysFuncManager:TPMSysFuncManager, containerOpenSec:float = 10.0, containerRetrySec:float = 5.0, wakeupRetrySec:float = 30.0):
+        # config 변수 선언 ------------------------
+        self.__containerComm                        = containerComm
+        self.__tpmSysFuncManager        :TPMSysFuncManager = tpmSysFuncManager
+        self.__containerOpenSec         :float      = containerOpenSec
+        self.__containerRetrySec        :float      = containerRetrySec
+        self.__wakeupRetrySec           :float      = wakeupRetrySec
+
+        # 일반 변수 선언 --------------------------
+        self.__infoDict                 :dict[int, DelonghiMaintenanceInfo] = {}
+        self.__cond                     :threading.Condition = threading.Condition()
+        # (실행 시간, 순번, 드롱기 번호, 명령) - 명령 : "OPEN", "CLOSE", "WAKEUP"
+        self.__actionHeap               :list       = []
+        self.__actionSeq                :int        = 0
+        self.__isRunning                :bool       = False
+
+
+
+    def addDelonghi(self, delonghiNum:int, delonghiComm):
+        self.__infoDict[delonghiNum] = DelonghiMaintenanceInfo(delonghiNum, delonghiComm)
+
+
+
+    def start(self):
+        '''
+        ### 유지보수 명령 실행 쓰레드 시작
+        '''
+        self.__isRunning = True
+        threading.Thread(target = self.__maintenanceThreadHandler, daemon = True).start()
+
+
+
+    def stop(self):
+        with self.__cond:
+            self.__isRunning = False
+            self.__cond.notify_all()
+
+
+
+    def isInMaintenance(self, delonghiNum:int) -> bool:
+        return self.__infoDict[delonghiNum].state != MaintenanceState.IDLE
+
+
+
+    def getState(self, delonghiNum:int) -> int:
+        return self.__infoDict[delonghiNum].state
+
+
+
+    def handleStatus(self, delonghiNum:int, status:int):
+        '''
+        ### 읽은 드롱기 상태에 따라 유지보수 상태 전이 (명령은 예약만 하고 바로 반환)
+        '''
+        with self.__cond:
+            info    :DelonghiMaintenanceInfo    = self.__infoDict[delonghiNum]
+            now     :float                      = time.monotonic()
+
+            # 찌꺼기 통을 비우는 중 -> 예약된 닫기 명령까지 대기 (열림 오류는 정상)
+            if info.state == MaintenanceState.CONTAINER_OPENED:
+                return
+
+            # 닫기/휴면 해제 명령 후 -> 오류가 풀렸거나 제한 시간이 지나면 다시 판단
+            if info.state in [MaintenanceState.CONTAINER_CLOSING, MaintenanceState.WAKING_UP]:
+
+                if status in [DelonghiState.ERR_OPENED_GROUNDS_CONTAINER, DelonghiState.ERR_POWERED_OFF] and now < info.deadlineTime:
+                    return
+
+                self.__setState(info, MaintenanceState.IDLE, now)
+
+            # 찌꺼기 통 가득! -> 열고 containerOpenSec 후 닫기
+            if status == DelonghiState.ERR_FULL_GROUNDS:
+
+                self.__setState(info, MaintenanceState.CONTAINER_OPENED, now)
+                self.__addAction(now, delonghiNum, "OPEN")
+                self.__addAction(now + self.__containerOpenSec, delonghiNum, "CLOSE")
+
+            # 찌꺼기 통 열림! -> 닫기
+            elif status == DelonghiState.ERR_OPENED_GROUNDS_CONTAINER:
+
+                self.__setState(info, MaintenanceState.CONTAINER_CLOSING, now + self.__containerRetrySec)
+                self.__addAction(now, delonghiNum, "CLOSE")
+
+            # 휴면 상태! -> 깨우기
+            elif status == DelonghiState.ERR_POWERED_OFF:
+
+                self.__setState(info, MaintenanceState.WAKING_UP, now + self.__wakeupRetrySec)
+                self.__addAction(now, delonghiNum, "WAKEUP")
+
+
+
+    def __setState(self, info:DelonghiMaintenanceInfo, state:int, deadlineTime:float):
+        if info.state != state:
+            CDRLog.print(f"{info.delonghiNum}번 드롱기 유지보수 상태 : {info.state} -> {state}")
+
+        info.state          = state
+        info.deadlineTime   = deadlineTime
+
+
+
+    def __addAction(self, runTime:float, delonghiNum:int, action:str):
+        self.__actionSeq += 1
+        heapq.heappush(self.__actionHeap, (runTime, self.__actionSeq, delonghiNum, action))
+        self.__cond.notify_all()
+
+
+
+    def __maintenanceThreadHandler(self):
+        '''
+        ### 유지보수 명령 실행 쓰레드 (예약 시간이 된 명령을 순서대로 실행)
+        '''
+        while True:
+
+            with self.__cond:
+
+                while self.__isRunning == True:
+
+                    if len(self.__actionHeap) > 0 and self.__actionHeap[0][0] <= time.monotonic():
+                        break
+
+                    waitSec :float = None if len(self.__actionHeap) == 0 else self.__actionHeap[0][0] - time.monotonic()
+                    self.__cond.wait(waitSec)
+
+                if self.__isRunning == False:
+                    break
+
+                _, _, delonghiNum, action = heapq.heappop(self.__actionHeap)
+                info :DelonghiMaintenanceInfo = self.__infoDict[delonghiNum]
+
+                # 찌꺼기 통 닫기 -> 닫힘 확인 대기
+                if action == "CLOSE" and info.state == MaintenanceState.CONTAINER_OPENED:
+                    self.__setState(info, MaintenanceState.CONTAINER_CLOSING, time.monotonic() + self.__containerRetrySec)
+
+            # 통신 명령은 lock 밖에서 실행 (handleStatus 를 막지 않도록)
+            if action == "OPEN":
+                self.__containerComm.write(f"OPEN_{delonghiNum}")
+
+            elif action == "CLOSE":
+                self.__containerComm.write(f"CLOSE_{delonghiNum}")
+
+            elif action == "WAKEUP":
+                self.__tpmSysFuncManager.wakeupDeloghi(info.delonghiComm)
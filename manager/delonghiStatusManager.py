@@ -0,0 +1,209 @@
+import threading
+import time
+
+from cdrutils.log import CDRLog
+
+from manager.devicePollingManager import DevicePollingManager
+
+
+
+
+class DelonghiStatusInfo():
+    '''
+    드롱기 1대의 상태 알림 설정 및 마지막 상태
+    '''
+
+    def __init__(self, name:str, delonghiComm, sampleCallback):
+        self.name                       :str        = name
+        self.delonghiComm                           = delonghiComm
+        self.sampleCallback                         = sampleCallback
+        self.isNotifyEnabled            :bool       = False
+
+        # 마지막 상태 (DelonghiState), 상태 없음 None
+        self.status                     :int        = None
+        # 마지막 상태를 받은 시간 (time.monotonic 기준), 상태 없음 -1
+        self.sampleTime                 :float      = -1
+        # 마지막 알림을 받은 시간 / 진행 중인 상태 읽기를 시작한 시간
+        self.notifyTime                 :float      = -1
+        self.pollStartTime              :float      = -1
+
+        self.notifyCount                :int        = 0
+        self.pollCount                  :int        = 0
+        self.missedNotifyCount          :int        = 0
+        self.decodeErrorCount           :int        = 0
+
+
+
+
+class DelonghiStatusManager():
+    '''
+    ### 드롱기 상태 알림(BLE notify) 관리 클래스 \n
+    - 드롱기가 상태 알림 특성(...0301)으로 보내는 값을 받을 때 한 번만 DelonghiState 로 변환하고, 마지막 상태와 받은 시간을 보관한다.
+    - 알림을 사용하면 상태 읽기(getDelonghiStateCode)는 연결 확인용으로 livenessPollingSec 주기로만 한다. (추출 완료(READY)가 읽기 주기를 기다리지 않고 바로 전달된다)
+    - 통신 변수가 알림을 지원하지 않으면 기존과 같이 DevicePollingManager 로 fast/idle 주기에 맞춰 읽는다.
+    - 알림과 상태 읽기 모두 같은 sampleCallback(status, isChanged) 으로 순서대로 전달된다. (isChanged 는 마지막 상태 기준)
+    '''
+
+
+
+    def __init__(self, tpmSysFuncManager, statusPoller:DevicePollingManager, fastPollingSec:float = 0.2, idlePollingSec:float = 1.0, livenessPollingSec:float = 5.0):
+        # TPMSysFuncManager : getDelonghiStateCode(통신 변수), decodeDelonghiStateCode(알림 값)
+        self.__tpmSysFuncManager                    = tpmSysFuncManager
+        self.__statusPoller             :DevicePollingManager = statusPoller
+        self.__fastPollingSec           :float      = fastPollingSec
+        self.__idlePollingSec           :float      = idlePollingSec
+        self.__livenessPollingSec       :float      = livenessPollingSec
+
+        # 알림 쓰레드와 상태 읽기 쓰레드의 상태 반영 순서 보장
+        self.__lock                     :threading.Lock = threading.Lock()
+        self.__statusInfoDict           :dict[str, DelonghiStatusInfo] = {}
+
+
+
+    def addDelonghi(self, name:str, delonghiComm, sampleCallback, isTransitionalFunc = None):
+        '''
+        ### 드롱기 등록 (연결 후, statusPoller.start() 전에 호출)
+        - 알림 등록 : delonghiComm.setNotifyCallback(callback) -> callback(payload), 변환 : decodeDelonghiStateCode(payload) -> DelonghiState
+        - isTransitionalFunc : 알림을 사용하지 않을 때 빠르게 읽을 상태인지 판단하는 함수 (DevicePollingManager.addPoller 참고)
+        - 반환값 : 알림 사용 여부
+        '''
+        statusInfo :DelonghiStatusInfo = DelonghiStatusInfo(name, delonghiComm, sampleCallback)
+        self.__statusInfoDict[name] = statusInfo
+
+        statusInfo.isNotifyEnabled = self.__enableNotify(statusInfo)
+
+        if statusInfo.isNotifyEnabled == True:
+            CDRLog.print(f"{name} 상태 알림 사용 (연결 확인 읽기 {self.__livenessPollingSec}초 주기)")
+            self.__statusPoller.addPoller(
+                name, lambda: self.__readStatus(statusInfo), lambda status, isChanged: self.__onStatusPolled(statusInfo, status),
+                self.__livenessPollingSec, self.__livenessPollingSec
+            )
+        else:
+            CDRLog.print(f"{name} 상태 알림 미지원, 상태 읽기 사용")
+            self.__statusPoller.addPoller(
+                name, lambda: self.__readStatus(statusInfo), lambda status, isChanged: self.__onStatusPolled(statusInfo, status),
+                self.__fastPollingSec, self.__idlePollingSec, isTransitionalFunc
+            )
+
+        return statusInfo.isNotifyEnabled
+
+
+
+    def getStatus(self, name:str) -> int:
+        '''
+        마지막 상태 (DelonghiState), 상태 없음 None
+        '''
+        return self.__statusInfoDict[name].status
+
+
+
+    def getSampleTime(self, name:str) -> float:
+        '''
+        마지막 상태를 받은 시간 (time.monotonic 기준), 상태 없음 -1
+        '''
+        return self.__statusInfoDict[name].sampleTime
+
+
+
+    def getAgeSec(self, name:str) -> float:
+        sampleTime :float = self.__statusInfoDict[name].sampleTime
+        return float("inf") if sampleTime < 0 else time.monotonic() - sampleTime
+
+
+
+    def getReport(self) -> dict:
+        '''
+        드롱기별 알림 사용 여부, 알림/읽기 횟수, 알림 누락(읽은 상태가 알림 상태와 다름) 횟수, 상태 경과 시간
+        '''
+        return {
+            name : {
+                "isNotifyEnabled"       : statusInfo.isNotifyEnabled,
+                "notifyCount"           : statusInfo.notifyCount,
+                "pollCount"             : statusInfo.pollCount,
+                "missedNotifyCount"     : statusInfo.missedNotifyCount,
+                "decodeErrorCount"      : statusInfo.decodeErrorCount,
+                "ageSec"                : self.getAgeSec(name),
+            }
+            for name, statusInfo in self.__statusInfoDict.items()
+        }
+
+
+
+    def __enableNotify(self, statusInfo:DelonghiStatusInfo) -> bool:
+        '''
+        ### 상태 알림 콜백 등록
+        - 통신 변수/TPMSysFuncManager 가 알림을 지원하지 않거나 등록에 실패하면 False
+        '''
+        if hasattr(statusInfo.delonghiComm, "setNotifyCallback") == False or hasattr(self.__tpmSysFuncManager, "decodeDelonghiStateCode") == False:
+            return False
+
+        try:
+            statusInfo.delonghiComm.setNotifyCallback(lambda payload: self.__onNotify(statusInfo, payload))
+
+        except Exception as e:
+            CDRLog.print(f"{statusInfo.name} 상태 알림 등록 실패 : {e}")
+            return False
+
+        return True
+
+
+
+    def __onNotify(self, statusInfo:DelonghiStatusInfo, payload):
+        '''
+        ### 상태 알림 수신 (통신 변수의 수신 쓰레드에서 호출)
+        '''
+        try:
+            status :int = self.__tpmSysFuncManager.decodeDelonghiStateCode(payload)
+
+        except Exception as e:
+            statusInfo.decodeErrorCount += 1
+            CDRLog.print(f"{statusInfo.name} 상태 알림 변환 실패 : {e}")
+            return
+
+        with self.__lock:
+            statusInfo.notifyTime   = time.monotonic()
+            statusInfo.notifyCount  += 1
+            self.__applyStatus(statusInfo, status)
+
+
+
+    def __readStatus(self, statusInfo:DelonghiStatusInfo) -> int:
+        '''
+        상태 읽기 (DevicePollingManager 의 readFunc)
+        '''
+        statusInfo.pollStartTime = time.monotonic()
+        return self.__tpmSysFuncManager.getDelonghiStateCode(statusInfo.delonghiComm)
+
+
+
+    def __onStatusPolled(self, statusInfo:DelonghiStatusInfo, status:int):
+        '''
+        ### 상태 읽기 결과 반영
+        - 읽는 동안 알림을 받았으면 읽은 값이 더 오래된 상태이므로 버린다.
+        - 알림을 사용 중인데 읽은 상태가 다르면 알림이 누락된 것이므로 읽은 상태로 바로잡는다.
+        '''
+        with self.__lock:
+            statusInfo.pollCount += 1
+
+            if statusInfo.notifyTime >= statusInfo.pollStartTime:
+                return
+
+            if statusInfo.isNotifyEnabled == True and statusInfo.status != None and status != statusInfo.status:
+                statusInfo.missedNotifyCount += 1
+                CDRLog.print(f"{statusInfo.name} 상태 알림 누락 : {statusInfo.status} -> {status}")
+
+            self.__applyStatus(statusInfo, status)
+
+
+
+    def __applyStatus(self, statusInfo:DelonghiStatusInfo, status:int):
+        '''
+        마지막 상태 갱신 후 sampleCallback 호출 (self.__lock 안에서 호출)
+        '''
+        isChanged :bool = status != statusInfo.status
+
+        statusInfo.status       = status
+        statusInfo.sampleTime   = time.monotonic()
+
+        if statusInfo.sampleCallback != None:
+            statusInfo.sampleCallback(status, isChanged)
@@ -0,0 +1,175 @@
+import threading
+import time
+
+from cdrutils.log import CDRLog
+
+
+
+CONNECTION_STATE_WAITING        :str = "WAITING"
+CONNECTION_STATE_CONNECTING     :str = "CONNECTING"
+CONNECTION_STATE_CONNECTED      :str = "CONNECTED"
+CONNECTION_STATE_FAILED         :str = "FAILED"
+CONNECTION_STATE_TIMEOUT        :str = "TIMEOUT"
+
+
+
+
+class DeviceConnectionInfo():
+    '''
+    장비별 연결 설정 및 결과
+    '''
+
+    def __init__(self, name:str, commVar, connectFunc, timeoutSec:float, retryNum:int, isRequired:bool):
+        self.name                       :str        = name
+        self.commVar                                = commVar
+        self.connectFunc                            = connectFunc
+        self.timeoutSec                 :float      = timeoutSec
+        self.retryNum                   :int        = retryNum
+        self.isRequired                 :bool       = isRequired
+
+        self.state                      :str        = CONNECTION_STATE_WAITING
+        self.attemptNum                 :int        = 0
+        self.elapsedSec                 :float      = -1
+        self.errorMsg                   :str        = ""
+
+
+
+
+class DeviceConnectionManager():
+    '''
+    ### 장비 병렬 연결 관리 클래스 \n
+    - 등록된 모든 장비의 connect() 를 장비별 쓰레드에서 동시에 실행하고, isConnected() 가 될 때까지 기다린다.
+    - 장비별 연결 제한 시간(timeoutSec)과 재시도 횟수(retryNum), 전체 제한 시간(deadlineSec)을 넘기면 실패로 처리한다.
+    - 연결이 끝나면 장비별 소요 시간 리포트를 로그로 출력한다.
+    '''
+
+
+
+    def __init__(self, pollingSec:float = 0.05):
+        self.__pollingSec               :float      = pollingSec
+        self.__deviceInfoList           :list[DeviceConnectionInfo] = []
+        self.__startTime                :float      = 0.0
+        self.__totalElapsedSec          :float      = -1
+        self.__lock                     :threading.Lock = threading.Lock()
+
+
+
+    def addDevice(self, name:str, commVar, connectFunc, timeoutSec:float = 10.0, retryNum:int = 2, isRequired:bool = True):
+        '''
+        ### 연결할 장비 등록
+        - connectFunc : 장비 연결을 시작하는 함수 (ex. lambda: plcComm.connect("192.168.3.60", 9988))
+        - retryNum : 첫 시도 이후 추가로 재시도하는 횟수
+        '''
+        self.__deviceInfoList.append(DeviceConnectionInfo(name, commVar, connectFunc, timeoutSec, retryNum, isRequired))
+
+
+
+    def connectAll(self, deadlineSec:float = 60.0) -> bool:
+        '''
+        ### 등록된 모든 장비를 동시에 연결
+        - 반환값 : 필수 장비가 모두 연결되었으면 True
+        '''
+        self.__startTime = time.monotonic()
+
+        threadList :list[threading.Thread] = []
+        for deviceInfo in self.__deviceInfoList:
+            thread = threading.Thread(target = self.__connectThreadHandler, args = (deviceInfo, self.__startTime + deadlineSec), daemon = True)
+            thread.start()
+            threadList.append(thread)
+
+        for thread in threadList:
+            thread.join(max(0.0, self.__startTime + deadlineSec - time.monotonic()))
+
+        with self.__lock:
+            for deviceInfo in self.__deviceInfoList:
+                if deviceInfo.state in [CONNECTION_STATE_WAITING, CONNECTION_STATE_CONNECTING]:
+                    deviceInfo.state = CONNECTION_STATE_TIMEOUT
+
+            self.__totalElapsedSec = time.monotonic() - self.__startTime
+
+        CDRLog.print(self.getReportText())
+        return self.isReady()
+
+
+
+    def isReady(self) -> bool:
+        '''
+        필수 장비가 모두 연결되었는지 여부
+        '''
+        return all(
+            deviceInfo.state == CONNECTION_STATE_CONNECTED for deviceInfo in self.__deviceInfoList if deviceInfo.isRequired == True
+        )
+
+
+
+    def getFailedDeviceNameList(self) -> list[str]:
+        return [deviceInfo.name for deviceInfo in self.__deviceInfoList if deviceInfo.state != CONNECTION_STATE_CONNECTED]
+
+
+
+    def getReport(self) -> dict:
+        '''
+        장비별 연결 결과 (상태, 시도 횟수, 연결까지 걸린 시간)
+        '''
+        return {
+            "totalElapsedSec"           : self.__totalElapsedSec,
+            "deviceList"                : [
+                {
+                    "name"              : deviceInfo.name,
+                    "state"             : deviceInfo.state,
+                    "attemptNum"        : deviceInfo.attemptNum,
+                    "elapsedSec"        : deviceInfo.elapsedSec,
+                    "errorMsg"          : deviceInfo.errorMsg,
+                }
+                for deviceInfo in self.__deviceInfoList
+            ]
+        }
+
+
+
+    def getReportText(self) -> str:
+        lineList :list[str] = [f"---------- device connection report (ready in {self.__totalElapsedSec:.2f}s) ----------"]
+
+        for deviceInfo in sorted(self.__deviceInfoList, key = lambda info: info.elapsedSec if info.elapsedSec >= 0 else float("inf")):
+            elapsedText :str = f"{deviceInfo.elapsedSec:6.2f}s" if deviceInfo.elapsedSec >= 0 else "     - "
+            lineList.append(f"{deviceInfo.name:<16} {deviceInfo.state:<10} {elapsedText} (attempt {deviceInfo.attemptNum}) {deviceInfo.errorMsg}")
+
+        return "\n".join(lineList)
+
+
+
+    def __connectThreadHandler(self, deviceInfo:DeviceConnectionInfo, deadlineTime:float):
+        '''
+        ### 장비 1개 연결 쓰레드 (재시도 포함)
+        '''
+        while deviceInfo.attemptNum <= deviceInfo.retryNum and time.monotonic() < deadlineTime:
+
+            deviceInfo.attemptNum   += 1
+            deviceInfo.state        = CONNECTION_STATE_CONNECTING
+            attemptEndTime  :float  = min(deadlineTime, time.monotonic() + deviceInfo.timeoutSec)
+
+            try:
+                deviceInfo.connectFunc()
+            except Exception as e:
+                deviceInfo.errorMsg = str(e)
+                CDRLog.print(f"{deviceInfo.name} 연결 시도 {deviceInfo.attemptNum} 실패 : {e}")
+                time.sleep(self.__pollingSec)
+                continue
+
+            while time.monotonic() < attemptEndTime:
+
+                if deviceInfo.commVar.isConnected() == True:
+                    with self.__lock:
+                        deviceInfo.state        = CONNECTION_STATE_CONNECTED
+                        deviceInfo.elapsedSec   = time.monotonic() - self.__startTime
+                    return
+
+                time.sleep(self.__pollingSec)
+
+            CDRLog.print(f"{deviceInfo.name} 연결 시도 {deviceInfo.attemptNum} 시간 초과 ({deviceInfo.timeoutSec}s)")
+
+        with self.__lock:
+            if time.monotonic() >= deadlineTime:
+                deviceInfo.state = CONNECTION_STATE_TIMEOUT
+            else:
+                deviceInfo.state = CONNECTION_STATE_FAILED
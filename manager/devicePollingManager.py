@@ -0,0 +1,173 @@
+import threading
+import time
+
+from cdrutils.log import CDRLog
+
+
+
+
+class DevicePollerInfo():
+    '''
+    장비별 상태 읽기 설정 및 마지막 샘플
+    '''
+
+    def __init__(self, name:str, readFunc, sampleCallback, fastIntervalSec:float, idleIntervalSec:float, isTransitionalFunc):
+        self.name                       :str        = name
+        self.readFunc                               = readFunc
+        self.sampleCallback                         = sampleCallback
+        self.fastIntervalSec            :float      = fastIntervalSec
+        self.idleIntervalSec            :float      = idleIntervalSec
+        self.isTransitionalFunc                     = isTransitionalFunc
+
+        self.value                                  = None
+        # 마지막 샘플을 읽은 시간 (time.monotonic 기준), 샘플 없음 -1
+        self.sampleTime                 :float      = -1
+        self.readElapsedSec             :float      = 0.0
+        self.sampleCount                :int        = 0
+        self.errorCount                 :int        = 0
+        self.intervalSec                :float      = fastIntervalSec
+        self.isPollRequested            :bool       = False
+
+
+
+
+class DevicePollingManager():
+    '''
+    ### 장비별 상태 읽기(polling) 관리 클래스 \n
+    - 장비마다 별도의 쓰레드에서 상태를 읽으므로, 느린 장비(BLE)가 다른 장비(PLC 센서)의 읽기 주기를 늦추지 않는다.
+    - 장비가 변화 중(isTransitionalFunc 가 True)이거나 값이 바뀐 직후에는 fastIntervalSec 주기로 읽고,
+      값이 바뀌지 않으면 읽기 주기를 backoffRatio 배씩 늘려 idleIntervalSec 까지 줄인다.
+    - 모든 샘플에는 읽은 시간이 기록되어, 사용하는 쪽에서 값이 얼마나 오래되었는지 알 수 있다.
+    '''
+
+
+
+    def __init__(self, backoffRatio:float = 2.0):
+        self.__backoffRatio             :float      = backoffRatio
+        self.__pollerInfoDict           :dict[str, DevicePollerInfo] = {}
+        self.__cond                     :threading.Condition = threading.Condition()
+        self.__isRunning                :bool       = False
+
+
+
+    def addPoller(self, name:str, readFunc, sampleCallback = None, fastIntervalSec:float = 0.05, idleIntervalSec:float = 1.0, isTransitionalFunc = None):
+        '''
+        ### 상태를 읽을 장비 등록
+        - readFunc : 장비 상태를 읽어 반환하는 함수 (ex. lambda: plcComm.read("M000", 7))
+        - sampleCallback : 샘플을 읽을 때마다 호출 -> sampleCallback(value, isChanged)
+        - isTransitionalFunc : 읽은 값이 변화 중인 상태인지 판단하는 함수 -> isTransitionalFunc(value), None 이면 항상 False
+        '''
+        self.__pollerInfoDict[name] = DevicePollerInfo(name, readFunc, sampleCallback, fastIntervalSec, idleIntervalSec, isTransitionalFunc)
+
+
+
+    def start(self):
+        '''
+        ### 장비별 읽기 쓰레드 시작
+        '''
+        self.__isRunning = True
+
+        for pollerInfo in self.__pollerInfoDict.values():
+            threading.Thread(target = self.__pollingThreadHandler, args = (pollerInfo,), daemon = True).start()
+
+
+
+    def stop(self):
+        with self.__cond:
+            self.__isRunning = False
+            self.__cond.notify_all()
+
+
+
+    def requestPoll(self, name:str):
+        '''
+        ### 다음 주기를 기다리지 않고 바로 읽기 (ex. 로봇 동작 완료 직후 센서 확인)
+        - 읽기 주기도 fastIntervalSec 로 되돌린다.
+        '''
+        with self.__cond:
+            pollerInfo :DevicePollerInfo = self.__pollerInfoDict[name]
+            pollerInfo.isPollRequested  = True
+            pollerInfo.intervalSec      = pollerInfo.fastIntervalSec
+            self.__cond.notify_all()
+
+
+
+    def getValue(self, name:str):
+        return self.__pollerInfoDict[name].value
+
+
+
+    def getSampleTime(self, name:str) -> float:
+        '''
+        마지막 샘플을 읽은 시간 (time.monotonic 기준), 샘플 없음 -1
+        '''
+        return self.__pollerInfoDict[name].sampleTime
+
+
+
+    def getAgeSec(self, name:str) -> float:
+        '''
+        마지막 샘플이 읽힌 후 지난 시간(초), 샘플 없음 inf
+        '''
+        sampleTime :float = self.__pollerInfoDict[name].sampleTime
+        return float("inf") if sampleTime < 0 else time.monotonic() - sampleTime
+
+
+
+    def getReport(self) -> dict:
+        '''
+        장비별 읽기 상태 (샘플 수, 오류 수, 현재 주기, 마지막 읽기 소요 시간, 샘플 경과 시간)
+        '''
+        return {
+            name : {
+                "sampleCount"           : pollerInfo.sampleCount,
+                "errorCount"            : pollerInfo.errorCount,
+                "intervalSec"           : pollerInfo.intervalSec,
+                "readElapsedSec"        : pollerInfo.readElapsedSec,
+                "ageSec"                : self.getAgeSec(name),
+            }
+            for name, pollerInfo in self.__pollerInfoDict.items()
+        }
+
+
+
+    def __pollingThreadHandler(self, pollerInfo:DevicePollerInfo):
+        '''
+        ### 장비 1개 상태 읽기 쓰레드
+        '''
+        while self.__isRunning == True:
+
+            readStartTime   :float  = time.monotonic()
+            try:
+                value = pollerInfo.readFunc()
+
+            except Exception as e:
+                pollerInfo.errorCount += 1
+                CDRLog.print(f"{pollerInfo.name} 상태 읽기 실패 : {e}")
+                self.__waitNextPoll(pollerInfo, pollerInfo.idleIntervalSec)
+                continue
+
+            isChanged :bool = value != pollerInfo.value
+
+            pollerInfo.value            = value
+            pollerInfo.sampleTime       = time.monotonic()
+            pollerInfo.readElapsedSec   = pollerInfo.sampleTime - readStartTime
+            pollerInfo.sampleCount      += 1
+
+            # 변화 중이거나 값이 바뀌었으면 빠르게, 아니면 점점 느리게
+            if isChanged == True or (pollerInfo.isTransitionalFunc != None and pollerInfo.isTransitionalFunc(value) == True):
+                pollerInfo.intervalSec = pollerInfo.fastIntervalSec
+            else:
+                pollerInfo.intervalSec = min(pollerInfo.idleIntervalSec, pollerInfo.intervalSec * self.__backoffRatio)
+
+            if pollerInfo.sampleCallback != None:
+                pollerInfo.sampleCallback(value, isChanged)
+
+            self.__waitNextPoll(pollerInfo, pollerInfo.intervalSec)
+
+
+
+    def __waitNextPoll(self, pollerInfo:DevicePollerInfo, intervalSec:float):
+        with self.__cond:
+            self.__cond.wait_for(lambda: pollerInfo.isPollRequested == True or self.__isRunning == False, intervalSec)
+            pollerInfo.isPollRequested = False
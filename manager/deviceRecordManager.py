@@ -0,0 +1,565 @@
+import threading
+import struct
+import base64
+import json
+import time
+import os
+
+from array import array
+from collections import deque
+
+from cdrutils.log import CDRLog
+
+from const.deviceRecordKind import DeviceRecordKind
+from data.deviceRecordData import DeviceRecordData
+
+
+
+# 기록 파일 머리말 (02 : 값을 JSON 으로 저장)
+RECORD_FILE_MAGIC               :bytes          = b"CDRDIO02"
+# 기록 1개의 머리 : 종류(u8), 호출 순번(u32), 경과 시간(f64), 장비 번호(u16), 함수 번호(u16), 값 길이(u32) + 값(JSON, UTF-8)
+RECORD_HEADER                   :struct.Struct  = struct.Struct("<BIdHHI")
+# 기록 값 안의 통신 변수 자신(ex. 이벤트 콜백의 data 인자), 콜백 함수 인자 자리 표시
+VAR_MARK                        :str            = "@var"
+CALLBACK_MARK                   :str            = "@callback"
+# JSON 으로 구분할 수 없는 값의 종류 표시 : {"@tuple" : [...]}, {"@bytes" : "base64"}, {"@array" : [typecode, [...]]}, {"@dict" : [[key, value], ...]}, {"@repr" : "..."}
+TUPLE_TAG                       :str            = "@tuple"
+BYTES_TAG                       :str            = "@bytes"
+ARRAY_TAG                       :str            = "@array"
+DICT_TAG                        :str            = "@dict"
+REPR_TAG                        :str            = "@repr"
+
+
+
+
+class RecordedVar():
+    '''
+    ### 기록 모드 통신 변수
+    - 실제 통신 변수의 함수 호출/반환/예외와, 실제 통신 변수가 호출한 콜백(생성자 이벤트 콜백, 알림 콜백)을 DeviceRecordManager 에 기록한다.
+    - 함수가 아닌 속성은 기록하지 않고 그대로 전달한다.
+    '''
+
+    def __init__(self, recordManager:"DeviceRecordManager", deviceName:str, varClass, eventCallback):
+        self._recordManager             :DeviceRecordManager = recordManager
+        self._deviceName                :str        = deviceName
+        self._var                                   = None
+        self._var                                   = varClass(recordManager.wrapCallback(self, "__init__", 0, eventCallback))
+
+    def __getattr__(self, name:str):
+        attr = getattr(self._var, name)
+        if callable(attr) == False:
+            return attr
+
+        return lambda *args, **kwargs: self._recordManager.recordCall(self, name, attr, args, kwargs)
+
+
+
+
+class ReplayVar():
+    '''
+    ### 재생 모드 통신 변수
+    - 장비 대신 기록 파일의 응답을 같은 장비/함수의 호출 순서대로, 기록된 응답 시간 후에 반환한다.
+    - 기록에 없는 함수는 속성이 없는 것으로 처리한다. (hasattr 로 기능 지원 여부를 판단하는 코드와 동일하게 동작)
+    '''
+
+    def __init__(self, replayManager:"DeviceRecordManager", deviceName:str, eventCallback):
+        self._replayManager             :DeviceRecordManager = replayManager
+        self._deviceName                :str        = deviceName
+        replayManager.registerCallback(self, "__init__", 0, eventCallback)
+
+    def __getattr__(self, name:str):
+        if name.startswith("_") == True or self._replayManager.hasMethod(self._deviceName, name) == False:
+            raise AttributeError(f"{self._deviceName} 기록에 없는 함수 : {name}")
+
+        return lambda *args, **kwargs: self._replayManager.replayCall(self, name, args, kwargs)
+
+
+
+
+class DeviceReplayInfo():
+    '''
+    재생 모드 장비 1대의 재생 통계
+    '''
+
+    def __init__(self, name:str):
+        self.name                       :str        = name
+        self.callCount                  :int        = 0
+        # 호출 인자가 기록과 다른 횟수 / 기록된 호출을 모두 사용한 후의 호출 횟수
+        self.mismatchCount              :int        = 0
+        self.missCount                  :int        = 0
+        self.skippedCallbackCount       :int        = 0
+
+
+
+
+class DeviceRecordManager():
+    '''
+    ### 장비 통신 기록/재생 클래스 \n
+    - 기록("record") : 컨트롤러가 사용하는 모든 통신 변수(MelsecPLCVar, BLEVar, ModbusTCPVar, TcpIPVar, MqttVar)의 요청/응답/예외와
+      장비가 호출한 콜백을 시간(time.monotonic 기준 경과 시간)과 함께 이진 기록 파일에 순서대로 저장한다.
+    - 재생("replay") : 장비 없이 기록 파일로 컨트롤러를 실행한다. 호출은 장비/함수별 기록 순서대로 기록된 응답 시간 후에 응답하고,
+      콜백(이벤트, 알림)은 기록된 시간에 다시 호출한다. 같은 코드를 재생하면 같은 호출 순서와 응답을 받는다.
+    - 재생 중 호출 인자가 기록과 다르거나 기록이 부족하면 getReport() 에 횟수를 남긴다. (스케줄러 변경 A/B 비교 시 기록과 달라진 정도)
+    - 사용 안 함("") : createVar() 는 통신 변수를 그대로 생성한다.
+    '''
+
+    MODE_OFF                    :str        = ""
+    MODE_RECORD                 :str        = "record"
+    MODE_REPLAY                 :str        = "replay"
+
+
+
+    def __init__(self, mode:str = "", filePath:str = "", flushIntervalSec:float = 1.0):
+        if mode not in [self.MODE_OFF, self.MODE_RECORD, self.MODE_REPLAY]:
+            raise ValueError(f"알 수 없는 장비 통신 기록 모드 : {mode}")
+
+        self.__mode                     :str        = mode
+        self.__filePath                 :str        = filePath
+        self.__flushIntervalSec         :float      = flushIntervalSec
+
+        self.__lock                     :threading.Lock = threading.Lock()
+        self.__cond                     :threading.Condition = threading.Condition()
+        self.__isRunning                :bool       = False
+        # 기록 : 기록 시작 시간 / 재생 : start() 시간 (time.monotonic 기준)
+        self.__startTime                :float      = time.monotonic()
+
+        # 기록 모드 ------------------------------
+        self.__recordFile                           = None
+        self.__lastFlushTime            :float      = 0.0
+        self.__callSeq                  :int        = 0
+        self.__deviceIdDict             :dict[str, int] = {}
+        self.__methodIdDict             :dict[str, int] = {}
+        self.__callCountDict            :dict[str, int] = {}
+
+        # 재생 모드 ------------------------------
+        # (장비 이름, 함수 이름) -> 남은 CALL 기록 / 마지막으로 사용한 CALL 기록
+        self.__callQueueDict            :dict[tuple[str, str], deque] = {}
+        self.__lastCallDict             :dict[tuple[str, str], DeviceRecordData] = {}
+        self.__callbackRecordList       :list[DeviceRecordData] = []
+        # (장비 이름, 함수 이름, 인자 위치) -> 컨트롤러가 전달한 콜백
+        self.__callbackDict             :dict[tuple[str, str, int], object] = {}
+        self.__replayVarDict            :dict[str, ReplayVar] = {}
+        self.__replayInfoDict           :dict[str, DeviceReplayInfo] = {}
+
+        if mode == self.MODE_RECORD:
+            self.__openRecordFile()
+        elif mode == self.MODE_REPLAY:
+            self.__loadReplay(self.readRecordFile(filePath))
+
+
+
+    def getMode(self) -> str:
+        return self.__mode
+
+
+
+    def createVar(self, varClass, deviceName:str, eventCallback):
+        '''
+        ### 모드에 맞는 통신 변수 생성 (ex. createVar(MelsecPLCVar, "PLC", self.commVarEventCallback))
+        - 사용 안 함 : varClass(eventCallback) / 기록 : RecordedVar / 재생 : ReplayVar (varClass 는 사용하지 않음)
+        '''
+        if self.__mode == self.MODE_RECORD:
+            return RecordedVar(self, deviceName, varClass, eventCallback)
+
+        if self.__mode == self.MODE_REPLAY:
+            with self.__lock:
+                self.__replayInfoDict.setdefault(deviceName, DeviceReplayInfo(deviceName))
+
+            replayVar :ReplayVar = ReplayVar(self, deviceName, eventCallback)
+            self.__replayVarDict[deviceName] = replayVar
+            return replayVar
+
+        return varClass(eventCallback)
+
+
+
+    def start(self):
+        '''
+        ### 재생 모드 : 재생 시간 기준을 지금으로 맞추고 콜백 재생 쓰레드 시작 (모든 통신 변수를 생성한 직후 호출)
+        '''
+        if self.__mode != self.MODE_REPLAY:
+            return
+
+        self.__startTime = time.monotonic()
+        self.__isRunning = True
+        threading.Thread(target = self.__callbackThreadHandler, daemon = True).start()
+
+
+
+    def close(self):
+        '''
+        ### 기록 파일 닫기 / 콜백 재생 중지
+        '''
+        with self.__cond:
+            self.__isRunning = False
+            self.__cond.notify_all()
+
+        with self.__lock:
+            if self.__recordFile != None:
+                self.__recordFile.close()
+                self.__recordFile = None
+
+
+
+    def getReport(self) -> dict:
+        '''
+        ### 장비별 기록/재생 통계
+        - 기록 : {장비 이름 : {"callCount"}}
+        - 재생 : {장비 이름 : {"callCount", "mismatchCount", "missCount", "remainCount", "skippedCallbackCount"}}
+        '''
+        if self.__mode == self.MODE_RECORD:
+            return {name : {"callCount" : callCount} for name, callCount in self.__callCountDict.items()}
+
+        with self.__lock:
+            return {
+                name : {
+                    "callCount"             : replayInfo.callCount,
+                    "mismatchCount"         : replayInfo.mismatchCount,
+                    "missCount"             : replayInfo.missCount,
+                    "remainCount"           : sum(len(callQueue) for (deviceName, _), callQueue in self.__callQueueDict.items() if deviceName == name),
+                    "skippedCallbackCount"  : replayInfo.skippedCallbackCount,
+                }
+                for name, replayInfo in self.__replayInfoDict.items()
+            }
+
+
+
+    @staticmethod
+    def readRecordFile(filePath:str) -> list[DeviceRecordData]:
+        '''
+        ### 기록 파일 읽기 (이름 등록 기록은 제외)
+        - CALL 기록에는 짝이 되는 RETURN/RAISE 기록(result)과 응답 시간(elapsedSec)을 연결한다.
+        - 기록 중 종료되어 마지막 기록이 잘린 경우 잘린 기록은 버린다.
+        - 값은 데이터(JSON)로만 읽으므로, 다른 곳에서 받은 기록 파일을 읽어도 코드가 실행되지 않는다.
+        '''
+        with open(filePath, "rb") as recordFile:
+            buffer :bytes = recordFile.read()
+
+        if buffer.startswith(RECORD_FILE_MAGIC) == False:
+            raise ValueError(f"장비 통신 기록 파일이 아님 : {filePath}")
+
+        recordList      :list[DeviceRecordData]         = []
+        deviceNameDict  :dict[int, str]                 = {}
+        methodNameDict  :dict[int, str]                 = {}
+        callDict        :dict[int, DeviceRecordData]    = {}
+        offset          :int                            = len(RECORD_FILE_MAGIC)
+
+        while offset + RECORD_HEADER.size <= len(buffer):
+
+            kind, seq, recordTime, deviceId, methodId, valueLen = RECORD_HEADER.unpack_from(buffer, offset)
+            offset += RECORD_HEADER.size
+            if offset + valueLen > len(buffer):
+                break
+
+            value = DeviceRecordManager.__decodeValue(json.loads(buffer[offset : offset + valueLen].decode("utf-8")))
+            offset += valueLen
+
+            if kind == DeviceRecordKind.DEVICE:
+                deviceNameDict[deviceId] = value
+                continue
+            if kind == DeviceRecordKind.METHOD:
+                methodNameDict[methodId] = value
+                continue
+
+            record :DeviceRecordData = DeviceRecordData(kind, seq, recordTime, deviceNameDict[deviceId], methodNameDict[methodId], value)
+            recordList.append(record)
+
+            if kind == DeviceRecordKind.CALL:
+                callDict[seq] = record
+            elif kind in [DeviceRecordKind.RETURN, DeviceRecordKind.RAISE] and seq in callDict:
+                callRecord :DeviceRecordData = callDict.pop(seq)
+                callRecord.result       = record
+                callRecord.elapsedSec   = record.time - callRecord.time
+
+        return recordList
+
+
+
+    # ============================================================================================================================
+    # 기록
+    # ============================================================================================================================
+
+    def recordCall(self, recordedVar:RecordedVar, methodName:str, method, args:tuple, kwargs:dict):
+        '''
+        ### RecordedVar 의 함수 호출 기록 후 실제 통신 변수 함수 실행
+        - 콜백 함수 인자는 장비가 호출할 때 기록되도록 감싸서 전달한다.
+        '''
+        forwardArgs :tuple = tuple(
+            self.wrapCallback(recordedVar, methodName, index, arg) if callable(arg) == True else arg for index, arg in enumerate(args)
+        )
+
+        with self.__lock:
+            self.__callSeq  += 1
+            seq :int        = self.__callSeq
+            self.__callCountDict[recordedVar._deviceName] = self.__callCountDict.get(recordedVar._deviceName, 0) + 1
+
+        self.__writeRecord(DeviceRecordKind.CALL, seq, recordedVar._deviceName, methodName, self.__markValue((args, kwargs), recordedVar._var))
+
+        try:
+            result = method(*forwardArgs, **kwargs)
+
+        except Exception as e:
+            self.__writeRecord(DeviceRecordKind.RAISE, seq, recordedVar._deviceName, methodName, (type(e).__name__, str(e)))
+            raise
+
+        self.__writeRecord(DeviceRecordKind.RETURN, seq, recordedVar._deviceName, methodName, self.__markValue(result, recordedVar._var))
+        return result
+
+
+
+    def wrapCallback(self, recordedVar:RecordedVar, methodName:str, argIndex:int, callback):
+        '''
+        ### 장비가 호출하는 콜백을 기록하도록 감싸기 (콜백 인자의 실제 통신 변수는 RecordedVar 로 바꿔 전달)
+        '''
+        if callback == None:
+            return None
+
+        def recordedCallback(*args):
+            self.__writeRecord(DeviceRecordKind.CALLBACK, 0, recordedVar._deviceName, methodName, (argIndex, self.__markValue(args, recordedVar._var)))
+            return callback(*(recordedVar if arg is recordedVar._var and arg is not None else arg for arg in args))
+
+        return recordedCallback
+
+
+
+    def __openRecordFile(self):
+        dirPath :str = os.path.dirname(self.__filePath)
+        if dirPath != "":
+            os.makedirs(dirPath, exist_ok = True)
+
+        self.__recordFile       = open(self.__filePath, "wb")
+        self.__recordFile.write(RECORD_FILE_MAGIC)
+        self.__lastFlushTime    = time.monotonic()
+        CDRLog.print(f"장비 통신 기록 시작 : {self.__filePath}")
+
+
+
+    def __writeRecord(self, kind:int, seq:int, deviceName:str, methodName:str, value):
+        valueBytes :bytes = self.__encodeValue(value)
+
+        with self.__lock:
+            if self.__recordFile == None:
+                return
+
+            deviceId    :int    = self.__getNameId(self.__deviceIdDict, DeviceRecordKind.DEVICE, deviceName)
+            methodId    :int    = self.__getNameId(self.__methodIdDict, DeviceRecordKind.METHOD, methodName)
+            now         :float  = time.monotonic()
+
+            # 기록 시간은 lock 안에서 읽으므로 파일 안의 기록은 시간 순서
+            self.__recordFile.write(RECORD_HEADER.pack(kind, seq, now - self.__startTime, deviceId, methodId, len(valueBytes)))
+            self.__recordFile.write(valueBytes)
+
+            if now - self.__lastFlushTime >= self.__flushIntervalSec:
+                self.__recordFile.flush()
+                self.__lastFlushTime = now
+
+
+
+    def __getNameId(self, nameIdDict:dict[str, int], kind:int, name:str) -> int:
+        '''
+        이름 번호 (처음 사용하는 이름은 이름 등록 기록을 먼저 남긴다, self.__lock 안에서 호출)
+        '''
+        nameId :int = nameIdDict.get(name)
+        if nameId != None:
+            return nameId
+
+        nameId              = len(nameIdDict)
+        nameIdDict[name]    = nameId
+        valueBytes :bytes   = self.__encodeValue(name)
+        self.__recordFile.write(RECORD_HEADER.pack(kind, 0, time.monotonic() - self.__startTime, nameId, nameId, len(valueBytes)))
+        self.__recordFile.write(valueBytes)
+
+        return nameId
+
+
+
+    @staticmethod
+    def __markValue(value, var):
+        '''
+        기록 값 안의 통신 변수 자신과 콜백 함수를 자리 표시로 바꾸기 (tuple, list, dict 안쪽까지)
+        '''
+        if var is not None and value is var:
+            return VAR_MARK
+        if isinstance(value, (tuple, list)) == True:
+            return type(value)(DeviceRecordManager.__markValue(item, var) for item in value)
+        if isinstance(value, dict) == True:
+            return {key : DeviceRecordManager.__markValue(item, var) for key, item in value.items()}
+        if callable(value) == True and isinstance(value, type) == False:
+            return CALLBACK_MARK
+
+        return value
+
+
+
+    @staticmethod
+    def __encodeValue(value) -> bytes:
+        '''
+        기록 값을 JSON(UTF-8)으로 변환 (__toJsonValue 참고)
+        '''
+        return json.dumps(DeviceRecordManager.__toJsonValue(value), ensure_ascii = False, separators = (",", ":")).encode("utf-8")
+
+
+
+    @staticmethod
+    def __toJsonValue(value):
+        '''
+        기록 값을 JSON 으로 저장할 수 있는 값으로 바꾸기 (tuple, list, dict 안쪽까지)
+        - tuple, bytes, array, 문자열이 아닌 key 를 가진 dict 는 종류 표시를 붙여 재생 시 같은 값으로 되돌린다.
+        - 그 외 저장할 수 없는 값(장비 라이브러리 객체 등)은 repr 문자열로 저장
+        '''
+        if value is None or isinstance(value, (bool, int, float, str)) == True:
+            return value
+        if isinstance(value, list) == True:
+            return [DeviceRecordManager.__toJsonValue(item) for item in value]
+        if isinstance(value, tuple) == True:
+            return {TUPLE_TAG : [DeviceRecordManager.__toJsonValue(item) for item in value]}
+        if isinstance(value, (bytes, bytearray)) == True:
+            return {BYTES_TAG : base64.b64encode(value).decode("ascii")}
+        if isinstance(value, array) == True:
+            return {ARRAY_TAG : [value.typecode, value.tolist()]}
+        if isinstance(value, dict) == True:
+            return {DICT_TAG : [[DeviceRecordManager.__toJsonValue(key), DeviceRecordManager.__toJsonValue(item)] for key, item in value.items()]}
+
+        return {REPR_TAG : repr(value)}
+
+
+
+    @staticmethod
+    def __decodeValue(value):
+        '''
+        __toJsonValue 로 저장한 값을 원래 값으로 되돌리기 (repr 로 저장한 값은 repr 문자열)
+        '''
+        if isinstance(value, list) == True:
+            return [DeviceRecordManager.__decodeValue(item) for item in value]
+        if isinstance(value, dict) == False or len(value) != 1:
+            return value
+
+        tag, tagValue = next(iter(value.items()))
+        if tag == TUPLE_TAG:
+            return tuple(DeviceRecordManager.__decodeValue(item) for item in tagValue)
+        if tag == BYTES_TAG:
+            return base64.b64decode(tagValue)
+        if tag == ARRAY_TAG:
+            return array(tagValue[0], tagValue[1])
+        if tag == DICT_TAG:
+            return {DeviceRecordManager.__decodeValue(key) : DeviceRecordManager.__decodeValue(item) for key, item in tagValue}
+        if tag == REPR_TAG:
+            return tagValue
+
+        raise ValueError(f"알 수 없는 장비 통신 기록 값 : {tag}")
+
+
+
+    # ============================================================================================================================
+    # 재생
+    # ============================================================================================================================
+
+    def hasMethod(self, deviceName:str, methodName:str) -> bool:
+        return (deviceName, methodName) in self.__callQueueDict
+
+
+
+    def registerCallback(self, replayVar:ReplayVar, methodName:str, argIndex:int, callback):
+        '''
+        ### 컨트롤러가 전달한 콜백 등록 (기록된 CALLBACK 을 재생할 때 호출)
+        '''
+        if callback == None:
+            return
+
+        with self.__lock:
+            self.__callbackDict[(replayVar._deviceName, methodName, argIndex)] = callback
+
+
+
+    def replayCall(self, replayVar:ReplayVar, methodName:str, args:tuple, kwargs:dict):
+        '''
+        ### 기록된 다음 호출의 응답 시간만큼 대기 후 기록된 응답 반환 (예외 기록은 RuntimeError)
+        - 기록된 호출을 모두 사용했으면 마지막 응답을 대기 없이 반환한다.
+        '''
+        deviceName :str = replayVar._deviceName
+
+        for index, arg in enumerate(args):
+            if callable(arg) == True:
+                self.registerCallback(replayVar, methodName, index, arg)
+
+        with self.__lock:
+            replayInfo  :DeviceReplayInfo   = self.__replayInfoDict[deviceName]
+            callQueue   :deque              = self.__callQueueDict[(deviceName, methodName)]
+            replayInfo.callCount += 1
+
+            if len(callQueue) > 0:
+                callRecord :DeviceRecordData = callQueue.popleft()
+                self.__lastCallDict[(deviceName, methodName)] = callRecord
+                waitSec :float = max(0.0, callRecord.elapsedSec)
+
+                if callRecord.value != self.__markValue((args, kwargs), replayVar):
+                    replayInfo.mismatchCount += 1
+            else:
+                callRecord :DeviceRecordData = self.__lastCallDict.get((deviceName, methodName))
+                waitSec :float = 0.0
+                replayInfo.missCount += 1
+
+        if waitSec > 0:
+            time.sleep(waitSec)
+
+        if callRecord == None or callRecord.result == None:
+            return None
+
+        if callRecord.result.kind == DeviceRecordKind.RAISE:
+            errorName, errorMsg = callRecord.result.value
+            raise RuntimeError(f"{deviceName} {methodName} 기록된 예외 {errorName} : {errorMsg}")
+
+        return self.__unmarkValue(callRecord.result.value, replayVar)
+
+
+
+    def __loadReplay(self, recordList:list[DeviceRecordData]):
+        for record in recordList:
+            if record.kind == DeviceRecordKind.CALL:
+                self.__callQueueDict.setdefault((record.deviceName, record.methodName), deque()).append(record)
+            elif record.kind == DeviceRecordKind.CALLBACK:
+                self.__callbackRecordList.append(record)
+
+        CDRLog.print(f"장비 통신 기록 불러오기 완료 : {self.__filePath} ({len(recordList)} records, {len(self.__callbackRecordList)} callbacks)")
+
+
+
+    @staticmethod
+    def __unmarkValue(value, replayVar:ReplayVar):
+        if isinstance(value, str) == True and value == VAR_MARK:
+            return replayVar
+        if isinstance(value, (tuple, list)) == True:
+            return type(value)(DeviceRecordManager.__unmarkValue(item, replayVar) for item in value)
+        if isinstance(value, dict) == True:
+            return {key : DeviceRecordManager.__unmarkValue(item, replayVar) for key, item in value.items()}
+
+        return value
+
+
+
+    def __callbackThreadHandler(self):
+        '''
+        ### 기록된 콜백(이벤트, 알림)을 기록된 시간에 다시 호출하는 쓰레드
+        '''
+        for record in self.__callbackRecordList:
+
+            with self.__cond:
+                self.__cond.wait_for(lambda: self.__isRunning == False, record.time - (time.monotonic() - self.__startTime))
+                if self.__isRunning == False:
+                    return
+
+            argIndex, args = record.value
+
+            with self.__lock:
+                callback                = self.__callbackDict.get((record.deviceName, record.methodName, argIndex))
+                replayVar :ReplayVar    = self.__replayVarDict.get(record.deviceName)
+
+                if callback == None or replayVar == None:
+                    self.__replayInfoDict.setdefault(record.deviceName, DeviceReplayInfo(record.deviceName)).skippedCallbackCount += 1
+                    continue
+
+            try:
+                callback(*self.__unmarkValue(args, replayVar))
+
+            except Exception as e:
+                CDRLog.print(f"{record.deviceName} 기록된 콜백 재생 실패 : {e}")
@@ -0,0 +1,247 @@
+from const.delonghiState import DelonghiState
+from const.orderState import OrderState
+from const.recipeTable import RecipeTable
+
+from data.laneStateData import LaneStateData
+
+from manager.timingModelManager import TimingModelManager
+
+
+
+
+class LaneDispatchManager():
+    '''
+    ### 음료별 제조 라인(드롱기) 배정 클래스 \n
+    - 라인별로 남은 추출 시간, 로봇 동작, 픽업대 점유 상태, 메뉴 종류를 고려해 음료의 예상 완료 시간을 계산한다.
+    - 예상 완료 시간이 가장 빠른 라인을 선택하며, 지금 비어 있는 라인보다 곧 비는 라인이 더 빠르면 그 라인을 기다린다.
+    - 직접 제조 라인(Indy7L + 드롱기 + 픽업대A)은 일반 라인보다 빨리 완료되고, 그동안 일반 라인에 컵을 전달할 필요가 없을 때만 사용한다.
+      (일반 라인의 픽업대가 사용 중이면 추출이 끝난 음료를 직접 제조 라인의 픽업대로 옮기기도 한다)
+    - 시간 단위는 초이며, 현재 시간(now)은 호출하는 쪽의 time.monotonic() 값을 사용한다.
+    - timingModel 을 지정하면 추출/로봇 동작 시간은 학습된 예상 시간(predictPercentile 백분위)을 사용하고, 샘플이 부족하면 아래 기본값을 사용한다.
+      (추출 : "brew(메뉴 번호)", 로봇 동작 : "공정 이름(메뉴 번호)" 동작)
+    '''
+
+
+
+    def __init__(self, timingModel:TimingModelManager = None):
+        self.timingModel                :TimingModelManager = timingModel
+        self.predictPercentile          :float      = 50.0
+
+        # 메뉴별 추출 시간 (RecipeTable 메뉴 정보)
+        self.brewSecDict                :dict[int, float]   = {menuId : menuInfo["brewSec"] for menuId, menuInfo in RecipeTable.MENU_DICT.items()}
+        # 메뉴별 Indy7L 컵 전달 시간 (컵 배출 ~ 중간 거치대, 아이스는 얼음 받는 시간 포함)
+        self.cupDeliverySecDict         :dict[int, float]   = {menuId : menuInfo["cupDeliverySec"] for menuId, menuInfo in RecipeTable.MENU_DICT.items()}
+        # 메뉴별 미리 준비한 컵의 남은 전달 시간 (얼음 받기, 컵을 든 위치 ~ 중간 거치대)
+        self.iceStageSecDict            :dict[int, float]   = {menuId : menuInfo["iceStageSec"] for menuId, menuInfo in RecipeTable.MENU_DICT.items()}
+        self.cupHandoffSecDict          :dict[int, float]   = {menuId : menuInfo["cupHandoffSec"] for menuId, menuInfo in RecipeTable.MENU_DICT.items()}
+        # 라인 로봇이 중간 거치대의 컵을 드롱기로 옮기는 시간
+        self.cupTransferSec             :float      = 12.0
+        # 라인 로봇이 드롱기의 음료를 픽업대로 옮기는 시간
+        self.pickupTransferSec          :float      = 14.0
+        # 픽업대에 음료가 놓인 후 고객이 가져가기까지의 예상 시간
+        self.pickupWaitSec              :float      = 25.0
+        # 추출 중이 아닌데 준비되지 않은 드롱기가 준비되기까지의 예상 시간
+        self.notReadyPenaltySec         :float      = 10.0
+        # 메뉴별로 컵이 중간 거치대에서 라인을 기다려도 되는 최대 시간 (아이스는 얼음이 녹으므로 짧게)
+        self.cupHoldLimitSecDict        :dict[int, float]   = {menuId : menuInfo["cupHoldLimitSec"] for menuId, menuInfo in RecipeTable.MENU_DICT.items()}
+        # 직접 제조로 일반 라인의 다음 컵 전달이 늦어져도 되는 시간
+        self.directFeedDelaySec         :float      = 15.0
+
+
+
+    def getBrewSec(self, menuId:int) -> float:
+        return self.__predictSec("brew", menuId, self.brewSecDict.get(menuId, max(self.brewSecDict.values())))
+
+
+
+    def getCupTransferSec(self, menuId:int) -> float:
+        return self.__predictSec("multiBrew", menuId, self.cupTransferSec)
+
+
+
+    def getPickupTransferSec(self, menuId:int) -> float:
+        return self.__predictSec("multiPickup", menuId, self.pickupTransferSec)
+
+
+
+    def getCupDeliverySec(self, menuId:int, jobState:int = OrderState.BREW_BEFORE) -> float:
+        '''
+        ### jobState 상태의 음료 컵이 중간 거치대에 도착하기까지 남은 시간
+        - 미리 준비한 컵(CUP_PREPARED, CUP_STAGED)은 남은 단계의 시간만, 이미 도착한 컵(CUP_READY)은 0
+        '''
+        if jobState == OrderState.CUP_READY:
+            return 0.0
+
+        cupHandoffSec   :float  = self.__predictSec("multiCupHandoff", menuId, self.cupHandoffSecDict.get(menuId, max(self.cupHandoffSecDict.values())))
+        if jobState == OrderState.CUP_STAGED:
+            return cupHandoffSec
+
+        iceStageSec     :float  = self.__predictSec("multiIceStage", menuId, self.iceStageSecDict.get(menuId, max(self.iceStageSecDict.values())))
+        if jobState == OrderState.CUP_PREPARED:
+            return iceStageSec + cupHandoffSec
+
+        # 컵 받기 기본값 : 전체 전달 시간 - 얼음 받기 - 중간 거치대 전달
+        cupStageSec     :float  = self.cupDeliverySecDict.get(menuId, max(self.cupDeliverySecDict.values())) - self.iceStageSecDict.get(menuId, 0.0) - self.cupHandoffSecDict.get(menuId, 0.0)
+        return self.__predictSec("multiCupStage", menuId, cupStageSec) + iceStageSec + cupHandoffSec
+
+
+
+    def getDirectMakeSec(self, menuId:int) -> float:
+        '''
+        직접 제조 라인에서 미리 준비한 컵(얼음 포함)을 드롱기에 놓은 후 음료가 픽업대에 놓일 때까지 걸리는 시간
+        '''
+        defaultSec :float = self.cupTransferSec + self.brewSecDict.get(menuId, max(self.brewSecDict.values())) + self.pickupTransferSec
+        return self.__predictSec("multiDirectBrew", menuId, defaultSec)
+
+
+
+    def getDirectPickupSec(self, menuId:int) -> float:
+        return self.__predictSec("multiDirectPickup", menuId, self.pickupTransferSec)
+
+
+
+    def getCupHoldLimitSec(self, menuId:int) -> float:
+        return self.cupHoldLimitSecDict.get(menuId, min(self.cupHoldLimitSecDict.values()))
+
+
+
+    def predictLaneFreeTime(self, lane:LaneStateData, now:float) -> float:
+        '''
+        ### 라인이 다음 컵을 받을 수 있게 되는 예상 시간 (드롱기 트레이가 비고 로봇이 한가해지는 시간)
+        - 드롱기 오류 등으로 사용할 수 없는 라인은 inf
+        '''
+        robotFreeTime           :float  = max(now, lane.robotBusyUntil)
+        pickupTrayFreeTime      :float  = now + self.pickupWaitSec if lane.hasCupOnPickupTray == 1 else now
+
+        # 제조 중인 음료가 있으면 -> 추출 완료 후 픽업대로 옮겨질 때까지
+        if lane.drinkJob != None:
+
+            # 직접 제조 라인 사용 중 -> 직접 제조(픽업대 전달)가 끝날 때까지 (같은 드롱기를 사용하는 일반 라인 포함)
+            if lane.drinkJob.state in (OrderState.DIRECT_MAKE, OrderState.DIRECT_PICKUP):
+                startTime   :float  = now if lane.drinkJob.recipeRun == None else lane.drinkJob.recipeRun.startTime
+                directSec   :float  = self.getDirectMakeSec(lane.drinkJob.menuId) if lane.drinkJob.state == OrderState.DIRECT_MAKE else self.getDirectPickupSec(lane.drinkJob.menuId)
+                return max(now, startTime + directSec)
+
+            if lane.drinkJob.state == OrderState.BREW_START:
+                brewEndTime :float = max(now, lane.drinkJob.brewStartTime + self.getBrewSec(lane.drinkJob.menuId))
+                return max(brewEndTime, pickupTrayFreeTime, robotFreeTime) + self.getPickupTransferSec(lane.drinkJob.menuId)
+
+            # 컵을 드롱기로 옮기는 중 -> 옮긴 후 추출까지
+            if lane.drinkJob.state == OrderState.CUP_READY:
+                brewEndTime :float = robotFreeTime + self.getCupTransferSec(lane.drinkJob.menuId) + self.getBrewSec(lane.drinkJob.menuId)
+                return max(brewEndTime, pickupTrayFreeTime) + self.getPickupTransferSec(lane.drinkJob.menuId)
+
+            return max(pickupTrayFreeTime, robotFreeTime) + self.getPickupTransferSec(lane.drinkJob.menuId)
+
+        # 드롱기 트레이에 알 수 없는 컵이 있거나, 드롱기 오류 상태 -> 사용 불가
+        if lane.hasCupOnDelonghiTray == 1:
+            return float("inf")
+
+        if lane.delonghiStatus == DelonghiState.READY:
+            return robotFreeTime
+
+        if lane.delonghiStatus == DelonghiState.NOT_READY:
+            return max(robotFreeTime, now + self.notReadyPenaltySec)
+
+        return float("inf")
+
+
+
+    def predictCompleteTime(self, lane:LaneStateData, menuId:int, now:float, jobState:int = OrderState.BREW_BEFORE) -> float:
+        '''
+        ### 지금 menuId 음료의 컵 전달을 시작할 때, 해당 라인에서 음료가 픽업대에 놓이는 예상 시간
+        - jobState : 음료의 제조 상태 (컵이 이미 중간 거치대에 있으면 CUP_READY, 미리 준비한 컵이면 CUP_PREPARED/CUP_STAGED)
+        '''
+        laneFreeTime            :float  = self.predictLaneFreeTime(lane, now)
+        if laneFreeTime == float("inf"):
+            return laneFreeTime
+
+        cupReadyTime            :float  = now + self.getCupDeliverySec(menuId, jobState)
+        brewEndTime             :float  = max(laneFreeTime, cupReadyTime) + self.getCupTransferSec(menuId) + self.getBrewSec(menuId)
+
+        # 라인에 이전 음료가 있으면, 그 음료가 픽업대에서 치워질 때까지 대기
+        pickupTrayFreeTime      :float  = now
+        if lane.drinkJob != None:
+            pickupTrayFreeTime = laneFreeTime + self.pickupWaitSec
+        elif lane.hasCupOnPickupTray == 1:
+            pickupTrayFreeTime = now + self.pickupWaitSec
+
+        return max(brewEndTime, pickupTrayFreeTime) + self.getPickupTransferSec(menuId)
+
+
+
+    def selectLane(self, laneList:list[LaneStateData], menuId:int, now:float, jobState:int = OrderState.BREW_BEFORE) -> LaneStateData:
+        '''
+        ### 예상 완료 시간이 가장 빠른 라인 선택. 사용 가능한 라인이 없으면 None
+        '''
+        selectedLane            :LaneStateData  = None
+        selectedCompleteTime    :float          = float("inf")
+
+        for lane in laneList:
+            completeTime :float = self.predictCompleteTime(lane, menuId, now, jobState)
+            if completeTime < selectedCompleteTime:
+                selectedLane            = lane
+                selectedCompleteTime    = completeTime
+
+        return selectedLane
+
+
+
+    def isDispatchable(self, lane:LaneStateData, menuId:int, now:float, jobState:int = OrderState.BREW_BEFORE) -> bool:
+        '''
+        ### 지금 컵 전달(미리 준비한 컵은 남은 단계)을 시작해야 하는지 여부
+        - 컵이 중간 거치대에 도착한 후 메뉴별 최대 대기 시간 안에 라인이 비게 되면 전달을 시작한다. (아이스 음료의 얼음이 녹지 않도록)
+        '''
+        return self.getDispatchTime(lane, menuId, now, jobState) <= now
+
+
+
+    def getDispatchTime(self, lane:LaneStateData, menuId:int, now:float, jobState:int = OrderState.BREW_BEFORE) -> float:
+        '''
+        ### 컵 전달을 시작할 예상 시간 (라인이 비는 시간 - 컵 전달 시간 - 최대 대기 시간)
+        - 상태 변경 알림 없이 시간이 지나 전달 가능해지는 경우, 이 시간에 다시 판단하는 용도
+        '''
+        return self.predictLaneFreeTime(lane, now) - self.getCupDeliverySec(menuId, jobState) - self.getCupHoldLimitSec(menuId)
+
+
+
+    def isDirectMakeBetter(self, directLane:LaneStateData, laneList:list[LaneStateData], menuId:int, now:float, jobState:int = OrderState.CUP_STAGED) -> bool:
+        '''
+        ### 컵 전달 로봇이 미리 준비한 menuId 음료 컵을 직접 제조 라인에서 제조하는 것이 나은지 여부
+        - 직접 제조 라인(드롱기, 픽업대)이 비어 있고, 일반 라인(laneList)보다 빨리 완료되어야 한다.
+        - 직접 제조 중에는 컵 전달을 할 수 없으므로, 일반 라인에 다음 컵을 전달해야 하는 시간이 직접 제조가 끝난 후(directFeedDelaySec 까지)여야 한다.
+        - jobState : 음료의 제조 상태 (얼음 받기 전이면 CUP_PREPARED)
+        '''
+        if self.isLaneFree(directLane) == False or directLane.hasCupOnPickupTray == 1:
+            return False
+
+        directEndTime   :float          = now + self.getCupDeliverySec(menuId, jobState) - self.getCupDeliverySec(menuId, OrderState.CUP_STAGED) + self.getDirectMakeSec(menuId)
+        lane            :LaneStateData  = self.selectLane(laneList, menuId, now, jobState)
+
+        if lane == None:
+            return True
+
+        if self.predictCompleteTime(lane, menuId, now, jobState) <= directEndTime:
+            return False
+
+        feedStartTime   :float          = min(self.predictLaneFreeTime(lane, now) for lane in laneList) - self.getCupDeliverySec(menuId)
+        return directEndTime <= feedStartTime + self.directFeedDelaySec
+
+
+
+    def isLaneFree(self, lane:LaneStateData) -> bool:
+        '''
+        지금 바로 컵을 받아 추출을 시작할 수 있는 라인인지 여부
+        '''
+        return lane.drinkJob == None and lane.hasCupOnDelonghiTray == 0 and lane.delonghiStatus == DelonghiState.READY
+
+
+
+    def __predictSec(self, actionName:str, menuId:int, defaultSec:float) -> float:
+        '''
+        menuId 메뉴의 actionName 동작 예상 시간 (모든 장비의 학습 결과 사용, 없으면 defaultSec)
+        '''
+        if self.timingModel == None:
+            return defaultSec
+
+        return self.timingModel.predict(None, TimingModelManager.getActionName(actionName, menuId), self.predictPercentile, defaultSec)
@@ -0,0 +1,324 @@
+import threading
+import time
+
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cdrutils.log import CDRLog
+
+
+
+
+class MetricInfo():
+    '''
+    metric 1개(이름, 종류, 설명)와 label 별 값
+    '''
+
+    def __init__(self, name:str, metricType:str, help:str, bucketList:list[float] = None, valueFunc = None):
+        self.name                       :str        = name
+        # "counter", "gauge", "histogram"
+        self.metricType                 :str        = metricType
+        self.help                       :str        = help
+        # histogram 의 bucket 상한 목록 (오름차순)
+        self.bucketList                 :list[float] = [] if bucketList == None else bucketList
+        # 값을 읽을 때 호출하는 함수 -> 값 또는 [(label dict, 값), ...]. None 이면 기록된 값 사용
+        self.valueFunc                              = valueFunc
+
+        # label tuple (ex. (("robot", "UR5"),)) -> 값. histogram 은 [bucket 별 개수, 합계, 개수]
+        self.valueDict                  :dict       = {}
+
+
+
+
+class MetricsManager():
+    '''
+    ### 운영 지표(metric) 수집 및 HTTP 제공 클래스 (Prometheus text 형식) \n
+    - counter/gauge/histogram 값은 기록할 때 짧은 lock 1번만 사용하므로, 제어 루프를 늦추지 않는다.
+    - 주문 대기열 길이처럼 이미 다른 곳에 있는 값은 gauge 의 valueFunc 로 등록하여, 조회(scrape)할 때만 계산한다.
+    - 장비 상태별 유지 시간(ex. 드롱기 오류 상태 시간)은 setState() 로 상태가 바뀔 때만 기록하고, 조회 시 진행 중인 시간을 더한다.
+    - start() 를 호출하면 http://host:port/metrics 로 조회할 수 있다.
+    '''
+
+
+
+    def __init__(self, prefix:str = "cdr_"):
+        self.__prefix                   :str        = prefix
+        self.__lock                     :threading.Lock = threading.Lock()
+        self.__metricDict               :dict[str, MetricInfo] = {}
+        # 상태 유지 시간 : (metric 이름, label tuple) -> (현재 상태, 상태 시작 시간)
+        self.__stateDict                :dict       = {}
+        # 최근 발생 시간 : metric 이름 -> 발생 시간 deque (windowSec 안의 발생 수 계산용)
+        self.__eventTimeDict            :dict[str, deque] = {}
+        self.__startTime                :float      = time.monotonic()
+        self.__httpServer               :ThreadingHTTPServer = None
+
+
+
+    # ============================================================================================================================
+    # 등록
+    # ============================================================================================================================
+    def addCounter(self, name:str, help:str, valueFunc = None):
+        '''
+        - valueFunc : 조회할 때 호출 -> 값 또는 [(label dict, 값), ...]. None 이면 incCounter() 로 기록한 값 사용
+        '''
+        self.__metricDict[name] = MetricInfo(self.__prefix + name, "counter", help, valueFunc = valueFunc)
+
+
+
+    def addGauge(self, name:str, help:str, valueFunc = None):
+        '''
+        - valueFunc : 조회할 때 호출 -> 값 또는 [(label dict, 값), ...]. None 이면 setGauge() 로 기록한 값 사용
+        '''
+        self.__metricDict[name] = MetricInfo(self.__prefix + name, "gauge", help, valueFunc = valueFunc)
+
+
+
+    def addHistogram(self, name:str, help:str, bucketList:list[float]):
+        self.__metricDict[name] = MetricInfo(self.__prefix + name, "histogram", help, sorted(bucketList))
+
+
+
+    def addStateDuration(self, name:str, help:str):
+        '''
+        ### 상태별 누적 유지 시간(초) counter 등록 (setState 로 기록, label 에 state 추가)
+        '''
+        self.__metricDict[name] = MetricInfo(self.__prefix + name, "counter", help)
+
+
+
+    def addRate(self, name:str, help:str, windowSec:float, perSec:float = 3600.0):
+        '''
+        ### 최근 windowSec 동안의 발생 수를 perSec 당 발생 수로 환산한 gauge 등록 (markEvent 로 기록)
+        - ex. addRate("drinks_per_hour", ..., 3600.0) -> 최근 1시간 동안 완료된 음료 수
+        - 시작 후 windowSec 이 지나기 전에는 실제보다 작게 나오므로, 정확한 값은 counter 의 rate() 를 사용한다.
+        '''
+        self.__eventTimeDict[name] = deque()
+        self.addGauge(name, help, lambda: self.__getRate(name, windowSec, perSec))
+
+
+
+    # ============================================================================================================================
+    # 기록
+    # ============================================================================================================================
+    def incCounter(self, name:str, labelDict:dict = None, value:float = 1.0):
+        labelKey :tuple = self.__getLabelKey(labelDict)
+
+        with self.__lock:
+            valueDict :dict = self.__metricDict[name].valueDict
+            valueDict[labelKey] = valueDict.get(labelKey, 0.0) + value
+
+
+
+    def setGauge(self, name:str, value:float, labelDict:dict = None):
+        labelKey :tuple = self.__getLabelKey(labelDict)
+
+        with self.__lock:
+            self.__metricDict[name].valueDict[labelKey] = value
+
+
+
+    def observe(self, name:str, value:float, labelDict:dict = None):
+        '''
+        ### histogram 에 값 1개 기록
+        '''
+        labelKey    :tuple      = self.__getLabelKey(labelDict)
+        metricInfo  :MetricInfo = self.__metricDict[name]
+
+        with self.__lock:
+            histogram :list = metricInfo.valueDict.get(labelKey)
+            if histogram == None:
+                histogram = [[0] * len(metricInfo.bucketList), 0.0, 0]
+                metricInfo.valueDict[labelKey] = histogram
+
+            for index, bucket in enumerate(metricInfo.bucketList):
+                if value <= bucket:
+                    histogram[0][index] += 1
+
+            histogram[1] += value
+            histogram[2] += 1
+
+
+
+    def setState(self, name:str, state, labelDict:dict = None):
+        '''
+        ### 장비 상태 기록. 상태가 바뀌면 이전 상태의 유지 시간을 누적한다. (같은 상태면 아무것도 하지 않음)
+        '''
+        labelKey    :tuple  = self.__getLabelKey(labelDict)
+        now         :float  = time.monotonic()
+
+        with self.__lock:
+            prevState, stateStartTime = self.__stateDict.get((name, labelKey), (None, now))
+            if prevState == state:
+                return
+
+            if prevState != None:
+                self.__addStateSec(name, labelKey, prevState, now - stateStartTime)
+
+            self.__stateDict[(name, labelKey)] = (state, now)
+
+
+
+    def markEvent(self, name:str):
+        '''
+        ### addRate 로 등록한 gauge 의 발생 시간 기록
+        '''
+        with self.__lock:
+            self.__eventTimeDict[name].append(time.monotonic())
+
+
+
+    # ============================================================================================================================
+    # 조회
+    # ============================================================================================================================
+    def getText(self) -> str:
+        '''
+        ### 모든 metric 을 Prometheus text 형식으로 반환
+        '''
+        lineList :list[str] = []
+
+        for name, metricInfo in list(self.__metricDict.items()):
+
+            valueDict :dict = self.__getValueDict(name, metricInfo)
+
+            lineList.append(f"# HELP {metricInfo.name} {metricInfo.help}")
+            lineList.append(f"# TYPE {metricInfo.name} {metricInfo.metricType}")
+
+            for labelKey, value in valueDict.items():
+
+                if metricInfo.metricType != "histogram":
+                    lineList.append(f"{metricInfo.name}{self.__toLabelText(labelKey)} {self.__toValueText(value)}")
+                    continue
+
+                bucketCountList, valueSum, valueCount = value
+                for bucket, bucketCount in zip(metricInfo.bucketList, bucketCountList):
+                    lineList.append(f"{metricInfo.name}_bucket{self.__toLabelText(labelKey + (('le', self.__toValueText(bucket)),))} {bucketCount}")
+                lineList.append(f"{metricInfo.name}_bucket{self.__toLabelText(labelKey + (('le', '+Inf'),))} {valueCount}")
+                lineList.append(f"{metricInfo.name}_sum{self.__toLabelText(labelKey)} {self.__toValueText(valueSum)}")
+                lineList.append(f"{metricInfo.name}_count{self.__toLabelText(labelKey)} {valueCount}")
+
+        return "\n".join(lineList) + "\n"
+
+
+
+    def getUptimeSec(self) -> float:
+        return time.monotonic() - self.__startTime
+
+
+
+    # ============================================================================================================================
+    # HTTP
+    # ============================================================================================================================
+    def start(self, host:str = "127.0.0.1", port:int = 9100) -> bool:
+        '''
+        ### http://host:port/metrics 제공 쓰레드 시작
+        - 반환값 : 시작 성공 여부 (포트 사용 중 등으로 실패해도 제어 프로그램은 계속 동작)
+        '''
+        metricsManager :MetricsManager = self
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ["/", "/metrics"]:
+                    self.send_error(404)
+                    return
+
+                body :bytes = metricsManager.getText().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                return
+
+        try:
+            self.__httpServer = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+            self.__httpServer.daemon_threads = True
+
+        except OSError as e:
+            CDRLog.print(f"metrics 서버 시작 실패 ({host}:{port}) : {e}")
+            return False
+
+        threading.Thread(target = self.__httpServer.serve_forever, daemon = True).start()
+        CDRLog.print(f"metrics 서버 시작 : http://{host}:{port}/metrics")
+        return True
+
+
+
+    def stop(self):
+        if self.__httpServer != None:
+            self.__httpServer.shutdown()
+            self.__httpServer.server_close()
+            self.__httpServer = None
+
+
+
+    # ============================================================================================================================
+    # 내부 함수
+    # ============================================================================================================================
+    def __getValueDict(self, name:str, metricInfo:MetricInfo) -> dict:
+        if metricInfo.valueFunc != None:
+            value = metricInfo.valueFunc()
+            if isinstance(value, list) == False:
+                return {() : value}
+
+            return {self.__getLabelKey(labelDict) : labelValue for labelDict, labelValue in value}
+
+        with self.__lock:
+            valueDict :dict = {labelKey : (list(value[0]), value[1], value[2]) if metricInfo.metricType == "histogram" else value for labelKey, value in metricInfo.valueDict.items()}
+
+            # 상태 유지 시간 : 현재 상태가 유지된 시간까지 더해서 반환
+            now :float = time.monotonic()
+            for (stateName, labelKey), (state, stateStartTime) in self.__stateDict.items():
+                if stateName == name:
+                    stateKey :tuple = labelKey + (("state", str(state)),)
+                    valueDict[stateKey] = valueDict.get(stateKey, 0.0) + now - stateStartTime
+
+        return valueDict
+
+
+
+    def __addStateSec(self, name:str, labelKey:tuple, state, elapsedSec:float):
+        valueDict   :dict   = self.__metricDict[name].valueDict
+        stateKey    :tuple  = labelKey + (("state", str(state)),)
+        valueDict[stateKey] = valueDict.get(stateKey, 0.0) + elapsedSec
+
+
+
+    def __getRate(self, name:str, windowSec:float, perSec:float) -> float:
+        now :float = time.monotonic()
+
+        with self.__lock:
+            eventTimeQueue :deque = self.__eventTimeDict[name]
+            while len(eventTimeQueue) > 0 and eventTimeQueue[0] < now - windowSec:
+                eventTimeQueue.popleft()
+
+            eventNum :int = len(eventTimeQueue)
+
+        return eventNum * perSec / windowSec
+
+
+
+    def __getLabelKey(self, labelDict:dict) -> tuple:
+        if labelDict == None:
+            return ()
+
+        return tuple(sorted((str(key), str(value)) for key, value in labelDict.items()))
+
+
+
+    def __toLabelText(self, labelKey:tuple) -> str:
+        if len(labelKey) == 0:
+            return ""
+
+        labelText :str = ",".join(f'{key}="{value}"' for key, value in labelKey)
+        return "{" + labelText + "}"
+
+
+
+    def __toValueText(self, value:float) -> str:
+        if value == float("inf"):
+            return "+Inf"
+
+        return repr(float(value)) if isinstance(value, float) else str(value)
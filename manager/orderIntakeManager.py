@@ -0,0 +1,309 @@
+import threading
+import heapq
+import time
+from collections import deque
+
+from cdrutils.log import CDRLog
+
+from data.orderData import IntakeOrderData
+
+from manager.tpmSysFuncManager import TPMSysFuncManager
+
+
+
+
+class OrderIntakeManager():
+    '''
+    ### 주문 접수 대기열 관리 클래스 \n
+    - 접수 쓰레드가 CRC 서버(runCRCCommunication)에서 주문을 받아, 제조를 기다리는 주문을 우선순위 대기열에 보관한다. 컨트롤러는 popOrder 로 다음 주문을 꺼낸다.
+      주문 메뉴는 컨트롤러가 지정한 menuFetchFunc 로 받는다. (ex. 메뉴 리스트 getCRCOrderMenuList / 메뉴 1개씩 getCRCOrderMenu)
+    - 대기열은 (우선순위 기준 시간, 접수 순번) heap 과 orderId 색인으로 구성되어 추가/꺼내기는 O(log n), 중복 주문 확인은 O(1) 이다.
+    - 우선순위가 1 높은 주문은 priorityStepSec 먼저 받은 주문으로 취급하므로, 우선순위가 낮은 주문도 계속 밀리지는 않는다.
+    - 대기열이 가득 차거나 예상 대기 시간이 maxWaitSec 를 넘으면 CRC 서버의 주문을 더 받지 않는다. (주문은 CRC 서버에 남는다)
+      예상 대기 시간의 초과/해제(resumeWaitSec 미만)는 backpressureCallback 으로 알린다. (ex. 주문 UI 에 대기 시간 안내)
+    - 예상 대기 시간 = (대기 + 제조 중인 음료 수) x 음료 1잔 처리 간격 (주문 완료 간격으로 학습)
+    '''
+
+
+
+    def __init__(self, tpmSysFuncManager:TPMSysFuncManager, menuFetchFunc, maxPendingNum:int = 20, maxWaitSec:float = 900.0, resumeWaitSec:float = 600.0,
+                 drinkIntervalSec:float = 60.0, priorityStepSec:float = 60.0, priorityFunc = None, orderAddedCallback = None, backpressureCallback = None):
+        # config 변수 선언 ------------------------
+        self.__tpmSysFuncManager        :TPMSysFuncManager = tpmSysFuncManager
+        # menuFetchFunc() -> 수신 중인 주문의 메뉴 리스트, 아직 메뉴 정보가 없으면 [] (컨트롤러별 CRC 메뉴 수신 방식)
+        self.__menuFetchFunc                        = menuFetchFunc
+        # 대기열에 보관할 수 있는 최대 주문 수 (가득 차면 CRC 서버의 주문을 받지 않는다)
+        self.__maxPendingNum            :int        = maxPendingNum
+        # 예상 대기 시간이 maxWaitSec 를 넘으면 주문 접수 중단, resumeWaitSec 아래로 내려가면 다시 접수
+        self.__maxWaitSec               :float      = maxWaitSec
+        self.__resumeWaitSec            :float      = resumeWaitSec
+        # 우선순위 1 당 먼저 받은 것으로 취급하는 시간
+        self.__priorityStepSec          :float      = priorityStepSec
+        # priorityFunc(menuIdList) -> 우선순위 (None 이면 모두 0, 받은 순서대로)
+        self.__priorityFunc                         = priorityFunc
+        # orderAddedCallback() : 대기열에 주문 추가, backpressureCallback(isBackpressured, predictedWaitSec) : 접수 중단/재개
+        self.__orderAddedCallback                   = orderAddedCallback
+        self.__backpressureCallback                 = backpressureCallback
+        self.__pollingSec               :float      = 0.05
+        # 처리 간격 학습 비율 (지수 이동 평균), 중복 확인에 사용할 최근 완료 주문 수
+        self.__intervalWeight           :float      = 0.2
+        self.__recentOrderNum           :int        = 100
+
+        # 일반 변수 선언 --------------------------
+        self.__cond                     :threading.Condition = threading.Condition()
+        # (우선순위 기준 시간, 접수 순번, orderId)
+        self.__pendingHeap              :list       = []
+        self.__pendingSeq               :int        = 0
+        # orderId -> 제조를 기다리는 주문 / 꺼낸 후 완료되지 않은 주문
+        self.__pendingOrderDict         :dict[int, IntakeOrderData] = {}
+        self.__activeOrderDict          :dict[int, IntakeOrderData] = {}
+        # 최근 완료한 orderId (CRC 서버가 같은 주문을 다시 보내는 경우 무시)
+        self.__recentOrderIdQueue       :deque      = deque()
+        self.__recentOrderIdSet         :set[int]   = set()
+        self.__pendingDrinkNum          :int        = 0
+        self.__activeDrinkNum           :int        = 0
+        self.__drinkIntervalSec         :float      = drinkIntervalSec
+        # 처리 간격 측정 기준 시간 (time.monotonic 기준, 제조 중인 주문이 없으면 None)
+        self.__lastCompleteTime         :float      = None
+        self.__isBackpressured          :bool       = False
+        # 마지막으로 알린 접수 중단 여부 (알림은 notifyLock 안에서 순서대로)
+        self.__notifiedBackpressure     :bool       = False
+        self.__notifyLock               :threading.Lock = threading.Lock()
+        self.__duplicateNum             :int        = 0
+        # 메뉴 정보를 수신 중인 orderId
+        self.__fetchingOrderId          :int        = -1
+        self.__isRunning                :bool       = False
+
+
+
+    def start(self):
+        '''
+        ### 주문 접수 쓰레드 시작
+        '''
+        self.__isRunning = True
+        threading.Thread(target = self.__intakeThreadHandler, daemon = True).start()
+
+
+
+    def stop(self):
+        with self.__cond:
+            self.__isRunning = False
+            self.__cond.notify_all()
+
+
+
+    def popOrder(self, timeoutSec:float = 0.0) -> IntakeOrderData:
+        '''
+        ### 우선순위가 가장 높은(같으면 먼저 받은) 주문을 꺼낸다. 없으면 timeoutSec 까지 기다리고, 그래도 없으면 None
+        - 꺼낸 주문은 completeOrder 전까지 제조 중인 주문으로 예상 대기 시간에 포함된다.
+        '''
+        with self.__cond:
+            if timeoutSec > 0:
+                self.__cond.wait_for(lambda: len(self.__pendingOrderDict) > 0 or self.__isRunning == False, timeoutSec)
+
+            if len(self.__pendingOrderDict) == 0:
+                return None
+
+            _, _, orderId = heapq.heappop(self.__pendingHeap)
+            order :IntakeOrderData = self.__pendingOrderDict.pop(orderId)
+
+            self.__activeOrderDict[orderId] = order
+            self.__pendingDrinkNum  -= len(order.menuIdList)
+            self.__activeDrinkNum   += len(order.menuIdList)
+
+            if self.__lastCompleteTime == None:
+                self.__lastCompleteTime = time.monotonic()
+
+            self.__updateBackpressure()
+            self.__cond.notify_all()
+
+        self.__notifyBackpressure()
+        return order
+
+
+
+    def completeOrder(self, orderId:int):
+        '''
+        ### 꺼낸 주문의 제조 완료 -> 음료 1잔 처리 간격 학습
+        '''
+        with self.__cond:
+            order :IntakeOrderData = self.__activeOrderDict.pop(orderId, None)
+            if order == None:
+                return
+
+            self.__activeDrinkNum -= len(order.menuIdList)
+            self.__rememberOrderId(orderId)
+
+            now :float = time.monotonic()
+            if self.__lastCompleteTime != None and len(order.menuIdList) > 0:
+                intervalSec :float = (now - self.__lastCompleteTime) / len(order.menuIdList)
+                self.__drinkIntervalSec += self.__intervalWeight * (intervalSec - self.__drinkIntervalSec)
+
+            self.__lastCompleteTime = now if len(self.__activeOrderDict) > 0 else None
+
+            self.__updateBackpressure()
+            self.__cond.notify_all()
+
+        self.__notifyBackpressure()
+
+
+
+    def getPendingNum(self) -> int:
+        '''
+        제조를 기다리는 주문 수
+        '''
+        with self.__cond:
+            return len(self.__pendingOrderDict)
+
+
+
+    def getPredictedWaitSec(self) -> float:
+        '''
+        지금 받은 주문이 제조를 시작할 때까지 예상 대기 시간
+        '''
+        with self.__cond:
+            return self.__getPredictedWaitSec()
+
+
+
+    def isBackpressured(self) -> bool:
+        return self.__isBackpressured
+
+
+
+    def getDuplicateNum(self) -> int:
+        '''
+        무시한 중복 주문 수
+        '''
+        return self.__duplicateNum
+
+
+
+    def __intakeThreadHandler(self):
+        '''
+        ### 주문 접수 쓰레드 (대기열에 여유가 있고 접수 중단 상태가 아니면 CRC 서버의 주문을 받는다)
+        '''
+        while True:
+
+            with self.__cond:
+
+                # 대기열이 비거나 예상 대기 시간이 줄어들면(popOrder, completeOrder) 다시 확인
+                while self.__isRunning == True and (len(self.__pendingOrderDict) >= self.__maxPendingNum or self.__isBackpressured == True):
+                    self.__cond.wait()
+
+                if self.__isRunning == False:
+                    break
+
+            # CRC 서버 요청은 lock 밖에서 진행 (popOrder 가 기다리지 않도록)
+            try:
+                order :IntakeOrderData = self.__fetchOrder()
+
+            except Exception as e:
+                CDRLog.print(f"주문 수신 실패 : {e}")
+                order = None
+
+            if order == None:
+                with self.__cond:
+                    self.__cond.wait(self.__pollingSec)
+                continue
+
+            self.__addOrder(order)
+
+
+
+    def __fetchOrder(self) -> IntakeOrderData:
+        '''
+        ### CRC 서버의 다음 주문 수신. 주문이 없거나 아직 메뉴 정보가 없으면 None (메뉴는 다음 호출에서 다시 요청)
+        '''
+        if self.__fetchingOrderId == -1:
+            self.__fetchingOrderId = self.__tpmSysFuncManager.getCRCOrderId()
+
+            if self.__fetchingOrderId == -1:
+                return None
+
+        menuIdList  :list[int]  = self.__menuFetchFunc()
+        if len(menuIdList) == 0:
+            return None
+
+        order :IntakeOrderData = IntakeOrderData(self.__fetchingOrderId, self.__tpmSysFuncManager.getCRCOrderNumber(), menuIdList)
+        if self.__priorityFunc != None:
+            order.priority = self.__priorityFunc(order.menuIdList)
+
+        self.__fetchingOrderId = -1
+        return order
+
+
+
+    def __addOrder(self, order:IntakeOrderData):
+        '''
+        ### 대기열에 주문 추가 (대기/제조 중이거나 최근 완료한 orderId 이면 무시)
+        '''
+        with self.__cond:
+            if order.orderId in self.__pendingOrderDict or order.orderId in self.__activeOrderDict or order.orderId in self.__recentOrderIdSet:
+                self.__duplicateNum += 1
+                CDRLog.print(f"중복 주문 무시 : orderId {order.orderId}")
+                return
+
+            self.__pendingSeq += 1
+            heapq.heappush(self.__pendingHeap, (order.receiveTime - order.priority * self.__priorityStepSec, self.__pendingSeq, order.orderId))
+            self.__pendingOrderDict[order.orderId] = order
+            self.__pendingDrinkNum += len(order.menuIdList)
+
+            self.__updateBackpressure()
+            self.__cond.notify_all()
+
+        if self.__orderAddedCallback != None:
+            self.__orderAddedCallback()
+
+        self.__notifyBackpressure()
+
+
+
+    def __rememberOrderId(self, orderId:int):
+        '''
+        최근 완료한 orderId 기록 (recentOrderNum 개까지)
+        '''
+        if len(self.__recentOrderIdQueue) >= self.__recentOrderNum:
+            self.__recentOrderIdSet.discard(self.__recentOrderIdQueue.popleft())
+
+        self.__recentOrderIdQueue.append(orderId)
+        self.__recentOrderIdSet.add(orderId)
+
+
+
+    def __getPredictedWaitSec(self) -> float:
+        return (self.__pendingDrinkNum + self.__activeDrinkNum) * self.__drinkIntervalSec
+
+
+
+    def __updateBackpressure(self):
+        '''
+        예상 대기 시간으로 접수 중단/재개 판단 (cond lock 안에서 호출)
+        '''
+        predictedWaitSec :float = self.__getPredictedWaitSec()
+
+        if self.__isBackpressured == False and predictedWaitSec > self.__maxWaitSec:
+            self.__isBackpressured = True
+        elif self.__isBackpressured == True and predictedWaitSec < self.__resumeWaitSec:
+            self.__isBackpressured = False
+
+
+
+    def __notifyBackpressure(self):
+        '''
+        ### 접수 중단/재개 알림 (cond lock 밖에서 호출)
+        - 여러 쓰레드가 동시에 상태를 바꿔도 알림 순서가 섞이지 않도록, notifyLock 안에서 현재 상태를 다시 읽어 바뀐 경우만 알린다.
+        '''
+        with self.__notifyLock:
+            with self.__cond:
+                isBackpressured     :bool   = self.__isBackpressured
+                predictedWaitSec    :float  = self.__getPredictedWaitSec()
+
+            if isBackpressured == self.__notifiedBackpressure:
+                return
+
+            self.__notifiedBackpressure = isBackpressured
+            CDRLog.print(f"주문 접수 {'중단' if isBackpressured == True else '재개'} : 예상 대기 시간 {predictedWaitSec:.0f}초")
+
+            if self.__backpressureCallback != None:
+                self.__backpressureCallback(isBackpressured, predictedWaitSec)
@@ -0,0 +1,107 @@
+import threading
+
+from const.orderState import OrderState
+
+from data.orderData import OrderData, DrinkJobData
+
+
+
+
+class OrderQueueManager():
+    '''
+    ### 주문 대기열 관리 클래스 \n
+    - 수신한 주문을 음료(DrinkJobData) 단위로 나누어 보관하고, 먼저 들어온 주문의 음료부터 제조하도록 순서를 제공한다.
+    - 여러 주문을 동시에 보관하므로, 이전 주문의 마지막 음료가 추출되는 동안 다음 주문의 음료 제조를 시작할 수 있다.
+    - 주문의 모든 음료가 픽업 가능 상태가 되면 완료 주문으로 꺼내어 주문별로 완료 처리한다.
+    '''
+
+
+
+    def __init__(self, maxOrderNum:int = 4):
+        self.__maxOrderNum              :int        = maxOrderNum
+        self.__orderList                :list[OrderData] = []
+        self.__version                  :int        = 0
+        self.__lock                     :threading.RLock = threading.RLock()
+
+
+
+    def isFull(self) -> bool:
+        '''
+        더 이상 주문을 받을 수 없는지 여부
+        '''
+        with self.__lock:
+            return len(self.__orderList) >= self.__maxOrderNum
+
+
+
+    def getOrderNum(self) -> int:
+        with self.__lock:
+            return len(self.__orderList)
+
+
+
+    def getVersion(self) -> int:
+        '''
+        대기열 변경 버전 (주문 추가/음료 상태 변경/주문 완료 시 증가)
+        '''
+        return self.__version
+
+
+
+    def addOrder(self, orderId:int, orderNumber:int, menuIdList:list[int], cycleDrinkNum:int = 0, receiveTime:float = None) -> OrderData:
+        '''
+        - cycleDrinkNum : 음료가 픽업대 수보다 많으면 픽업대 수(cycleDrinkNum)잔씩 나누어, 이전 음료가 모두 픽업대에 놓인 후 다음 음료를 시작한다. (0 이면 나누지 않음)
+        - receiveTime : 주문을 받은 시간 (None 이면 지금)
+        '''
+        with self.__lock:
+            order = OrderData(orderId, orderNumber, menuIdList, cycleDrinkNum, receiveTime)
+            self.__orderList.append(order)
+            self.__version += 1
+            return order
+
+
+
+    def getJobList(self) -> list[DrinkJobData]:
+        '''
+        진행 중인 모든 음료 (먼저 들어온 주문, 주문 내 메뉴 순서)
+        '''
+        with self.__lock:
+            return [drinkJob for order in self.__orderList for drinkJob in order.drinkJobList]
+
+
+
+    def getWaitingJob(self) -> DrinkJobData:
+        '''
+        제조를 시작하지 않은 음료 중 가장 먼저 들어온 음료. 없으면 None
+        - 주문을 나누어 제조하는 경우 이전 순번의 음료가 픽업대에 놓이지 않았으면 다음 주문의 음료를 반환한다.
+        '''
+        with self.__lock:
+            for order in self.__orderList:
+                for drinkJob in order.drinkJobList:
+                    if drinkJob.state == OrderState.BREW_BEFORE:
+                        if order.isCycleReady(drinkJob.cycleIndex) == True:
+                            return drinkJob
+                        break
+            return None
+
+
+
+    def setJobState(self, drinkJob:DrinkJobData, state:int):
+        with self.__lock:
+            drinkJob.state      = state
+            self.__version      += 1
+
+
+
+    def popCompletedOrderList(self) -> list[OrderData]:
+        '''
+        모든 음료가 픽업 가능 상태인 주문을 대기열에서 꺼내 반환
+        '''
+        with self.__lock:
+            completedOrderList  :list[OrderData] = [order for order in self.__orderList if order.isCompleted() == True]
+
+            if len(completedOrderList) > 0:
+                self.__orderList    = [order for order in self.__orderList if order.isCompleted() == False]
+                self.__version      += 1
+
+            return completedOrderList
@@ -0,0 +1,75 @@
+from variable.tcpipVar import TcpIPVar
+
+from cdrutils.log import CDRLog
+
+from manager.cellStateManager import CellStateManager
+from manager.timerSchedulerManager import TimerSchedulerManager
+
+
+
+
+class OrderUIManager():
+    '''
+    ### 주문 UI 표시 관리 클래스 \n
+    - 픽업대(slot) 에 주문 번호를 표시하고, pickupDisplaySec 후 픽업대가 비면 표시를 해제한다. ('$b12%' / '$b0%')
+      - 해제 확인은 예약 작업 쓰레드(TimerSchedulerManager) 1개에서 진행하므로, 음료마다 쓰레드를 만들지 않는다.
+      - 음료가 남아 있으면 pickupRecheckSec 후 다시 확인한다.
+      - 같은 픽업대에 새 번호를 표시하면 이전 번호의 해제 확인은 중단된다.
+    - 주문 접수가 중단되면 예상 대기 시간(분)을 표시한다. ('$w15%' / '$w0%')
+    '''
+
+
+
+    def __init__(self, orderUIComm:TcpIPVar, timerScheduler:TimerSchedulerManager, cellState:CellStateManager, pickupSensorKeyDict:dict[str, str],
+                 pickupDisplaySec:float = 30.0, pickupRecheckSec:float = 1.0):
+        self.__orderUIComm              :TcpIPVar   = orderUIComm
+        self.__timerScheduler           :TimerSchedulerManager = timerScheduler
+        self.__cellState                :CellStateManager = cellState
+        # 픽업대(slot) -> 픽업대 센서 (셀 상태 key)
+        self.__pickupSensorKeyDict      :dict[str, str] = pickupSensorKeyDict
+        self.__pickupDisplaySec         :float      = pickupDisplaySec
+        self.__pickupRecheckSec         :float      = pickupRecheckSec
+        # 픽업대별 표시 순번 (새 번호를 표시하면 이전 번호의 해제 예약은 무시)
+        self.__pickupDisplaySeqDict     :dict[str, int] = {}
+
+
+
+    def showPickup(self, slot:str, orderNumber:int):
+        '''
+        ### 픽업대(slot) 에 주문 번호 표시 -> pickupDisplaySec 후 픽업대가 비면 표시 해제
+        '''
+        msg = '$'+slot+str(orderNumber)+'%'#'$b'+str(order_num)+'%'
+
+        self.__orderUIComm.write(msg,2)
+
+        self.__pickupDisplaySeqDict[slot] = self.__pickupDisplaySeqDict.get(slot, 0) + 1
+        self.__timerScheduler.callLater(self.__pickupDisplaySec, self.__clearPickup, slot, self.__pickupDisplaySeqDict[slot])
+
+
+
+    def showWaitTime(self, isBackpressured:bool, predictedWaitSec:float):
+        '''
+        ### 주문 접수 중단 -> 예상 대기 시간(분) 표시, 접수 재개 -> 표시 해제 (OrderIntakeManager 의 backpressureCallback)
+        '''
+        waitMin :int = int(predictedWaitSec // 60) + 1 if isBackpressured == True else 0
+        msg = '$w'+str(waitMin)+'%'
+
+        self.__orderUIComm.write(msg,2)
+
+
+
+    def __clearPickup(self, slot:str, displaySeq:int):
+        '''
+        ### (예약 작업) 픽업대가 비어 있으면 주문 번호 표시 해제, 음료가 남아 있으면 pickupRecheckSec 후 다시 확인
+        '''
+        # 같은 픽업대에 새 번호가 표시됨 -> 새 번호의 예약 작업이 처리
+        if self.__pickupDisplaySeqDict.get(slot) != displaySeq:
+            return
+
+        if getattr(self.__cellState.getSnapshot(), self.__pickupSensorKeyDict[slot]) == 0 :
+            msg = '$'+slot+'0%'
+            self.__orderUIComm.write(msg,2)
+            return
+
+        CDRLog.print(f'There is item remaining in Slot {slot.upper()}')
+        self.__timerScheduler.callLater(self.__pickupRecheckSec, self.__clearPickup, slot, displaySeq)
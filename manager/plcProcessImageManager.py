@@ -0,0 +1,209 @@
+import re
+
+from array import array
+
+
+
+
+class PlcReadBlock():
+    '''
+    PLC 일괄 읽기 요청 1회 (같은 디바이스의 연속된 주소 범위)
+    '''
+
+    def __init__(self, deviceCode:str, startNum:int, pointNum:int, offset:int):
+        self.deviceCode                 :str        = deviceCode
+        self.startNum                   :int        = startNum
+        self.pointNum                   :int        = pointNum
+        # 프로세스 이미지에서 이 요청의 값이 시작하는 위치
+        self.offset                     :int        = offset
+        # 읽기 요청 주소 (ex. "M000", "X01A", "D100")
+        self.address                    :str        = ""
+
+
+
+
+class PlcSignalInfo():
+    '''
+    이름이 붙은 PLC 신호 1개의 주소와 프로세스 이미지 위치
+    '''
+
+    def __init__(self, name:str, deviceCode:str, pointNum:int, bitIndex:int):
+        self.name                       :str        = name
+        self.deviceCode                 :str        = deviceCode
+        self.pointNum                   :int        = pointNum
+        # 워드 디바이스의 비트 번호, 비트/워드 값 전체 -1
+        self.bitIndex                   :int        = bitIndex
+        # 프로세스 이미지 위치
+        self.offset                     :int        = -1
+
+
+
+
+class PlcProcessImageManager():
+    '''
+    ### PLC 프로세스 이미지 클래스 \n
+    - 이름이 붙은 신호(ex. PlcSignalTable.SIGNAL_DICT)를 디바이스별로 모아, 주기마다 가장 적은 수의 MELSEC 일괄 읽기 요청으로 읽는다.
+      (주소 사이 간격이 maxGapNum 이하이면 같은 요청으로 묶고, 요청 1회는 최대 maxBlockPointNum 점)
+    - 읽은 값은 16bit 배열(프로세스 이미지) 1개에 보관하고, diff() 는 이전 이미지와 비교해 바뀐 신호만 {이름 : 값} 으로 반환한다.
+    - read() 는 DevicePollingManager 의 readFunc 으로 사용한다. (이미지가 같으면 isChanged == False)
+    '''
+
+    # 디바이스 코드 -> 주소 번호 진법 (긴 코드부터 비교)
+    BIT_DEVICE_DICT             :dict[str, int] = {"SM" : 10, "M" : 10, "L" : 10, "F" : 10, "X" : 16, "Y" : 16, "B" : 16}
+    WORD_DEVICE_DICT            :dict[str, int] = {"SD" : 10, "ZR" : 10, "D" : 10, "R" : 10, "W" : 16}
+
+
+
+    def __init__(self, plcComm, signalDict:dict[str, str], maxGapNum:int = 16, maxBlockPointNum:int = 960):
+        # MelsecPLCVar : read(시작 주소, 점 수) -> 값 목록
+        self.__plcComm                              = plcComm
+        self.__maxGapNum                :int        = maxGapNum
+        self.__maxBlockPointNum         :int        = maxBlockPointNum
+
+        self.__signalList               :list[PlcSignalInfo] = [self.__parseSignal(name, address) for name, address in signalDict.items()]
+        self.__blockList                :list[PlcReadBlock]  = self.__planBlockList()
+        self.__imageSize                :int        = sum(block.pointNum for block in self.__blockList)
+
+        # 마지막으로 diff() 한 이미지, 없으면 None
+        self.__prevImage                :array      = None
+
+
+
+    def getBlockList(self) -> list[PlcReadBlock]:
+        '''
+        주기마다 보내는 읽기 요청 목록
+        '''
+        return list(self.__blockList)
+
+
+
+    def getSignalNameList(self) -> list[str]:
+        return [signal.name for signal in self.__signalList]
+
+
+
+    def read(self) -> array:
+        '''
+        ### 모든 읽기 요청을 보내 새 프로세스 이미지 생성
+        - 응답 값 수가 요청과 다르면 ValueError (DevicePollingManager 가 읽기 실패로 처리)
+        '''
+        image :array = array("H", bytes(2 * self.__imageSize))
+
+        for block in self.__blockList:
+
+            valueList :list[int] = self.__plcComm.read(block.address, block.pointNum)
+            if len(valueList) != block.pointNum:
+                raise ValueError(f"PLC 응답 값 수 오류 : {block.address} {len(valueList)}/{block.pointNum}")
+
+            image[block.offset : block.offset + block.pointNum] = array("H", (value & 0xFFFF for value in valueList))
+
+        return image
+
+
+
+    def getValue(self, image:array, name:str) -> int:
+        for signal in self.__signalList:
+            if signal.name == name:
+                return self.__getSignalValue(image, signal)
+
+        raise KeyError(f"알 수 없는 PLC 신호 : {name}")
+
+
+
+    def getSignalDict(self, image:array) -> dict[str, int]:
+        '''
+        이미지의 모든 신호 값 {이름 : 값}
+        '''
+        return {signal.name : self.__getSignalValue(image, signal) for signal in self.__signalList}
+
+
+
+    def diff(self, image:array) -> dict[str, int]:
+        '''
+        ### 이전 diff() 이미지와 비교해 바뀐 신호만 {이름 : 값} 으로 반환 (첫 호출은 모든 신호)
+        - 같은 쓰레드(PLC 읽기 쓰레드)에서만 호출한다.
+        '''
+        prevImage       :array  = self.__prevImage
+        self.__prevImage        = image
+
+        if prevImage == None:
+            return self.getSignalDict(image)
+
+        if prevImage == image:
+            return {}
+
+        changedDict :dict[str, int] = {}
+        for signal in self.__signalList:
+            value :int = self.__getSignalValue(image, signal)
+            if value != self.__getSignalValue(prevImage, signal):
+                changedDict[signal.name] = value
+
+        return changedDict
+
+
+
+    def __getSignalValue(self, image:array, signal:PlcSignalInfo) -> int:
+        value :int = image[signal.offset]
+        return value if signal.bitIndex == -1 else (value >> signal.bitIndex) & 1
+
+
+
+    def __parseSignal(self, name:str, address:str) -> PlcSignalInfo:
+        '''
+        "M6", "X1A", "D100", "D100.3" -> 디바이스 코드, 번호, 워드 비트 번호
+        '''
+        for deviceCode in sorted({**self.BIT_DEVICE_DICT, **self.WORD_DEVICE_DICT}, key = len, reverse = True):
+
+            if address.upper().startswith(deviceCode) == False:
+                continue
+
+            isWordDevice    :bool   = deviceCode in self.WORD_DEVICE_DICT
+            radix           :int    = self.WORD_DEVICE_DICT[deviceCode] if isWordDevice == True else self.BIT_DEVICE_DICT[deviceCode]
+            match                   = re.fullmatch(r"([0-9A-F]+)(?:\.([0-9A-F]))?", address.upper()[len(deviceCode):])
+
+            if match == None or (match.group(2) != None and isWordDevice == False):
+                break
+
+            bitIndex :int = -1 if match.group(2) == None else int(match.group(2), 16)
+            return PlcSignalInfo(name, deviceCode, int(match.group(1), radix), bitIndex)
+
+        raise ValueError(f"PLC 신호 주소 오류 : {name} = {address}")
+
+
+
+    def __planBlockList(self) -> list[PlcReadBlock]:
+        '''
+        ### 디바이스별로 주소를 정렬해 읽기 요청 묶기
+        - 다음 주소와의 간격이 maxGapNum 이하이고 요청 크기가 maxBlockPointNum 이하이면 같은 요청으로 읽는다.
+        '''
+        blockList   :list[PlcReadBlock] = []
+        offset      :int                = 0
+
+        for deviceCode in sorted({signal.deviceCode for signal in self.__signalList}):
+
+            pointNumList    :list[int]      = sorted({signal.pointNum for signal in self.__signalList if signal.deviceCode == deviceCode})
+            block           :PlcReadBlock   = None
+
+            for pointNum in pointNumList:
+
+                if block != None and pointNum - (block.startNum + block.pointNum) <= self.__maxGapNum and pointNum - block.startNum < self.__maxBlockPointNum:
+                    block.pointNum = pointNum - block.startNum + 1
+                    continue
+
+                if block != None:
+                    offset += block.pointNum
+
+                block = PlcReadBlock(deviceCode, pointNum, 1, offset)
+                blockList.append(block)
+
+            offset += block.pointNum
+
+        for block in blockList:
+            radix :int = self.WORD_DEVICE_DICT.get(block.deviceCode, self.BIT_DEVICE_DICT.get(block.deviceCode))
+            block.address = f"{block.deviceCode}{block.startNum:03X}" if radix == 16 else f"{block.deviceCode}{block.startNum:03d}"
+
+            for signal in self.__signalList:
+                if signal.deviceCode == block.deviceCode and block.startNum <= signal.pointNum < block.startNum + block.pointNum:
+                    signal.offset = block.offset + signal.pointNum - block.startNum
+
+        return blockList
@@ -0,0 +1,55 @@
+from manager.metricsManager import MetricsManager
+from manager.traceManager import TraceManager
+from manager.orderIntakeManager import OrderIntakeManager
+from manager.crcPublishManager import CRCPublishManager
+from manager.devicePollingManager import DevicePollingManager
+from manager.delonghiStatusManager import DelonghiStatusManager
+
+
+
+
+class ProcessMetricsManager():
+    '''
+    ### 공정 컨트롤러 운영 지표 등록 클래스 \n
+    - 단독/통합 공정 컨트롤러가 같은 이름의 운영 지표를 제공하도록 MetricsManager 에 지표를 등록한다.
+    - 주문 대기열 길이, 로봇 동작 비율, 상태 읽기 지연처럼 다른 곳에 이미 있는 값은 조회할 때만 계산한다.
+    '''
+
+
+
+    @staticmethod
+    def addMetrics(metrics:MetricsManager, orderQueueLengthFunc, robotNameList:list[str], traceManager:TraceManager, orderIntake:OrderIntakeManager,
+                   crcPublisher:CRCPublishManager, statusPoller:DevicePollingManager, delonghiStatus:DelonghiStatusManager):
+        '''
+        ### 운영 지표 등록
+        - orderQueueLengthFunc : 제조 중인 주문 수를 반환하는 함수 (접수 대기 중인 주문 수는 orderIntake 에서 더한다)
+        - robotNameList : 동작 비율을 제공할 로봇 이름 (TraceManager 의 장비 이름)
+        '''
+        metrics.addCounter("drinks_completed_total", "픽업대에 놓인 음료 수")
+        metrics.addRate("drinks_per_hour", "최근 1시간 동안 픽업대에 놓인 음료 수 (시간당)", 3600.0)
+        metrics.addGauge("order_queue_length", "제조 중/대기 중인 주문 수", lambda: orderQueueLengthFunc() + orderIntake.getPendingNum())
+        metrics.addGauge("order_intake_wait_seconds", "지금 받은 주문의 예상 대기 시간", lambda: orderIntake.getPredictedWaitSec())
+        metrics.addGauge("order_intake_backpressure", "주문 접수 중단 여부 (예상 대기 시간 초과)", lambda: 1 if orderIntake.isBackpressured() == True else 0)
+        metrics.addCounter("order_intake_duplicate_total", "무시한 중복 주문 수", lambda: orderIntake.getDuplicateNum())
+        metrics.addGauge("crc_publish_queue_length", "CRC 서버에 보내지 못한 주문 완료 메시지 수 (스풀 파일 포함)", lambda: crcPublisher.getQueueNum())
+        metrics.addGauge("crc_publish_spool_length", "스풀 파일에 저장된 주문 완료 메시지 수", lambda: crcPublisher.getSpoolNum())
+        metrics.addCounter("crc_publish_total", "CRC 서버에 보낸 주문 완료 메시지 수", lambda: crcPublisher.getSentNum())
+        metrics.addCounter("crc_publish_failure_total", "CRC 서버 전송 실패(재시도) 횟수", lambda: crcPublisher.getFailNum())
+        metrics.addGauge("crc_publish_delay_seconds", "마지막 주문 완료 메시지의 완료 ~ 전송 시간", lambda: crcPublisher.getLastDelaySec())
+        metrics.addHistogram("order_lead_time_seconds", "주문 수신 ~ 모든 음료가 픽업대에 놓일 때까지 걸린 시간", [60, 120, 180, 240, 300, 420, 600, 900, 1200])
+        metrics.addCounter("robot_busy_seconds_total", "로봇 명령 실행 누적 시간",
+            lambda: [({"robot" : robotName}, traceManager.getDeviceBusySec(robotName)) for robotName in robotNameList])
+        metrics.addGauge("robot_busy_ratio", "시작 후 로봇 명령 실행 시간 비율",
+            lambda: [({"robot" : robotName}, traceManager.getDeviceBusySec(robotName) / max(1.0, metrics.getUptimeSec())) for robotName in robotNameList])
+        metrics.addCounter("delonghi_brew_total", "드롱기별 추출 횟수")
+        metrics.addStateDuration("delonghi_state_seconds_total", "드롱기 상태(DelonghiState)별 누적 시간")
+        metrics.addGauge("device_poll_latency_seconds", "장비 상태 읽기 1회 소요 시간 (마지막 샘플)",
+            lambda: [({"device" : name}, report["readElapsedSec"]) for name, report in statusPoller.getReport().items()])
+        metrics.addGauge("device_sample_age_seconds", "장비 마지막 샘플 후 지난 시간",
+            lambda: [({"device" : name}, report["ageSec"]) for name, report in statusPoller.getReport().items()])
+        metrics.addCounter("device_poll_errors_total", "장비 상태 읽기 실패 횟수",
+            lambda: [({"device" : name}, report["errorCount"]) for name, report in statusPoller.getReport().items()])
+        metrics.addCounter("delonghi_status_notify_total", "드롱기 상태 알림 수신 횟수",
+            lambda: [({"device" : name}, report["notifyCount"]) for name, report in delonghiStatus.getReport().items()])
+        metrics.addCounter("delonghi_status_missed_notify_total", "연결 확인 읽기에서 발견한 드롱기 상태 알림 누락 횟수",
+            lambda: [({"device" : name}, report["missedNotifyCount"]) for name, report in delonghiStatus.getReport().items()])
@@ -0,0 +1,89 @@
+from cdrutils.log import CDRLog
+
+from manager.traceManager import TraceManager
+from manager.timingModelManager import TimingModelManager
+from manager.deviceRecordManager import DeviceRecordManager
+
+
+
+
+class ProcessRecordManager():
+    '''
+    ### 공정 실행 기록 관리 클래스 \n
+    - 공정 컨트롤러(단독/통합)가 실행하는 동안 남기는 기록을 한 곳에서 만들고, 시작 시 불러오기 / 종료 시 저장한다.
+      - 장비 동작 구간 기록 (TraceManager) : 종료 시 trace/{processName}Trace.json (Chrome trace)
+      - 장비 동작 시간 학습 (TimingModelManager) : 시작 시 불러오고 종료 시 timing/{processName}Timing.json 에 저장
+      - 장비 통신 기록/재생 (DeviceRecordManager) : record/{processName}Device.bin
+    - 기록된 동작 구간은 동작 시간 학습에 그대로 전달된다.
+    '''
+
+
+
+    def __init__(self, processName:str, deviceRecordMode:str = DeviceRecordManager.MODE_OFF):
+        self.__traceFilePath            :str        = f"trace/{processName}Trace.json"
+        self.__timingModelFilePath      :str        = f"timing/{processName}Timing.json"
+        self.__deviceRecordFilePath     :str        = f"record/{processName}Device.bin"
+
+        self.__traceManager             :TraceManager = TraceManager()
+        self.__timingModel              :TimingModelManager = TimingModelManager(self.__timingModelFilePath)
+        self.__deviceRecord             :DeviceRecordManager = DeviceRecordManager(deviceRecordMode, self.__deviceRecordFilePath)
+        self.__traceManager.subscribe(self.__timingModel.recordSpan)
+
+
+
+    def getTraceManager(self) -> TraceManager:
+        return self.__traceManager
+
+
+
+    def getTimingModel(self) -> TimingModelManager:
+        return self.__timingModel
+
+
+
+    def getDeviceRecord(self) -> DeviceRecordManager:
+        return self.__deviceRecord
+
+
+
+    def load(self):
+        '''
+        ### 이전 실행에서 학습한 장비 동작 시간 불러오기
+        '''
+        try:
+            entryNum :int = self.__timingModel.load()
+            CDRLog.print(f"동작 시간 학습 결과 불러오기 완료 : {self.__timingModelFilePath} ({entryNum} actions)")
+
+        except Exception as e:
+            CDRLog.print(f"동작 시간 학습 결과 불러오기 실패 : {e}")
+
+
+
+    def close(self):
+        '''
+        ### 종료 시 기록 저장
+        - 장비 동작 구간을 Chrome trace 파일로 저장 (chrome://tracing, Perfetto 에서 열기)
+        - 학습한 장비 동작 시간 저장 (다음 실행에서 사용)
+        - 장비 통신 기록 파일 닫기 / 재생 중지 (장비별 기록/재생 통계 출력)
+        - 저장에 실패해도 나머지 기록은 저장한다.
+        '''
+        try:
+            spanNum :int = self.__traceManager.exportChromeTrace(self.__traceFilePath)
+            CDRLog.print(f"trace 저장 완료 : {self.__traceFilePath} ({spanNum} spans)")
+
+        except Exception as e:
+            CDRLog.print(f"trace 저장 실패 : {e}")
+
+        try:
+            entryNum :int = self.__timingModel.save()
+            CDRLog.print(f"동작 시간 학습 결과 저장 완료 : {self.__timingModelFilePath} ({entryNum} actions)")
+
+        except Exception as e:
+            CDRLog.print(f"동작 시간 학습 결과 저장 실패 : {e}")
+
+        if self.__deviceRecord.getMode() == DeviceRecordManager.MODE_OFF:
+            return
+
+        self.__deviceRecord.close()
+        for deviceName, report in self.__deviceRecord.getReport().items():
+            CDRLog.print(f"장비 통신 {self.__deviceRecord.getMode()} {deviceName} : {report}")
@@ -0,0 +1,328 @@
+import time
+
+from concurrent.futures import Future
+
+from const.recipeStepType import RecipeStepType
+from const.recipeTable import RecipeTable
+
+from data.cellStateData import CellStateData
+from data.recipeData import RecipeDeviceData, RecipeStepData, RecipePlanData, RecipeRunData
+from data.traceSpanData import TraceSpanData
+
+from manager.tpmSysFuncManager import TPMSysFuncManager
+from manager.robotCommandManager import RobotCommandManager
+from manager.traceManager import TraceManager
+from manager.timingModelManager import TimingModelManager
+from manager.cellStateManager import CellStateManager
+
+
+
+
+class RecipeManager():
+    '''
+    ### 메뉴 레시피 실행 계획 관리 클래스 \n
+    - RecipeTable 의 메뉴 정보와 공정 동작 순서를 장비(RecipeDeviceData)에 맞춰 실행 계획(RecipePlanData)으로 변환한다.
+    - 변환한 실행 계획은 (메뉴, 공정, 장비) 별로 저장해 두고 다시 사용하므로, 제조 중에는 단계별 함수와 인자를 다시 만들지 않는다.
+    - 실행 계획은 단계별 선행 단계를 가진 그래프(DAG)이며, advanceRun() 은 선행 단계가 끝나고 장비가 비어 있고 셀 상태 조건을 만족하는
+      모든 단계를 한 번에 장비별 명령 쓰레드(RobotCommandManager)에 요청한다. (ex. 로봇 이동과 그리퍼 열기, 추출 시작과 홈 복귀 동시 진행)
+    - advanceRun() 은 기다리지 않으므로, 명령 완료/셀 상태 변경 알림을 받을 때마다(CONFIRM_STATE 단계는 run.wakeTime 에도) 다시 호출한다.
+    - timingModel 을 지정하면 끝난 실행 계획의 실행 시간(셀 상태 대기 제외)을 "공정(메뉴 번호)" 동작으로 학습하고,
+      CONFIRM_STATE 단계는 학습된 p99 대기 시간(레시피의 기본값 이상)이 지나면 셀 상태 확인 없이 끝낸다.
+    '''
+
+
+
+    def __init__(self, tpmSysFuncManager:TPMSysFuncManager, robotCommand:RobotCommandManager, dispenseCupFunc, indyModbusArgs:tuple = (0, 1, 100, 0), traceManager:TraceManager = None, timingModel:TimingModelManager = None,
+                 cellState:CellStateManager = None):
+        self.__tpmSysFuncManager        :TPMSysFuncManager = tpmSysFuncManager
+        # 장비별 명령 쓰레드 (로봇 팔, 그리퍼, 드롱기를 각각 addRobot 으로 등록해야 한다)
+        self.__robotCommand             :RobotCommandManager = robotCommand
+        # 컵 배출 함수 dispenseCupFunc(디스펜서 명령 코드)
+        self.__dispenseCupFunc                      = dispenseCupFunc
+        # WAIT_STATE 단계의 대기 구간 기록
+        self.__traceManager             :TraceManager = traceManager
+        # Indy 프로그램 실행 인자 (cmdAddr, feedbackAddr, startFeedback, finFeedback)
+        self.__indyModbusArgs           :tuple      = indyModbusArgs
+        # 실행 계획 실행 시간 학습, CONFIRM_STATE 단계의 최대 대기 시간 예측
+        self.__timingModel              :TimingModelManager = timingModel
+        self.__confirmPercentile        :float      = 99.0
+        # 셀 상태 저장소 : 셀 상태 조건의 항목 이름 확인에 사용 (셀 구성이 추가한 항목 포함, None 이면 CellStateData 항목만)
+        self.__cellState                :CellStateManager = cellState
+
+        # (메뉴 번호, 공정 이름, 로봇 이름, 드롱기 이름) -> 실행 계획
+        self.__planDict                 :dict[tuple, RecipePlanData] = {}
+
+
+
+    def hasMenu(self, menuId:int) -> bool:
+        return menuId in RecipeTable.MENU_DICT
+
+
+
+    def getMenuName(self, menuId:int) -> str:
+        return RecipeTable.MENU_DICT[menuId]["name"] if self.hasMenu(menuId) == True else str(menuId)
+
+
+
+    def getPlan(self, menuId:int, processName:str, device:RecipeDeviceData) -> RecipePlanData:
+        '''
+        ### menuId 메뉴를 processName 공정에서 device 로 실행하는 계획. 레시피가 없는 메뉴는 None
+        '''
+        planKey :tuple          = (menuId, processName, device.robotName, device.delonghiName)
+        plan    :RecipePlanData = self.__planDict.get(planKey)
+
+        if plan == None and self.hasMenu(menuId) == True:
+            plan = self.__compilePlan(menuId, processName, device)
+            self.__planDict[planKey] = plan
+
+        return plan
+
+
+
+    def precompile(self, processName:str, device:RecipeDeviceData) -> int:
+        '''
+        ### 모든 메뉴의 processName 공정 실행 계획을 미리 변환 (레시피 오류는 시작할 때 발생)
+        - 반환값 : 변환한 실행 계획 수
+        '''
+        for menuId in RecipeTable.MENU_DICT:
+            self.getPlan(menuId, processName, device)
+
+        return len(RecipeTable.MENU_DICT)
+
+
+
+    def startRun(self, plan:RecipePlanData) -> RecipeRunData:
+        '''
+        ### 실행 계획 1회 실행 시작 (호출한 쓰레드의 trace context 를 단계 기록에 사용)
+        - 단계 요청은 advanceRun() 에서 진행한다.
+        '''
+        context :tuple = (-1, -1) if self.__traceManager == None else self.__traceManager.getContext()
+        return RecipeRunData(plan, context, time.monotonic())
+
+
+
+    def advanceRun(self, run:RecipeRunData, cellSnapshot:CellStateData) -> bool:
+        '''
+        ### 끝난 단계를 반영하고, 시작할 수 있는 모든 단계를 요청
+        - 시작 조건 : 선행 단계가 모두 끝남 + 단계의 장비 명령 쓰레드가 비어 있음 + (WAIT_STATE) cellSnapshot 이 조건을 만족
+        - CONFIRM_STATE 단계는 cellSnapshot 이 조건을 만족하거나 최대 대기 시간이 지나면 끝난다.
+        - 반환값 : 실행이 끝났는지 여부 (run.exception 이 있으면 실패)
+        '''
+        for index, future in list(run.futureDict.items()):
+
+            if future.done() == False:
+                continue
+
+            del run.futureDict[index]
+            if future.exception() != None:
+                run.exception = future.exception()
+            else:
+                run.doneIndexSet.add(index)
+
+        # 실패한 실행은 이어지는 단계를 요청하지 않음
+        if run.exception != None:
+            return run.isDone()
+
+        run.wakeTime = float("inf")
+
+        isProgressed :bool = True
+        while isProgressed == True:
+
+            isProgressed = False
+
+            for index, step in enumerate(run.plan.stepList):
+
+                if index in run.doneIndexSet or index in run.futureDict:
+                    continue
+
+                if any(dependIndex not in run.doneIndexSet for dependIndex in step.dependIndexList):
+                    continue
+
+                # 셀 상태 조건 : 만족하면(CONFIRM_STATE 는 최대 대기 시간이 지나도) 바로 끝난 단계로 처리 -> 이어지는 단계를 같은 판단에서 요청
+                if step.stepType in (RecipeStepType.WAIT_STATE, RecipeStepType.CONFIRM_STATE):
+
+                    if self.__advanceWaitStep(run, index, step, cellSnapshot) == True:
+                        isProgressed = True
+                    continue
+
+                # 장비가 다른 명령을 실행 중이면 다음 판단에서 요청
+                if self.__robotCommand.isBusy(step.resourceComm) == True:
+                    continue
+
+                if self.__traceManager == None:
+                    run.futureDict[index] = self.__robotCommand.submit(step.resourceComm, step.name, step.programId, step.func, step.args)
+                else:
+                    with self.__traceManager.context(*run.context):
+                        run.futureDict[index] = self.__robotCommand.submit(step.resourceComm, step.name, step.programId, step.func, step.args)
+
+        if run.isDone() == False:
+            return False
+
+        # 정상 종료 : 실행 시간 학습 (1회)
+        if run.endTime == -1:
+            run.endTime = time.monotonic()
+            if self.__timingModel != None:
+                self.__timingModel.record(run.plan.device.robotName, TimingModelManager.getActionName(run.plan.processName, run.plan.menuId), run.endTime - run.startTime - run.waitSec)
+
+        return True
+
+
+
+    def __advanceWaitStep(self, run:RecipeRunData, index:int, step:RecipeStepData, cellSnapshot:CellStateData) -> bool:
+        '''
+        ### 셀 상태 대기 단계 판단. 반환값 : 단계가 끝났는지 여부
+        - CONFIRM_STATE 단계가 최대 대기 시간으로 끝나면 "timeout" 오류로 기록한다. (대기 시간 학습에서 제외)
+        '''
+        now             :float  = time.monotonic()
+        waitStartTime   :float  = run.waitStartTimeDict.setdefault(index, now)
+        isConfirmed     :bool   = step.func(cellSnapshot)
+        isTimeout       :bool   = False
+
+        if isConfirmed == False and step.stepType == RecipeStepType.CONFIRM_STATE:
+
+            timeoutTime :float = waitStartTime + self.__getConfirmTimeoutSec(step)
+            isTimeout = now >= timeoutTime
+            if isTimeout == False:
+                run.wakeTime = min(run.wakeTime, timeoutTime)
+
+        if isConfirmed == False and isTimeout == False:
+            return False
+
+        run.doneIndexSet.add(index)
+        run.waitSec += now - waitStartTime
+
+        if self.__traceManager != None:
+            span :TraceSpanData = TraceSpanData(step.name, step.deviceName, waitStartTime, now, -1, *run.context)
+            if isTimeout == True:
+                span.error = "timeout"
+            self.__traceManager.addSpan(span)
+
+        return True
+
+
+
+    def __getConfirmTimeoutSec(self, step:RecipeStepData) -> float:
+        '''
+        CONFIRM_STATE 단계의 최대 대기 시간 : 조건 확인까지 걸린 시간의 p99 (샘플이 부족하면 레시피의 기본값)
+        - 시간 초과한 대기는 학습하지 않아 p99 가 줄어들기만 하므로, 레시피의 기본값보다 짧게 끝내지 않는다.
+        '''
+        if self.__timingModel == None:
+            return step.defaultSec
+
+        return max(step.defaultSec, self.__timingModel.predict(step.deviceName, step.name, self.__confirmPercentile, step.defaultSec))
+
+
+
+    def __compilePlan(self, menuId:int, processName:str, device:RecipeDeviceData) -> RecipePlanData:
+        '''
+        ### 공정 동작 순서에 메뉴 정보를 채우고 장비의 실행 함수/인자를 정해 실행 계획 생성
+        '''
+        menuInfo    :dict   = RecipeTable.MENU_DICT[menuId]
+        valueDict   :dict   = {**RecipeTable.CUP_DICT[menuInfo["cup"]], **menuInfo}
+        stepList    :list[RecipeStepData] = []
+        # 이전 항목의 단계 번호 (다음 항목 단계들의 선행 단계)
+        prevIndexList :list[int] = []
+
+        for entry in RecipeTable.PROCESS_DICT[processName]:
+
+            # 단계 1개 또는 동시에 실행할 단계 목록
+            stepTemplateList    :list       = entry if isinstance(entry, list) else [entry]
+            indexList           :list[int]  = []
+
+            for stepTemplate in stepTemplateList:
+
+                stepType, value, condition, name = (tuple(stepTemplate) + (None, None))[:4]
+
+                # 포함 조건 : "key" -> 메뉴 정보의 key 값이 있을 때, "!key" -> 없을 때
+                if condition != None:
+                    isNegative  :bool = condition.startswith("!")
+                    hasValue    :bool = bool(valueDict[condition.lstrip("!")])
+                    if hasValue == isNegative:
+                        continue
+
+                if isinstance(value, str) and value.startswith("$"):
+                    value = valueDict[value[1:]]
+
+                step :RecipeStepData = self.__compileStep(stepType, value, name, device)
+                step.dependIndexList = tuple(prevIndexList)
+                indexList.append(len(stepList))
+                stepList.append(step)
+
+            # 같은 장비를 쓰는 단계는 동시에 실행할 수 없음
+            resourceIdList :list[int] = [id(stepList[index].resourceComm) for index in indexList if stepList[index].resourceComm != None]
+            if len(resourceIdList) != len(set(resourceIdList)):
+                raise ValueError(f"{processName} : 같은 장비를 쓰는 단계를 동시에 실행할 수 없음 ({[stepList[index].name for index in indexList]})")
+
+            if len(indexList) > 0:
+                prevIndexList = indexList
+
+        return RecipePlanData(menuId, menuInfo["name"], processName, device, tuple(stepList))
+
+
+
+    def __compileStep(self, stepType:int, value, name:str, device:RecipeDeviceData) -> RecipeStepData:
+        if stepType == RecipeStepType.ROBOT:
+
+            if device.isURRobot == True:
+                step = RecipeStepData(stepType, "sendURCmd", device.robotName, value, self.__tpmSysFuncManager.sendURCmd, (device.robotComm, value), device.robotComm)
+            else:
+                cmdAddr, feedbackAddr, startFeedback, finFeedback = self.__indyModbusArgs
+                step = RecipeStepData(stepType, "sendIndyModbusCmd", device.robotName, value, self.__tpmSysFuncManager.sendIndyModbusCmd,
+                                      (device.robotComm, cmdAddr, value, feedbackAddr, startFeedback, finFeedback), device.robotComm)
+
+        elif stepType == RecipeStepType.GRIPPER_HOLD:
+            step = RecipeStepData(stepType, "holdDHGripper", device.robotName, -1, self.__tpmSysFuncManager.holdDHGripper, (device.gripperComm,), device.gripperComm)
+
+        elif stepType == RecipeStepType.GRIPPER_RELEASE:
+            step = RecipeStepData(stepType, "releaseDHGripper", device.robotName, -1, self.__tpmSysFuncManager.releaseDHGripper, (device.gripperComm,), device.gripperComm)
+
+        # 컵 배출, 대기 중에는 로봇 팔이 자리를 지키므로 로봇 팔 명령 쓰레드에서 실행
+        elif stepType == RecipeStepType.DISPENSE_CUP:
+            step = RecipeStepData(stepType, "reqDispensingCup", device.robotName, -1, self.__dispenseCupFunc, (value,), device.robotComm)
+
+        elif stepType == RecipeStepType.BREW:
+            if device.delonghiComm == None:
+                raise ValueError(f"{device.robotName} 에 추출할 드롱기가 없음 ({value})")
+            step = RecipeStepData(stepType, value, device.delonghiName, -1, getattr(self.__tpmSysFuncManager, value), (device.delonghiComm,), device.delonghiComm)
+
+        elif stepType == RecipeStepType.SLEEP:
+            step = RecipeStepData(stepType, "sleep", device.robotName, -1, time.sleep, (value,), device.robotComm)
+
+        elif stepType == RecipeStepType.WAIT_STATE:
+            step = RecipeStepData(stepType, "waitState", device.robotName + " 대기", -1, self.__makeStatePredicate(value, device), ())
+
+        elif stepType == RecipeStepType.CONFIRM_STATE:
+            expectedDict, defaultSec = value
+            step = RecipeStepData(stepType, "confirmState", device.robotName + " 대기", -1, self.__makeStatePredicate(expectedDict, device), ())
+            step.defaultSec = defaultSec
+
+        else:
+            raise ValueError(f"알 수 없는 레시피 단계 : {stepType}")
+
+        if step.resourceComm != None and self.__robotCommand.hasRobot(step.resourceComm) == False:
+            raise ValueError(f"명령 쓰레드가 없는 장비의 레시피 단계 : {step.name} ({step.deviceName})")
+
+        if name != None:
+            step.name = name
+
+        return step
+
+
+
+    def __makeStatePredicate(self, expectedDict:dict, device:RecipeDeviceData):
+        '''
+        {셀 상태 항목 이름 : 값} -> 셀 상태(snapshot)가 모든 값과 같으면 True 인 함수 ("@key" 는 장비 묶음의 셀 상태 이름)
+        '''
+        cellState       :CellStateData  = self.__cellState.getSnapshot() if self.__cellState != None else CellStateData()
+        expectedList    :list[tuple]    = []
+
+        for key, value in expectedDict.items():
+            if key.startswith("@"):
+                key = device.stateKeyDict[key[1:]]
+
+            if hasattr(cellState, key) == False:
+                raise KeyError(f"알 수 없는 셀 상태 : {key}")
+
+            expectedList.append((key, value))
+
+        return lambda cellSnapshot: all(getattr(cellSnapshot, key) == value for key, value in expectedList)
@@ -0,0 +1,198 @@
+import threading
+from concurrent.futures import Future
+
+from cdrutils.log import CDRLog
+
+from manager.tpmSysFuncManager import TPMSysFuncManager
+from manager.traceManager import TraceManager
+
+
+
+
+class RobotCommandQueue():
+    '''
+    로봇 1대의 명령 대기열과 명령 실행 쓰레드
+    '''
+
+    def __init__(self, name:str):
+        self.name                       :str            = name
+        # (future, 실행 함수, 인자, span 이름, 프로그램 번호, 요청 시점의 trace context) 목록
+        self.commandList                :list           = []
+        self.isBusy                     :bool           = False
+        self.thread                     :threading.Thread = None
+
+
+
+
+class RobotCommandManager():
+    '''
+    ### 로봇 비동기 명령 관리 클래스 \n
+    - TPMSysFuncManager 의 로봇/그리퍼 명령을 로봇별 명령 쓰레드에서 실행하고, 호출한 쪽에는 바로 Future 를 반환한다.
+    - 같은 로봇의 명령은 요청한 순서대로 하나씩 실행되고, 다른 로봇의 명령은 동시에 실행된다. (ex. UR5 와 Indy7R 동시 동작)
+    - 로봇 명령의 Future 는 Modbus 피드백 핸드셰이크(시작 100 -> 완료 0)가 끝나 TPMSysFuncManager 호출이 반환될 때 완료된다.
+    - 명령 실행 중 예외가 발생하면 해당 로봇에 대기 중인 명령은 모두 같은 예외로 취소된다. (동작 시퀀스 중단)
+    - traceManager 를 지정하면 명령마다 실행 구간(span)을 기록한다. 주문 정보는 명령을 요청한 쓰레드의 context 를 사용한다.
+    '''
+
+
+
+    def __init__(self, tpmSysFuncManager:TPMSysFuncManager, doneCallback = None, traceManager:TraceManager = None):
+        self.__tpmSysFuncManager        :TPMSysFuncManager = tpmSysFuncManager
+        # 명령이 끝날 때마다 호출 (ex. 스케줄러 쓰레드 깨우기)
+        self.__doneCallback                                = doneCallback
+        self.__traceManager             :TraceManager      = traceManager
+
+        self.__cond                     :threading.Condition = threading.Condition()
+        self.__commandQueueDict         :dict[int, RobotCommandQueue] = {}
+
+
+
+    def addRobot(self, robotComm, name:str):
+        '''
+        ### 명령을 실행할 로봇 등록 (로봇별 명령 쓰레드 시작)
+        - 로봇 팔과 동시에 동작할 수 있는 장비(그리퍼, 드롱기)도 등록하면 별도 명령 쓰레드에서 실행된다. (ex. 레시피 실행 계획의 단계)
+        '''
+        commandQueue :RobotCommandQueue = RobotCommandQueue(name)
+
+        with self.__cond:
+            self.__commandQueueDict[id(robotComm)] = commandQueue
+
+        commandQueue.thread = threading.Thread(target = self.__commandThreadHandler, args = (commandQueue,), daemon = True)
+        commandQueue.thread.start()
+
+
+
+    def sendIndyModbusCmd(self, indyComm, cmdAddr:int, programId:int, feedbackAddr:int, startFeedback:int, finFeedback:int) -> Future:
+        return self.__addCommand(indyComm, "sendIndyModbusCmd", programId, self.__tpmSysFuncManager.sendIndyModbusCmd, (indyComm, cmdAddr, programId, feedbackAddr, startFeedback, finFeedback))
+
+
+
+    def sendURCmd(self, urComm, programId:int) -> Future:
+        return self.__addCommand(urComm, "sendURCmd", programId, self.__tpmSysFuncManager.sendURCmd, (urComm, programId))
+
+
+
+    def holdDHGripper(self, robotComm, gripperComm) -> Future:
+        '''
+        그리퍼 명령은 그리퍼가 달린 로봇(robotComm)의 명령 순서에 맞춰 실행
+        '''
+        return self.__addCommand(robotComm, "holdDHGripper", -1, self.__tpmSysFuncManager.holdDHGripper, (gripperComm,))
+
+
+
+    def releaseDHGripper(self, robotComm, gripperComm) -> Future:
+        return self.__addCommand(robotComm, "releaseDHGripper", -1, self.__tpmSysFuncManager.releaseDHGripper, (gripperComm,))
+
+
+
+    def call(self, robotComm, func, *args) -> Future:
+        '''
+        ### robotComm 로봇의 명령 순서에 맞춰 func(*args) 실행
+        - 로봇 동작 사이에 들어가는 컵 배출, 드롱기 추출 명령, 대기 등에 사용
+        '''
+        return self.__addCommand(robotComm, getattr(func, "__name__", "call").lstrip("_"), -1, func, args)
+
+
+
+    def submit(self, robotComm, spanName:str, programId:int, func, args:tuple) -> Future:
+        '''
+        ### robotComm 로봇의 명령 순서에 맞춰 func(*args) 실행 (span 이름, 프로그램 번호 지정)
+        - 함수와 인자가 미리 정해진 명령(ex. 레시피 실행 계획의 단계)을 그대로 요청할 때 사용
+        '''
+        return self.__addCommand(robotComm, spanName, programId, func, args)
+
+
+
+    def hasRobot(self, robotComm) -> bool:
+        with self.__cond:
+            return id(robotComm) in self.__commandQueueDict
+
+
+
+    def isBusy(self, robotComm) -> bool:
+        '''
+        로봇이 명령을 실행 중이거나 대기 중인 명령이 있는지 여부
+        '''
+        with self.__cond:
+            commandQueue :RobotCommandQueue = self.__commandQueueDict[id(robotComm)]
+            return commandQueue.isBusy == True or len(commandQueue.commandList) > 0
+
+
+
+    def waitAll(self, futureList:list[Future], timeoutSec:float = None) -> bool:
+        '''
+        ### futureList 의 명령이 모두 끝날 때까지 대기
+        - 반환값 : timeoutSec 안에 모두 끝났으면 True
+        - 실패한 명령이 있으면 해당 예외를 다시 발생시킨다.
+        '''
+        with self.__cond:
+            isDone :bool = self.__cond.wait_for(lambda: all(future.done() for future in futureList), timeoutSec)
+
+        if isDone == True:
+            for future in futureList:
+                future.result()
+
+        return isDone
+
+
+
+    def __addCommand(self, robotComm, spanName:str, programId:int, func, args:tuple) -> Future:
+        future  :Future = Future()
+        context :tuple  = None if self.__traceManager == None else self.__traceManager.getContext()
+
+        with self.__cond:
+            commandQueue :RobotCommandQueue = self.__commandQueueDict[id(robotComm)]
+            commandQueue.commandList.append((future, func, args, spanName, programId, context))
+            self.__cond.notify_all()
+
+        return future
+
+
+
+    def __runCommand(self, commandQueue:RobotCommandQueue, func, args:tuple, spanName:str, programId:int, context:tuple):
+        '''
+        명령 실행 (traceManager 가 있으면 요청 시점의 주문 정보로 span 기록)
+        '''
+        if self.__traceManager == None:
+            return func(*args)
+
+        with self.__traceManager.context(*context), self.__traceManager.span(spanName, commandQueue.name, programId):
+            return func(*args)
+
+
+
+    def __commandThreadHandler(self, commandQueue:RobotCommandQueue):
+        '''
+        ### 로봇별 명령 실행 쓰레드
+        '''
+        while True:
+
+            with self.__cond:
+                commandQueue.isBusy = False
+                self.__cond.wait_for(lambda: len(commandQueue.commandList) > 0)
+
+                future, func, args, spanName, programId, context = commandQueue.commandList.pop(0)
+                commandQueue.isBusy = True
+
+            if future.set_running_or_notify_cancel() == False:
+                continue
+
+            try:
+                future.set_result(self.__runCommand(commandQueue, func, args, spanName, programId, context))
+
+            except Exception as e:
+                CDRLog.print(f"{commandQueue.name} 명령 실패 : {e}")
+                future.set_exception(e)
+
+                # 이어지는 명령은 실행하지 않음
+                with self.__cond:
+                    for canceledFuture, *_ in commandQueue.commandList:
+                        if canceledFuture.set_running_or_notify_cancel() == True:
+                            canceledFuture.set_exception(e)
+                    commandQueue.commandList.clear()
+
+            with self.__cond:
+                self.__cond.notify_all()
+
+            if self.__doneCallback != None:
+                self.__doneCallback()
@@ -0,0 +1,111 @@
+import threading
+import heapq
+import time
+
+from cdrutils.log import CDRLog
+
+
+
+
+class TimerSchedulerManager():
+    '''
+    ### 예약 작업 실행 클래스 \n
+    - 지정한 시간이 지나면 callback 을 실행한다. 모든 예약 작업은 쓰레드 1개에서 시간 순서대로 실행되므로,
+      예약 작업이 많아져도 쓰레드 수와 CPU 사용량은 늘어나지 않는다. (ex. 픽업대 주문 번호 표시 해제)
+    - callback 은 쓰레드를 오래 점유하지 않도록 짧게 작성하고, 다시 확인이 필요하면 callLater 로 다시 예약한다.
+    '''
+
+
+
+    def __init__(self, name:str = "timer"):
+        self.__name                     :str        = name
+        self.__cond                     :threading.Condition = threading.Condition()
+        # (실행 시간, 순번, callback, 인자) - 실행 시간은 time.monotonic 기준
+        self.__timerHeap                :list       = []
+        self.__timerSeq                 :int        = 0
+        # 취소된 예약 작업의 순번
+        self.__canceledSeqSet           :set[int]   = set()
+        self.__isRunning                :bool       = False
+
+
+
+    def start(self):
+        '''
+        ### 예약 작업 실행 쓰레드 시작
+        '''
+        self.__isRunning = True
+        threading.Thread(target = self.__timerThreadHandler, daemon = True).start()
+
+
+
+    def stop(self):
+        with self.__cond:
+            self.__isRunning = False
+            self.__cond.notify_all()
+
+
+
+    def callLater(self, delaySec:float, callback, *args) -> int:
+        '''
+        ### delaySec 후 callback(*args) 실행 예약
+        - 반환값 : 예약 번호 (cancel 에 사용)
+        '''
+        with self.__cond:
+            self.__timerSeq += 1
+            heapq.heappush(self.__timerHeap, (time.monotonic() + delaySec, self.__timerSeq, callback, args))
+            self.__cond.notify_all()
+
+            return self.__timerSeq
+
+
+
+    def cancel(self, timerId:int):
+        '''
+        ### 아직 실행되지 않은 예약 작업 취소
+        '''
+        with self.__cond:
+            if any(timerSeq == timerId for _, timerSeq, _, _ in self.__timerHeap):
+                self.__canceledSeqSet.add(timerId)
+
+
+
+    def getTimerNum(self) -> int:
+        '''
+        실행을 기다리는 예약 작업 수
+        '''
+        with self.__cond:
+            return len(self.__timerHeap) - len(self.__canceledSeqSet)
+
+
+
+    def __timerThreadHandler(self):
+        '''
+        ### 예약 작업 실행 쓰레드 (실행 시간이 된 작업을 순서대로 실행)
+        '''
+        while True:
+
+            with self.__cond:
+
+                while self.__isRunning == True:
+
+                    if len(self.__timerHeap) > 0 and self.__timerHeap[0][0] <= time.monotonic():
+                        break
+
+                    waitSec :float = None if len(self.__timerHeap) == 0 else self.__timerHeap[0][0] - time.monotonic()
+                    self.__cond.wait(waitSec)
+
+                if self.__isRunning == False:
+                    break
+
+                _, timerSeq, callback, args = heapq.heappop(self.__timerHeap)
+
+                if timerSeq in self.__canceledSeqSet:
+                    self.__canceledSeqSet.discard(timerSeq)
+                    continue
+
+            # 예약 작업은 lock 밖에서 실행 (작업 안에서 다시 예약 가능)
+            try:
+                callback(*args)
+
+            except Exception as e:
+                CDRLog.print(f"{self.__name} 예약 작업 실패 : {e}")
@@ -0,0 +1,155 @@
+import threading
+import json
+import os
+
+from collections import deque
+
+from data.traceSpanData import TraceSpanData
+
+
+
+
+class TimingModelManager():
+    '''
+    ### 장비 동작 시간 학습 클래스 \n
+    - (장비 이름, 동작 이름) 별로 최근 maxSampleNum 개의 실제 소요 시간을 보관하고, 백분위(p50, p99 등) 예상 시간을 제공한다.
+    - 동작 이름은 "sendIndyModbusCmd(14)" 처럼 프로그램 번호를 포함한다. (TraceManager 의 span 을 그대로 기록할 수 있다)
+    - 샘플이 minSampleNum 개보다 적으면 예상 시간 대신 호출한 쪽의 기본값을 사용한다.
+    - 실행 사이에 학습 결과를 유지하도록 filePath(JSON) 에 저장/불러오기 한다.
+    '''
+
+
+
+    def __init__(self, filePath:str = "", maxSampleNum:int = 200, minSampleNum:int = 5):
+        self.__filePath                 :str        = filePath
+        self.__maxSampleNum             :int        = maxSampleNum
+        self.__minSampleNum             :int        = minSampleNum
+
+        self.__lock                     :threading.Lock = threading.Lock()
+        # (장비 이름, 동작 이름) -> 최근 소요 시간(초)
+        self.__sampleDict               :dict[tuple[str, str], deque] = {}
+
+
+
+    @staticmethod
+    def getActionName(name:str, programId:int = -1) -> str:
+        '''
+        동작 이름 (프로그램 번호가 있으면 "name(programId)")
+        '''
+        return name if programId == -1 else f"{name}({programId})"
+
+
+
+    def record(self, deviceName:str, actionName:str, elapsedSec:float):
+        with self.__lock:
+            sampleQueue :deque = self.__sampleDict.get((deviceName, actionName))
+
+            if sampleQueue == None:
+                sampleQueue = deque(maxlen = self.__maxSampleNum)
+                self.__sampleDict[(deviceName, actionName)] = sampleQueue
+
+            sampleQueue.append(elapsedSec)
+
+
+
+    def recordSpan(self, span:TraceSpanData):
+        '''
+        ### TraceManager 에 기록된 span 의 소요 시간 학습 (TraceManager.subscribe 콜백)
+        - 실패했거나 시간 초과로 끝난 구간(span.error)은 정상 소요 시간이 아니므로 제외한다.
+        '''
+        if span.error != "":
+            return
+
+        self.record(span.deviceName, self.getActionName(span.name, span.programId), span.getElapsedSec())
+
+
+
+    def predict(self, deviceName:str, actionName:str, percentile:float = 50.0, defaultSec:float = 0.0) -> float:
+        '''
+        ### 동작의 percentile 백분위 예상 시간(초)
+        - deviceName 이 None 이면 모든 장비의 같은 동작 샘플을 합쳐서 계산 (ex. 드롱기별 추출 시간)
+        - 샘플이 부족하면 defaultSec
+        '''
+        with self.__lock:
+            if deviceName == None:
+                sampleList :list[float] = [sample for (_, sampleActionName), sampleQueue in self.__sampleDict.items() if sampleActionName == actionName for sample in sampleQueue]
+            else:
+                sampleList :list[float] = list(self.__sampleDict.get((deviceName, actionName), ()))
+
+        if len(sampleList) < self.__minSampleNum:
+            return defaultSec
+
+        return self.__getPercentile(sorted(sampleList), percentile)
+
+
+
+    def getReport(self) -> dict:
+        '''
+        ### 학습 결과 요약 {(장비 이름, 동작 이름) : {"count", "p50", "p90", "p99"}}
+        '''
+        with self.__lock:
+            sampleListDict :dict = {key : sorted(sampleQueue) for key, sampleQueue in self.__sampleDict.items()}
+
+        return {
+            key : {"count" : len(sampleList), "p50" : self.__getPercentile(sampleList, 50.0), "p90" : self.__getPercentile(sampleList, 90.0), "p99" : self.__getPercentile(sampleList, 99.0)}
+            for key, sampleList in sampleListDict.items()
+        }
+
+
+
+    def load(self) -> int:
+        '''
+        ### filePath 의 학습 결과 불러오기 (파일이 없으면 빈 상태로 시작)
+        - 반환값 : 불러온 (장비, 동작) 수
+        '''
+        if self.__filePath == "" or os.path.exists(self.__filePath) == False:
+            return 0
+
+        with open(self.__filePath, "r", encoding = "utf-8") as modelFile:
+            entryList :list[dict] = json.load(modelFile)
+
+        with self.__lock:
+            for entry in entryList:
+                self.__sampleDict[(entry["device"], entry["action"])] = deque(entry["samples"], maxlen = self.__maxSampleNum)
+
+        return len(entryList)
+
+
+
+    def save(self) -> int:
+        '''
+        ### 학습 결과를 filePath 에 저장
+        - 반환값 : 저장한 (장비, 동작) 수
+        '''
+        with self.__lock:
+            entryList :list[dict] = [
+                {"device" : deviceName, "action" : actionName, "samples" : list(sampleQueue)}
+                for (deviceName, actionName), sampleQueue in self.__sampleDict.items()
+            ]
+
+        dirPath :str = os.path.dirname(self.__filePath)
+        if dirPath != "":
+            os.makedirs(dirPath, exist_ok = True)
+
+        # 저장 중 종료되어도 이전 파일이 깨지지 않도록 임시 파일에 쓴 후 교체
+        with open(self.__filePath + ".tmp", "w", encoding = "utf-8") as modelFile:
+            json.dump(entryList, modelFile, ensure_ascii = False)
+        os.replace(self.__filePath + ".tmp", self.__filePath)
+
+        return len(entryList)
+
+
+
+    @staticmethod
+    def __getPercentile(sortedList:list[float], percentile:float) -> float:
+        '''
+        정렬된 샘플의 percentile 백분위 값 (선형 보간)
+        '''
+        if len(sortedList) == 0:
+            return 0.0
+
+        position    :float  = (len(sortedList) - 1) * percentile / 100.0
+        lowerIndex  :int    = int(position)
+        upperIndex  :int    = min(lowerIndex + 1, len(sortedList) - 1)
+
+        return sortedList[lowerIndex] + (sortedList[upperIndex] - sortedList[lowerIndex]) * (position - lowerIndex)
@@ -0,0 +1,183 @@
+import threading
+import json
+import os
+import time
+
+from collections import deque
+from contextlib import contextmanager
+
+from data.traceSpanData import TraceSpanData
+
+
+
+
+class TraceManager():
+    '''
+    ### 장비 동작 구간(span) 기록 클래스 \n
+    - 로봇/그리퍼/컵 디스펜서/드롱기 명령 1회마다 시작/종료 시간, 장비, 프로그램 번호, 주문 번호, 음료 순번을 기록한다.
+    - 기록은 최대 maxSpanNum 개까지 보관하며(ring buffer), 가득 차면 오래된 기록부터 지워진다.
+    - exportChromeTrace() 로 Chrome trace(JSON) 파일을 만들면 trace viewer(chrome://tracing, Perfetto)에서 장비별로 볼 수 있다.
+    - 주문 정보는 context() 로 쓰레드별로 지정하며, 다른 쓰레드에서 실행되는 명령은 요청할 때의 context 를 함께 넘겨받아 사용한다.
+    - subscribe() 로 등록한 콜백은 span 이 기록될 때마다 호출된다. (ex. 동작 시간 학습)
+    '''
+
+
+
+    def __init__(self, maxSpanNum:int = 100000):
+        self.__lock                     :threading.Lock = threading.Lock()
+        self.__spanQueue                :deque      = deque(maxlen = maxSpanNum)
+        # 장비별 누적 동작 시간 (ring buffer 에서 지워진 기록 포함)
+        self.__deviceBusySecDict        :dict[str, float] = {}
+        # 쓰레드별 주문 정보 (orderId, menuIndex)
+        self.__threadLocal                          = threading.local()
+        # trace 시간 기준 (time.monotonic), 기준 시점의 실제 시간
+        self.__baseTime                 :float      = time.monotonic()
+        self.__baseWallTime             :float      = time.time()
+        # span 기록 콜백 목록
+        self.__subscriberList           :list       = []
+
+
+
+    @contextmanager
+    def context(self, orderId:int, menuIndex:int = -1):
+        '''
+        ### with 구간 안에서 기록하는 span 의 주문 정보 지정
+        - ex. with traceManager.context(drinkJob.orderId, drinkJob.menuIndex): motionFunc()
+        '''
+        prevContext :tuple = self.getContext()
+        self.__threadLocal.context = (orderId, menuIndex)
+
+        try:
+            yield
+        finally:
+            self.__threadLocal.context = prevContext
+
+
+
+    def getContext(self) -> tuple[int, int]:
+        '''
+        현재 쓰레드의 주문 정보 (orderId, menuIndex), 없으면 (-1, -1)
+        '''
+        return getattr(self.__threadLocal, "context", (-1, -1))
+
+
+
+    @contextmanager
+    def span(self, name:str, deviceName:str, programId:int = -1, context:tuple = None):
+        '''
+        ### with 구간의 실행 시간을 span 으로 기록
+        - context : (orderId, menuIndex). None 이면 현재 쓰레드의 context 사용
+        - 구간 안에서 예외가 발생하면 오류 메시지를 함께 기록하고 예외는 그대로 전달한다.
+        '''
+        orderId, menuIndex = self.getContext() if context == None else context
+        span :TraceSpanData = TraceSpanData(name, deviceName, time.monotonic(), 0.0, programId, orderId, menuIndex)
+
+        try:
+            yield span
+
+        except BaseException as e:
+            span.error = f"{type(e).__name__} : {e}"
+            raise
+
+        finally:
+            span.endTime = time.monotonic()
+            self.addSpan(span)
+
+
+
+    def subscribe(self, callback):
+        '''
+        ### span 기록 콜백 등록 : span 을 기록한 쓰레드에서 callback(span) 호출
+        '''
+        with self.__lock:
+            self.__subscriberList.append(callback)
+
+
+
+    def addSpan(self, span:TraceSpanData):
+        '''
+        ### 이미 끝난 구간 기록 (ex. 드롱기 추출 시작 ~ 추출 완료 확인)
+        '''
+        with self.__lock:
+            self.__spanQueue.append(span)
+            self.__deviceBusySecDict[span.deviceName] = self.__deviceBusySecDict.get(span.deviceName, 0.0) + span.getElapsedSec()
+            subscriberList :list = list(self.__subscriberList)
+
+        for callback in subscriberList:
+            callback(span)
+
+
+
+    def getSpanList(self) -> list[TraceSpanData]:
+        with self.__lock:
+            return list(self.__spanQueue)
+
+
+
+    def getDeviceBusySec(self, deviceName:str) -> float:
+        '''
+        deviceName 장비의 기록 시작 후 누적 동작 시간(초)
+        '''
+        with self.__lock:
+            return self.__deviceBusySecDict.get(deviceName, 0.0)
+
+
+
+    def getSummary(self) -> dict:
+        '''
+        ### 장비/동작별 기록 요약 {(장비 이름, 동작 이름, 프로그램 번호) : {"count", "totalSec", "meanSec", "maxSec"}}
+        '''
+        summaryDict :dict = {}
+
+        for span in self.getSpanList():
+            summary :dict = summaryDict.setdefault((span.deviceName, span.name, span.programId), {"count" : 0, "totalSec" : 0.0, "maxSec" : 0.0})
+            summary["count"]    += 1
+            summary["totalSec"] += span.getElapsedSec()
+            summary["maxSec"]   = max(summary["maxSec"], span.getElapsedSec())
+
+        for summary in summaryDict.values():
+            summary["meanSec"] = summary["totalSec"] / summary["count"]
+
+        return summaryDict
+
+
+
+    def exportChromeTrace(self, filePath:str) -> int:
+        '''
+        ### 기록된 span 을 Chrome trace(JSON) 파일로 저장
+        - 장비별로 trace viewer 의 행(thread)이 나뉘며, 주문 번호/음료 순번/프로그램 번호는 args 에 기록된다.
+        - 반환값 : 저장한 span 수
+        '''
+        spanList        :list[TraceSpanData]    = self.getSpanList()
+        deviceIdDict    :dict[str, int]         = {}
+        eventList       :list[dict]             = []
+
+        for span in spanList:
+
+            if span.deviceName not in deviceIdDict:
+                deviceIdDict[span.deviceName] = len(deviceIdDict) + 1
+                eventList.append({"name" : "thread_name", "ph" : "M", "pid" : 1, "tid" : deviceIdDict[span.deviceName], "args" : {"name" : span.deviceName}})
+
+            args :dict = {"orderId" : span.orderId, "menuIndex" : span.menuIndex, "programId" : span.programId}
+            if span.error != "":
+                args["error"] = span.error
+
+            eventList.append({
+                "name"  : span.name if span.programId == -1 else f"{span.name}({span.programId})",
+                "cat"   : span.deviceName,
+                "ph"    : "X",
+                "ts"    : (span.startTime - self.__baseTime) * 1000000,
+                "dur"   : span.getElapsedSec() * 1000000,
+                "pid"   : 1,
+                "tid"   : deviceIdDict[span.deviceName],
+                "args"  : args,
+            })
+
+        dirPath :str = os.path.dirname(filePath)
+        if dirPath != "":
+            os.makedirs(dirPath, exist_ok = True)
+
+        with open(filePath, "w", encoding = "utf-8") as traceFile:
+            json.dump({"traceEvents" : eventList, "displayTimeUnit" : "ms", "otherData" : {"baseWallTime" : self.__baseWallTime}}, traceFile, ensure_ascii = False)
+
+        return len(spanList)
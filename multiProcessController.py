@@ -3,7 +3,8 @@ import sys
 import json
 import traceback
 import time
-import datetime
+
+from array import array
 
 from queue import Queue
 
@@ -20,18 +21,40 @@ from const.event import Event
 from const.crcJsonKeyword import CRCJsonKeyword as CRCKey
 from const.delonghiState import DelonghiState
 from const.modbusFuncCode import ModbusFuncCode
+from const.orderState import OrderState
 
 from data.mainData import MainData
 from data.mqttFilterData import MqttFilterData
+from data.orderData import DrinkJobData, IntakeOrderData
+from data.laneStateData import LaneStateData
+from data.cellStateData import CellStateData
+from data.traceSpanData import TraceSpanData
+from data.recipeData import RecipeDeviceData, RecipePlanData, RecipeRunData
+from data.cellTopologyData import CellTopologyData, LaneTopologyData, DelonghiTopologyData, TrayTopologyData
 
 from manager.tpmSysFuncManager import TPMSysFuncManager
-
-
-
-ORDER_STATE_BREW_BEFORE         :int = -1
-ORDER_STATE_BREW_START          :int = 0
-ORDER_STATE_BREW_COMPLETE       :int = 1
-ORDER_STATE_PICKUP_ENABLE       :int = 2
+from manager.deviceConnectionManager import DeviceConnectionManager
+from manager.deviceRecordManager import DeviceRecordManager
+from manager.orderQueueManager import OrderQueueManager
+from manager.orderIntakeManager import OrderIntakeManager
+from manager.crcPublishManager import CRCPublishManager
+from manager.laneDispatchManager import LaneDispatchManager
+from manager.robotCommandManager import RobotCommandManager
+from manager.devicePollingManager import DevicePollingManager
+from manager.delonghiMaintenanceManager import DelonghiMaintenanceManager
+from manager.delonghiStatusManager import DelonghiStatusManager
+from manager.cellStateManager import CellStateManager
+from manager.timerSchedulerManager import TimerSchedulerManager
+from manager.traceManager import TraceManager
+from manager.metricsManager import MetricsManager
+from manager.recipeManager import RecipeManager
+from manager.timingModelManager import TimingModelManager
+from manager.plcProcessImageManager import PlcProcessImageManager
+from manager.processRecordManager import ProcessRecordManager
+from manager.processMetricsManager import ProcessMetricsManager
+from manager.orderUIManager import OrderUIManager
+from manager.cupDispenserManager import CupDispenserManager
+from manager.cellTopologyManager import CellTopologyManager
 
 
 
@@ -40,42 +63,96 @@ class MultiProcessController():
     '''
     해당 클래스는 '[한기대] 공정교육용 로봇 시스템 - 통합 데모'룰 수행하는 기능이 구현되어있다.
     특이사항 : 로봇별 커피머신과 픽업대가 지정되어 있다. (UR5 + 1번드롱기 + 픽업대B / Indy7R + 2번드롱기 + 픽업대C)
+    로봇, 드롱기, 픽업대, 제조 라인, 장비 주소는 셀 구성 파일(topology/multiProcessTopology.json)에서 읽으며, 스케줄러는 설정된 라인 수만큼 음료를 동시에 제조한다.
+    직접 제조 라인(isDirect, Indy7L + 1번 드롱기 + 픽업대A)은 기본 셀 구성에 없다. multiDirectBrew/multiDirectPickup 은 단독 공정의 로봇 프로그램을
+    다른 시작 자세에서 실행하므로, 셀에서 경로를 확인한 후 lanes 에 {"robot": "Indy7L", "delonghi": 1, "pickupTray": "A", "isDirect": true} 를 추가한다.
     '''
 
 
 
     def __init__(self):
         CDRLog.print("[0%] var init Start.")
+        # 셀 구성 (로봇, 드롱기, 픽업대, 제조 라인, 장비 주소) ------------------------
+        self.__topologyFilePath         :str        = "topology/multiProcessTopology.json"
+        try:
+            self.__topology             :CellTopologyData = CellTopologyManager(self.__topologyFilePath).load()
+        except Exception as e:
+            CDRLog.print(f"셀 구성 불러오기 실패 : {self.__topologyFilePath} : {e}")
+            sys.exit()
+        CDRLog.print(f"셀 구성 : 로봇 {len(self.__topology.robotDict)}대, 드롱기 {len(self.__topology.delonghiDict)}대, 픽업대 {len(self.__topology.trayDict)}개, 라인 {len(self.__topology.laneList)}개")
+
         # config 변수 선언 ------------------------
-        self.__trayNum                  :int = 2
+        # CRC 주문 메뉴 리스트 크기 (주문 1건의 최대 음료 수) : getCRCOrderMenuList 는 최대 trayNum 개의 메뉴를 반환한다
+        # 일반 라인의 픽업대 수 (직접 제조 라인의 픽업대A 는 여유 라인이므로 CRC 메뉴 리스트 크기와 주문 1회 음료 수를 바꾸지 않는다)
+        self.__trayNum                  :int = len([lane for lane in self.__topology.laneList if lane.isDirect == False])
         
         
         self.__indyCmdAddr              :int        = 0
         self.__indyFeedbackAddr         :int        = 1
         self.__indyStartFeedback        :int        = 100
         self.__indtFinFeedback          :int        = 0
+
+        self.__connectionDeadlineSec    :float      = 60.0
+        # 동시에 보관(제조)할 수 있는 최대 주문 수
+        self.__maxOrderNum              :int        = 4
+        # 제조를 기다릴 수 있는 최대 주문 수, 주문 접수를 중단/재개하는 예상 대기 시간, 음료 1잔 처리 간격 초기값 (약 100잔/h)
+        self.__maxPendingOrderNum       :int        = 20
+        self.__maxOrderWaitSec          :float      = 900.0
+        self.__resumeOrderWaitSec       :float      = 600.0
+        self.__drinkIntervalSec         :float      = 35.0
         
         
         # 일반 변수 선언 --------------------------
-        self.__orderId                  :int        = -1
-        self.__menuIdList               :list[int]  = [-1, -1]
-        self.__menuStateList            :list[int]  = [ORDER_STATE_BREW_BEFORE, ORDER_STATE_BREW_BEFORE] 
-        self.__curMenuIndex             :int        = 0
-
-        # 센서 상태 : 감지(1), 미감지(0)
-        self.__hasCupOnMiddleATray      :int        = 1
-        self.__hasCupOnMiddleBTray      :int        = 1
-        self.__hasCupOnDeloghi01Tray    :int        = 1
-        self.__hasCupOnDeloghi02Tray    :int        = 1  
-        self.__hasCupOnPickupATray      :int        = 1
-        self.__hasCupOnPickupBTray      :int        = 1
-        self.__hasCupOnPickupCTray      :int        = 1
-        
-        self.__delonghi01Status         :int        = DelonghiState.NOT_READY
-        self.__delonghi02Status         :int        = DelonghiState.NOT_READY
-
-        self.__delonghi01MenuIndex      :int        = -1
-        self.__delonghi02MenuIndex      :int        = -1
+        self.__orderQueue               :OrderQueueManager = OrderQueueManager(self.__maxOrderNum)
+        self.__isConnecting             :bool       = False
+
+        # 트레이 센서/드롱기 상태 저장소 : 스케줄러는 판단할 때마다 같은 시점의 snapshot 을 사용한다
+        self.__cellState                :CellStateManager = CellStateManager(CellTopologyManager.getCellStateValueDict(self.__topology))
+        self.__cellSnapshot             :CellStateData = self.__cellState.getSnapshot()
+        # 커피 제조 스케줄러가 사용하는 상태 (이 값이 바뀔 때만 커피 제조 쓰레드를 깨운다)
+        self.__schedulerStateKeyList    :list[str]  = ["hasCupOnMiddleBTray"] + list(CellTopologyManager.getCellStateValueDict(self.__topology))
+
+        # 라인 번호별 제조 중인 음료 (컵이 드롱기에 놓인 후 픽업대로 옮겨질 때까지)
+        self.__laneJobDict              :dict[int, DrinkJobData] = {lane.laneNum : None for lane in self.__topology.laneList}
+        # 일반 라인 / 직접 제조 라인 (Indy7L 이 컵 전달이 한가할 때 드롱기와 픽업대A 를 직접 사용)
+        self.__laneTopologyList         :list[LaneTopologyData] = [lane for lane in self.__topology.laneList if lane.isDirect == False]
+        self.__directLaneTopologyList   :list[LaneTopologyData] = [lane for lane in self.__topology.laneList if lane.isDirect == True]
+
+        # 실행 기록 : 장비 동작 구간, 장비 동작 시간 학습(라인 배정 예상 시간에 사용), 장비 통신 기록/재생
+        # 장비 통신 기록/재생 : "record" 는 모든 통신 변수의 요청/응답을 기록, "replay" 는 장비 대신 기록 파일로 실행 ("" : 사용 안 함)
+        self.__deviceRecordMode         :str        = ""
+        self.__processRecord            :ProcessRecordManager = ProcessRecordManager("multiProcess", self.__deviceRecordMode)
+        self.__processRecord.load()
+        self.__traceManager             :TraceManager = self.__processRecord.getTraceManager()
+        self.__timingModel              :TimingModelManager = self.__processRecord.getTimingModel()
+        self.__deviceRecord             :DeviceRecordManager = self.__processRecord.getDeviceRecord()
+
+        self.__laneDispatcher           :LaneDispatchManager = LaneDispatchManager(self.__timingModel)
+        # 라인이 비기를 기다리는 음료의 컵 전달, 확인 대기 단계의 재판단 시간 (time.monotonic 기준, 없으면 inf)
+        self.__dispatchRetryTime        :float      = float("inf")
+
+        # 스케줄러 상태 변경 알림 (센서/드롱기 상태, 로봇 명령 완료) : 알림마다 version 증가 -> 커피 제조 쓰레드를 깨운다
+        self.__stateChangedCond         :threading.Condition = threading.Condition()
+        self.__stateVersion             :int        = 0
+        self.__idleWaitTimeoutSec       :float      = 1.0
+
+        # 픽업대 주문 번호 표시 해제 등 예약 작업 (쓰레드 1개에서 실행)
+        self.__timerScheduler           :TimerSchedulerManager = TimerSchedulerManager("주문UI 예약")
+        # 픽업대(slot) -> 픽업대 센서
+        self.__pickupSensorKeyDict      :dict[str, str] = {tray.uiSlot : tray.sensorKey for tray in self.__topology.trayDict.values()}
+
+        # 운영 지표 : http://127.0.0.1:9100/metrics (Prometheus text 형식)
+        self.__metrics                  :MetricsManager = MetricsManager()
+        self.__metricsPort              :int        = 9100
+        self.__robotNameList            :list[str]  = list(self.__topology.robotDict)
+
+        # 장비별 상태 읽기 주기
+        self.__statusPoller             :DevicePollingManager = DevicePollingManager()
+        self.__plcFastPollingSec        :float      = 0.05
+        self.__delonghiFastPollingSec   :float      = 0.2
+        self.__idlePollingSec           :float      = 1.0
+        # 드롱기 상태 알림을 사용하면 상태 읽기는 연결 확인용으로만
+        self.__delonghiLivenessPollingSec :float    = 5.0
 
         self.__tpmSysFuncManager    :TPMSysFuncManager = TPMSysFuncManager()  
         self.__tpmSysFuncManager.initSysFuncVar() 
@@ -83,76 +160,157 @@ class MultiProcessController():
         
         self.__tpmSysFuncManager.__storeId                   = 7
         self.__tpmSysFuncManager.__printerId                 = 7
-        
+
         
         CDRLog.print("[30%] Comm init Start.")
         # 통신 변수 선언 --------------------------------------------------------
-        self.__plcComm              :MelsecPLCVar = MelsecPLCVar(self.commVarEventCallback)
-        self.__plcComm.connect("192.168.3.60", 9988)
-        
-        self.__delonghi01Comm       :BLEVar = BLEVar(self.commVarEventCallback)
-        self.__delonghi01Comm.connect("00:A0:50:3D:86:d7", "00035b03-58e6-07dd-021a-08123a000300", "00035b03-58e6-07dd-021a-08123a000301", "00002902-0000-1000-8000-00805f9b34fb")
-     
-        self.__delonghi02Comm       :BLEVar = BLEVar(self.commVarEventCallback)
-        self.__delonghi02Comm.connect("00:A0:50:99:0A:0E", "00035b03-58e6-07dd-021a-08123a000300", "00035b03-58e6-07dd-021a-08123a000301", "00002902-0000-1000-8000-00805f9b34fb")
-     
-        self.__delonghiContainer  :TcpIPVar = TcpIPVar(self.commVarEventCallback)
-        self.__delonghiContainer.connect("192.168.3.123", 60000)
-        
-        self.__crcComm              :MqttVar = MqttVar(self.commVarEventCallback)
-        self.__crcComm.connect("b85b26e22ac34763bd9cc18d7f655038.s2.eu.hivemq.cloud", 8883, "admin", "201103crcBroker", ["crc/jts", "print/mbrush"])
-        self.__crcComm.setSubscribeFilter(MqttFilterData(CRCKey.KEY_STORE_ID, self.__tpmSysFuncManager.__storeId))
-
-        self.__cupDispenser         :TcpIPVar = TcpIPVar(self.commVarEventCallback)
-        self.__cupDispenser.connect("192.168.3.110", 5000)
-
-        # 로봇 통신 변수 선언
+        self.__plcComm              :MelsecPLCVar = self.__deviceRecord.createVar(MelsecPLCVar, "PLC", self.commVarEventCallback)
+        # PLC 신호(PlcSignalTable + 셀 구성의 드롱기/픽업대 센서)를 주기마다 일괄 읽기 요청으로 읽는 프로세스 이미지
+        self.__plcImage             :PlcProcessImageManager = PlcProcessImageManager(self.__plcComm, CellTopologyManager.getPlcSignalDict(self.__topology))
+        CDRLog.print(f"PLC 신호 {len(self.__plcImage.getSignalNameList())}개, 읽기 요청 {len(self.__plcImage.getBlockList())}회/주기")
+        # 드롱기 번호 -> 통신 변수
+        self.__delonghiCommDict     :dict[int, BLEVar] = {
+            delonghi.num : self.__deviceRecord.createVar(BLEVar, delonghi.name, self.commVarEventCallback) for delonghi in self.__topology.delonghiDict.values()
+        }
+        self.__delonghiContainer    :TcpIPVar = self.__deviceRecord.createVar(TcpIPVar, "찌꺼기통", self.commVarEventCallback)
+        self.__crcComm              :MqttVar = self.__deviceRecord.createVar(MqttVar, "CRC", self.commVarEventCallback)
+        # CRC 서버 주문 완료 전송 (전송하지 못한 메시지는 스풀 파일에 저장)
+        self.__crcPublishSpoolFilePath  :str        = "spool/multiProcessCrc.jsonl"
+        self.__crcPublisher         :CRCPublishManager = CRCPublishManager(self.__tpmSysFuncManager, self.__crcComm, self.__crcPublishSpoolFilePath)
+        self.__cupDispenser         :TcpIPVar = self.__deviceRecord.createVar(TcpIPVar, "컵디스펜서", self.commVarEventCallback)
+        self.__cupDispenserManager  :CupDispenserManager = CupDispenserManager(self.__cupDispenser, self.__traceManager)
+
+        # 로봇 통신 변수 선언 (로봇 이름 -> 로봇 팔/그리퍼 통신 변수)
         # 로봇은 정면을 기준으로 좌측부터 indy7 -> UR5 -> indy7 순서로 배치됨
-        self.__indy7LComm           :ModbusTCPVar = ModbusTCPVar(self.commVarEventCallback)
-        self.__indy7LComm.connect("192.168.3.101", 502) 
-        self.__tpmSysFuncManager.initIndyModbusCmd(self.__indy7LComm)
-
-        self.__ur5Comm              :ModbusTCPVar = ModbusTCPVar(self.commVarEventCallback)
-        self.__ur5Comm.connect("192.168.3.102", 502)
-
-        self.__indy7RComm           :ModbusTCPVar = ModbusTCPVar(self.commVarEventCallback)
-        self.__indy7RComm.connect("192.168.3.103", 502)
-        self.__tpmSysFuncManager.initIndyModbusCmd(self.__indy7RComm)
-
-        self.__indy7LGripperComm    :TcpIPVar = TcpIPVar(self.commVarEventCallback)
-        self.__indy7LGripperComm.connect("192.168.3.160", 5000)
-        
-        self.__ur5GripperComm       :TcpIPVar = TcpIPVar(self.commVarEventCallback)
-        self.__ur5GripperComm.connect("192.168.3.170", 5000)
-
-        self.__indy7RGripperComm    :TcpIPVar = TcpIPVar(self.commVarEventCallback)
-        self.__indy7RGripperComm.connect("192.168.3.180", 5000)
+        self.__robotCommDict        :dict[str, ModbusTCPVar] = {
+            robot.name : self.__deviceRecord.createVar(ModbusTCPVar, robot.name, self.commVarEventCallback) for robot in self.__topology.robotDict.values()
+        }
+        self.__gripperCommDict      :dict[str, TcpIPVar] = {
+            robot.name : self.__deviceRecord.createVar(TcpIPVar, robot.gripperName, self.commVarEventCallback) for robot in self.__topology.robotDict.values()
+        }
+
+        self.__order_UI             :TcpIPVar = self.__deviceRecord.createVar(TcpIPVar, "주문UI", self.commVarEventCallback)
+        # 주문 UI 표시 (픽업대 주문 번호, 주문 접수 중단 시 예상 대기 시간)
+        self.__orderUIManager       :OrderUIManager = OrderUIManager(self.__order_UI, self.__timerScheduler, self.__cellState, self.__pickupSensorKeyDict)
+
+        # 주문 접수 대기열 : CRC 서버의 주문을 받아 두고, 주문 대기열(orderQueue)에 여유가 생기면 꺼낸다
+        self.__orderIntake              :OrderIntakeManager = OrderIntakeManager(
+            self.__tpmSysFuncManager, self.__fetchCRCOrderMenuList, self.__maxPendingOrderNum, self.__maxOrderWaitSec, self.__resumeOrderWaitSec, self.__drinkIntervalSec,
+            # 1잔 주문은 최대 priorityStepSec(60초) 먼저 받은 주문보다 앞서 제조 (평균 대기 시간 감소)
+            priorityFunc = lambda menuIdList: 1 if len(menuIdList) == 1 else 0,
+            orderAddedCallback = self.__notifyStateChanged, backpressureCallback = self.__orderUIManager.showWaitTime
+        )
+
+        # 통신 변수 이벤트의 장비 이름
+        self.__commNameList         :list[tuple] = [(self.__plcComm, "PLC")]
+        self.__commNameList += [(self.__delonghiCommDict[num], delonghi.name) for num, delonghi in self.__topology.delonghiDict.items()]
+        for robot in self.__topology.robotDict.values():
+            self.__commNameList += [(self.__robotCommDict[robot.name], robot.name), (self.__gripperCommDict[robot.name], robot.gripperName)]
+
+        # 드롱기 오류 상태별 유지보수 관리 (찌꺼기 통 개폐, 휴면 해제)
+        self.__delonghiMaintenance  :DelonghiMaintenanceManager = DelonghiMaintenanceManager(self.__delonghiContainer, self.__tpmSysFuncManager)
+        for num, delonghiComm in self.__delonghiCommDict.items():
+            self.__delonghiMaintenance.addDelonghi(num, delonghiComm)
+
+        # 드롱기 상태 알림 수신 (알림을 지원하지 않으면 상태 읽기)
+        self.__delonghiStatus       :DelonghiStatusManager = DelonghiStatusManager(self.__tpmSysFuncManager, self.__statusPoller,
+                                                                                   self.__delonghiFastPollingSec, self.__idlePollingSec, self.__delonghiLivenessPollingSec)
+
+        # 운영 지표 등록 (단독/통합 공정 공통 지표)
+        ProcessMetricsManager.addMetrics(self.__metrics, self.__orderQueue.getOrderNum, self.__robotNameList, self.__traceManager, self.__orderIntake,
+                                         self.__crcPublisher, self.__statusPoller, self.__delonghiStatus)
+
+        # 재생 모드 : 기록된 장비 이벤트 재생 시작
+        self.__deviceRecord.start()
+
+        # 모든 장비를 동시에 연결 (장비별 제한 시간/재시도, 전체 제한 시간 적용)
+        connectionManager           :DeviceConnectionManager = DeviceConnectionManager()
+        addressDict                 :dict[str, list] = self.__topology.deviceAddressDict
+        connectionManager.addDevice("PLC", self.__plcComm, lambda: self.__plcComm.connect(*addressDict["PLC"]))
+        for num, delonghi in self.__topology.delonghiDict.items():
+            connectionManager.addDevice(delonghi.name, self.__delonghiCommDict[num], lambda comm = self.__delonghiCommDict[num], address = delonghi.address: comm.connect(*address), timeoutSec = 20.0)
+        connectionManager.addDevice("찌꺼기통", self.__delonghiContainer, lambda: self.__delonghiContainer.connect(*addressDict["찌꺼기통"]))
+        connectionManager.addDevice("CRC", self.__crcComm, lambda: self.__crcComm.connect(*addressDict["CRC"]), timeoutSec = 15.0)
+        connectionManager.addDevice("컵디스펜서", self.__cupDispenser, lambda: self.__cupDispenser.connect(*addressDict["컵디스펜서"]))
+        for robot in self.__topology.robotDict.values():
+            connectionManager.addDevice(robot.name, self.__robotCommDict[robot.name], lambda comm = self.__robotCommDict[robot.name], address = robot.address: comm.connect(*address))
+        for robot in self.__topology.robotDict.values():
+            connectionManager.addDevice(robot.gripperName, self.__gripperCommDict[robot.name], lambda comm = self.__gripperCommDict[robot.name], address = robot.gripperAddress: comm.connect(*address))
+        connectionManager.addDevice("주문UI", self.__order_UI, lambda: self.__order_UI.connect(*addressDict["주문UI"]))
+
+        self.__isConnecting = True
+        if connectionManager.connectAll(self.__connectionDeadlineSec) == False:
+            CDRLog.print(f"장비 연결 실패 : {connectionManager.getFailedDeviceNameList()}")
+            self.__terminateSystem()
+        self.__isConnecting = False
 
-        self.__tpmSysFuncManager.initDHGripperVar(self.__indy7LGripperComm)
-        self.__tpmSysFuncManager.initDHGripperVar(self.__ur5GripperComm)
-        self.__tpmSysFuncManager.initDHGripperVar(self.__indy7RGripperComm)
+        # 연결 완료 후 장비 초기화
+        self.__crcComm.setSubscribeFilter(MqttFilterData(CRCKey.KEY_STORE_ID, self.__tpmSysFuncManager.__storeId))
+        for robot in self.__topology.robotDict.values():
+            if robot.isURRobot == False:
+                self.__tpmSysFuncManager.initIndyModbusCmd(self.__robotCommDict[robot.name])
+        for robot in self.__topology.robotDict.values():
+            self.__tpmSysFuncManager.initDHGripperVar(self.__gripperCommDict[robot.name])
+
+        # 로봇별 명령 쓰레드 : 서로 다른 로봇의 동작은 동시에 진행된다. 명령이 끝날 때마다 커피 제조 쓰레드를 깨운다 (명령별 실행 구간 기록)
+        self.__robotCommand         :RobotCommandManager = RobotCommandManager(self.__tpmSysFuncManager, self.__onRobotCommandDone, self.__traceManager)
+        for robot in self.__topology.robotDict.values():
+            self.__robotCommand.addRobot(self.__robotCommDict[robot.name], robot.name)
+        # 로봇 팔 동작 중에 동시에 실행할 수 있는 그리퍼/드롱기 명령 쓰레드
+        for robot in self.__topology.robotDict.values():
+            self.__robotCommand.addRobot(self.__gripperCommDict[robot.name], f"{robot.name} 그리퍼")
+        for num, delonghi in self.__topology.delonghiDict.items():
+            self.__robotCommand.addRobot(self.__delonghiCommDict[num], delonghi.name)
+
+        # 메뉴 레시피 실행 계획 : 컵 전달(Indy7L), 라인별 추출/픽업(ex. UR5 + 1번 드롱기 / Indy7R + 2번 드롱기). 제조 중 변환하지 않도록 미리 생성
+        self.__recipe               :RecipeManager = RecipeManager(self.__tpmSysFuncManager, self.__robotCommand, self.__cupDispenserManager.dispense,
+                                                                   (self.__indyCmdAddr, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback), self.__traceManager, self.__timingModel,
+                                                                   self.__cellState)
+        cupRobotName                :str = self.__topology.cupRobotName
+        self.__cupDevice            :RecipeDeviceData = RecipeDeviceData(cupRobotName, self.__robotCommDict[cupRobotName], self.__gripperCommDict[cupRobotName],
+                                                                         self.__topology.robotDict[cupRobotName].isURRobot)
+        # 라인 번호 -> 라인 로봇 + 드롱기 + 픽업대
+        self.__laneDeviceDict       :dict[int, RecipeDeviceData] = {
+            lane.laneNum : RecipeDeviceData(
+                lane.robotName, self.__robotCommDict[lane.robotName], self.__gripperCommDict[lane.robotName], self.__topology.robotDict[lane.robotName].isURRobot,
+                self.__topology.delonghiDict[lane.delonghiNum].name, self.__delonghiCommDict[lane.delonghiNum],
+                CellTopologyManager.getLaneStateKeyDict(self.__topology, lane)
+            )
+            for lane in self.__topology.laneList
+        }
+        self.__recipe.precompile("multiCupStage", self.__cupDevice)
+        self.__recipe.precompile("multiIceStage", self.__cupDevice)
+        self.__recipe.precompile("multiCupHandoff", self.__cupDevice)
+        for lane in self.__laneTopologyList:
+            self.__recipe.precompile("multiBrew", self.__laneDeviceDict[lane.laneNum])
+            self.__recipe.precompile("multiPickup", self.__laneDeviceDict[lane.laneNum])
+        for lane in self.__directLaneTopologyList:
+            self.__recipe.precompile("multiDirectBrew", self.__laneDeviceDict[lane.laneNum])
+            self.__recipe.precompile("multiDirectPickup", self.__laneDeviceDict[lane.laneNum])
 
-        self.__order_UI             :TcpIPVar = TcpIPVar(self.commVarEventCallback)
-        self.__order_UI.connect("127.0.0.1", 6666)        
-          
         CDRLog.print("[70%] Comm init Complete.")
-        while True:
-            if ( 
-                self.__plcComm.isConnected()
-                and self.__delonghi01Comm.isConnected()
-                and self.__delonghi02Comm.isConnected()
-                and self.__crcComm.isConnected()
-            ):
-                break   
 
         # CRC 서버 통신 처리 쓰레드
         self.__tpmSysFuncManager.runCRCCommunication(self.__crcComm, self.__tpmSysFuncManager.__storeId, self.__tpmSysFuncManager.__printerId, self.__trayNum)
+        # CRC 서버 주문 완료 전송 쓰레드
+        self.__crcPublisher.start()
+        # 주문 접수 쓰레드
+        self.__orderIntake.start()
         CDRLog.print("[100%] Comm connect Complete. Thread Start ")
         # 커피 제조 쓰레드
         threading.Thread(target = self.__coffeeMakingThreadHandler).start()   
 
-        # 드롱기 실시간 상태 체크 쓰레드
-        threading.Thread(target = self.__delonghiAndSensorStatusCheckingThreadHandler).start()   
+        # 드롱기 유지보수(찌꺼기 통 비우기, 휴면 해제) 쓰레드
+        self.__delonghiMaintenance.start()
+
+        # 예약 작업(픽업대 주문 번호 표시 해제) 쓰레드
+        self.__timerScheduler.start()
+
+        # 드롱기/트레이 센서 실시간 상태 체크 (장비별 쓰레드)
+        self.__startStatusPolling()
+
+        # 운영 지표 제공 쓰레드
+        self.__metrics.start("127.0.0.1", self.__metricsPort)
         
         # 키보드 명령 key값 입력 처리 쓰레드
         threading.Thread(target = self.__keyInputThreadHandler).start()    
@@ -169,599 +327,544 @@ class MultiProcessController():
 
             if MainData.isRunningTPMProgram == False:
                 break
-            #CDRLog.print(f"{self.__orderId}  {self.__menuIdList} {self.__menuStateList} {self.__curMenuIndex} {self.__delonghi01MenuIndex} {self.__delonghi02MenuIndex}")
-            # 1. orderId 수신 ==========================================================================================================
-            if self.__orderId == -1:
-                self.__orderId = self.__tpmSysFuncManager.getCRCOrderId()    
-            
-            # 2. 주문 메뉴 수신 ========================================================================================================
-            elif self.__menuIdList == [-1, -1]:
-            
-                self.__menuIdList = self.__tpmSysFuncManager.getCRCOrderMenuList()
-                # 첫번째 메뉴부터 제조 시작    
-                self.__curMenuIndex = 0
-            
-            # 3. 모든 주문 메뉴 제조 완료 -> 주문 완료 처리 =============================================================================
-            elif self.__menuStateList == [ORDER_STATE_PICKUP_ENABLE, ORDER_STATE_PICKUP_ENABLE]:
-
-                self.__tpmSysFuncManager.publishCRCOrderComplete(self.__crcComm, self.__tpmSysFuncManager.__storeId, self.__orderId)
-                self.__orderId              = -1
-                self.__menuIdList           = [-1, -1]
-                self.__menuStateList        = [ORDER_STATE_BREW_BEFORE, ORDER_STATE_BREW_BEFORE]
-                self.__delonghi01MenuIndex  = -1
-                self.__delonghi02MenuIndex  = -1
-            
-            
-            # 4. 타겟 메뉴가 '핫 아메리카노'인 경우 =====================================================================================
-            elif self.__menuIdList[self.__curMenuIndex] == 1000: 
-                
-                if self.__menuStateList[self.__curMenuIndex] == ORDER_STATE_BREW_BEFORE:
 
-                    # 중간 거치대에 컵이 없으면 
-                    if self.__hasCupOnMiddleBTray == 0:
+            stateVersion        :int    = self.__stateVersion
+            prevSignature       :tuple  = self.__getSchedulerSignature()
 
-                        # 1번 드롱기에 컵이 없고, 사용 가능한 상태 -> 1번 드롱기에 curMenuIndex번 'hot 아메리카노' 메뉴 제조 명령
-                        if self.__hasCupOnDeloghi01Tray == 0 and self.__delonghi01Status == DelonghiState.READY:
+            self.__runSchedulerStep()
 
-                            self.__deliveryHotCup()
-                            self.__startBrewHotAmericanoOnDelonghi01()
-                            self.__menuStateList[self.__curMenuIndex] = ORDER_STATE_BREW_START
-                            self.__delonghi01MenuIndex = self.__curMenuIndex
+            # 진행된 내용이 없으면 센서/드롱기 상태가 바뀌거나 새 주문이 접수될 때까지 대기
+            if prevSignature == self.__getSchedulerSignature():
 
-                        # 2번 드롱기에 컵이 없고, 사용 가능한 상태 -> 2번 드롱기에 curMenuIndex번 'hot 아메리카노' 메뉴 제조 명령
-                        elif self.__hasCupOnDeloghi02Tray == 0 and self.__delonghi02Status == DelonghiState.READY:
+                retryWaitSec :float = max(0.0, self.__dispatchRetryTime - time.monotonic())
+                self.__waitStateChanged(stateVersion, min(self.__idleWaitTimeoutSec, retryWaitSec))
 
-                            self.__deliveryHotCup()
-                            self.__startBrewHotAmericanoOnDelonghi02()
-                            self.__menuStateList[self.__curMenuIndex] = ORDER_STATE_BREW_START
-                            self.__delonghi02MenuIndex = self.__curMenuIndex
-            
-                elif self.__menuStateList[self.__curMenuIndex] == ORDER_STATE_BREW_START:
-                    #CDRLog.print(f"{self.__curMenuIndex} {self.__delonghi01MenuIndex}  // {self.__delonghi02MenuIndex}")
-                    # 타겟 인덱스의 메뉴를 1번 드롱기에서 담당하고
-                    if self.__curMenuIndex == self.__delonghi01MenuIndex:    
 
-                        # 대기 상태 & 1번 드롱기가 제조를 완료 -> 타겟 메뉴를 '제조 완료' 상태로 변경   
-                        if self.__delonghi01Status == DelonghiState.READY:
-                            self.__menuStateList[self.__curMenuIndex] = ORDER_STATE_BREW_COMPLETE
 
-                    # 타겟 인덱스의 메뉴를 2번 드롱기에서 담당하고
-                    elif self.__curMenuIndex == self.__delonghi02MenuIndex:
+    def __runSchedulerStep(self):
+        '''
+        ### 커피 제조 스케줄러 1회 판단 \n
+        - 주문 대기열에 여유가 있으면 다음 주문을 받고, 진행 중인 모든 음료의 제조 상태를 한 단계씩 진행시킨다.
+        - 음료는 주문 단위가 아닌 1잔 단위로 진행되므로, 이전 주문의 음료가 추출되는 동안 다음 주문의 컵 전달이 시작된다.
+        - 로봇 동작은 로봇별 명령 쓰레드에서 진행되므로, 동작을 기다리지 않고 다른 음료를 판단한다. (Indy7L, UR5, Indy7R 동시 동작)
+        - Indy7L 은 드롱기가 추출하는 동안 다음 음료의 컵(아이스는 얼음까지)을 미리 받아 들고 있다가, 라인이 비면 바로 중간 거치대B 에 전달한다.
+        - 일반 라인이 곧 비지 않아 컵 전달이 한가하면, Indy7L 이 들고 있는 컵을 직접 제조 라인(드롱기 + 픽업대A)에서 직접 제조한다.
+        - 일반 라인의 픽업대가 사용 중이면, 한가한 Indy7L 이 추출이 끝난 음료를 직접 제조 라인의 픽업대로 옮겨 드롱기를 비운다.
+        '''
+        # 이번 판단에 사용할 셀 상태 (판단 도중 센서 값이 바뀌어도 같은 시점 기준으로 판단)
+        self.__cellSnapshot = self.__cellState.getSnapshot()
 
-                        # 대기 상태 & 2번 드롱기가 제조를 완료 -> 타겟 메뉴를 '제조 완료' 상태로 변경    
-                        if self.__delonghi02Status == DelonghiState.READY:
-                            self.__menuStateList[self.__curMenuIndex] = ORDER_STATE_BREW_COMPLETE
+        # 1. 주문 수신 ===============================================================================================================
+        self.__receiveOrder()
+        self.__dispatchRetryTime = float("inf")
 
-                elif self.__menuStateList[self.__curMenuIndex] == ORDER_STATE_BREW_COMPLETE:
+        # 2. 음료별 제조 상태 진행 (먼저 들어온 주문의 음료부터) =======================================================================
+        for drinkJob in self.__orderQueue.getJobList():
 
-                    # 타겟 인덱스의 메뉴를 1번 드롱기에서 담당하고, 픽업대B에 컵이 없다면 -> 음료컵을 픽업대B로 P&P   
-                    if self.__curMenuIndex == self.__delonghi01MenuIndex and self.__hasCupOnPickupBTray == 0:
+            if MainData.isRunningTPMProgram == False:
+                return
 
-                        self.__bringCupDelonghi01ToTrayB()
-                        self.__menuStateList[self.__curMenuIndex] = ORDER_STATE_PICKUP_ENABLE
-                        CDRLog.print(f"Americano Make Complete. orderId : {self.__orderId} Menu : {self.__menuIdList[self.__curMenuIndex]} ")
-                        self.UI_reset_thread(slot='b',ordernum=self.__tpmSysFuncManager.getCRCOrderNumber())
-                        # 다음 순번 메뉴로 이동
-                        #self.__moveNextIndex()
+            # 로봇 동작 중 -> 시작할 수 있는 단계를 요청하고, 동작이 끝나면 다음 상태로 변경
+            if drinkJob.recipeRun != None:
 
-                    # 타겟 인덱스의 메뉴를 2번 드롱기에서 담당하고, 픽업대C에 컵이 없다면 -> 음료컵을 픽업대C로 P&P
-                    elif self.__curMenuIndex == self.__delonghi02MenuIndex and self.__hasCupOnPickupCTray == 0:
+                if self.__recipe.advanceRun(drinkJob.recipeRun, self.__cellSnapshot) == False:
+                    # 확인 대기 단계(CONFIRM_STATE)는 최대 대기 시간에 다시 판단
+                    self.__dispatchRetryTime = min(self.__dispatchRetryTime, drinkJob.recipeRun.wakeTime)
+                    continue
 
-                        self.__bringCupDelonghi02ToTrayC()
-                        self.__menuStateList[self.__curMenuIndex] = ORDER_STATE_PICKUP_ENABLE
-                        CDRLog.print(f"Americano Make Complete. orderId : {self.__orderId} Menu : {self.__menuIdList[self.__curMenuIndex]} ")
-                        self.UI_reset_thread(slot='c',ordernum=self.__tpmSysFuncManager.getCRCOrderNumber())
-                        # 다음 순번 메뉴로 이동
-                        #self.__moveNextIndex()
+                self.__completeDrinkJobMotion(drinkJob)
 
-                
+            # 제조 전 -> 가장 먼저 들어온 1잔만 Indy7L 이 컵을 미리 받아 둔다 (라인 배정 전)
+            if drinkJob.state == OrderState.BREW_BEFORE:
 
-            # 5. 타겟 메뉴가 '아이스 아메리카노'인 경우 =====================================================================================
-            elif self.__menuIdList[self.__curMenuIndex] == 1001:
-                
-                if self.__menuStateList[self.__curMenuIndex] == ORDER_STATE_BREW_BEFORE:
+                if drinkJob is self.__orderQueue.getWaitingJob():
+                    self.__stageCupForDrinkJob(drinkJob)
 
-                    # 중간 거치대에 컵이 없으면 
-                    if self.__hasCupOnMiddleBTray == 0:
+            # 컵 준비 완료(아이스, 얼음 전) -> 라인이 비는 시간에 맞춰 얼음 받기
+            elif drinkJob.state == OrderState.CUP_PREPARED:
 
-                        # 1번 드롱기에 컵이 없고, 사용 가능한 상태 -> 1번 드롱기에 curMenuIndex번 'ice 아메리카노' 메뉴 제조 명령
-                        if self.__hasCupOnDeloghi01Tray == 0 and self.__delonghi01Status == DelonghiState.READY:
+                self.__stageIceForDrinkJob(drinkJob)
 
-                            self.__deliveryIceCup()
-                            self.__startBrewIceAmericanoOnDelonghi01()
-                            self.__menuStateList[self.__curMenuIndex] = ORDER_STATE_BREW_START
-                            self.__delonghi01MenuIndex = self.__curMenuIndex
+            # 컵 준비 완료 -> 직접 제조 라인이 더 빠르면 직접 제조, 아니면 예상 완료 시간이 가장 빠른 라인을 골라 중간 거치대로 컵 전달
+            elif drinkJob.state == OrderState.CUP_STAGED:
 
-                        # 2번 드롱기에 컵이 없고, 사용 가능한 상태 -> 2번 드롱기에 curMenuIndex번 'ice 아메리카노' 메뉴 제조 명령
-                        elif self.__hasCupOnDeloghi02Tray == 0 and self.__delonghi02Status == DelonghiState.READY:
+                self.__deliverCupForDrinkJob(drinkJob)
 
-                            self.__deliveryIceCup()
-                            self.__startBrewIceAmericanoOnDelonghi02()
-                            self.__menuStateList[self.__curMenuIndex] = ORDER_STATE_BREW_START
-                            self.__delonghi02MenuIndex = self.__curMenuIndex
-            
-                elif self.__menuStateList[self.__curMenuIndex] == ORDER_STATE_BREW_START:
+            # 컵 전달 완료 -> 배정된 라인이 비면 드롱기로 P&P 후 추출 시작
+            elif drinkJob.state == OrderState.CUP_READY:
 
-                    # 타겟 인덱스의 메뉴를 1번 드롱기에서 담당하고
-                    if self.__curMenuIndex == self.__delonghi01MenuIndex:    
+                self.__startBrewDrinkJob(drinkJob)
 
-                        # 대기 상태 & 1번 드롱기가 제조를 완료 -> 타겟 메뉴를 '제조 완료' 상태로 변경  
-                        if self.__delonghi01Status == DelonghiState.READY:
-                            self.__menuStateList[self.__curMenuIndex] = ORDER_STATE_BREW_COMPLETE
+            # 제조 중 -> 담당 드롱기의 제조 완료 확인
+            elif drinkJob.state == OrderState.BREW_START:
 
-                    # 타겟 인덱스의 메뉴를 2번 드롱기에서 담당하고
-                    elif self.__curMenuIndex == self.__delonghi02MenuIndex:
+                self.__checkDrinkJobBrewed(drinkJob)
 
-                        # 대기 상태 & 2번 드롱기가 제조를 완료 -> 타겟 메뉴를 '제조 완료' 상태로 변경  
-                        if self.__delonghi02Status == DelonghiState.READY:
-                            self.__menuStateList[self.__curMenuIndex] = ORDER_STATE_BREW_COMPLETE
+            # 제조 완료 -> 담당 픽업대(사용 중이면 직접 제조 라인의 픽업대)로 P&P
+            elif drinkJob.state == OrderState.BREW_COMPLETE:
 
-                elif self.__menuStateList[self.__curMenuIndex] == ORDER_STATE_BREW_COMPLETE:
+                self.__deliverDrinkJob(drinkJob)
 
-                    # 타겟 인덱스의 메뉴를 1번 드롱기에서 담당하고, 픽업대B에 컵이 없다면 -> 음료컵을 픽업대B로 P&P    
-                    if self.__curMenuIndex == self.__delonghi01MenuIndex and self.__hasCupOnPickupBTray == 0:
+        # 3. 모든 음료 제조 완료 -> 주문별 완료 처리 ====================================================================================
+        for order in self.__orderQueue.popCompletedOrderList():
 
-                        self.__bringCupDelonghi01ToTrayB()
-                        self.__menuStateList[self.__curMenuIndex] = ORDER_STATE_PICKUP_ENABLE
-                        CDRLog.print(f"Americano Make Complete. orderId : {self.__orderId} Menu : {self.__menuIdList[self.__curMenuIndex]} ")
-                        self.UI_reset_thread(slot='b',ordernum=self.__tpmSysFuncManager.getCRCOrderNumber())
-                        # 다음 순번 메뉴로 이동
-                        #self.__moveNextIndex()
+            self.__crcPublisher.publishOrderComplete(self.__tpmSysFuncManager.__storeId, order.orderId)
+            self.__orderIntake.completeOrder(order.orderId)
+            self.__metrics.observe("order_lead_time_seconds", time.time() - order.receiveTime)
+            CDRLog.print(f"Order Complete. orderId : {order.orderId}")
 
-                    # 타겟 인덱스의 메뉴를 2번 드롱기에서 담당하고, 픽업대C에 컵이 없다면 -> 음료컵을 픽업대C로 P&P    
-                    elif self.__curMenuIndex == self.__delonghi02MenuIndex and self.__hasCupOnPickupCTray == 0:
 
-                        self.__bringCupDelonghi02ToTrayC()
-                        self.__menuStateList[self.__curMenuIndex] = ORDER_STATE_PICKUP_ENABLE
-                        CDRLog.print(f"Americano Make Complete. orderId : {self.__orderId} Menu : {self.__menuIdList[self.__curMenuIndex]} ")
-                        self.UI_reset_thread(slot='c',ordernum=self.__tpmSysFuncManager.getCRCOrderNumber())
 
-                        # 다음 순번 메뉴로 이동 
-                        #self.__moveNextIndex()
+    def __receiveOrder(self):
+        '''
+        ### 주문 대기열에 여유가 있으면 주문 접수 대기열의 다음 주문을 꺼낸다
+        '''
+        if self.__orderQueue.isFull() == True:
+            return
 
-            # 6. 해당 인덱스에 타겟 메뉴가 없다면 -> 제조할 음료가 없으므로, 바로 완료 상태로 처리 ============================================
-            elif self.__menuIdList[self.__curMenuIndex] == -1:  
+        order :IntakeOrderData = self.__orderIntake.popOrder()
+        if order == None:
+            return
 
-                self.__menuStateList[self.__curMenuIndex] = ORDER_STATE_PICKUP_ENABLE
-                # 다음 순번 메뉴로 이동
-            self.__moveNextIndex()
-            
+        self.__orderQueue.addOrder(order.orderId, order.orderNumber, order.menuIdList, receiveTime = order.receiveTime)
 
 
 
-    
-    def __delonghiAndSensorStatusCheckingThreadHandler(self):
+    def __stageCupForDrinkJob(self, drinkJob:DrinkJobData):
         '''
-        ### 드롱기 실시간 상태 체크 쓰레드
+        ### Indy7L 이 다음 음료의 컵을 미리 받아 든 채로 대기 (아이스는 거치대A 에서 다시 잡은 상태)
+        - 컵 배출(약 3초) 시간이 라인 대기 시간과 겹치도록, 라인을 배정하기 전에 시작한다.
+        - 얼음은 녹지 않도록 라인이 비는 시간에 맞춰 따로 받는다. (CUP_PREPARED -> __stageIceForDrinkJob)
         '''
+        # 레시피가 없는 메뉴 -> 바로 완료 상태로 처리
+        if self.__recipe.hasMenu(drinkJob.menuId) == False:
+            CDRLog.print(f"Unknown Menu. orderId : {drinkJob.orderId} Menu : {drinkJob.menuId}")
+            self.__orderQueue.setJobState(drinkJob, OrderState.PICKUP_ENABLE)
+            return
 
-        while True:
-            
-            if MainData.isRunningTPMProgram == False:
-                break
-
-            # 주기적으로 드롱기 상태 체크    
-            self.__delonghi01Status         = self.__tpmSysFuncManager.getDelonghiStateCode(self.__delonghi01Comm)
-            self.__delonghi02Status         = self.__tpmSysFuncManager.getDelonghiStateCode(self.__delonghi02Comm)
-            
-            #주기적으로 트레이 센서 감지 상태 체크
-            sensorStateList:list[int]       = self.__plcComm.read("M000", 7) 
-            self.__hasCupOnMiddleATray      = sensorStateList[0]
-            self.__hasCupOnMiddleBTray      = sensorStateList[1]
-            self.__hasCupOnDeloghi01Tray    = sensorStateList[2]
-            self.__hasCupOnDeloghi02Tray    = sensorStateList[3]
-            self.__hasCupOnPickupATray      = sensorStateList[6]#[4]
-            self.__hasCupOnPickupBTray      = sensorStateList[4]#[5]
-            self.__hasCupOnPickupCTray      = sensorStateList[5]#[6]
-            CDRLog.print(f'{self.__hasCupOnMiddleATray} {self.__hasCupOnMiddleBTray} {self.__hasCupOnDeloghi01Tray} {self.__hasCupOnDeloghi02Tray}')
-            CDRLog.print(f'{self.__hasCupOnPickupATray} {self.__hasCupOnPickupBTray} {self.__hasCupOnPickupCTray} ')
-            # 1번 드롱기 찌꺼기 통 가득!
-            if self.__delonghi01Status == DelonghiState.ERR_FULL_GROUNDS:
-                
-                self.__delonghiContainer.write("OPEN_1")
-                time.sleep(10)
-                self.__delonghiContainer.write("CLOSE_1")
-                
-            # 1번 드롱기 찌꺼기 통 열림!
-            elif self.__delonghi01Status == DelonghiState.ERR_OPENED_GROUNDS_CONTAINER:
-                
-                self.__delonghiContainer.write("CLOSE_1")
-
-            # 1번 드롱기 휴면 상태!    
-            elif self.__delonghi01Status == DelonghiState.ERR_POWERED_OFF:
+        # Indy7L 은 컵을 1개만 들 수 있음 -> 이전 음료의 컵을 중간 거치대B 에 내려놓을 때까지(직접 제조 중이면 끝날 때까지) 대기
+        if self.__isCupRobotIdle() == False:
+            return
 
-                self.__tpmSysFuncManager.wakeupDeloghi(self.__delonghi01Comm)
-            
+        # 추출 중인 일반 라인 음료를 직접 제조 라인의 픽업대로 옮겨야 할 수 있음 (담당 픽업대 사용 중) -> 컵을 받지 않고 추출 완료를 기다린다
+        if any(job.state in (OrderState.BREW_START, OrderState.BREW_COMPLETE) and job.recipeRun == None and self.__getDirectPickupLane(job) != None
+               for job in self.__orderQueue.getJobList()):
+            return
 
-            # 2번 드롱기 찌꺼기 통 가득!
-            if self.__delonghi02Status == DelonghiState.ERR_FULL_GROUNDS:
-                
-                self.__delonghiContainer.write("OPEN_2")
-                time.sleep(10)
-                self.__delonghiContainer.write("CLOSE_2")
-
-            # 2번 드롱기 찌꺼기 통 열림!
-            elif self.__delonghi02Status == DelonghiState.ERR_OPENED_GROUNDS_CONTAINER:
-                
-                self.__delonghiContainer.write("CLOSE_2")
+        # 얼음 받는 단계가 없는 메뉴는 바로 전달 대기 상태
+        icePlan     :RecipePlanData = self.__recipe.getPlan(drinkJob.menuId, "multiIceStage", self.__cupDevice)
+        nextState   :int            = OrderState.CUP_STAGED if len(icePlan.stepList) == 0 else OrderState.CUP_PREPARED
 
-            # 2번 드롱기 휴면 상태! 
-            elif self.__delonghi02Status == DelonghiState.ERR_POWERED_OFF:
+        self.__startDrinkJobMotion(drinkJob, "multiCupStage", self.__cupDevice, nextState)
 
-                self.__tpmSysFuncManager.wakeupDeloghi(self.__delonghi02Comm)
 
 
-            time.sleep(1)
+    def __isCupRobotIdle(self) -> bool:
+        '''
+        Indy7L 이 컵을 들고 있지 않고, 직접 제조 라인에서 제조 중이 아닌지 여부
+        '''
+        for job in self.__orderQueue.getJobList():
+            if job.state in (OrderState.CUP_PREPARED, OrderState.CUP_STAGED, OrderState.DIRECT_MAKE, OrderState.DIRECT_PICKUP):
+                return False
+            # 컵 받는 중
+            if job.state == OrderState.BREW_BEFORE and job.recipeRun != None:
+                return False
 
+        return True
 
 
 
-    def commVarEventCallback(self, eventId:int, data):
+    def __selectDirectLane(self, drinkJob:DrinkJobData) -> LaneStateData:
         '''
-        통신 변수 이벤트 처리 전용 콜백 함수
+        ### Indy7L 이 미리 준비한 컵을 직접 제조할 직접 제조 라인. 일반 라인에 전달하는 것이 나으면 None
+        - 직접 제조 라인이 비어 있고, 일반 라인보다 빨리 완료되며, 직접 제조가 끝날 때까지 일반 라인에 컵을 전달할 필요가 없을 때만 선택한다.
+        - 직접 제조 중에는 같은 드롱기를 사용하는 일반 라인도 사용 중으로 본다. (__getLaneStateList)
         '''
+        if len(self.__directLaneTopologyList) == 0:
+            return None
 
-        targetVar :str = ""
+        now         :float                  = time.monotonic()
+        laneList    :list[LaneStateData]    = self.__getLaneStateList()
 
-        if data == self.__plcComm:
-            targetVar = "PLC"
-        elif data == self.__delonghi01Comm:
-            targetVar = "1번 드롱기"
-        elif data == self.__delonghi02Comm:
-            targetVar = "2번 드롱기"
-        elif data == self.__indy7LComm:
-            targetVar = "Indy7L"
-        elif data == self.__indy7LGripperComm:
-            targetVar = "Indy7L_그리퍼"
-        elif data == self.__ur5Comm:
-            targetVar = "UR5"
-        elif data == self.__ur5GripperComm:
-            targetVar = "UR5그리퍼"
-        elif data == self.__indy7RComm:
-            targetVar = "Indy7R"
-        elif data == self.__indy7RGripperComm:
-            targetVar = "Indy7R_그리퍼"
-        
-        if eventId == Event.COMM_VAR_DISCONNECTED:
+        for directLane in self.__getLaneStateList(True):
+            if self.__laneDispatcher.isDirectMakeBetter(directLane, laneList, drinkJob.menuId, now, drinkJob.state) == True:
+                return directLane
 
-            CDRLog.print(f"{targetVar} 통신 끊어짐")
-            self.__terminateSystem()
+        return None
 
-        elif eventId == Event.COMM_VAR_FAILED_TO_CONNECT:
-            
-            CDRLog.print(f"{targetVar} 통신 연결 실패")
-            self.__terminateSystem()
 
 
-    def __deliveryHotCup(self):
+    def __startDirectMakeDrinkJob(self, drinkJob:DrinkJobData, directLane:LaneStateData):
         '''
-        ### indy7L이 핫 컵을 중간 거치대로 전달 
+        ### Indy7L 이 미리 준비한 컵을 직접 제조 라인의 드롱기에 놓고, 추출된 음료를 픽업대(ex. 픽업대A)에 내려놓기
         '''
-        
-        # Indy7L 그리퍼 닫기
-        self.__tpmSysFuncManager.holdDHGripper(self.__indy7LGripperComm) 
-
-        # Indy7L이 컵디스펜서의 핫 음료컵을 받을 수 있는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 1, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
-        
-        # 컵 디스펜서에서 핫 음료컵 배출
-        self.__reqDispensingHotCup()
-        #time.sleep(3)
-
-        # Indy7L이 중간 거치대에 컵을 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 21, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+        drinkJob.laneNum                            = directLane.laneNum
+        drinkJob.delonghiNum                        = directLane.delonghiNum
+        self.__laneJobDict[directLane.laneNum]      = drinkJob
 
-        # Indy7L 그리퍼 열기 -> 컵은 중간 거치대에 place 
-        self.__tpmSysFuncManager.releaseDHGripper(self.__indy7LGripperComm) 
-        #time.sleep(2)
+        self.__orderQueue.setJobState(drinkJob, OrderState.DIRECT_MAKE)
+        self.__startDrinkJobMotion(drinkJob, "multiDirectBrew", self.__laneDeviceDict[directLane.laneNum], OrderState.PICKUP_ENABLE)
 
-        # Indy7L이 중간 거치대에서 홈 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 23, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
 
 
+    def __stageIceForDrinkJob(self, drinkJob:DrinkJobData):
+        '''
+        ### 미리 받은 컵에 얼음 받기
+        - 얼음을 받은 컵이 중간 거치대에 도착한 후 메뉴별 최대 대기 시간 안에 라인이 비게 되면 시작한다.
+        - 직접 제조 라인에서 제조하는 것이 나으면 바로 시작한다. (얼음을 받은 후 __deliverCupForDrinkJob 에서 다시 판단)
+        '''
+        if self.__selectDirectLane(drinkJob) != None:
+            self.__startDrinkJobMotion(drinkJob, "multiIceStage", self.__cupDevice, OrderState.CUP_STAGED)
+            return
 
+        if self.__isMiddleBTrayWaiting() == True:
+            return
 
-    def __deliveryIceCup(self):
-        '''
-        ### indy7L이 아이스 컵을 중간 거치대로 전달     
-        '''      
-        # Indy7L 그리퍼 닫기
-        self.__tpmSysFuncManager.holdDHGripper(self.__indy7LGripperComm) 
+        now     :float          = time.monotonic()
+        lane    :LaneStateData  = self.__laneDispatcher.selectLane(self.__getLaneStateList(), drinkJob.menuId, now, drinkJob.state)
 
-        # Indy7L이 컵디스펜서의 아이스 음료컵을 받을 수 있는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 2, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
-        
-        # 컵 디스펜서에서 아이스 음료컵 배출
-        self.__reqDispensingIceCup()
-        #time.sleep(3)
+        if lane == None:
+            return
 
-        # Indy7L이 거치대A에에 컵을 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 11, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+        # 라인이 아직 비지 않음 -> 얼음 받기를 시작할 시간에 다시 판단
+        if self.__laneDispatcher.isDispatchable(lane, drinkJob.menuId, now, drinkJob.state) == False:
+            self.__dispatchRetryTime = min(self.__dispatchRetryTime, self.__laneDispatcher.getDispatchTime(lane, drinkJob.menuId, now, drinkJob.state))
+            return
 
-        # Indy7L 그리퍼 열기
-        self.__tpmSysFuncManager.releaseDHGripper(self.__indy7LGripperComm) 
+        self.__startDrinkJobMotion(drinkJob, "multiIceStage", self.__cupDevice, OrderState.CUP_STAGED)
 
-        # Indy7L이 거치대A에 아이스 컵 잡는 위치로 이동
-        #self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 13, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
 
-        # Indy7L 그리퍼 닫기
-        self.__tpmSysFuncManager.holdDHGripper(self.__indy7LGripperComm) 
 
-        # Indy7L이 제빙기에 얼음 받는 위치로 이동하고 레버 밀기기
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 14, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+    def __deliverCupForDrinkJob(self, drinkJob:DrinkJobData):
+        '''
+        ### 음료를 제조할 라인을 정하고 Indy7L이 미리 받아 둔 컵을 중간 거치대로 전달
+        - 예상 완료 시간이 가장 빠른 라인을 고르고, 컵이 중간 거치대에 도착할 때까지 그 라인이 비게 되면 전달을 시작한다.
+        - 직접 제조 라인이 더 빠르고 컵 전달이 한가하면, 중간 거치대를 거치지 않고 직접 제조한다.
+        '''
+        directLane :LaneStateData = self.__selectDirectLane(drinkJob)
+        if directLane != None:
+            self.__startDirectMakeDrinkJob(drinkJob, directLane)
+            return
 
-        # 제빙기에서 얼음 배출. 대기하면서 컵에 얼음 받기
-        time.sleep(8)
+        if self.__isMiddleBTrayWaiting() == True:
+            return
 
-        # Indy7L이 중간 거치대에 컵을 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 22, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+        now     :float          = time.monotonic()
+        lane    :LaneStateData  = self.__laneDispatcher.selectLane(self.__getLaneStateList(), drinkJob.menuId, now, drinkJob.state)
 
-        # Indy7L 그리퍼 열기 -> 컵은 중간 거치대에 place 
-        self.__tpmSysFuncManager.releaseDHGripper(self.__indy7LGripperComm) 
-        #time.sleep(2)
+        if lane == None:
+            return
 
-        # Indy7L이 중간 거치대에서 홈 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 23, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+        # 라인이 아직 비지 않음 -> 컵 전달을 시작할 시간에 다시 판단
+        if self.__laneDispatcher.isDispatchable(lane, drinkJob.menuId, now, drinkJob.state) == False:
+            self.__dispatchRetryTime = min(self.__dispatchRetryTime, self.__laneDispatcher.getDispatchTime(lane, drinkJob.menuId, now, drinkJob.state))
+            return
 
+        drinkJob.laneNum        = lane.laneNum
+        drinkJob.delonghiNum    = lane.delonghiNum
+        self.__startDrinkJobMotion(drinkJob, "multiCupHandoff", self.__cupDevice, OrderState.CUP_READY)
 
 
 
-    def __startBrewHotAmericanoOnDelonghi01(self):
+    def __isMiddleBTrayWaiting(self) -> bool:
+        '''
+        ### 중간 거치대B 의 컵이 라인을 기다리는 중인지 여부
+        - 라인 로봇이 컵을 가져가는 중이면 False : 다음 컵 전달을 시작하고, 컵을 내려놓는 단계에서 거치대가 빌 때까지 기다린다.
         '''
-        ### UR5가 빈 컵을 중간 거치대에서 1번 드롱기로 P&P -> 1번 드롱기에서 '핫 아메리카노' 음료 제조 시작 & UR5는 홈위치로 이동
-        ''' 
+        cupReadyJobList :list[DrinkJobData] = [job for job in self.__orderQueue.getJobList() if job.state == OrderState.CUP_READY]
+        if any(job.recipeRun == None for job in cupReadyJobList):
+            return True
 
-        # UR5 그리퍼 열기
-        self.__tpmSysFuncManager.releaseDHGripper(self.__ur5GripperComm) 
+        return self.__cellSnapshot.hasCupOnMiddleBTray != 0 and len(cupReadyJobList) == 0
 
-        # UR5가 홈위치에서 중간 거치대의 컵 잡는 위치로 이동
-        self.__tpmSysFuncManager.sendURCmd(self.__ur5Comm, 1)
 
-        # UR5 그리퍼 닫기
-        self.__tpmSysFuncManager.holdDHGripper(self.__ur5GripperComm) 
-        #time.sleep(2)
 
-        # UR5가 1번 드롱기에 컵을 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendURCmd(self.__ur5Comm, 2)
+    def __startBrewDrinkJob(self, drinkJob:DrinkJobData):
+        '''
+        ### 중간 거치대의 컵을 라인 로봇이 드롱기로 P&P -> 추출 시작 (ex. UR5 + 1번 드롱기 / Indy7R + 2번 드롱기)
+        - 컵이 준비된 시점에 다시 예상 완료 시간이 가장 빠른 라인을 고르므로, 배정된 라인이 늦어지면 다른 라인으로 변경된다.
+        '''
+        lane    :LaneStateData  = self.__laneDispatcher.selectLane(self.__getLaneStateList(), drinkJob.menuId, time.monotonic(), OrderState.CUP_READY)
 
-        # UR5 그리퍼 열기 -> 컵은 1번 드롱기에 place
-        self.__tpmSysFuncManager.releaseDHGripper(self.__ur5GripperComm) 
-        #time.sleep(2)
+        if lane == None or self.__laneDispatcher.isLaneFree(lane) == False:
+            return
 
-        # 1번 드롱기에서 아메리카노 제조 명령 전달
-        self.__tpmSysFuncManager.brewDelonghiAmericano(self.__delonghi01Comm)
+        drinkJob.laneNum                            = lane.laneNum
+        drinkJob.delonghiNum                        = lane.delonghiNum
+        self.__laneJobDict[lane.laneNum]            = drinkJob
 
-        # 커피 제조 시작과 동시에 UR5는 홈 위치로 이동
-        self.__tpmSysFuncManager.sendURCmd(self.__ur5Comm, 3)
+        self.__startDrinkJobMotion(drinkJob, "multiBrew", self.__laneDeviceDict[lane.laneNum], OrderState.BREW_START)
 
 
 
-    def __startBrewIceAmericanoOnDelonghi01(self):
+    def __getLaneStateList(self, isDirect:bool = False) -> list[LaneStateData]:
         '''
-        ### UR5가 빈 컵을 중간 거치대에서 1번 드롱기로 P&P -> 1번 드롱기에서 '아이스 아메리카노' 음료 제조 시작 & UR5는 홈위치로 이동  
+        셀 구성의 일반 라인(isDirect 이면 직접 제조 라인)별 현재 상태 (ex. 1번 라인 : UR5 + 1번 드롱기 + 픽업대B / 2번 라인 : Indy7R + 2번 드롱기 + 픽업대C)
+        - 같은 드롱기를 사용하는 다른 라인에서 제조 중인 음료가 있으면, 그 음료를 라인의 음료로 본다. (드롱기를 사용할 수 없음)
         '''
-        # UR5 그리퍼 열기
-        self.__tpmSysFuncManager.releaseDHGripper(self.__ur5GripperComm) 
+        laneList :list[LaneStateData] = []
 
-        # UR5가 홈위치에서 중간 거치대의 컵 잡는 위치로 이동
-        self.__tpmSysFuncManager.sendURCmd(self.__ur5Comm, 1)
+        for laneTopology in (self.__directLaneTopologyList if isDirect == True else self.__laneTopologyList):
+            delonghi    :DelonghiTopologyData   = self.__topology.delonghiDict[laneTopology.delonghiNum]
 
-        # UR5 그리퍼 닫기
-        self.__tpmSysFuncManager.holdDHGripper(self.__ur5GripperComm) 
-        #time.sleep(2)
+            lane                            = LaneStateData(laneTopology.delonghiNum, laneTopology.laneNum)
+            lane.delonghiStatus             = getattr(self.__cellSnapshot, delonghi.statusKey)
+            lane.hasCupOnDelonghiTray       = getattr(self.__cellSnapshot, delonghi.trayKey)
+            lane.hasCupOnPickupTray         = getattr(self.__cellSnapshot, self.__getPickupTray(laneTopology.laneNum).sensorKey)
+            lane.drinkJob                   = self.__laneJobDict[laneTopology.laneNum]
 
-        # UR5가 1번 드롱기에 컵을 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendURCmd(self.__ur5Comm, 2)
+            for otherLane in self.__topology.laneList:
+                if lane.drinkJob == None and otherLane.delonghiNum == laneTopology.delonghiNum:
+                    lane.drinkJob = self.__laneJobDict[otherLane.laneNum]
 
-        # UR5 그리퍼 열기 -> 컵은 1번 드롱기에 place
-        self.__tpmSysFuncManager.releaseDHGripper(self.__ur5GripperComm) 
-        #time.sleep(2)
+            laneList.append(lane)
 
-        # 1번 드롱기에서 에스프레소 제조 명령 전달
-        self.__tpmSysFuncManager.brewDelonghiEspresso(self.__delonghi01Comm)
+        return laneList
 
-        # 커피 제조 시작과 동시에 UR5는 홈 위치로 이동
-        self.__tpmSysFuncManager.sendURCmd(self.__ur5Comm, 3)
+
+
+    def __getPickupTray(self, laneNum:int) -> TrayTopologyData:
+        '''
+        라인의 픽업대
+        '''
+        for lane in self.__topology.laneList:
+            if lane.laneNum == laneNum:
+                return self.__topology.trayDict[lane.pickupTrayName]
 
 
 
-    def __startBrewHotAmericanoOnDelonghi02(self):
+    def __checkDrinkJobBrewed(self, drinkJob:DrinkJobData):
         '''
-        ### Indy7R이 빈 컵을 중간 거치대에서 2번 드롱기로 P&P -> 2번 드롱기에서 '핫 아메리카노' 음료 제조 시작 & Indy7R은 홈위치로 이동   
+        ### 담당 드롱기가 대기 상태로 돌아오면 '제조 완료' 상태로 변경
+        - 추출 시작 전에 읽은 드롱기 상태(READY)로 완료 판단하지 않도록, 추출 시작 이후에 읽은 샘플만 사용한다.
         '''
-        # Indy7 그리퍼 열기
-        self.__tpmSysFuncManager.releaseDHGripper(self.__indy7RGripperComm) 
+        delonghi :DelonghiTopologyData = self.__topology.delonghiDict[drinkJob.delonghiNum]
 
-        # Indy7이이 홈위치에서 중간 거치대의 컵 잡는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7RComm, self.__indyCmdAddr, 1, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+        if getattr(self.__cellSnapshot, delonghi.statusKey) == DelonghiState.READY and self.__cellSnapshot.getSampleTime(delonghi.name) > drinkJob.brewStartTime:
 
-        # Indy7 그리퍼 닫기
-        self.__tpmSysFuncManager.holdDHGripper(self.__indy7RGripperComm) 
-        #time.sleep(2)
+            self.__traceManager.addSpan(TraceSpanData(f"brew({drinkJob.menuId})", delonghi.name, drinkJob.brewStartTime, time.monotonic(), -1, drinkJob.orderId, drinkJob.menuIndex))
+            self.__orderQueue.setJobState(drinkJob, OrderState.BREW_COMPLETE)
 
-        # Indy7이 1번 드롱기에 컵을 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7RComm, self.__indyCmdAddr, 2, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
 
-        # Indy7 그리퍼 열기 -> 컵은 1번 드롱기에 place
-        self.__tpmSysFuncManager.releaseDHGripper(self.__indy7RGripperComm) 
-        #time.sleep(2)
 
-        # 1번 드롱기에서 아메리카노 제조 명령 전달
-        self.__tpmSysFuncManager.brewDelonghiAmericano(self.__delonghi02Comm)
+    def __deliverDrinkJob(self, drinkJob:DrinkJobData):
+        '''
+        ### 담당 픽업대가 비어 있으면 음료컵을 픽업대로 P&P (ex. 1번 드롱기 -> 픽업대B / 2번 드롱기 -> 픽업대C)
+        - 담당 픽업대가 사용 중이고 Indy7L 이 한가하면, 같은 드롱기를 사용하는 직접 제조 라인의 픽업대(ex. 픽업대A)로 Indy7L 이 P&P
+        '''
+        if getattr(self.__cellSnapshot, self.__getPickupTray(drinkJob.laneNum).sensorKey) == 0:
+
+            self.__startDrinkJobMotion(drinkJob, "multiPickup", self.__laneDeviceDict[drinkJob.laneNum], OrderState.PICKUP_ENABLE)
+            return
+
+        directLane :LaneTopologyData = self.__getDirectPickupLane(drinkJob)
+        if directLane != None and self.__isCupRobotIdle() == True:
+
+            self.__laneJobDict[drinkJob.laneNum]        = None
+            self.__laneJobDict[directLane.laneNum]      = drinkJob
+            drinkJob.laneNum                            = directLane.laneNum
 
-        # 커피 제조 시작과 동시에 Indy7은 홈 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7RComm, self.__indyCmdAddr, 3, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+            self.__orderQueue.setJobState(drinkJob, OrderState.DIRECT_PICKUP)
+            self.__startDrinkJobMotion(drinkJob, "multiDirectPickup", self.__laneDeviceDict[directLane.laneNum], OrderState.PICKUP_ENABLE)
 
 
 
-    def __startBrewIceAmericanoOnDelonghi02(self):
+    def __getDirectPickupLane(self, drinkJob:DrinkJobData) -> LaneTopologyData:
         '''
-        ### Indy7R이 빈 컵을 중간 거치대에서 2번 드롱기로 P&P -> 2번 드롱기에서 '아이스 아메리카노' 음료 제조 시작 & Indy7R은 홈위치로 이동 
+        ### 일반 라인 음료의 담당 픽업대가 사용 중일 때, 대신 음료를 내려놓을 수 있는 직접 제조 라인 (같은 드롱기, 픽업대가 비어 있음). 없으면 None
         '''
-        # Indy7 그리퍼 열기
-        self.__tpmSysFuncManager.releaseDHGripper(self.__indy7RGripperComm) 
+        if getattr(self.__cellSnapshot, self.__getPickupTray(drinkJob.laneNum).sensorKey) == 0:
+            return None
 
-        # Indy7이이 홈위치에서 중간 거치대의 컵 잡는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7RComm, self.__indyCmdAddr, 1, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+        for directLane in self.__directLaneTopologyList:
+            if directLane.delonghiNum == drinkJob.delonghiNum and self.__laneJobDict[directLane.laneNum] == None \
+                and getattr(self.__cellSnapshot, self.__getPickupTray(directLane.laneNum).sensorKey) == 0:
+                return directLane
 
-        # Indy7 그리퍼 닫기
-        self.__tpmSysFuncManager.holdDHGripper(self.__indy7RGripperComm) 
-        #time.sleep(2)
+        return None
 
-        # Indy7이 1번 드롱기에 컵을 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7RComm, self.__indyCmdAddr, 2, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
 
-        # Indy7 그리퍼 열기 -> 컵은 1번 드롱기에 place
-        self.__tpmSysFuncManager.releaseDHGripper(self.__indy7RGripperComm) 
-        #time.sleep(2)
 
-        # 1번 드롱기에서 에스프레소 제조 명령 전달
-        self.__tpmSysFuncManager.brewDelonghiEspresso(self.__delonghi02Comm)
+    def __startDrinkJobMotion(self, drinkJob:DrinkJobData, processName:str, device:RecipeDeviceData, nextState:int):
+        '''
+        ### 음료 메뉴의 processName 공정 동작을 device 로봇에 요청. 동작이 끝나면 스케줄러가 nextState 로 변경한다.
+        - 실행 계획은 시작할 때 미리 만들어 둔 것을 사용하고, 로봇 명령은 해당 음료의 주문 번호/음료 순번으로 기록된다.
+        '''
+        plan :RecipePlanData = self.__recipe.getPlan(drinkJob.menuId, processName, device)
 
-        # 커피 제조 시작과 동시에 Indy7은 홈 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7RComm, self.__indyCmdAddr, 3, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+        with self.__traceManager.context(drinkJob.orderId, drinkJob.menuIndex):
+            drinkJob.recipeRun      = self.__recipe.startRun(plan)
 
+        drinkJob.nextState      = nextState
+        self.__recipe.advanceRun(drinkJob.recipeRun, self.__cellSnapshot)
 
 
-    def __bringCupDelonghi01ToTrayB(self):
+
+    def __completeDrinkJobMotion(self, drinkJob:DrinkJobData):
         '''
-        ### UR5가 음료컵을 1번 드롱기에서 픽업대B로 P&P -> UR5는 홈위치로 이동
+        ### 끝난 로봇 동작의 결과 처리 -> 음료 상태 변경
+        - 동작 중 오류가 발생했으면 시스템 종료
         '''
-        # UR5 그리퍼 열기
-        self.__tpmSysFuncManager.releaseDHGripper(self.__ur5GripperComm) 
+        recipeRun :RecipeRunData = drinkJob.recipeRun
+        drinkJob.recipeRun      = None
 
-        # UR5가 홈위치에서 중간 거치대의 컵 잡는 위치로 이동
-        self.__tpmSysFuncManager.sendURCmd(self.__ur5Comm, 4)
+        if recipeRun.exception != None:
+            CDRLog.print(f"로봇 동작 실패. orderId : {drinkJob.orderId} Menu : {drinkJob.menuId} : {recipeRun.exception}")
+            self.__terminateSystem()
 
-        # UR5 그리퍼 닫기
-        self.__tpmSysFuncManager.holdDHGripper(self.__ur5GripperComm) 
-        #time.sleep(2)
+        # 드롱기로 P&P 완료 -> 추출 시작
+        if drinkJob.nextState == OrderState.BREW_START:
+            drinkJob.brewStartTime = time.monotonic()
+            self.__metrics.incCounter("delonghi_brew_total", {"delonghi" : drinkJob.delonghiNum})
 
-        # UR5가 픽업대B에 컵을 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendURCmd(self.__ur5Comm, 5)
+        # 픽업대로 P&P 완료 -> 라인 비움, 주문 UI 에 픽업 번호 표시
+        elif drinkJob.nextState == OrderState.PICKUP_ENABLE:
 
-        # UR5 그리퍼 열기 -> 컵은 픽업대B에 place
-        self.__tpmSysFuncManager.releaseDHGripper(self.__ur5GripperComm) 
-        #time.sleep(2)
+            # 직접 제조는 추출 시작을 따로 기록하지 않으므로 완료 시 기록
+            if drinkJob.state == OrderState.DIRECT_MAKE:
+                self.__metrics.incCounter("delonghi_brew_total", {"delonghi" : drinkJob.delonghiNum})
 
-        # UR5는 홈 위치로 이동
-        self.__tpmSysFuncManager.sendURCmd(self.__ur5Comm, 6)
+            self.__laneJobDict[drinkJob.laneNum] = None
+            self.UI_reset(slot=self.__getPickupTray(drinkJob.laneNum).uiSlot,ordernum=drinkJob.orderNumber)
 
+            self.__metrics.incCounter("drinks_completed_total", {"menu" : drinkJob.menuId})
+            self.__metrics.markEvent("drinks_per_hour")
+            CDRLog.print(f"{self.__recipe.getMenuName(drinkJob.menuId)} Make Complete. orderId : {drinkJob.orderId} Menu : {drinkJob.menuId} ")
 
+        self.__orderQueue.setJobState(drinkJob, drinkJob.nextState)
 
-    def __bringCupDelonghi02ToTrayC(self):
+
+
+
+    
+    def __startStatusPolling(self):
         '''
-        ### Indy7R이 음료컵을 2번 드롱기에서 픽업대C로 P&P -> Indy7R은 홈위치로 이동
+        ### 드롱기/트레이 센서 상태 읽기 시작 (읽은 값은 셀 상태 저장소에 반영)
+        - PLC 트레이 센서, 1번 드롱기, 2번 드롱기를 각각 별도 쓰레드에서 읽으므로, 느린 BLE 읽기가 센서 갱신을 늦추지 않는다.
+        - PLC 센서는 제조 중인 주문이 있는 동안 빠르게 읽는다.
+        - 드롱기 상태는 BLE 상태 알림으로 받고 연결 확인용으로만 느리게 읽는다. (알림 미지원 시 추출 중(NOT_READY)인 동안 빠르게 읽기)
         '''
-        # Indy7R 그리퍼 열기
-        self.__tpmSysFuncManager.releaseDHGripper(self.__indy7RGripperComm) 
+        self.__statusPoller.addPoller(
+            "PLC", self.__plcImage.read, self.__onPlcSensorSampled,
+            self.__plcFastPollingSec, self.__idlePollingSec, lambda image: self.__orderQueue.getOrderNum() > 0
+        )
+        for num, delonghi in self.__topology.delonghiDict.items():
+            self.__delonghiStatus.addDelonghi(
+                delonghi.name, self.__delonghiCommDict[num], lambda status, isChanged, delonghi = delonghi: self.__onDelonghiStatusSampled(delonghi, status, isChanged),
+                lambda status, num = num: status == DelonghiState.NOT_READY or self.__delonghiMaintenance.isInMaintenance(num)
+            )
+        # 스케줄러가 사용하는 상태가 바뀌면 커피 제조 쓰레드를 깨운다
+        self.__cellState.subscribe(lambda cellSnapshot, changedKeySet: self.__notifyStateChanged(), self.__schedulerStateKeyList)
+        self.__statusPoller.start()
+
+
+
+    def __onPlcSensorSampled(self, image:array, isChanged:bool):
+        '''
+        ### PLC 프로세스 이미지에서 바뀐 신호만 셀 상태에 반영 (스케줄러 관련 값이 바뀌면 구독 콜백이 커피 제조 쓰레드를 깨운다)
+        '''
+        changedKeySet :set = self.__cellState.update(self.__plcImage.diff(image), "PLC")
 
-        # Indy7R이 홈위치에서 중간 거치대의 컵 잡는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7RComm, self.__indyCmdAddr, 4, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+        if len(changedKeySet) > 0:
+            cellSnapshot :CellStateData = self.__cellState.getSnapshot()
+            CDRLog.print(' '.join(f'{getattr(cellSnapshot, signalName)}' for signalName in self.__plcImage.getSignalNameList()))
 
-        # Indy7R 그리퍼 닫기
-        self.__tpmSysFuncManager.holdDHGripper(self.__indy7RGripperComm) 
-        #time.sleep(2)
 
-        # Indy7R이 픽업대C에 컵을 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7RComm, self.__indyCmdAddr, 5, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
 
-        # Indy7R 그리퍼 열기 -> 컵은 픽업대C에 place
-        self.__tpmSysFuncManager.releaseDHGripper(self.__indy7RGripperComm) 
-        #time.sleep(2)
+    def __onDelonghiStatusSampled(self, delonghi:DelonghiTopologyData, status:int, isChanged:bool):
+        '''
+        ### 드롱기 상태 샘플을 셀 상태에 반영, 오류 상태는 유지보수 요청
+        '''
+        self.__cellState.update({delonghi.statusKey : status}, delonghi.name)
+        self.__metrics.setState("delonghi_state_seconds_total", status, {"delonghi" : delonghi.num})
 
-        # Indy7R은 홈 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7RComm, self.__indyCmdAddr, 6, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+        # 오류 상태(찌꺼기 통 가득/열림, 휴면) 처리는 유지보수 쓰레드에서 진행
+        self.__delonghiMaintenance.handleStatus(delonghi.num, status)
 
 
 
-    def __moveNextIndex(self):
+    def __onRobotCommandDone(self):
         '''
-        타겟 메뉴 인덱스를 다음 순번으로 변경
+        로봇 명령 완료 -> 트레이 센서를 바로 다시 읽고, 커피 제조 쓰레드를 깨운다
         '''
+        self.__statusPoller.requestPoll("PLC")
+        self.__notifyStateChanged()
 
-        self.__curMenuIndex += 1
 
-        if self.__curMenuIndex >= self.__trayNum:
-            self.__curMenuIndex = 0
 
-    ##################################################################################################################################################################    
-    def UI_reset_thread(self, slot : str, ordernum : int) :
-        th_ = threading.Thread(target=self.UI_reset,args=(slot,ordernum,))
-        th_.start()
 
-    def UI_reset(self, slot : str, ordernum : int) :
-        msg = '$'+slot+str(ordernum)+'%'#'$b'+str(order_num)+'%'
+    def commVarEventCallback(self, eventId:int, data):
+        '''
+        통신 변수 이벤트 처리 전용 콜백 함수
+        '''
+
+        targetVar :str = ""
 
-        self.__order_UI.write(msg,2)
+        for commVar, commName in self.__commNameList:
+            if data == commVar:
+                targetVar = commName
+                break
         
-        std_time = datetime.datetime.now()
-        while True :
-            cur_time = datetime.datetime.now()
-            time_itv = cur_time - std_time
-            if time_itv.total_seconds() > 30 :
-                if slot == 'a' :
-                    if self.__hasCupOnPickupATray == 0 :
-                        msg = '$'+slot+'0%'
-                        self.__order_UI.write(msg,2)
-                        break
-                    else :
-                        print('There is item remaining in Slot A')
-                    
-                elif slot == 'b' :
-                    if self.__hasCupOnPickupBTray == 0 :
-                        msg = '$'+slot+'0%'
-                        self.__order_UI.write(msg,2)
-                        break
-                    else :
-                        print('There is item remaining in Slot B')
-                    
-                elif slot == 'c' :
-                    if self.__hasCupOnPickupCTray == 0 :
-                        msg = '$'+slot+'0%'
-                        self.__order_UI.write(msg,2)
-                        break
-                    else :
-                        print('There is item remaining in Slot C')
-                
-                time.sleep(1)
+        if eventId == Event.COMM_VAR_DISCONNECTED:
+
+            CDRLog.print(f"{targetVar} 통신 끊어짐")
+            self.__terminateSystem()
+
+        elif eventId == Event.COMM_VAR_FAILED_TO_CONNECT:
+            
+            CDRLog.print(f"{targetVar} 통신 연결 실패")
+
+            # 시작 시 연결 실패는 DeviceConnectionManager 가 재시도/제한 시간으로 처리
+            if self.__isConnecting == False:
+                self.__terminateSystem()
 
 
-    def __reqDispensingHotCup(self) :
+    def __getSchedulerSignature(self) -> tuple:
         '''
-        컵 자판기 종이컵 배출 명령
+        스케줄러 진행 상태 (값이 같으면 진행된 내용이 없음)
         '''
-        writeTcpIpResult    :bool           = False
+        return (self.__orderQueue.getVersion(),)
 
-        while MainData.isRunningTPMProgram == True:
 
-            writeTcpIpResult = self.__cupDispenser.write('0203410201034A', 1)
 
-            if writeTcpIpResult == False:
-                time.sleep(0.1)
-                CDRLog.print("컵디스펜서 Hot 컵 배출 명령 전송 실패")
-            else:
-                time.sleep(3)
-                break    
+    def __notifyStateChanged(self):
+        '''
+        센서/드롱기 상태 변경 -> 대기 중인 커피 제조 쓰레드를 깨운다
+        '''
+        with self.__stateChangedCond:
+            self.__stateVersion += 1
+            self.__stateChangedCond.notify_all()
+
 
-        
 
-    def __reqDispensingIceCup(self) :
+    def __waitStateChanged(self, stateVersion:int, timeoutSec:float):
         '''
-        컵 자판기 플라스틱컵 배출 명령
+        stateVersion 이후 상태 변경 알림이 오거나 timeoutSec 이 지날 때까지 대기
         '''
-        writeTcpIpResult    :bool           = False
+        with self.__stateChangedCond:
+            self.__stateChangedCond.wait_for(
+                lambda: self.__stateVersion != stateVersion or MainData.isRunningTPMProgram == False,
+                timeoutSec
+            )
 
-        while MainData.isRunningTPMProgram == True:
 
-            writeTcpIpResult = self.__cupDispenser.write('02034101010349', 1)
 
-            if writeTcpIpResult == False:
-                time.sleep(0.1)
-                CDRLog.print("컵디스펜서 Ice 컵 배출 명령 전송 실패")
-            else:
-                time.sleep(3)
-                break 
+    ##################################################################################################################################################################    
+    def UI_reset(self, slot : str, ordernum : int) :
+        '''
+        ### 주문 UI 의 픽업대(slot) 에 주문 번호 표시 -> 픽업대가 비면 표시 해제 (OrderUIManager)
+        '''
+        self.__orderUIManager.showPickup(slot, ordernum)
+
+
+
+    def __fetchCRCOrderMenuList(self) -> list[int]:
+        '''
+        ### CRC 서버의 현재 주문 메뉴 수신 (주문 접수 쓰레드) : 메뉴 리스트(최대 trayNum 개)를 한 번에 받는다, 빈 칸(-1)은 제외
+        '''
+        menuIdList :list[int] = self.__tpmSysFuncManager.getCRCOrderMenuList()
+        return [menuId for menuId in menuIdList if menuId != -1]
+
 
     def __keyInputThreadHandler(self):
         '''
@@ -787,5 +890,13 @@ class MultiProcessController():
 
     def __terminateSystem(self):
         MainData.isRunningTPMProgram    = False
+        self.__statusPoller.stop()
+        self.__orderIntake.stop()
+        self.__crcPublisher.stop()
+        self.__delonghiMaintenance.stop()
+        self.__timerScheduler.stop()
+        self.__processRecord.close()
+        self.__metrics.stop()
+        self.__notifyStateChanged()
         sys.exit()
         
\ No newline at end of file
@@ -0,0 +1,413 @@
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import tempfile
+
+
+from const.orderState import OrderState
+from const.delonghiState import DelonghiState
+
+from data.laneStateData import LaneStateData
+from data.cellTopologyData import CellTopologyData
+from data.orderData import DrinkJobData
+from data.recipeData import RecipeDeviceData
+
+from manager.cellStateManager import CellStateManager
+from manager.cellTopologyManager import CellTopologyManager
+from manager.plcProcessImageManager import PlcProcessImageManager
+from manager.laneDispatchManager import LaneDispatchManager
+from manager.timingModelManager import TimingModelManager
+from manager.robotCommandManager import RobotCommandManager
+from manager.recipeManager import RecipeManager
+from manager.metricsManager import MetricsManager
+from manager.deviceRecordManager import DeviceRecordManager
+
+from simulation.cellSimulator import CellSimulator
+from simulation.simCellConfig import SimCellConfig, MENU_HOT_AMERICANO, MENU_ICE_AMERICANO
+
+
+
+HOT                             :int = MENU_HOT_AMERICANO
+ICE                             :int = MENU_ICE_AMERICANO
+
+
+
+
+class BenchmarkPlcVar():
+    '''
+    마이크로 벤치마크용 PLC 통신 변수 (읽을 때마다 컵 감지 센서 1개가 바뀜)
+    '''
+
+    def __init__(self, eventCallback = None):
+        self.__readCount                :int        = 0
+
+    def read(self, address:str, count:int) -> list[int]:
+        self.__readCount += 1
+        return [self.__readCount & 1] + [0] * (count - 1)
+
+
+
+
+class BenchmarkTPMSysFuncManager():
+    '''
+    마이크로 벤치마크용 TPMSysFuncManager (레시피 단계 함수 참조만 하고 실행하지 않음)
+    '''
+
+    def __getattr__(self, name:str):
+        return lambda *args: None
+
+
+
+
+class BenchmarkScenario():
+    '''
+    ### 종단간 벤치마크 시나리오 1개 (시뮬레이션 셀에서 주문 목록을 모두 완료할 때까지 실행)
+    '''
+
+    def __init__(self, name:str, orderList:list[tuple[float, list[int]]], groundsCapacity:int = None, powerOffIdleSec:float = None, maxDurationSec:float = 3600.0):
+        self.name                       :str        = name
+        # (도착 시간, 메뉴 목록) 목록
+        self.orderList                  :list[tuple[float, list[int]]] = orderList
+        # 드롱기 오류 주입 (SimFaultConfig)
+        self.groundsCapacity            :int        = groundsCapacity
+        self.powerOffIdleSec            :float      = powerOffIdleSec
+        # 주문을 모두 완료하지 못해도 종료하는 가상 시간
+        self.maxDurationSec             :float      = maxDurationSec
+
+
+
+
+class BenchmarkSuite():
+    '''
+    ### 컨트롤러 성능 벤치마크 \n
+    - 마이크로 벤치마크 : 스케줄러 판단 경로의 구성 요소(셀 상태 반영, PLC 이미지 비교, 라인 선택, 레시피 대기 단계 판단)와
+      메시지 변환(지표 text, 장비 통신 기록)의 1회 실행 시간(us)
+    - 종단간 벤치마크 : 시뮬레이션 셀(장비 대체 객체)에서 주문 목록을 모두 완료할 때까지 컨트롤러를 실행한 결과 (가상 시간 기준 완료 시간, 처리량)
+      멀티 공정은 실행 중 __runSchedulerStep 1회(스케줄러 판단 1회)의 CPU 시간도 측정한다.
+    - 결과는 JSON 으로 저장하고, 기준 결과(baseline)와 비교하여 허용 비율보다 나빠진 항목을 찾는다.
+    - 사용 예 : python benchmarkDemo.py bench/result.json simulation/benchmarkBaseline.json
+    '''
+
+    # 종단간 시나리오 : 1/2/10잔 주문, 핫/아이스 혼합, 드롱기 오류 주입
+    # (멀티 공정은 주문 1건에 픽업 트레이 수(2잔)까지만 받으므로 10잔은 같은 시간에 도착한 2잔 주문 5건으로 만든다)
+    SCENARIO_LIST               :list[BenchmarkScenario] = [
+        BenchmarkScenario("order1Hot",              [(0.0, [HOT])]),
+        BenchmarkScenario("order1Ice",              [(0.0, [ICE])]),
+        BenchmarkScenario("order2Mix",              [(0.0, [HOT, ICE])]),
+        BenchmarkScenario("order10Mix",             [(0.0, [HOT, ICE])] * 5),
+        BenchmarkScenario("orders10Burst",          [(index * 10.0, [ICE if index % 3 == 0 else HOT]) for index in range(10)]),
+        BenchmarkScenario("order10GroundsFull",     [(0.0, [HOT, ICE])] * 5, groundsCapacity = 3),
+        BenchmarkScenario("order4PowerOff",         [(0.0, [HOT, ICE]), (400.0, [ICE, HOT])], powerOffIdleSec = 120.0),
+    ]
+
+    CONTROLLER_LIST             :list[tuple[str, str]] = [
+        ("singleProcessController", "SingleProcessController"),
+        ("multiProcessController", "MultiProcessController"),
+    ]
+
+    # 기준 대비 허용 비율 : 마이크로(실제 시간, 장비 성능 영향) / 종단간(가상 시간)
+    MICRO_TOLERANCE_RATIO       :float      = 0.25
+    E2E_TOLERANCE_RATIO         :float      = 0.05
+
+    # 종단간 결과 항목 -> 값이 클수록 좋은지 여부
+    E2E_METRIC_DICT             :dict[str, bool] = {"makespanSec" : False, "leadTimeMeanSec" : False, "drinksPerHour" : True, "errorCount" : False}
+
+
+
+    def __init__(self, repeatNum:int = 200, isVerbose:bool = True):
+        self.__repeatNum                :int        = repeatNum
+        self.__isVerbose                :bool       = isVerbose
+        # deviceRecordRead 측정용 (측정 후 close)
+        self.__deviceRecord             :DeviceRecordManager = None
+
+
+
+    def run(self, scenarioNameList:list[str] = None) -> dict:
+        '''
+        ### 마이크로 + 종단간 벤치마크 실행
+        - scenarioNameList : 실행할 시나리오 이름 (None 이면 모두)
+        '''
+        result :dict = {
+            "meta"      : {"python" : platform.python_version(), "machine" : platform.machine(), "time" : time.strftime("%Y-%m-%d %H:%M:%S")},
+            "micro"     : self.runMicro(),
+            "e2e"       : {},
+        }
+
+        # 스케줄러 판단 1회 CPU 시간(us) (멀티 공정 시나리오 전체)
+        stepSampleList :list[float] = []
+
+        for scenario in self.SCENARIO_LIST:
+            if scenarioNameList != None and scenario.name not in scenarioNameList:
+                continue
+
+            for controllerModuleName, controllerClassName in self.CONTROLLER_LIST:
+                name, e2eResult, sampleList = self.runScenario(scenario, controllerModuleName, controllerClassName)
+                result["e2e"][name] = e2eResult
+                stepSampleList.extend(sampleList)
+
+        if len(stepSampleList) > 0:
+            result["micro"]["schedulerStep"] = self.__summarize(stepSampleList)
+            self.__print(f"micro {'schedulerStep':24s} p50 {result['micro']['schedulerStep']['p50Us']:9.2f}us / p99 {result['micro']['schedulerStep']['p99Us']:9.2f}us")
+
+        return result
+
+
+
+    # ============================================================================================================================
+    # 마이크로 벤치마크
+    # ============================================================================================================================
+
+    def runMicro(self) -> dict:
+        '''
+        ### 마이크로 벤치마크 {이름 : {"sampleNum", "meanUs", "p50Us", "p99Us"}}
+        '''
+        resultDict :dict = {}
+
+        for name, func, batchNum in self.__getMicroList():
+            resultDict[name] = self.__measure(func, batchNum)
+            self.__print(f"micro {name:24s} p50 {resultDict[name]['p50Us']:9.2f}us / p99 {resultDict[name]['p99Us']:9.2f}us")
+
+        self.__deviceRecord.close()
+        return resultDict
+
+
+
+    def __getMicroList(self) -> list[tuple[str, object, int]]:
+        '''
+        (이름, 측정 함수, 샘플 1개당 호출 횟수) 목록
+        '''
+        # 셀 상태 반영 : 센서 1개 변경 + snapshot 조회
+        cellState       :CellStateManager = CellStateManager()
+        cellState.subscribe(lambda cellSnapshot, changedKeySet: None, ["hasCupOnMiddleBTray"])
+        sensorValueList :list[int]        = [0]
+
+        def cellStateUpdate():
+            sensorValueList[0] ^= 1
+            cellState.update({"hasCupOnMiddleATray" : sensorValueList[0], "hasCupOnMiddleBTray" : 0}, "PLC")
+            cellState.getSnapshot()
+
+        # PLC 프로세스 이미지 읽기 + 바뀐 신호 비교 (통합 데모 셀 구성의 신호)
+        topology        :CellTopologyData    = CellTopologyManager("topology/multiProcessTopology.json").load()
+        plcImage        :PlcProcessImageManager = PlcProcessImageManager(BenchmarkPlcVar(), CellTopologyManager.getPlcSignalDict(topology))
+
+        def plcImageDiff():
+            plcImage.diff(plcImage.read())
+
+        # 라인 선택 : 2개 라인 중 예상 완료 시간이 빠른 라인 (1개 라인은 추출 중)
+        timingModel     :TimingModelManager  = TimingModelManager()
+        laneDispatcher  :LaneDispatchManager = LaneDispatchManager(timingModel)
+        laneList        :list[LaneStateData] = [LaneStateData(1), LaneStateData(2)]
+        for lane in laneList:
+            lane.delonghiStatus         = DelonghiState.READY
+            lane.hasCupOnDelonghiTray   = 0
+            lane.hasCupOnPickupTray     = 0
+        laneList[0].drinkJob                = DrinkJobData(1, 1, 0, HOT)
+        laneList[0].drinkJob.state          = OrderState.BREW_START
+        laneList[0].drinkJob.brewStartTime  = time.monotonic()
+
+        def laneSelect():
+            now :float = time.monotonic()
+            lane :LaneStateData = laneDispatcher.selectLane(laneList, ICE, now, OrderState.CUP_STAGED)
+            laneDispatcher.getDispatchTime(lane, ICE, now, OrderState.CUP_STAGED)
+
+        # 레시피 대기 단계 판단 : 중간 거치대B 가 비기를 기다리는 컵 전달 (조건 불만족 -> 요청 없음)
+        robotComm, gripperComm = object(), object()
+        robotCommand    :RobotCommandManager = RobotCommandManager(None)
+        robotCommand.addRobot(robotComm, "Indy7L")
+        robotCommand.addRobot(gripperComm, "Indy7L 그리퍼")
+        recipe          :RecipeManager       = RecipeManager(BenchmarkTPMSysFuncManager(), robotCommand, lambda dispenserCode: None, timingModel = timingModel)
+        recipeRun                            = recipe.startRun(recipe.getPlan(ICE, "multiCupHandoff", RecipeDeviceData("Indy7L", robotComm, gripperComm)))
+        waitState       :CellStateManager    = CellStateManager()
+        waitState.update({"hasCupOnMiddleBTray" : 1})
+        waitSnapshot                         = waitState.getSnapshot()
+
+        def recipeAdvanceWait():
+            recipe.advanceRun(recipeRun, waitSnapshot)
+
+        # 지표 text (Prometheus)
+        metrics         :MetricsManager      = MetricsManager()
+        metrics.addCounter("drinks_completed_total", "drinks")
+        metrics.addHistogram("order_lead_time_seconds", "lead time", [60, 120, 180, 240, 300, 420, 600, 900, 1200])
+        metrics.addStateDuration("delonghi_state_seconds_total", "delonghi state")
+        for index in range(100):
+            metrics.incCounter("drinks_completed_total")
+            metrics.observe("order_lead_time_seconds", 60.0 + index * 3)
+            metrics.setState("delonghi_state_seconds_total", index % 2, {"delonghi" : 1 + index % 2})
+
+        # 장비 통신 기록 : PLC 읽기 1회 (호출/반환 기록 포함)
+        recordFilePath  :str                 = os.path.join(tempfile.mkdtemp(), "benchmarkDevice.bin")
+        self.__deviceRecord                  = DeviceRecordManager(DeviceRecordManager.MODE_RECORD, recordFilePath)
+        recordedPlc                          = self.__deviceRecord.createVar(BenchmarkPlcVar, "PLC", None)
+
+        def deviceRecordRead():
+            recordedPlc.read("M000", 7)
+
+        return [
+            ("cellStateUpdate",     cellStateUpdate,    20),
+            ("plcImageDiff",        plcImageDiff,       20),
+            ("laneSelect",          laneSelect,         20),
+            ("recipeAdvanceWait",   recipeAdvanceWait,  20),
+            ("metricsText",         metrics.getText,    1),
+            ("deviceRecordRead",    deviceRecordRead,   20),
+        ]
+
+
+
+    def __measure(self, func, batchNum:int) -> dict:
+        '''
+        func 를 batchNum 번 호출한 평균 시간을 repeatNum 개 측정 (처음 1/10 은 준비 실행으로 제외)
+        '''
+        sampleList :list[float] = []
+
+        for index in range(self.__repeatNum + self.__repeatNum // 10):
+            startTime :int = time.perf_counter_ns()
+            for _ in range(batchNum):
+                func()
+            if index >= self.__repeatNum // 10:
+                sampleList.append((time.perf_counter_ns() - startTime) / batchNum / 1000.0)
+
+        return self.__summarize(sampleList)
+
+
+
+    @staticmethod
+    def __summarize(sampleList:list[float]) -> dict:
+        sortedList :list[float] = sorted(sampleList)
+        return {
+            "sampleNum"     : len(sortedList),
+            "meanUs"        : statistics.mean(sortedList),
+            "p50Us"         : sortedList[len(sortedList) // 2],
+            "p99Us"         : sortedList[min(len(sortedList) - 1, int(len(sortedList) * 0.99))],
+        }
+
+
+
+    # ============================================================================================================================
+    # 종단간 벤치마크
+    # ============================================================================================================================
+
+    def runScenario(self, scenario:BenchmarkScenario, controllerModuleName:str, controllerClassName:str) -> tuple[str, dict, list[float]]:
+        '''
+        ### 시나리오 1개를 컨트롤러 1개로 실행
+        - 반환값 : (결과 이름, 결과, 스케줄러 판단 1회 CPU 시간(us) 목록)
+        '''
+        config :SimCellConfig = SimCellConfig()
+        config.order.orderList          = scenario.orderList
+        config.fault.groundsCapacity    = scenario.groundsCapacity
+        config.fault.powerOffIdleSec    = scenario.powerOffIdleSec
+
+        name            :str        = f"{scenario.name}/{controllerClassName}"
+        stepSampleList  :list[float]= []
+        restoreFunc                 = self.__measureSchedulerStep(controllerModuleName, controllerClassName, stepSampleList)
+
+        startTime :float = time.perf_counter()
+        try:
+            report = CellSimulator(controllerModuleName, controllerClassName, config, name).run(scenario.maxDurationSec, isStopWhenCompleted = True)
+        finally:
+            restoreFunc()
+
+        e2eResult :dict = {
+            "makespanSec"       : report.makespanSec,
+            "leadTimeMeanSec"   : statistics.mean(report.leadTimeSecList) if len(report.leadTimeSecList) > 0 else scenario.maxDurationSec,
+            "drinksPerHour"     : report.drinksPerHour,
+            "completedOrderNum" : report.completedOrderCount,
+            "orderNum"          : len(scenario.orderList),
+            "deliveredDrinkNum" : report.deliveredDrinkCount,
+            "errorCount"        : len(report.errorList),
+            "realSec"           : time.perf_counter() - startTime,
+        }
+        self.__print(f"e2e   {name:48s} makespan {e2eResult['makespanSec']:7.1f}s / lead {e2eResult['leadTimeMeanSec']:7.1f}s / "
+                     f"{e2eResult['completedOrderNum']}/{e2eResult['orderNum']} orders / errors {e2eResult['errorCount']} ({e2eResult['realSec']:.1f}s)")
+
+        return name, e2eResult, stepSampleList
+
+
+
+    @staticmethod
+    def __measureSchedulerStep(controllerModuleName:str, controllerClassName:str, sampleList:list[float]):
+        '''
+        ### 컨트롤러의 스케줄러 판단 1회(__runSchedulerStep)를 감싸 호출한 쓰레드의 CPU 시간(us)을 기록
+        - 스케줄러 판단 함수가 없는 컨트롤러는 측정하지 않는다.
+        - 반환값 : 원래 함수로 되돌리는 함수
+        '''
+        module          = __import__(controllerModuleName)
+        controllerClass = getattr(module, controllerClassName)
+        methodName :str = f"_{controllerClassName}__runSchedulerStep"
+        method          = controllerClass.__dict__.get(methodName)
+
+        if method == None:
+            return lambda: None
+
+        def measuredMethod(self):
+            startTime :int = time.thread_time_ns()
+            try:
+                return method(self)
+            finally:
+                sampleList.append((time.thread_time_ns() - startTime) / 1000.0)
+
+        setattr(controllerClass, methodName, measuredMethod)
+        return lambda: setattr(controllerClass, methodName, method)
+
+
+
+    # ============================================================================================================================
+    # 저장 / 비교
+    # ============================================================================================================================
+
+    @staticmethod
+    def save(result:dict, filePath:str):
+        dirPath :str = os.path.dirname(filePath)
+        if dirPath != "":
+            os.makedirs(dirPath, exist_ok = True)
+
+        with open(filePath, "w", encoding = "utf-8") as resultFile:
+            json.dump(result, resultFile, ensure_ascii = False, indent = 2)
+
+
+
+    @staticmethod
+    def load(filePath:str) -> dict:
+        with open(filePath, "r", encoding = "utf-8") as resultFile:
+            return json.load(resultFile)
+
+
+
+    def compare(self, result:dict, baseline:dict) -> list[str]:
+        '''
+        ### 기준 결과 대비 허용 비율보다 나빠진 항목 목록 (비어 있으면 통과)
+        - 마이크로 : p50 시간 / 종단간 : E2E_METRIC_DICT 항목 (기준에 없는 항목은 비교하지 않음)
+        '''
+        regressionList :list[str] = []
+
+        for name, micro in result["micro"].items():
+            baseMicro :dict = baseline.get("micro", {}).get(name)
+            if baseMicro != None and micro["p50Us"] > baseMicro["p50Us"] * (1.0 + self.MICRO_TOLERANCE_RATIO):
+                regressionList.append(f"micro {name} p50 {baseMicro['p50Us']:.2f}us -> {micro['p50Us']:.2f}us")
+
+        for name, e2eResult in result["e2e"].items():
+            baseResult :dict = baseline.get("e2e", {}).get(name)
+            if baseResult == None:
+                continue
+
+            for metricName, isHigherBetter in self.E2E_METRIC_DICT.items():
+                value       :float  = e2eResult[metricName]
+                baseValue   :float  = baseResult[metricName]
+
+                if isHigherBetter == True:
+                    isRegressed :bool = value < baseValue * (1.0 - self.E2E_TOLERANCE_RATIO)
+                else:
+                    isRegressed :bool = value > baseValue * (1.0 + self.E2E_TOLERANCE_RATIO) and value > baseValue
+
+                if isRegressed == True:
+                    regressionList.append(f"e2e {name} {metricName} {baseValue:.2f} -> {value:.2f}")
+
+        return regressionList
+
+
+
+    def __print(self, msg:str):
+        if self.__isVerbose == True:
+            print(msg, file = sys.stderr, flush = True)
@@ -0,0 +1,230 @@
+import threading
+import importlib
+import functools
+import statistics
+
+from cdrutils.log import CDRLog
+
+from data.mainData import MainData
+
+from simulation.virtualClock import VirtualClock, VirtualTimeModule, VirtualDatetimeModule, VirtualThreadingModule
+from simulation.simCell import SimCell
+from simulation.simCellConfig import SimCellConfig
+from simulation.simVariables import SimMelsecPLCVar, SimBLEVar, SimModbusTCPVar, SimTcpIPVar, SimMqttVar
+from simulation.simTPMSysFuncManager import SimTPMSysFuncManager
+
+
+
+
+class SimLog():
+    '''
+    ### 시뮬레이션용 CDRLog 대체 클래스 (가상 시간 표시, 출력 on/off)
+    '''
+
+    def __init__(self, clock:VirtualClock, isVerbose:bool):
+        self.__clock                    :VirtualClock   = clock
+        self.__isVerbose                :bool           = isVerbose
+
+    def print(self, msg:str):
+        if self.__isVerbose == True:
+            CDRLog.print(f"[SIM {self.__clock.now():10.1f}s] {msg}")
+
+    def printBuiltin(self, *args, **kwargs):
+        '''
+        컨트롤러 모듈의 내장 print 대체 함수
+        '''
+        self.print(" ".join(str(arg) for arg in args))
+
+
+
+
+class SimReport():
+    '''
+    ### 시뮬레이션 결과 리포트 (처리량, 대기 시간, 장비 가동률)
+    '''
+
+    def __init__(self, name:str, durationSec:float, cell:SimCell):
+        self.name                       :str        = name
+        self.durationSec                :float      = durationSec
+
+        orderList = [order for order in cell.getOrderList() if order.arrivalTime <= durationSec]
+        fetchedList = [order for order in orderList if order.fetchTime >= 0]
+        completedList = [order for order in orderList if order.completeTime >= 0]
+
+        self.arrivedOrderCount          :int        = len(orderList)
+        self.completedOrderCount        :int        = len(completedList)
+        self.deliveredDrinkCount        :int        = cell.getDeliveredCount()
+        self.servedDrinkCount           :int        = len(cell.getServedCupList())
+        self.drinksPerHour              :float      = self.deliveredDrinkCount * 3600.0 / durationSec
+        # 마지막 주문이 완료된 시간 (완료된 주문 없음 0)
+        self.makespanSec                :float      = max([order.completeTime for order in completedList], default = 0.0)
+
+        self.queueWaitSecList           :list[float] = [order.fetchTime - order.arrivalTime for order in fetchedList]
+        self.leadTimeSecList            :list[float] = [order.completeTime - order.arrivalTime for order in completedList]
+
+        self.utilizationDict            :dict[str, float] = {}
+        for robot in cell.getRobotDict().values():
+            self.utilizationDict[robot.name] = min(1.0, robot.busySec / durationSec)
+
+        self.brewCountDict              :dict[str, int] = {}
+        self.errorSecDict               :dict[str, dict[int, float]] = {}
+        for delonghi in cell.getDelonghiDict().values():
+            self.utilizationDict[delonghi.name] = min(1.0, delonghi.busySec / durationSec)
+            self.brewCountDict[delonghi.name]   = delonghi.brewCount
+            self.errorSecDict[delonghi.name]    = dict(delonghi.errorSecDict)
+
+        self.errorList                  :list[tuple[float, str]] = cell.getErrorList()
+
+
+
+    @staticmethod
+    def __summary(valueList:list[float]) -> str:
+        if len(valueList) == 0:
+            return "-"
+
+        sortedList  = sorted(valueList)
+        p95         = sortedList[min(len(sortedList) - 1, int(len(sortedList) * 0.95))]
+        return f"mean {statistics.mean(sortedList):7.1f}s / p95 {p95:7.1f}s / max {sortedList[-1]:7.1f}s"
+
+
+
+    def toDict(self) -> dict:
+        return {
+            "name"                      : self.name,
+            "durationSec"               : self.durationSec,
+            "arrivedOrderCount"         : self.arrivedOrderCount,
+            "completedOrderCount"       : self.completedOrderCount,
+            "deliveredDrinkCount"       : self.deliveredDrinkCount,
+            "servedDrinkCount"          : self.servedDrinkCount,
+            "drinksPerHour"             : self.drinksPerHour,
+            "makespanSec"               : self.makespanSec,
+            "queueWaitSecList"          : self.queueWaitSecList,
+            "leadTimeSecList"           : self.leadTimeSecList,
+            "utilization"               : self.utilizationDict,
+            "brewCount"                 : self.brewCountDict,
+            "errorCount"                : len(self.errorList),
+        }
+
+
+
+    def toText(self) -> str:
+        lineList :list[str] = [
+            f"===== {self.name} ({self.durationSec / 3600.0:.2f} h) =====",
+            f"orders     : arrived {self.arrivedOrderCount} / completed {self.completedOrderCount}",
+            f"drinks     : delivered {self.deliveredDrinkCount} / served {self.servedDrinkCount} / {self.drinksPerHour:.1f} drinks/h",
+            f"queue wait : {self.__summary(self.queueWaitSecList)}",
+            f"lead time  : {self.__summary(self.leadTimeSecList)}",
+            "utilization: " + ", ".join(f"{name} {ratio * 100:.0f}%" for name, ratio in self.utilizationDict.items()),
+            "brew count : " + ", ".join(f"{name} {count}" for name, count in self.brewCountDict.items()),
+            f"errors     : {len(self.errorList)}",
+        ]
+        for errorTime, errorMsg in self.errorList[:10]:
+            lineList.append(f"    [{errorTime:10.1f}s] {errorMsg}")
+
+        return "\n".join(lineList)
+
+
+
+
+class CellSimulator():
+    '''
+    ### 컨트롤러를 시뮬레이션 셀에서 실행하는 클래스 \n
+    - 컨트롤러 모듈의 통신 변수 클래스, TPMSysFuncManager, time/datetime/threading 모듈을 시뮬레이션 객체로 교체한 뒤 컨트롤러를 생성한다.
+    - 컨트롤러가 사용하는 manager 모듈 중 쓰레드/시간을 다루는 모듈(patchModuleNameList)은 time/threading/CDRLog 만 교체한다.
+    - 컨트롤러 코드는 수정 없이 가상 시간 위에서 동작하며, 실행이 끝나면 교체한 전역 변수는 원래대로 복구된다.
+    - 사용 예 : CellSimulator("multiProcessController", "MultiProcessController").run(3600).toText()
+    '''
+
+
+
+    def __init__(self, controllerModuleName:str, controllerClassName:str, config:SimCellConfig = None, name:str = None, isVerbose:bool = False,
+                 controllerArgDict:dict = None):
+        self.__controllerModuleName     :str            = controllerModuleName
+        self.__controllerClassName      :str            = controllerClassName
+        # 컨트롤러 생성 인자 (ex. {"isPipelined" : True})
+        self.__controllerArgDict        :dict           = {} if controllerArgDict == None else controllerArgDict
+        self.__config                   :SimCellConfig  = SimCellConfig() if config == None else config
+        self.__name                     :str            = controllerClassName if name == None else name
+        self.__isVerbose                :bool           = isVerbose
+        # isStopWhenCompleted 일 때 모든 주문 완료를 확인하는 주기 (가상 시간)
+        self.__stopCheckSec             :float          = 5.0
+        self.__patchModuleNameList      :list[str]      = ["manager.robotCommandManager", "manager.devicePollingManager", "manager.delonghiMaintenanceManager", "manager.delonghiStatusManager", "manager.deviceRecordManager", "manager.cellStateManager", "manager.timerSchedulerManager", "manager.traceManager", "manager.metricsManager", "manager.recipeManager", "manager.timingModelManager", "manager.orderIntakeManager", "manager.crcPublishManager", "manager.processRecordManager", "manager.orderUIManager", "manager.cupDispenserManager", "data.orderData", "data.crcMessageData"]
+
+
+
+    def run(self, durationSec:float, isStopWhenCompleted:bool = False) -> SimReport:
+        '''
+        ### durationSec(가상 시간) 동안 컨트롤러를 실행하고 결과 리포트를 반환
+        - isStopWhenCompleted : 주문 목록(config.order.orderList)의 모든 주문이 완료되면 durationSec 전에 종료 (리포트 시간은 실제 실행한 가상 시간)
+        '''
+        clock               :VirtualClock   = VirtualClock()
+        cell                :SimCell        = SimCell(clock, self.__config)
+        stopEvent           :threading.Event= threading.Event()
+        simLog              :SimLog         = SimLog(clock, self.__isVerbose)
+
+        def simInput(*args):
+            # 키 입력 쓰레드는 시뮬레이션 종료까지 가상 시계 밖에서 대기
+            clock.noteBlocked()
+            stopEvent.wait()
+            raise SystemExit()
+
+        patchDict :dict = {
+            "MelsecPLCVar"          : functools.partial(SimMelsecPLCVar, cell, clock, self.__config),
+            "BLEVar"                : functools.partial(SimBLEVar, cell, clock, self.__config),
+            "ModbusTCPVar"          : functools.partial(SimModbusTCPVar, cell, clock, self.__config),
+            "TcpIPVar"              : functools.partial(SimTcpIPVar, cell, clock, self.__config),
+            "MqttVar"               : functools.partial(SimMqttVar, cell, clock, self.__config),
+            "TPMSysFuncManager"     : functools.partial(SimTPMSysFuncManager, cell, clock, self.__config),
+            "time"                  : VirtualTimeModule(clock),
+            "datetime"              : VirtualDatetimeModule(clock),
+            "threading"             : VirtualThreadingModule(clock),
+            "CDRLog"                : simLog,
+            "print"                 : simLog.printBuiltin,
+            "input"                 : simInput,
+        }
+
+        module = importlib.import_module(self.__controllerModuleName)
+        originalDict :dict = {name : module.__dict__[name] for name in patchDict if name in module.__dict__}
+
+        # manager 모듈은 이미 import 한 전역 변수만 교체
+        subModuleList :list = [importlib.import_module(moduleName) for moduleName in self.__patchModuleNameList]
+        subOriginalList :list[dict] = [
+            {name : subModule.__dict__[name] for name in ["time", "threading", "CDRLog"] if name in subModule.__dict__}
+            for subModule in subModuleList
+        ]
+        threadSet :set[threading.Thread] = set(threading.enumerate())
+
+        try:
+            module.__dict__.update(patchDict)
+            for subModule, subOriginalDict in zip(subModuleList, subOriginalList):
+                subModule.__dict__.update({name : patchDict[name] for name in subOriginalDict})
+            clock.start()
+
+            getattr(module, self.__controllerClassName)(**self.__controllerArgDict)
+
+            if isStopWhenCompleted == False:
+                clock.sleep(durationSec)
+            else:
+                while clock.now() < durationSec and cell.isAllOrderCompleted() == False:
+                    clock.sleep(min(self.__stopCheckSec, durationSec - clock.now()))
+                durationSec = clock.now()
+
+        finally:
+            MainData.isRunningTPMProgram = False
+            clock.stop()
+            stopEvent.set()
+
+            # 가상 시계를 사용하는 쓰레드는 SystemExit 로 바로 끝난다. 가상 시계 밖에서 대기하는 daemon 쓰레드(ex. 지표 HTTP 서버)는 기다리지 않는다.
+            for thread in set(threading.enumerate()) - threadSet:
+                thread.join(5.0 if thread.daemon == False else 0.1)
+
+            for name in patchDict:
+                if name in originalDict:
+                    module.__dict__[name] = originalDict[name]
+                else:
+                    module.__dict__.pop(name, None)
+
+            for subModule, subOriginalDict in zip(subModuleList, subOriginalList):
+                subModule.__dict__.update(subOriginalDict)
+
+        return SimReport(self.__name, durationSec, cell)
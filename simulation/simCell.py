@@ -0,0 +1,543 @@
+import threading
+import random
+
+from const.delonghiState import DelonghiState
+
+from simulation.virtualClock import VirtualClock
+from simulation.simCellConfig import SimCellConfig, MENU_HOT_AMERICANO, MENU_ICE_AMERICANO
+
+
+
+TRAY_NAME_LIST                  :list[str] = [
+    "middleATray", "middleBTray", "delonghi01Tray", "delonghi02Tray", "pickupATray", "pickupBTray", "pickupCTray"
+]
+PICKUP_TRAY_NAME_LIST           :list[str] = ["pickupATray", "pickupBTray", "pickupCTray"]
+
+COFFEE_AMERICANO                :str = "americano"
+COFFEE_ESPRESSO                 :str = "espresso"
+
+
+
+
+class SimCup():
+    '''
+    시뮬레이션 컵 정보
+    '''
+
+    def __init__(self, cupId:int, isIceCup:bool):
+        self.cupId                      :int        = cupId
+        self.isIceCup                   :bool       = isIceCup
+        self.hasIce                     :bool       = False
+        self.coffee                     :str        = None
+        self.pickupTime                 :float      = -1
+
+
+
+
+class SimOrder():
+    '''
+    시뮬레이션 주문 정보
+    '''
+
+    def __init__(self, orderId:int, menuIdList:list[int], arrivalTime:float):
+        self.orderId                    :int        = orderId
+        self.menuIdList                 :list[int]  = menuIdList
+        self.arrivalTime                :float      = arrivalTime
+        self.fetchTime                  :float      = -1
+        self.completeTime               :float      = -1
+        self.nextMenuIndex              :int        = 0
+
+
+
+
+class SimRobot():
+    '''
+    시뮬레이션 로봇 상태
+    '''
+
+    def __init__(self, name:str):
+        self.name                       :str        = name
+        self.location                   :str        = "home"
+        self.heldCup                    :SimCup     = None
+        self.busySec                    :float      = 0.0
+        self.motionCount                :int        = 0
+
+
+
+
+class SimDelonghi():
+    '''
+    시뮬레이션 드롱기 상태
+    '''
+
+    def __init__(self, name:str):
+        self.name                       :str        = name
+        self.brewEndTime                :float      = 0.0
+        self.lastBrewTime               :float      = 0.0
+        self.wakeupEndTime              :float      = -1
+        self.groundsCount               :int        = 0
+        self.isContainerOpened          :bool       = False
+        self.isPoweredOff               :bool       = False
+        self.busySec                    :float      = 0.0
+        self.brewCount                  :int        = 0
+        self.errorSecDict               :dict[int, float] = {}
+
+
+
+
+class SimCell():
+    '''
+    ### 시뮬레이션 셀의 물리 상태 모델 \n
+    - 트레이/로봇 그리퍼/드롱기 위의 컵 위치를 추적하여 PLC 센서값과 드롱기 상태를 만들어낸다.
+    - 모든 상태 변경은 가상 시계 기준 시간으로 기록되며, 시간에 따른 상태 변화(추출 완료, 고객 픽업 등)는 조회 시점에 반영한다.
+    '''
+
+
+
+    def __init__(self, clock:VirtualClock, config:SimCellConfig):
+        self.__clock                    :VirtualClock   = clock
+        self.__config                   :SimCellConfig  = config
+        self.__lock                     :threading.RLock= threading.RLock()
+        self.__random                   :random.Random  = random.Random(config.order.seed)
+
+        self.__trayDict                 :dict[str, SimCup]      = {trayName : None for trayName in TRAY_NAME_LIST}
+        self.__pickupDueTimeDict        :dict[str, float]       = {}
+        self.__robotDict                :dict[str, SimRobot]    = {name : SimRobot(name) for name in ["indy7L", "ur5", "indy7R"]}
+        self.__delonghiDict             :dict[str, SimDelonghi] = {name : SimDelonghi(name) for name in ["delonghi01", "delonghi02"]}
+        self.__lastStateDict            :dict[str, tuple[int, float]] = {}
+        # 명령으로 드롱기 상태가 바뀔 때 호출 -> callback(드롱기 이름)
+        self.__delonghiListenerList     :list       = []
+
+        self.__cupSeq                   :int        = 0
+        self.__pendingOrderList         :list[SimOrder] = []
+        self.__orderList                :list[SimOrder] = []
+        self.__orderDict                :dict[int, SimOrder] = {}
+        self.__orderUIMessageList       :list[tuple[float, str]] = []
+        self.__errorList                :list[tuple[float, str]] = []
+        self.__servedCupList            :list[SimCup] = []
+        self.__deliveredCount           :int        = 0
+        self.__dispensedCount           :int        = 0
+        self.__iceCount                 :int        = 0
+
+        self.__createOrders()
+
+
+
+    # ============================================================================================================================
+    # 주문
+    # ============================================================================================================================
+
+    def __createOrders(self):
+        '''
+        주문 도착 시간표 생성. 시뮬레이션 시간과 관계없이 충분히 긴 시간(24시간)의 주문을 미리 만든다.
+        '''
+        orderConfig = self.__config.order
+
+        if orderConfig.orderList != None:
+            for arrivalTime, menuIdList in orderConfig.orderList:
+                self.__addOrder(arrivalTime, list(menuIdList))
+            return
+
+        arrivalTime :float = 0.0
+        while arrivalTime < 24 * 3600:
+            arrivalTime += self.__random.expovariate(1.0 / orderConfig.meanInterArrivalSec)
+            drinkNum    :int = self.__random.randint(1, orderConfig.maxDrinksPerOrder)
+            menuIdList  :list[int] = [
+                MENU_ICE_AMERICANO if self.__random.random() < orderConfig.iceRatio else MENU_HOT_AMERICANO for _ in range(drinkNum)
+            ]
+            self.__addOrder(arrivalTime, menuIdList)
+
+
+
+    def __addOrder(self, arrivalTime:float, menuIdList:list[int]):
+        order = SimOrder(len(self.__orderList) + 1, menuIdList, arrivalTime)
+        self.__orderList.append(order)
+        self.__orderDict[order.orderId] = order
+        self.__pendingOrderList.append(order)
+
+
+
+    def fetchOrder(self) -> SimOrder:
+        '''
+        현재 시간까지 도착한 주문 중 가장 오래된 주문을 반환. 없으면 None
+        '''
+        with self.__lock:
+            if len(self.__pendingOrderList) == 0 or self.__pendingOrderList[0].arrivalTime > self.__clock.now():
+                return None
+
+            order = self.__pendingOrderList.pop(0)
+            order.fetchTime = self.__clock.now()
+            return order
+
+
+
+    def completeOrder(self, orderId:int):
+        with self.__lock:
+            order = self.__orderDict.get(orderId)
+            if order == None:
+                self.__addError(f"unknown order complete : {orderId}")
+                return
+            if order.completeTime < 0:
+                order.completeTime = self.__clock.now()
+
+
+
+    def getOrderList(self) -> list[SimOrder]:
+        return list(self.__orderList)
+
+
+
+    def isAllOrderCompleted(self) -> bool:
+        '''
+        생성된 모든 주문이 완료되었는지 여부 (주문 목록을 지정한 경우에 사용)
+        '''
+        with self.__lock:
+            return all(order.completeTime >= 0 for order in self.__orderList)
+
+
+
+    def writeOrderUI(self, msg:str):
+        with self.__lock:
+            self.__orderUIMessageList.append((self.__clock.now(), msg))
+
+
+
+    def getOrderUIMessageList(self) -> list[tuple[float, str]]:
+        return list(self.__orderUIMessageList)
+
+
+
+    # ============================================================================================================================
+    # 로봇 / 그리퍼 / 디스펜서
+    # ============================================================================================================================
+
+    def runMotion(self, robotName:str, programId:int):
+        '''
+        ### 로봇 모션 수행 (호출한 쓰레드는 모션 시간 동안 가상 시간으로 대기)
+        '''
+        motionSec :float = self.__config.timing.getMotionSec(robotName, programId)
+        self.__clock.sleep(motionSec)
+
+        with self.__lock:
+            robot = self.__robotDict[robotName]
+            robot.busySec       += motionSec
+            robot.motionCount   += 1
+
+            location = self.__config.motionLocationDict.get((robotName, programId))
+            if location == None:
+                self.__addError(f"{robotName} unknown program : {programId}")
+                return
+
+            robot.location = location
+
+            # 얼음 받기
+            if location == "iceMaker" and robot.heldCup != None:
+                robot.heldCup.hasIce = True
+                self.__iceCount += 1
+
+
+
+    def holdGripper(self, robotName:str):
+        '''
+        ### 그리퍼 닫기 -> 로봇 위치의 트레이에 컵이 있으면 집는다.
+        '''
+        self.__clock.sleep(self.__config.timing.gripperSec)
+
+        with self.__lock:
+            self.__refresh()
+            robot = self.__robotDict[robotName]
+            robot.busySec += self.__config.timing.gripperSec
+
+            if robot.heldCup != None or robot.location not in self.__trayDict:
+                return
+
+            cup = self.__trayDict[robot.location]
+            if cup == None:
+                return
+
+            if robot.location in self.__config.machineTrayDict:
+                delonghi = self.__delonghiDict[self.__config.machineTrayDict[robot.location]]
+                if delonghi.brewEndTime > self.__clock.now():
+                    self.__addError(f"{robotName} picked cup from {robot.location} during brewing")
+
+            self.__trayDict[robot.location] = None
+            robot.heldCup = cup
+
+
+
+    def releaseGripper(self, robotName:str):
+        '''
+        ### 그리퍼 열기 -> 로봇 위치의 트레이에 컵을 내려놓는다.
+        '''
+        self.__clock.sleep(self.__config.timing.gripperSec)
+
+        with self.__lock:
+            self.__refresh()
+            robot = self.__robotDict[robotName]
+            robot.busySec += self.__config.timing.gripperSec
+
+            if robot.heldCup == None:
+                return
+
+            if robot.location not in self.__trayDict:
+                self.__addError(f"{robotName} dropped cup at {robot.location}")
+                robot.heldCup = None
+                return
+
+            if self.__trayDict[robot.location] != None:
+                self.__addError(f"{robotName} placed cup on occupied {robot.location}")
+
+            cup = robot.heldCup
+            robot.heldCup = None
+            self.__trayDict[robot.location] = cup
+
+            if robot.location in PICKUP_TRAY_NAME_LIST:
+                self.__deliveredCount += 1
+                pickupDelaySecRange = self.__config.timing.pickupDelaySecRange
+                self.__pickupDueTimeDict[robot.location] = self.__clock.now() + self.__random.uniform(*pickupDelaySecRange)
+                if cup.coffee == None:
+                    self.__addError(f"empty cup delivered to {robot.location}")
+
+
+
+    def dispenseCup(self, isIceCup:bool):
+        '''
+        ### 컵 디스펜서 컵 배출 -> 디스펜서 위치의 로봇 그리퍼에 컵이 들어간다.
+        '''
+        with self.__lock:
+            self.__dispensedCount += 1
+            self.__cupSeq += 1
+            cup = SimCup(self.__cupSeq, isIceCup)
+            location = "iceCupDispenser" if isIceCup else "hotCupDispenser"
+
+            for robot in self.__robotDict.values():
+                if robot.location == location and robot.heldCup == None:
+                    robot.heldCup = cup
+                    return
+
+            self.__addError(f"cup dispensed without robot at {location}")
+
+
+
+    # ============================================================================================================================
+    # 드롱기
+    # ============================================================================================================================
+
+    def brew(self, delonghiName:str, coffee:str):
+        '''
+        ### 드롱기 추출 시작 -> 트레이의 컵(또는 트레이 위치에서 로봇이 들고 있는 컵)에 커피를 담는다.
+        '''
+        with self.__lock:
+            self.__refresh()
+            delonghi = self.__delonghiDict[delonghiName]
+
+            if self.__getDelonghiState(delonghi) != DelonghiState.READY:
+                self.__addError(f"{delonghiName} brew requested while not ready")
+                return
+
+            trayName :str = f"{delonghiName}Tray"
+            cup :SimCup = self.__trayDict.get(trayName)
+            if cup == None:
+                for robot in self.__robotDict.values():
+                    if robot.location == trayName and robot.heldCup != None:
+                        cup = robot.heldCup
+                        break
+
+            if cup == None:
+                self.__addError(f"{delonghiName} brewed without cup")
+            else:
+                cup.coffee = coffee
+                if cup.isIceCup == True and cup.hasIce == False:
+                    self.__addError(f"{delonghiName} brewed into ice cup without ice")
+
+            timing = self.__config.timing
+            brewSec :float = timing.americanoBrewSec if coffee == COFFEE_AMERICANO else timing.espressoBrewSec
+
+            delonghi.brewEndTime    = self.__clock.now() + brewSec
+            delonghi.lastBrewTime   = self.__clock.now()
+            delonghi.busySec        += brewSec
+            delonghi.brewCount      += 1
+            delonghi.groundsCount   += 1
+
+            self.__notifyDelonghiChanged(delonghiName)
+
+
+
+    def wakeupDelonghi(self, delonghiName:str):
+        with self.__lock:
+            delonghi = self.__delonghiDict[delonghiName]
+            if delonghi.isPoweredOff == True and delonghi.wakeupEndTime < 0:
+                delonghi.wakeupEndTime = self.__clock.now() + self.__config.timing.wakeupSec
+                self.__notifyDelonghiChanged(delonghiName)
+
+
+
+    def writeContainer(self, msg:str):
+        '''
+        ### 찌꺼기 통 개폐 장치 명령 처리 (OPEN_n / CLOSE_n)
+        '''
+        with self.__lock:
+            command, _, number = msg.partition("_")
+            delonghi = self.__delonghiDict.get(f"delonghi0{number}")
+            if delonghi == None:
+                self.__addError(f"unknown container command : {msg}")
+                return
+
+            if command == "OPEN":
+                delonghi.isContainerOpened  = True
+                delonghi.groundsCount       = 0
+            elif command == "CLOSE":
+                delonghi.isContainerOpened  = False
+
+            self.__notifyDelonghiChanged(delonghi.name)
+
+
+
+    def getDelonghiState(self, delonghiName:str) -> int:
+        with self.__lock:
+            self.__refresh()
+            return self.__getDelonghiState(self.__delonghiDict[delonghiName])
+
+
+
+    def getDelonghiNextChangeTime(self, delonghiName:str) -> float:
+        '''
+        ### 명령 없이 시간 경과로 드롱기 상태가 바뀌는 다음 시각 (추출 완료, 휴면 해제, 휴면 전환), 없으면 inf
+        '''
+        with self.__lock:
+            self.__refresh()
+            delonghi        = self.__delonghiDict[delonghiName]
+            now     :float  = self.__clock.now()
+            timeList:list[float] = [float("inf")]
+
+            if delonghi.brewEndTime > now:
+                timeList.append(delonghi.brewEndTime)
+
+            if delonghi.isPoweredOff == True and delonghi.wakeupEndTime >= 0:
+                timeList.append(delonghi.wakeupEndTime)
+
+            powerOffIdleSec = self.__config.fault.powerOffIdleSec
+            if powerOffIdleSec != None and delonghi.isPoweredOff == False:
+                timeList.append(max(delonghi.lastBrewTime, delonghi.brewEndTime) + powerOffIdleSec)
+
+            return min(timeList)
+
+
+
+    def addDelonghiListener(self, callback):
+        '''
+        명령(추출, 휴면 해제, 찌꺼기 통 개폐)으로 드롱기 상태가 바뀔 때 호출할 콜백 등록 -> callback(드롱기 이름)
+        '''
+        with self.__lock:
+            self.__delonghiListenerList.append(callback)
+
+
+
+    def __notifyDelonghiChanged(self, delonghiName:str):
+        for callback in self.__delonghiListenerList:
+            callback(delonghiName)
+
+
+
+    def __getDelonghiState(self, delonghi:SimDelonghi) -> int:
+        now :float = self.__clock.now()
+
+        if delonghi.isContainerOpened == True:
+            return DelonghiState.ERR_OPENED_GROUNDS_CONTAINER
+
+        if delonghi.brewEndTime > now:
+            return DelonghiState.NOT_READY
+
+        if delonghi.isPoweredOff == True:
+            return DelonghiState.ERR_POWERED_OFF if delonghi.wakeupEndTime < 0 else DelonghiState.NOT_READY
+
+        groundsCapacity = self.__config.fault.groundsCapacity
+        if groundsCapacity != None and delonghi.groundsCount >= groundsCapacity:
+            return DelonghiState.ERR_FULL_GROUNDS
+
+        return DelonghiState.READY
+
+
+
+    # ============================================================================================================================
+    # 센서
+    # ============================================================================================================================
+
+    def readPlcSensors(self) -> list[int]:
+        '''
+        PLC M000 ~ M006 컵 감지 센서값
+        '''
+        with self.__lock:
+            self.__refresh()
+            return [0 if self.__trayDict[trayName] == None else 1 for trayName in self.__config.plcSensorTrayList]
+
+
+
+    def __refresh(self):
+        '''
+        ### 시간 경과에 따른 상태 변화 반영 (고객 픽업, 휴면 전환/해제, 오류 상태 지속 시간)
+        '''
+        now :float = self.__clock.now()
+
+        for trayName, dueTime in list(self.__pickupDueTimeDict.items()):
+            if dueTime <= now:
+                cup = self.__trayDict[trayName]
+                if cup != None:
+                    cup.pickupTime = dueTime
+                    self.__servedCupList.append(cup)
+                self.__trayDict[trayName] = None
+                del self.__pickupDueTimeDict[trayName]
+
+        powerOffIdleSec = self.__config.fault.powerOffIdleSec
+        for delonghi in self.__delonghiDict.values():
+
+            if delonghi.isPoweredOff == True and 0 <= delonghi.wakeupEndTime <= now:
+                delonghi.isPoweredOff   = False
+                delonghi.wakeupEndTime  = -1
+                delonghi.lastBrewTime   = now
+
+            elif (
+                powerOffIdleSec != None
+                and delonghi.isPoweredOff == False
+                and delonghi.brewEndTime <= now
+                and now - max(delonghi.lastBrewTime, delonghi.brewEndTime) >= powerOffIdleSec
+            ):
+                delonghi.isPoweredOff = True
+
+            # 오류 상태 지속 시간 누적
+            state :int = self.__getDelonghiState(delonghi)
+            lastState, lastTime = self.__lastStateDict.get(delonghi.name, (DelonghiState.READY, now))
+            if lastState not in [DelonghiState.READY, DelonghiState.NOT_READY]:
+                delonghi.errorSecDict[lastState] = delonghi.errorSecDict.get(lastState, 0.0) + (now - lastTime)
+            self.__lastStateDict[delonghi.name] = (state, now)
+
+
+
+    def __addError(self, msg:str):
+        self.__errorList.append((self.__clock.now(), msg))
+
+
+
+    # ============================================================================================================================
+    # 통계
+    # ============================================================================================================================
+
+    def getRobotDict(self) -> dict[str, SimRobot]:
+        return dict(self.__robotDict)
+
+    def getDelonghiDict(self) -> dict[str, SimDelonghi]:
+        with self.__lock:
+            self.__refresh()
+            return dict(self.__delonghiDict)
+
+    def getErrorList(self) -> list[tuple[float, str]]:
+        return list(self.__errorList)
+
+    def getServedCupList(self) -> list[SimCup]:
+        return list(self.__servedCupList)
+
+    def getDeliveredCount(self) -> int:
+        return self.__deliveredCount
+
+    def getDispensedCount(self) -> int:
+        return self.__dispensedCount
@@ -0,0 +1,153 @@
+MENU_HOT_AMERICANO               :int = 1000
+MENU_ICE_AMERICANO               :int = 1001
+
+
+
+
+class SimTimingConfig():
+    '''
+    ### 시뮬레이션 장비 동작 시간 설정 (단위 : 초)
+    '''
+
+    def __init__(self):
+        # 로봇별 기본 모션 시간. (로봇명, 프로그램 번호) 별 시간은 motionSecDict 로 재정의한다.
+        self.robotMotionSecDict         :dict[str, float]               = {"indy7L" : 5.0, "ur5" : 4.0, "indy7R" : 5.0}
+        self.motionSecDict              :dict[tuple[str, int], float]   = {}
+        self.gripperSec                 :float      = 0.8
+
+        self.americanoBrewSec           :float      = 45.0
+        self.espressoBrewSec            :float      = 25.0
+        self.wakeupSec                  :float      = 20.0
+
+        self.bleReadSec                 :float      = 0.15
+        # 드롱기 상태가 바뀐 후 BLE 상태 알림이 도착하기까지 걸리는 시간
+        self.bleNotifySec               :float      = 0.02
+        self.plcReadSec                 :float      = 0.01
+        self.tcpWriteSec                :float      = 0.005
+        # CRC 서버(클라우드 MQTT 브로커) 메시지 1건 전송 시간 (TLS 왕복 포함)
+        self.crcPublishSec              :float      = 0.3
+
+        # 픽업대에 음료가 놓인 후 고객이 가져가기까지 걸리는 시간 범위
+        self.pickupDelaySecRange        :tuple[float, float]            = (10.0, 40.0)
+
+
+
+    def getMotionSec(self, robotName:str, programId:int) -> float:
+        '''
+        로봇 모션 1회 수행 시간
+        '''
+        if (robotName, programId) in self.motionSecDict:
+            return self.motionSecDict[(robotName, programId)]
+
+        return self.robotMotionSecDict.get(robotName, 4.0)
+
+
+
+
+class SimOrderConfig():
+    '''
+    ### 시뮬레이션 주문 발생 설정
+    - orderList 를 지정하면 (도착시간, 메뉴 리스트) 순서대로 주문이 발생하고, 그렇지 않으면 포아송 도착으로 주문을 생성한다.
+    '''
+
+    def __init__(self):
+        self.meanInterArrivalSec        :float      = 90.0
+        self.iceRatio                   :float      = 0.5
+        self.maxDrinksPerOrder          :int        = 2
+        self.seed                       :int        = 7
+        self.orderList                  :list[tuple[float, list[int]]]  = None
+
+
+
+
+class SimFaultConfig():
+    '''
+    ### 시뮬레이션 장비 오류 주입 설정
+    - None 인 항목은 해당 오류를 발생시키지 않는다.
+    '''
+
+    def __init__(self):
+        # 찌꺼기 통이 가득 찰 때까지의 추출 횟수
+        self.groundsCapacity            :int        = None
+        # 해당 시간 동안 추출이 없으면 드롱기가 휴면 상태로 전환
+        self.powerOffIdleSec            :float      = None
+        # CRC 서버 연결 장애 구간 (시작, 끝) : 이 구간에 보낸 메시지는 전송 실패
+        self.crcOutageSecRange          :tuple[float, float]            = None
+
+
+
+
+class SimCellConfig():
+    '''
+    ### 시뮬레이션 셀 구성 설정
+    - 장비 주소(IP, MAC)로 컨트롤러가 생성한 통신 변수를 시뮬레이션 장비와 연결한다.
+    - 로봇 프로그램 번호별 도착 위치로 컵의 이동을 추적한다.
+    '''
+
+    def __init__(self):
+        self.timing                     :SimTimingConfig    = SimTimingConfig()
+        self.order                      :SimOrderConfig     = SimOrderConfig()
+        self.fault                      :SimFaultConfig     = SimFaultConfig()
+
+        # 통신 주소 -> 장비명
+        self.deviceAddressDict          :dict[str, str]     = {
+            "192.168.3.60"              : "plc",
+            "00:A0:50:3D:86:d7"         : "delonghi01",
+            "00:A0:50:99:0A:0E"         : "delonghi02",
+            "192.168.3.123"             : "delonghiContainer",
+            "192.168.3.110"             : "cupDispenser",
+            "192.168.3.101"             : "indy7L",
+            "192.168.3.102"             : "ur5",
+            "192.168.3.103"             : "indy7R",
+            "192.168.3.160"             : "indy7L",
+            "192.168.3.170"             : "ur5",
+            "192.168.3.180"             : "indy7R",
+            "127.0.0.1"                 : "orderUI",
+        }
+
+        # (로봇명, 프로그램 번호) -> 모션 완료 후 로봇 위치
+        self.motionLocationDict         :dict[tuple[str, int], str] = {
+            ("indy7L", 1)               : "hotCupDispenser",
+            ("indy7L", 2)               : "iceCupDispenser",
+            ("indy7L", 11)              : "middleATray",
+            ("indy7L", 12)              : "middleATray",
+            ("indy7L", 13)              : "middleATray",
+            ("indy7L", 14)              : "iceMaker",
+            ("indy7L", 15)              : "delonghi01Tray",
+            ("indy7L", 16)              : "delonghi01Tray",
+            ("indy7L", 17)              : "pickupATray",
+            ("indy7L", 18)              : "home",
+            ("indy7L", 21)              : "middleBTray",
+            ("indy7L", 22)              : "middleBTray",
+            ("indy7L", 23)              : "home",
+            # 단독 공정 파이프라인 전용 : 1번 드롱기 트레이 -> 홈 (아이스/핫), 홈 -> 1번 드롱기 트레이 (아이스/핫)
+            ("indy7L", 31)              : "home",
+            ("indy7L", 32)              : "home",
+            ("indy7L", 33)              : "delonghi01Tray",
+            ("indy7L", 34)              : "delonghi01Tray",
+
+            ("ur5", 1)                  : "middleBTray",
+            ("ur5", 2)                  : "delonghi01Tray",
+            ("ur5", 3)                  : "home",
+            ("ur5", 4)                  : "delonghi01Tray",
+            ("ur5", 5)                  : "pickupBTray",
+            ("ur5", 6)                  : "home",
+
+            ("indy7R", 1)               : "middleBTray",
+            ("indy7R", 2)               : "delonghi02Tray",
+            ("indy7R", 3)               : "home",
+            ("indy7R", 4)               : "delonghi02Tray",
+            ("indy7R", 5)               : "pickupCTray",
+            ("indy7R", 6)               : "home",
+        }
+
+        # 드롱기 트레이 위치 -> 드롱기 장비명
+        self.machineTrayDict            :dict[str, str]     = {
+            "delonghi01Tray"            : "delonghi01",
+            "delonghi02Tray"            : "delonghi02",
+        }
+
+        # PLC M000 ~ M006 비트 -> 트레이 위치 (컨트롤러의 sensorStateList 인덱스 매핑과 동일)
+        self.plcSensorTrayList          :list[str]          = [
+            "middleATray", "middleBTray", "delonghi01Tray", "delonghi02Tray", "pickupBTray", "pickupCTray", "pickupATray"
+        ]
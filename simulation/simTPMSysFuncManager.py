@@ -0,0 +1,147 @@
+import threading
+
+from simulation.virtualClock import VirtualClock
+from simulation.simCell import SimCell, SimOrder, COFFEE_AMERICANO, COFFEE_ESPRESSO
+from simulation.simCellConfig import SimCellConfig
+from simulation.simVariables import SimCommVar
+
+
+
+
+class SimTPMSysFuncManager():
+    '''
+    ### TPMSysFuncManager 대체 클래스
+    - 컨트롤러가 사용하는 로봇/그리퍼/드롱기/CRC 기능을 시뮬레이션 셀 동작으로 변환한다.
+    - 로봇 모션 함수는 실제와 같이 모션 완료(피드백 수신)까지 호출한 쓰레드를 블로킹한다.
+    '''
+
+
+
+    def __init__(self, cell:SimCell, clock:VirtualClock, config:SimCellConfig):
+        self.__cell                     :SimCell        = cell
+        self.__clock                    :VirtualClock   = clock
+        self.__config                   :SimCellConfig  = config
+        self.__lock                     :threading.Lock = threading.Lock()
+
+        self.__trayNum                  :int            = 2
+        self.__curOrder                 :SimOrder       = None
+
+
+
+    def initSysFuncVar(self):
+        pass
+
+    def initIndyModbusCmd(self, indyComm:SimCommVar):
+        pass
+
+    def initDHGripperVar(self, gripperComm:SimCommVar):
+        pass
+
+
+
+    # CRC 서버 ====================================================================================================================
+
+    def runCRCCommunication(self, crcComm:SimCommVar, storeId:int, printerId:int, trayNum:int):
+        self.__trayNum = trayNum
+
+
+
+    def getCRCOrderId(self) -> int:
+        '''
+        도착한 주문이 있으면 현재 주문으로 지정하고 orderId 반환. 없으면 -1
+        '''
+        with self.__lock:
+            order = self.__cell.fetchOrder()
+            if order == None:
+                return -1
+
+            self.__curOrder = order
+            return order.orderId
+
+
+
+    def getCRCOrderMenuList(self) -> list[int]:
+        '''
+        현재 주문의 메뉴 리스트 (트레이 개수만큼 -1 로 채움)
+        '''
+        with self.__lock:
+            if self.__curOrder == None:
+                return [-1] * self.__trayNum
+
+            menuIdList :list[int] = self.__curOrder.menuIdList[:self.__trayNum]
+            self.__curOrder.nextMenuIndex = len(self.__curOrder.menuIdList)
+            return menuIdList + [-1] * (self.__trayNum - len(menuIdList))
+
+
+
+    def getCRCOrderMenu(self) -> int:
+        '''
+        현재 주문의 다음 메뉴. 더 이상 없으면 -1
+        '''
+        with self.__lock:
+            if self.__curOrder == None or self.__curOrder.nextMenuIndex >= len(self.__curOrder.menuIdList):
+                return -1
+
+            menuId :int = self.__curOrder.menuIdList[self.__curOrder.nextMenuIndex]
+            self.__curOrder.nextMenuIndex += 1
+            return menuId
+
+
+
+    def getCRCOrderNumber(self) -> int:
+        with self.__lock:
+            return -1 if self.__curOrder == None else self.__curOrder.orderId
+
+
+
+    def publishCRCOrderComplete(self, crcComm:SimCommVar, storeId:int, orderId:int) -> bool:
+        '''
+        브로커 전송 시간만큼 블로킹. 연결 장애 구간이면 False
+        '''
+        self.__clock.sleep(self.__config.timing.crcPublishSec)
+
+        outageSecRange = self.__config.fault.crcOutageSecRange
+        if outageSecRange != None and outageSecRange[0] <= self.__clock.now() < outageSecRange[1]:
+            return False
+
+        self.__cell.completeOrder(orderId)
+        return True
+
+
+
+    # 로봇 / 그리퍼 =================================================================================================================
+
+    def sendIndyModbusCmd(self, indyComm:SimCommVar, cmdAddr:int, programId:int, feedbackAddr:int, startFeedback:int, finFeedback:int):
+        self.__cell.runMotion(indyComm.deviceName, programId)
+
+    def sendURCmd(self, urComm:SimCommVar, programId:int):
+        self.__cell.runMotion(urComm.deviceName, programId)
+
+    def holdDHGripper(self, gripperComm:SimCommVar):
+        self.__cell.holdGripper(gripperComm.deviceName)
+
+    def releaseDHGripper(self, gripperComm:SimCommVar):
+        self.__cell.releaseGripper(gripperComm.deviceName)
+
+
+
+    # 드롱기 =======================================================================================================================
+
+    def getDelonghiStateCode(self, delonghiComm:SimCommVar) -> int:
+        self.__clock.sleep(self.__config.timing.bleReadSec)
+        return self.__cell.getDelonghiState(delonghiComm.deviceName)
+
+    def decodeDelonghiStateCode(self, payload:bytes) -> int:
+        '''
+        SimBLEVar 상태 알림 값 (상태 코드 1 byte)
+        '''
+        return payload[0]
+
+    def brewDelonghiAmericano(self, delonghiComm:SimCommVar):
+        self.__cell.brew(delonghiComm.deviceName, COFFEE_AMERICANO)
+
+    def brewDelonghiEspresso(self, delonghiComm:SimCommVar):
+        self.__cell.brew(delonghiComm.deviceName, COFFEE_ESPRESSO)
+
+    def wakeupDeloghi(self, delonghiComm:SimCommVar):
+        self.__cell.wakeupDelonghi(delonghiComm.deviceName)
@@ -0,0 +1,142 @@
+from simulation.virtualClock import VirtualClock, VirtualCondition, VirtualThread
+from simulation.simCell import SimCell
+from simulation.simCellConfig import SimCellConfig
+
+
+
+
+class SimCommVar():
+    '''
+    ### 시뮬레이션 통신 변수 공통 클래스
+    - connect() 에 전달된 주소(IP, MAC)로 시뮬레이션 셀의 장비를 찾는다.
+    - 실제 통신 변수와 같이 생성자에서 이벤트 콜백 함수를 전달받는다.
+    '''
+
+    def __init__(self, cell:SimCell, clock:VirtualClock, config:SimCellConfig, eventCallback):
+        self._cell                      :SimCell        = cell
+        self._clock                     :VirtualClock   = clock
+        self._config                    :SimCellConfig  = config
+        self._eventCallback                             = eventCallback
+        self._isConnected               :bool           = False
+        self.deviceName                 :str            = ""
+        self.address                    :str            = ""
+
+    def connect(self, address:str, *args):
+        self.address        = address
+        self.deviceName     = self._config.deviceAddressDict.get(address, address)
+        self._isConnected   = True
+
+    def disconnect(self):
+        self._isConnected   = False
+
+    def isConnected(self) -> bool:
+        return self._isConnected
+
+
+
+
+class SimMelsecPLCVar(SimCommVar):
+    '''
+    ### MelsecPLCVar 대체 클래스
+    '''
+
+    def read(self, address:str, count:int) -> list[int]:
+        '''
+        M 디바이스는 M000 부터 컵 감지 센서값, 그 외 주소는 0
+        '''
+        self._clock.sleep(self._config.timing.plcReadSec)
+        sensorStateList :list[int] = self._cell.readPlcSensors() if address.upper().startswith("M") == True else []
+        startNum        :int       = int(address[1:]) if address.upper().startswith("M") == True else 0
+        sensorStateList = sensorStateList[startNum : startNum + count]
+        return sensorStateList + [0] * max(0, count - len(sensorStateList))
+
+    def write(self, address:str, valueList) -> bool:
+        return True
+
+
+
+
+class SimBLEVar(SimCommVar):
+    '''
+    ### BLEVar 대체 클래스 (드롱기)
+    - setNotifyCallback() 으로 콜백을 등록하면, 드롱기 상태가 바뀔 때마다 bleNotifySec 후 callback(상태 코드 1 byte) 를 호출한다.
+    '''
+
+    def setNotifyCallback(self, callback):
+        self._notifyCallback                = callback
+        self._notifyCond :VirtualCondition  = VirtualCondition(self._clock)
+        self._isNotifyRequested :bool       = False
+
+        self._cell.addDelonghiListener(self.__onDelonghiChanged)
+        VirtualThread(self._clock, target = self.__notifyThreadHandler, daemon = True).start()
+
+    def __onDelonghiChanged(self, delonghiName:str):
+        if delonghiName == self.deviceName:
+            with self._notifyCond:
+                self._isNotifyRequested = True
+                self._notifyCond.notify_all()
+
+    def __notifyThreadHandler(self):
+        '''
+        ### 상태 알림 쓰레드 : 명령으로 상태가 바뀌거나 시간 경과로 상태가 바뀌는 시각에 깨어나 바뀐 상태를 알린다.
+        '''
+        lastState :int = None
+
+        while True:
+
+            state :int = self._cell.getDelonghiState(self.deviceName)
+            if state != lastState:
+                lastState = state
+                self._clock.sleep(self._config.timing.bleNotifySec)
+                self._notifyCallback(bytes([state]))
+                continue
+
+            waitSec :float = self._cell.getDelonghiNextChangeTime(self.deviceName) - self._clock.now()
+
+            with self._notifyCond:
+                self._notifyCond.wait_for(lambda: self._isNotifyRequested == True, None if waitSec == float("inf") else max(0.001, waitSec))
+                self._isNotifyRequested = False
+
+
+
+
+class SimModbusTCPVar(SimCommVar):
+    '''
+    ### ModbusTCPVar 대체 클래스 (로봇)
+    '''
+    pass
+
+
+
+
+class SimTcpIPVar(SimCommVar):
+    '''
+    ### TcpIPVar 대체 클래스 (그리퍼, 컵 디스펜서, 찌꺼기 통 개폐 장치, 주문 UI)
+    '''
+
+    def write(self, msg:str, *args) -> bool:
+        self._clock.sleep(self._config.timing.tcpWriteSec)
+
+        if self.deviceName == "cupDispenser":
+            # '02034101010349' : 아이스(플라스틱) 컵, '0203410201034A' : 핫(종이) 컵
+            self._cell.dispenseCup(msg == "02034101010349")
+        elif self.deviceName == "delonghiContainer":
+            self._cell.writeContainer(msg)
+        elif self.deviceName == "orderUI":
+            self._cell.writeOrderUI(msg)
+
+        return True
+
+
+
+
+class SimMqttVar(SimCommVar):
+    '''
+    ### MqttVar 대체 클래스 (CRC 서버)
+    '''
+
+    def setSubscribeFilter(self, filterData):
+        pass
+
+    def publish(self, topic:str, msg:str) -> bool:
+        return True
@@ -0,0 +1,468 @@
+import threading
+import heapq
+from collections import deque
+import time as _realTime
+import datetime as _realDatetime
+
+
+
+
+class VirtualClock():
+    '''
+    ### 이산 사건(discrete-event) 시뮬레이션용 가상 시계 \n
+    - sleep() 을 호출한 쓰레드는 가상 시간이 깨어날 시각에 도달할 때까지 대기한다.
+    - callAt() 으로 등록한 콜백은 가상 시간이 해당 시각에 도달하면 호출된다. (VirtualCondition 의 timeout 처리에 사용)
+    - 깨어 있는 쓰레드 수(awake)를 추적하여, 모든 쓰레드가 sleep/대기 중이 되면 기다리지 않고 가장 빠른 기상 시각으로 시간을 건너뛴다.
+      (VirtualThreadingModule 의 Thread/Condition/Event 를 사용하는 쓰레드만 추적된다)
+    - 시간 이동 1회의 비용은 깨어난 쓰레드의 처리 시간이므로, 실행 속도는 상태 읽기 주기(polling) 같은 이벤트 수에 비례한다.
+    '''
+
+
+
+    def __init__(self, startEpoch:float = 1700000000.0, idleQuantum:float = 0.0005, stallTimeout:float = 0.01):
+        # config 변수 선언 ------------------------
+        self.__startEpoch               :float      = startEpoch
+        self.__idleQuantum              :float      = idleQuantum
+        self.__stallTimeout             :float      = stallTimeout
+
+        # 일반 변수 선언 --------------------------
+        self.__cond                     :threading.Condition    = threading.Condition()
+        self.__now                      :float      = 0.0
+        # (기상 시각, 순번, 콜백) - 콜백이 None 이면 sleep 중인 쓰레드
+        self.__sleeperHeap              :list       = []
+        self.__sleeperSeq               :int        = 0
+        self.__cancelledSeqSet          :set[int]   = set()
+        self.__activitySeq              :int        = 0
+        self.__awakeCount               :int        = 0
+        self.__isStopped                :bool       = False
+        self.__stopCallbackList         :list       = []
+        self.__driverThread             :threading.Thread = None
+
+
+
+    def start(self):
+        '''
+        ### 가상 시간 진행 쓰레드 시작
+        '''
+        with self.__cond:
+            # start() 를 호출한 쓰레드는 처음 sleep 할 때까지 깨어 있는 쓰레드
+            self.__awakeCount += 1
+
+        self.__driverThread = threading.Thread(target = self.__driverThreadHandler, daemon = True)
+        self.__driverThread.start()
+
+
+
+    def stop(self):
+        '''
+        ### 가상 시간 정지. 대기 중인 모든 쓰레드는 SystemExit 로 종료된다.
+        '''
+        with self.__cond:
+            self.__isStopped = True
+            self.__cond.notify_all()
+
+        for callback in self.__stopCallbackList:
+            callback()
+
+
+
+    def isStopped(self) -> bool:
+        return self.__isStopped
+
+
+
+    def now(self) -> float:
+        '''
+        시뮬레이션 시작 후 경과한 가상 시간(초)
+        '''
+        self.__checkStopped()
+        return self.__now
+
+
+
+    def epoch(self) -> float:
+        '''
+        가상 시간 기준 epoch 시간(초). time.time() 대체용
+        '''
+        return self.__startEpoch + self.now()
+
+
+
+    def sleep(self, sec:float):
+        '''
+        ### 가상 시간 기준으로 sec 초 동안 대기
+        '''
+        with self.__cond:
+            self.__checkStopped()
+
+            if sec is None or sec <= 0:
+                return
+
+            wakeTime :float = self.__now + sec
+            self.__sleeperSeq += 1
+            heapq.heappush(self.__sleeperHeap, (wakeTime, self.__sleeperSeq, None))
+
+            self.__noteBlocked()
+
+            while self.__now < wakeTime and self.__isStopped == False:
+                self.__cond.wait()
+
+            self.__checkStopped()
+
+
+
+    def sleepUntil(self, targetTime:float):
+        '''
+        ### 가상 시간이 targetTime 에 도달할 때까지 대기
+        '''
+        self.sleep(targetTime - self.now())
+
+
+
+    def callAt(self, targetTime:float, callback) -> int:
+        '''
+        ### 가상 시간이 targetTime 에 도달하면 callback() 호출 (가상 시간 진행 쓰레드에서 호출됨)
+        - 반환값 : cancel() 에 사용하는 핸들
+        '''
+        with self.__cond:
+            self.__sleeperSeq += 1
+            heapq.heappush(self.__sleeperHeap, (max(targetTime, self.__now), self.__sleeperSeq, callback))
+            return self.__sleeperSeq
+
+
+
+    def cancel(self, handle:int):
+        with self.__cond:
+            self.__cancelledSeqSet.add(handle)
+
+
+
+    def addStopCallback(self, callback):
+        '''
+        stop() 시 호출할 콜백 등록 (가상 시계 밖에서 대기 중인 쓰레드를 깨우는 용도)
+        '''
+        with self.__cond:
+            self.__stopCallbackList.append(callback)
+
+
+
+    def noteBlocked(self):
+        '''
+        쓰레드가 sleep 이 아닌 방법(VirtualCondition 등)으로 대기를 시작함을 알림
+        '''
+        with self.__cond:
+            self.__noteBlocked()
+
+
+
+    def noteWoken(self, threadNum:int):
+        '''
+        대기 중이던 쓰레드 threadNum 개가 깨어났음을 알림 (다시 대기할 때까지 시간을 진행하지 않음)
+        '''
+        if threadNum <= 0:
+            return
+
+        with self.__cond:
+            self.__awakeCount   += threadNum
+            self.__activitySeq  += 1
+
+
+
+    def __noteBlocked(self):
+        self.__activitySeq += 1
+        if self.__awakeCount > 0:
+            self.__awakeCount -= 1
+        self.__cond.notify_all()
+
+
+
+    def __checkStopped(self):
+        # 시뮬레이션 종료 후 가상 시계를 사용하는 쓰레드는 SystemExit 로 종료시킨다. (쓰레드에서는 traceback 없이 종료됨)
+        if self.__isStopped == True and threading.current_thread() is not threading.main_thread():
+            raise SystemExit()
+
+
+
+    def __driverThreadHandler(self):
+        '''
+        ### 가상 시간 진행 쓰레드 \n
+        - 깨어난 쓰레드가 모두 다시 대기하면 바로 다음 기상 시각으로 이동
+        - 깨어난 쓰레드가 추적되지 않는 방법(Queue, Lock 등)으로 대기하는 경우를 위해, idleQuantum 단위로 활동을 확인하여 stallTimeout 동안 활동이 없으면 이동
+        '''
+        while True:
+
+            callbackList :list = []
+
+            with self.__cond:
+
+                if self.__isStopped == True:
+                    break
+
+                # 취소된 콜백 제거
+                while len(self.__sleeperHeap) > 0 and self.__sleeperHeap[0][1] in self.__cancelledSeqSet:
+                    self.__cancelledSeqSet.discard(heapq.heappop(self.__sleeperHeap)[1])
+
+                if len(self.__sleeperHeap) == 0:
+                    self.__cond.wait(self.__idleQuantum)
+                    continue
+
+                # 실제 경과 시간 대신 활동 없는 idleQuantum 횟수로 판단 (프로세스가 CPU 를 못 받은 시간은 제외)
+                activitySeq     :int    = self.__activitySeq
+                idleQuantumNum  :int    = 0
+                stallQuantumNum :int    = max(1, int(self.__stallTimeout / self.__idleQuantum))
+
+                while self.__isStopped == False and self.__awakeCount > 0:
+                    self.__cond.wait(self.__idleQuantum)
+
+                    if activitySeq != self.__activitySeq:
+                        activitySeq     = self.__activitySeq
+                        idleQuantumNum  = 0
+                        continue
+
+                    idleQuantumNum += 1
+                    if idleQuantumNum >= stallQuantumNum:
+                        break
+
+                if self.__isStopped == True:
+                    break
+
+                wakeTime    :float  = self.__sleeperHeap[0][0]
+                wokenCount  :int    = 0
+                while len(self.__sleeperHeap) > 0 and self.__sleeperHeap[0][0] <= wakeTime:
+                    _, seq, callback = heapq.heappop(self.__sleeperHeap)
+
+                    if seq in self.__cancelledSeqSet:
+                        self.__cancelledSeqSet.discard(seq)
+                    elif callback == None:
+                        wokenCount += 1
+                    else:
+                        callbackList.append(callback)
+
+                if wakeTime > self.__now:
+                    self.__now = wakeTime
+
+                self.__awakeCount   = wokenCount
+                self.__activitySeq  += 1
+                self.__cond.notify_all()
+
+            # 콜백은 다른 쓰레드의 lock 을 잡을 수 있으므로 가상 시계 lock 밖에서 호출
+            for callback in callbackList:
+                callback()
+
+
+
+
+class VirtualTimeModule():
+    '''
+    ### 'time' 모듈 대체 객체
+    - 컨트롤러 모듈의 전역 time 을 이 객체로 교체하면 time.sleep() 이 가상 시간을 진행시킨다.
+    '''
+
+    def __init__(self, clock:VirtualClock):
+        self.__clock :VirtualClock = clock
+
+    def sleep(self, sec:float):
+        self.__clock.sleep(sec)
+
+    def time(self) -> float:
+        return self.__clock.epoch()
+
+    def monotonic(self) -> float:
+        return self.__clock.now()
+
+    def perf_counter(self) -> float:
+        return self.__clock.now()
+
+    def __getattr__(self, name:str):
+        return getattr(_realTime, name)
+
+
+
+
+class VirtualDatetimeModule():
+    '''
+    ### 'datetime' 모듈 대체 객체
+    - datetime.datetime.now() 가 가상 시간을 반환한다.
+    '''
+
+    def __init__(self, clock:VirtualClock):
+
+        class _VirtualDatetime(_realDatetime.datetime):
+
+            @classmethod
+            def now(cls, tz = None):
+                return _realDatetime.datetime.fromtimestamp(clock.epoch(), tz)
+
+        self.datetime = _VirtualDatetime
+
+    def __getattr__(self, name:str):
+        return getattr(_realDatetime, name)
+
+
+
+
+class VirtualCondition():
+    '''
+    ### threading.Condition 대체 클래스
+    - wait(timeout) / wait_for(predicate, timeout) 의 timeout 을 가상 시간 기준으로 처리한다.
+    - 대기/깨어남을 가상 시계에 알려, 깨어난 쓰레드가 다시 대기할 때까지 가상 시간이 진행되지 않도록 한다.
+    '''
+
+    def __init__(self, clock:VirtualClock, lock = None):
+        self.__clock                    :VirtualClock           = clock
+        self.__cond                     :threading.Condition    = threading.Condition(lock)
+        # 대기 중인 쓰레드의 깨어남 표시 [bool] (대기 시작 순서). notify 는 먼저 대기한 쓰레드부터 깨우므로 같은 순서로 꺼낸다.
+        self.__waiterQueue              :deque                  = deque()
+
+        clock.addStopCallback(self.__onTimeout)
+
+    def __enter__(self):
+        return self.__cond.__enter__()
+
+    def __exit__(self, *args):
+        return self.__cond.__exit__(*args)
+
+    def acquire(self, *args):
+        return self.__cond.acquire(*args)
+
+    def release(self):
+        self.__cond.release()
+
+    def wait(self, timeout:float = None) -> bool:
+        handle :int = None
+        if timeout != None:
+            handle = self.__clock.callAt(self.__clock.now() + timeout, self.__onTimeout)
+
+        waiter :list = [False]
+        self.__waiterQueue.append(waiter)
+        self.__clock.noteBlocked()
+        try:
+            self.__cond.wait()
+        finally:
+            # notify 없이 깨어남 (예외 등) -> 직접 깨어난 쓰레드로 알림
+            if waiter[0] == False:
+                self.__waiterQueue.remove(waiter)
+                self.__clock.noteWoken(1)
+            if handle != None:
+                self.__clock.cancel(handle)
+
+        self.__clock.now()      # 시뮬레이션 종료로 깨어난 경우 SystemExit
+        return True
+
+    def wait_for(self, predicate, timeout:float = None):
+        endTime :float = None if timeout == None else self.__clock.now() + timeout
+        result = predicate()
+
+        while not result:
+            if endTime != None:
+                waitSec :float = endTime - self.__clock.now()
+                if waitSec <= 0:
+                    break
+                self.wait(waitSec)
+            else:
+                self.wait()
+            result = predicate()
+
+        return result
+
+    def notify(self, n:int = 1):
+        self.__clock.noteWoken(self.__markWoken(n))
+        self.__cond.notify(n)
+
+    def notify_all(self):
+        self.__clock.noteWoken(self.__markWoken(len(self.__waiterQueue)))
+        self.__cond.notify_all()
+
+    def __markWoken(self, n:int) -> int:
+        '''
+        아직 깨우지 않은 대기 쓰레드 중 먼저 대기한 n 개를 깨어남으로 표시. 반환값 : 표시한 수 (이미 깨운 쓰레드는 다시 세지 않음)
+        '''
+        wokenNum :int = 0
+        while wokenNum < n and len(self.__waiterQueue) > 0:
+            self.__waiterQueue.popleft()[0] = True
+            wokenNum += 1
+
+        return wokenNum
+
+    def __onTimeout(self):
+        with self.__cond:
+            self.notify_all()
+
+
+
+
+class VirtualEvent():
+    '''
+    ### threading.Event 대체 클래스 (timeout 을 가상 시간 기준으로 처리)
+    '''
+
+    def __init__(self, clock:VirtualClock):
+        self.__cond                     :VirtualCondition   = VirtualCondition(clock)
+        self.__flag                     :bool               = False
+
+    def is_set(self) -> bool:
+        return self.__flag
+
+    def set(self):
+        with self.__cond:
+            self.__flag = True
+            self.__cond.notify_all()
+
+    def clear(self):
+        with self.__cond:
+            self.__flag = False
+
+    def wait(self, timeout:float = None) -> bool:
+        with self.__cond:
+            return self.__cond.wait_for(lambda: self.__flag, timeout)
+
+
+
+
+class VirtualThread(threading.Thread):
+    '''
+    ### threading.Thread 대체 클래스
+    - 시작한 쓰레드는 첫 대기까지 깨어 있는 쓰레드로, 종료한 쓰레드는 대기 중인 쓰레드로 가상 시계에 알린다.
+    '''
+
+    def __init__(self, clock:VirtualClock, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__clock                    :VirtualClock           = clock
+
+    def start(self):
+        self.__clock.noteWoken(1)
+        try:
+            super().start()
+        except Exception:
+            self.__clock.noteBlocked()
+            raise
+
+    def run(self):
+        try:
+            super().run()
+        finally:
+            self.__clock.noteBlocked()
+
+
+
+
+class VirtualThreadingModule():
+    '''
+    ### 'threading' 모듈 대체 객체
+    - Condition, Event 는 가상 시간 기준으로 동작하고, Thread 는 시작/종료를 가상 시계에 알린다. 나머지(Lock 등)는 실제 threading 모듈을 사용한다.
+    '''
+
+    def __init__(self, clock:VirtualClock):
+        self.__clock :VirtualClock = clock
+
+    def Thread(self, *args, **kwargs) -> threading.Thread:
+        return VirtualThread(self.__clock, *args, **kwargs)
+
+    def Condition(self, lock = None) -> VirtualCondition:
+        return VirtualCondition(self.__clock, lock)
+
+    def Event(self) -> VirtualEvent:
+        return VirtualEvent(self.__clock)
+
+    def __getattr__(self, name:str):
+        return getattr(threading, name)
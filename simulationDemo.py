@@ -0,0 +1,22 @@
+import sys
+
+from simulation.cellSimulator import CellSimulator
+from simulation.simCellConfig import SimCellConfig
+
+if __name__ == "__main__" :
+
+    # 사용법 : python simulationDemo.py [시뮬레이션 시간(h)] [평균 주문 간격(s)]
+    hours               :float = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    meanInterArrivalSec :float = float(sys.argv[2]) if len(sys.argv) > 2 else 90.0
+
+    # (컨트롤러 모듈, 클래스, 리포트 이름, 생성 인자)
+    for controllerModuleName, controllerClassName, name, controllerArgDict in [
+        ("singleProcessController", "SingleProcessController", None, None),
+        ("singleProcessController", "SingleProcessController", "SingleProcessController(pipelined)", {"isPipelined" : True}),
+        ("multiProcessController", "MultiProcessController", None, None),
+    ]:
+        config = SimCellConfig()
+        config.order.meanInterArrivalSec = meanInterArrivalSec
+
+        report = CellSimulator(controllerModuleName, controllerClassName, config, name, controllerArgDict = controllerArgDict).run(hours * 3600)
+        print(report.toText())
@@ -1,7 +1,8 @@
 import threading
 import sys
 import time
-import datetime
+
+from array import array
 
 from variable.bleVar import BLEVar
 from variable.melsecPLCVar import MelsecPLCVar
@@ -19,8 +20,31 @@ from const.modbusFuncCode import ModbusFuncCode
 
 from data.mainData import MainData
 from data.mqttFilterData import MqttFilterData
+from data.recipeData import RecipeDeviceData, RecipePlanData, RecipeRunData
+from data.orderData import DrinkJobData, IntakeOrderData
+from data.cellTopologyData import CellTopologyData, RobotTopologyData
 
 from manager.tpmSysFuncManager import TPMSysFuncManager
+from manager.deviceConnectionManager import DeviceConnectionManager
+from manager.deviceRecordManager import DeviceRecordManager
+from manager.orderIntakeManager import OrderIntakeManager
+from manager.crcPublishManager import CRCPublishManager
+from manager.devicePollingManager import DevicePollingManager
+from manager.delonghiMaintenanceManager import DelonghiMaintenanceManager
+from manager.delonghiStatusManager import DelonghiStatusManager
+from manager.cellStateManager import CellStateManager
+from manager.cellTopologyManager import CellTopologyManager
+from manager.timerSchedulerManager import TimerSchedulerManager
+from manager.traceManager import TraceManager
+from manager.metricsManager import MetricsManager
+from manager.recipeManager import RecipeManager
+from manager.timingModelManager import TimingModelManager
+from manager.plcProcessImageManager import PlcProcessImageManager
+from manager.processRecordManager import ProcessRecordManager
+from manager.processMetricsManager import ProcessMetricsManager
+from manager.orderUIManager import OrderUIManager
+from manager.cupDispenserManager import CupDispenserManager
+from manager.robotCommandManager import RobotCommandManager
 
 
 
@@ -29,35 +53,91 @@ class SingleProcessController():
     '''
     해당 클래스는 '[한기대] 공정교육용 로봇 시스템 - 단독 공정 데모'룰 수행하는 기능이 구현되어있다.
     특이사항 : 한번에 최대 1잔만 제조가 가능한 공정이므로, 로봇이 직접 컵을 들고 추출된 커피를 받는다. 
+    파이프라인 모드(isPipelined)는 컵을 1번 드롱기 트레이에 내려놓고, 추출하는 동안 다음 음료의 컵을 받아 두므로 최대 2잔이 동시에 진행된다.
+    파이프라인 모드는 전용 Indy7L 프로그램(31~34, RecipeTable 'singleBrew' 참고)을 로봇에 티칭하고 셀에서 경로를 확인한 후 사용한다.
     '''
 
 
 
-    def __init__(self):
+    def __init__(self, isPipelined:bool = False):
         CDRLog.print("[0%] var init Start.")
+        # 셀 구성 : 같은 셀을 사용하므로 장비 주소와 드롱기 트레이/픽업대 센서의 PLC 주소는 통합 데모의 셀 구성 파일에서 읽는다
+        self.__topologyFilePath         :str        = "topology/multiProcessTopology.json"
+        try:
+            self.__topology             :CellTopologyData = CellTopologyManager(self.__topologyFilePath).load()
+        except Exception as e:
+            CDRLog.print(f"셀 구성 불러오기 실패 : {self.__topologyFilePath} : {e}")
+            sys.exit()
+
 		# config 변수 선언 ------------------------
         self.__trayNum                  :int        = 2
+        # 파이프라인 모드 : Indy7L 이 컵을 드롱기 트레이에 내려놓고 추출하는 동안 다음 음료의 컵을 받는다 (False : 컵을 든 채로 추출)
+        self.__isPipelined              :bool       = isPipelined
         
         self.__indyCmdAddr              :int        = 0
         self.__indyFeedbackAddr         :int        = 1
         self.__indyStartFeedback        :int        = 100
         self.__indtFinFeedback          :int        = 0
+
+        self.__connectionDeadlineSec    :float      = 60.0
+        # 제조를 기다릴 수 있는 최대 주문 수, 주문 접수를 중단/재개하는 예상 대기 시간, 음료 1잔 처리 간격 초기값 (약 50잔/h)
+        self.__maxPendingOrderNum       :int        = 20
+        self.__maxOrderWaitSec          :float      = 900.0
+        self.__resumeOrderWaitSec       :float      = 600.0
+        self.__drinkIntervalSec         :float      = 70.0
+        # 주문이 없을 때 다음 주문을 기다리는 최대 시간
+        self.__orderWaitSec             :float      = 1.0
         
         
 		# 일반 변수 선언 --------------------------
         self.__orderId                  :int        = -1##
         self.__menuId                   :int        = -1
-
-        # 센서 상태 : 감지(1), 미감지(0)
-        self.__hasCupOnMiddleATray      :int        = 1
-        self.__hasCupOnMiddleBTray      :int        = 1
-        self.__hasCupOnDeloghi01Tray    :int        = 1
-        self.__hasCupOnDeloghi02Tray    :int        = 1
-        self.__hasCupOnPickupATray      :int        = 1
-        self.__hasCupOnPickupBTray      :int        = 1
-        self.__hasCupOnPickupCTray      :int        = 1
-        
-        self.__delonghi01Status         :int        = DelonghiState.NOT_READY
+        # 주문에서 현재 제조 중인 음료 순번 (동작 구간 기록용)
+        self.__menuIndex                :int        = -1
+        # 제조 중인 주문의 주문 번호, 메뉴 목록, 주문을 받은 시간 (time.time 기준)
+        self.__orderNumber              :int        = -1
+        self.__menuIdList               :list[int]  = []
+        self.__orderReceiveTime         :float      = 0.0
+        self.__isConnecting             :bool       = False
+
+        # (파이프라인 모드) 1번 드롱기 트레이에서 추출 중인 음료, 없으면 None
+        self.__brewingDrinkJob          :DrinkJobData = None
+        # (파이프라인 모드) 추출 중인 음료가 주문의 마지막 음료이면 그 주문의 수신 시간 (픽업대에 놓인 후 주문 완료), 아니면 -1
+        self.__brewingOrderReceiveTime  :float      = -1.0
+
+        # 트레이 센서/드롱기 상태 저장소 : 조건을 만족할 때까지 polling 없이 대기
+        self.__cellState                :CellStateManager = CellStateManager()
+        self.__stateWaitTimeoutSec      :float      = 1.0
+
+        # 레시피 진행 알림 (셀 상태 변경, 장비 명령 완료) : 알림마다 version 증가 -> 커피 제조 쓰레드를 깨운다
+        self.__stateChangedCond         :threading.Condition = threading.Condition()
+        self.__stateVersion             :int        = 0
+
+        # 픽업대 주문 번호 표시 해제 등 예약 작업 (쓰레드 1개에서 실행)
+        self.__timerScheduler           :TimerSchedulerManager = TimerSchedulerManager("주문UI 예약")
+        # 픽업대(slot) -> 픽업대 센서
+        self.__pickupSensorKeyDict      :dict[str, str] = {tray.uiSlot : tray.sensorKey for tray in self.__topology.trayDict.values()}
+
+        # 실행 기록 : 장비 동작 구간, 장비 동작 시간 학습(확인 대기 단계의 최대 대기 시간에 사용), 장비 통신 기록/재생
+        # 장비 통신 기록/재생 : "record" 는 모든 통신 변수의 요청/응답을 기록, "replay" 는 장비 대신 기록 파일로 실행 ("" : 사용 안 함)
+        self.__deviceRecordMode         :str        = ""
+        self.__processRecord            :ProcessRecordManager = ProcessRecordManager("singleProcess", self.__deviceRecordMode)
+        self.__processRecord.load()
+        self.__traceManager             :TraceManager = self.__processRecord.getTraceManager()
+        self.__timingModel              :TimingModelManager = self.__processRecord.getTimingModel()
+        self.__deviceRecord             :DeviceRecordManager = self.__processRecord.getDeviceRecord()
+
+        # 운영 지표 : http://127.0.0.1:9100/metrics (Prometheus text 형식)
+        self.__metrics                  :MetricsManager = MetricsManager()
+        self.__metricsPort              :int        = 9100
+
+        # 장비별 상태 읽기 주기
+        self.__statusPoller             :DevicePollingManager = DevicePollingManager()
+        self.__plcFastPollingSec        :float      = 0.05
+        self.__delonghiFastPollingSec   :float      = 0.2
+        self.__idlePollingSec           :float      = 1.0
+        # 드롱기 상태 알림을 사용하면 상태 읽기는 연결 확인용으로만
+        self.__delonghiLivenessPollingSec :float    = 5.0
 
         self.__tpmSysFuncManager    :TPMSysFuncManager = TPMSysFuncManager() 
         self.__tpmSysFuncManager.initSysFuncVar() 
@@ -65,57 +145,120 @@ class SingleProcessController():
         
         self.__tpmSysFuncManager.__storeId                   = 7
         self.__tpmSysFuncManager.__printerId                 = 7
-        
+
         
         CDRLog.print("[30%] Comm init Start.")
         # 통신 변수 선언 --------------------------------------------------------
-        self.__plcComm              :MelsecPLCVar = MelsecPLCVar(self.commVarEventCallback)
-        self.__plcComm.connect("192.168.3.60", 9988)
-        
-        self.__delonghi01Comm       :BLEVar = BLEVar(self.commVarEventCallback)
-        self.__delonghi01Comm.connect("00:A0:50:3D:86:d7", "00035b03-58e6-07dd-021a-08123a000300", "00035b03-58e6-07dd-021a-08123a000301", "00002902-0000-1000-8000-00805f9b34fb")
-
-        self.__delonghiContainer  :TcpIPVar = TcpIPVar(self.commVarEventCallback)
-        self.__delonghiContainer.connect("192.168.3.123", 60000)
-  
-        self.__crcComm              :MqttVar = MqttVar(self.commVarEventCallback)
-        self.__crcComm.connect("b85b26e22ac34763bd9cc18d7f655038.s2.eu.hivemq.cloud", 8883, "admin", "201103crcBroker", ["crc/jts", "print/mbrush"])
-        self.__crcComm.setSubscribeFilter(MqttFilterData(CRCKey.KEY_STORE_ID, self.__tpmSysFuncManager.__storeId))
+        self.__plcComm              :MelsecPLCVar = self.__deviceRecord.createVar(MelsecPLCVar, "PLC", self.commVarEventCallback)
+        # PLC 신호(PlcSignalTable + 셀 구성의 드롱기/픽업대 센서)를 주기마다 일괄 읽기 요청으로 읽는 프로세스 이미지
+        self.__plcImage             :PlcProcessImageManager = PlcProcessImageManager(self.__plcComm, CellTopologyManager.getPlcSignalDict(self.__topology))
+        CDRLog.print(f"PLC 신호 {len(self.__plcImage.getSignalNameList())}개, 읽기 요청 {len(self.__plcImage.getBlockList())}회/주기")
+        self.__delonghi01Comm       :BLEVar = self.__deviceRecord.createVar(BLEVar, "1번 드롱기", self.commVarEventCallback)
+        self.__delonghiContainer    :TcpIPVar = self.__deviceRecord.createVar(TcpIPVar, "찌꺼기통", self.commVarEventCallback)
+        self.__crcComm              :MqttVar = self.__deviceRecord.createVar(MqttVar, "CRC", self.commVarEventCallback)
+        # CRC 서버 주문 완료 전송 (전송하지 못한 메시지는 스풀 파일에 저장)
+        self.__crcPublishSpoolFilePath  :str        = "spool/singleProcessCrc.jsonl"
+        self.__crcPublisher         :CRCPublishManager = CRCPublishManager(self.__tpmSysFuncManager, self.__crcComm, self.__crcPublishSpoolFilePath)
         
         ############ TEST 시 주석처리
-        self.__cupDispenser         :TcpIPVar = TcpIPVar(self.commVarEventCallback)
-        self.__cupDispenser.connect("192.168.3.110", 5000)
+        self.__cupDispenser         :TcpIPVar = self.__deviceRecord.createVar(TcpIPVar, "컵디스펜서", self.commVarEventCallback)
+        self.__cupDispenserManager  :CupDispenserManager = CupDispenserManager(self.__cupDispenser, self.__traceManager)
         
         # 로봇 통신 변수 선언
         # 로봇은 정면을 기준으로 좌측부터 indy7 -> UR5 -> indy7 순서로 배치됨
-        self.__indy7LComm           :ModbusTCPVar = ModbusTCPVar(self.commVarEventCallback)
-        self.__indy7LComm.connect("192.168.3.101", 502)
+        self.__indy7LComm           :ModbusTCPVar = self.__deviceRecord.createVar(ModbusTCPVar, "Indy7L", self.commVarEventCallback)
 
         ############ TEST 시 주석처리
-        self.__indy7LGripperComm    :TcpIPVar = TcpIPVar(self.commVarEventCallback)
-        self.__indy7LGripperComm.connect("192.168.3.160", 5000)
-        self.__tpmSysFuncManager.initDHGripperVar(self.__indy7LGripperComm)    
+        self.__indy7LGripperComm    :TcpIPVar = self.__deviceRecord.createVar(TcpIPVar, "Indy7L_그리퍼", self.commVarEventCallback)
         
-        
-        self.__order_UI             :TcpIPVar = TcpIPVar(self.commVarEventCallback)
-        self.__order_UI.connect("127.0.0.1", 6666)          
+        self.__order_UI             :TcpIPVar = self.__deviceRecord.createVar(TcpIPVar, "주문UI", self.commVarEventCallback)
+        # 주문 UI 표시 (픽업대 주문 번호, 주문 접수 중단 시 예상 대기 시간)
+        self.__orderUIManager       :OrderUIManager = OrderUIManager(self.__order_UI, self.__timerScheduler, self.__cellState, self.__pickupSensorKeyDict)
+
+        # 주문 접수 대기열 : CRC 서버의 주문을 받아 두고, 이전 주문이 끝나면 꺼낸다
+        self.__orderIntake              :OrderIntakeManager = OrderIntakeManager(
+            self.__tpmSysFuncManager, self.__fetchCRCOrderMenu, self.__maxPendingOrderNum, self.__maxOrderWaitSec, self.__resumeOrderWaitSec, self.__drinkIntervalSec,
+            # 1잔 주문은 최대 priorityStepSec(60초) 먼저 받은 주문보다 앞서 제조 (평균 대기 시간 감소)
+            priorityFunc = lambda menuIdList: 1 if len(menuIdList) == 1 else 0,
+            backpressureCallback = self.__orderUIManager.showWaitTime
+        )
+
+        # 드롱기 오류 상태별 유지보수 관리 (찌꺼기 통 개폐, 휴면 해제)
+        self.__delonghiMaintenance  :DelonghiMaintenanceManager = DelonghiMaintenanceManager(self.__delonghiContainer, self.__tpmSysFuncManager)
+        self.__delonghiMaintenance.addDelonghi(1, self.__delonghi01Comm)
+
+        # 드롱기 상태 알림 수신 (알림을 지원하지 않으면 상태 읽기)
+        self.__delonghiStatus       :DelonghiStatusManager = DelonghiStatusManager(self.__tpmSysFuncManager, self.__statusPoller,
+                                                                                   self.__delonghiFastPollingSec, self.__idlePollingSec, self.__delonghiLivenessPollingSec)
+
+        # 운영 지표 등록 (단독/통합 공정 공통 지표)
+        ProcessMetricsManager.addMetrics(self.__metrics, lambda: (0 if self.__orderId == -1 else 1) + (1 if self.__brewingOrderReceiveTime >= 0 else 0), ["Indy7L"], self.__traceManager, self.__orderIntake,
+                                         self.__crcPublisher, self.__statusPoller, self.__delonghiStatus)
+
+        # 재생 모드 : 기록된 장비 이벤트 재생 시작
+        self.__deviceRecord.start()
+
+        # 모든 장비를 동시에 연결 (장비별 제한 시간/재시도, 전체 제한 시간 적용) : 장비 주소는 셀 구성 파일에서 읽는다
+        connectionManager           :DeviceConnectionManager = DeviceConnectionManager()
+        addressDict                 :dict[str, list] = self.__topology.deviceAddressDict
+        indy7L                      :RobotTopologyData = self.__topology.robotDict["Indy7L"]
+        connectionManager.addDevice("PLC", self.__plcComm, lambda: self.__plcComm.connect(*addressDict["PLC"]))
+        connectionManager.addDevice("1번 드롱기", self.__delonghi01Comm, lambda: self.__delonghi01Comm.connect(*self.__topology.delonghiDict[1].address), timeoutSec = 20.0)
+        connectionManager.addDevice("찌꺼기통", self.__delonghiContainer, lambda: self.__delonghiContainer.connect(*addressDict["찌꺼기통"]))
+        connectionManager.addDevice("CRC", self.__crcComm, lambda: self.__crcComm.connect(*addressDict["CRC"]), timeoutSec = 15.0)
+        connectionManager.addDevice("컵디스펜서", self.__cupDispenser, lambda: self.__cupDispenser.connect(*addressDict["컵디스펜서"]))
+        connectionManager.addDevice("Indy7L", self.__indy7LComm, lambda: self.__indy7LComm.connect(*indy7L.address))
+        connectionManager.addDevice("Indy7L_그리퍼", self.__indy7LGripperComm, lambda: self.__indy7LGripperComm.connect(*indy7L.gripperAddress))
+        connectionManager.addDevice("주문UI", self.__order_UI, lambda: self.__order_UI.connect(*addressDict["주문UI"]))
+
+        self.__isConnecting = True
+        if connectionManager.connectAll(self.__connectionDeadlineSec) == False:
+            CDRLog.print(f"장비 연결 실패 : {connectionManager.getFailedDeviceNameList()}")
+            self.__terminateSystem()
+        self.__isConnecting = False
+
+        # 연결 완료 후 장비 초기화
+        self.__crcComm.setSubscribeFilter(MqttFilterData(CRCKey.KEY_STORE_ID, self.__tpmSysFuncManager.__storeId))
+        self.__tpmSysFuncManager.initDHGripperVar(self.__indy7LGripperComm)    
+
+        # 레시피 단계를 장비별(로봇 팔, 그리퍼, 드롱기) 명령 쓰레드에서 실행 -> 서로 다른 장비의 단계는 동시에 진행
+        self.__robotCommand         :RobotCommandManager = RobotCommandManager(self.__tpmSysFuncManager, self.__notifyStateChanged, self.__traceManager)
+        self.__robotCommand.addRobot(self.__indy7LComm, "Indy7L")
+        self.__robotCommand.addRobot(self.__indy7LGripperComm, "Indy7L 그리퍼")
+        self.__robotCommand.addRobot(self.__delonghi01Comm, "1번 드롱기")
+
+        # 메뉴 레시피 실행 계획 (Indy7L + 1번 드롱기). 제조 중 변환하지 않도록 미리 생성
+        self.__recipe               :RecipeManager = RecipeManager(self.__tpmSysFuncManager, self.__robotCommand, self.__cupDispenserManager.dispense,
+                                                                   (self.__indyCmdAddr, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback), self.__traceManager, self.__timingModel,
+                                                                   self.__cellState)
+        self.__indy7LDevice         :RecipeDeviceData = RecipeDeviceData("Indy7L", self.__indy7LComm, self.__indy7LGripperComm, False, "1번 드롱기", self.__delonghi01Comm,
+                                                                         {"delonghiTray" : "hasCupOnDelonghi01Tray", "delonghiStatus" : "delonghi01Status", "pickupTray" : "hasCupOnPickupATray"})
+        for processName in (["singleCupStage", "singleBrew", "singlePickup", "singleHome"] if self.__isPipelined == True else ["singleMake"]):
+            self.__recipe.precompile(processName, self.__indy7LDevice)
+
         CDRLog.print("[70%] Comm init Complete.")
-        while True:
-            if ( 
-                self.__plcComm.isConnected()
-                and self.__delonghi01Comm.isConnected()
-                and self.__crcComm.isConnected()
-            ):
-                break   
         
         # CRC 서버 통신 처리 쓰레드
         self.__tpmSysFuncManager.runCRCCommunication(self.__crcComm, self.__tpmSysFuncManager.__storeId, self.__tpmSysFuncManager.__printerId, self.__trayNum)
+        # CRC 서버 주문 완료 전송 쓰레드
+        self.__crcPublisher.start()
+        # 주문 접수 쓰레드
+        self.__orderIntake.start()
         CDRLog.print("[100%] Comm connect Complete. Thread Start ")
         # 커피 제조 쓰레드
         threading.Thread(target = self.__coffeeMakingThreadHandler).start()   
 
-        # 드롱기 실시간 상태 체크 쓰레드
-        threading.Thread(target = self.__delonghiAndSensorStatusCheckingThreadHandler).start()   
+        # 드롱기 유지보수(찌꺼기 통 비우기, 휴면 해제) 쓰레드
+        self.__delonghiMaintenance.start()
+
+        # 예약 작업(픽업대 주문 번호 표시 해제) 쓰레드
+        self.__timerScheduler.start()
+
+        # 드롱기/트레이 센서 실시간 상태 체크 (장비별 쓰레드)
+        self.__startStatusPolling()
+
+        # 운영 지표 제공 쓰레드
+        self.__metrics.start("127.0.0.1", self.__metricsPort)
         
         # 키보드 명령 key값 입력 처리 쓰레드
         threading.Thread(target = self.__keyInputThreadHandler).start()    
@@ -133,80 +276,90 @@ class SingleProcessController():
             if MainData.isRunningTPMProgram == False:
                 break
             
-            # 1. orderId 수신 ==========================================================================================================
+            # 1. 주문 접수 대기열에서 다음 주문 꺼내기 ====================================================================================
             if self.__orderId == -1:
-                self.__orderId = self.__tpmSysFuncManager.getCRCOrderId()    
+
+                # 추출 중인 음료가 있으면 추출 완료를 확인할 수 있도록 짧게 기다린다
+                order :IntakeOrderData = self.__orderIntake.popOrder(self.__orderWaitSec if self.__brewingDrinkJob == None else self.__plcFastPollingSec)
+
+                if order != None:
+                    self.__orderId              = order.orderId
+                    self.__orderNumber          = order.orderNumber
+                    self.__menuIdList           = order.menuIdList
+                    self.__orderReceiveTime     = order.receiveTime
+
+                # (파이프라인 모드) 다음 주문이 없으면 추출이 끝난 음료를 바로 픽업대로
+                elif self.__brewingDrinkJob != None and self.__cellState.getSnapshot().delonghi01Status == DelonghiState.READY:
+                    self.__pickupBrewingDrink(False)
             
-            # 2. 주문 메뉴 수신 ========================================================================================================
+            # 2. 다음 메뉴 ===========================================================================================================
             elif self.__menuId == -1:
             
-                self.__menuId = self.__tpmSysFuncManager.getCRCOrderMenu()
+                if self.__menuIndex + 1 < len(self.__menuIdList):
+                    self.__menuIndex += 1
+                    self.__menuId = self.__menuIdList[self.__menuIndex]
                 
                 # 3. orderId는 존재하나, 제조할 주문 메뉴 정보가 더 이상 존재하지 않는다면, -> 주문 완료 처리
                 if self.__menuId == -1:
 
-                    self.__tpmSysFuncManager.publishCRCOrderComplete(self.__crcComm, self.__tpmSysFuncManager.__storeId, self.__orderId)
+                    # (파이프라인 모드) 마지막 음료가 추출 중이면 픽업대에 놓인 후 주문 완료
+                    if self.__brewingDrinkJob != None and self.__brewingDrinkJob.orderId == self.__orderId:
+                        self.__brewingOrderReceiveTime = self.__orderReceiveTime
+                    else:
+                        self.__completeOrder(self.__orderId, self.__orderReceiveTime)
+
                     self.__orderId              = -1
                     self.__menuId               = -1
+                    self.__menuIndex            = -1
                     
             
-            # 4. 타겟 메뉴가 '핫 아메리카노'인 경우 =====================================================================================
-            elif self.__menuId == 1000: 
-                
-                self.__makeHotAmericano()
-                
-
-            # 5. 타겟 메뉴가 '아이스 아메리카노'인 경우 =====================================================================================
-            elif self.__menuId == 1001:
+            # 4. 타겟 메뉴의 레시피대로 제조 =========================================================================================
+            else:
                 
-                self.__makeIceAmericano()
+                with self.__traceManager.context(self.__orderId, self.__menuIndex):
+                    self.__makeDrink(self.__menuId)
 
 
 
     
-    def __delonghiAndSensorStatusCheckingThreadHandler(self):
+    def __startStatusPolling(self):
         '''
-        ### 드롱기 실시간 상태 체크 쓰레드
+        ### 드롱기/트레이 센서 상태 읽기 시작 (읽은 값은 셀 상태 저장소에 반영)
+        - PLC 트레이 센서와 1번 드롱기를 각각 별도 쓰레드에서 읽으므로, 느린 BLE 읽기가 센서 갱신을 늦추지 않는다.
+        - PLC 센서는 제조 중인 주문(추출 중인 음료)이 있는 동안 빠르게 읽는다.
+        - 드롱기 상태는 BLE 상태 알림으로 받고 연결 확인용으로만 느리게 읽는다. (알림 미지원 시 추출 중(NOT_READY)인 동안 빠르게 읽기)
         '''
+        self.__statusPoller.addPoller(
+            "PLC", self.__plcImage.read, self.__onPlcSensorSampled,
+            self.__plcFastPollingSec, self.__idlePollingSec, lambda image: self.__orderId != -1 or self.__brewingDrinkJob != None
+        )
+        self.__delonghiStatus.addDelonghi(
+            "1번 드롱기", self.__delonghi01Comm, self.__onDelonghi01StatusSampled,
+            lambda status: status == DelonghiState.NOT_READY or self.__delonghiMaintenance.isInMaintenance(1)
+        )
+        # 셀 상태가 바뀌면 레시피 대기 단계를 다시 판단하도록 커피 제조 쓰레드를 깨운다
+        self.__cellState.subscribe(lambda cellSnapshot, changedKeySet: self.__notifyStateChanged())
+        self.__statusPoller.start()
 
-        while True:
-            
-            if MainData.isRunningTPMProgram == False:
-                break
 
-            # 주기적으로 드롱기 상태 체크    
-            self.__delonghi01Status         = self.__tpmSysFuncManager.getDelonghiStateCode(self.__delonghi01Comm)
-            
-            #주기적으로 트레이 센서 감지 상태 체크
-            sensorStateList:list[int]       = self.__plcComm.read("M000", 7) 
-            self.__hasCupOnMiddleATray      = sensorStateList[0]
-            self.__hasCupOnMiddleBTray      = sensorStateList[1]
-            self.__hasCupOnDeloghi01Tray    = sensorStateList[2]
-            self.__hasCupOnDeloghi02Tray    = sensorStateList[3]
-            self.__hasCupOnPickupATray      = sensorStateList[6]#[4]
-            self.__hasCupOnPickupBTray      = sensorStateList[4]#[5]
-            self.__hasCupOnPickupCTray      = sensorStateList[5]#[6]
-
-
-            # 1번 드롱기 찌꺼기 통 가득!
-            if self.__delonghi01Status == DelonghiState.ERR_FULL_GROUNDS:
-                
-                self.__delonghiContainer.write("OPEN_1")
-                time.sleep(10)
-                self.__delonghiContainer.write("CLOSE_1")
-                
-            # 1번 드롱기 찌꺼기 통 열림!
-            elif self.__delonghi01Status == DelonghiState.ERR_OPENED_GROUNDS_CONTAINER:
-                
-                self.__delonghiContainer.write("CLOSE_1")
 
-            # 1번 드롱기 휴면 상태!    
-            elif self.__delonghi01Status == DelonghiState.ERR_POWERED_OFF:
+    def __onPlcSensorSampled(self, image:array, isChanged:bool):
+        '''
+        ### PLC 프로세스 이미지에서 바뀐 신호만 셀 상태에 반영
+        '''
+        self.__cellState.update(self.__plcImage.diff(image), "PLC")
 
-                self.__tpmSysFuncManager.wakeupDeloghi(self.__delonghi01Comm)
 
 
-            time.sleep(1)
+    def __onDelonghi01StatusSampled(self, status:int, isChanged:bool):
+        '''
+        ### 1번 드롱기 상태 샘플을 셀 상태에 반영, 오류 상태는 유지보수 요청
+        '''
+        self.__cellState.update({"delonghi01Status" : status}, "1번 드롱기")
+        self.__metrics.setState("delonghi_state_seconds_total", status, {"delonghi" : 1})
+
+        # 오류 상태(찌꺼기 통 가득/열림, 휴면) 처리는 유지보수 쓰레드에서 진행
+        self.__delonghiMaintenance.handleStatus(1, status)
 
 
 
@@ -236,239 +389,188 @@ class SingleProcessController():
         elif eventId == Event.COMM_VAR_FAILED_TO_CONNECT:
             
             CDRLog.print(f"{targetVar} 통신 연결 실패")
-            self.__terminateSystem()
+
+            # 시작 시 연결 실패는 DeviceConnectionManager 가 재시도/제한 시간으로 처리
+            if self.__isConnecting == False:
+                self.__terminateSystem()
 
 
 
-    def __makeHotAmericano(self):
+    def __makeDrink(self, menuId:int):
         '''
-        ### indy7L이 핫 음료를 제조 
+        ### indy7L이 menuId 메뉴를 레시피(RecipeTable 'singleMake' 공정) 순서대로 제조
+        - 1번 드롱기가 비기를 기다려 컵을 받고(아이스는 얼음까지), 컵을 든 채로 추출한 뒤 픽업대A 에 내려놓는다.
+        - 파이프라인 모드는 __makeDrinkPipelined 로 제조한다.
         '''
-        CDRLog.print(f"make hot Americano start")
-        
-        while True:
-
-            if MainData.isRunningTPMProgram == False:
-                return
+        if self.__isPipelined == True:
+            self.__makeDrinkPipelined(menuId)
+            return
 
-            # 1번드롱기에 컵이 없고, 1번드롱기가 제조 가능한 상태이면 break
-            if self.__hasCupOnDeloghi01Tray == 0 and self.__delonghi01Status == DelonghiState.READY:
-                break
+        plan :RecipePlanData = self.__recipe.getPlan(menuId, "singleMake", self.__indy7LDevice)
 
-            time.sleep(1)
+        # 제조할 수 없는 메뉴 -> 다음 메뉴로
+        if plan == None:
+            CDRLog.print(f"Unknown Menu. orderId : {self.__orderId} Menu : {menuId}")
+            self.__menuId               = -1
+            return
 
-        # Indy7L 그리퍼 닫기
-        self.__tpmSysFuncManager.holdDHGripper(self.__indy7LGripperComm) 
+        CDRLog.print(f"make {plan.menuName} start")
 
-        # Indy7L이 컵디스펜서의 핫 음료컵을 받을 수 있는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 1, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
-        
-        # 컵 디스펜서에서 핫 음료컵 배출
-        self.__reqDispensingHotCup()
-        #time.sleep(3)
+        # 셀 상태 대기 중 프로그램 종료
+        if self.__runRecipePlan(plan) == False:
+            return
 
-        # Indy7L이 거치대A에 컵을 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 11, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
-
-        # Indy7L 그리퍼 열기 -> 컵은 거치대A에 place 
-        self.__tpmSysFuncManager.releaseDHGripper(self.__indy7LGripperComm) 
-        #time.sleep(2)
-
-        # Indy7L이 거치대A의 컵 잡는 위치로 이동
-        #self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 12, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
-
-        # Indy7L 그리퍼 닫기
-        self.__tpmSysFuncManager.holdDHGripper(self.__indy7LGripperComm) 
-
-        # Indy7L이 1번 드롱기 컵 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 16, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+        self.__metrics.incCounter("delonghi_brew_total", {"delonghi" : 1})
+        self.__metrics.incCounter("drinks_completed_total", {"menu" : menuId})
+        self.__metrics.markEvent("drinks_per_hour")
+        CDRLog.print(f"{plan.menuName} Make Complete. orderId : {self.__orderNumber} ")
+        self.UI_reset(slot='a',ordernum=self.__orderNumber)
+        self.__menuId               = -1
 
-        # 1번 드롱기에서 아메리카노 제조 명령 전달 (Indy7이 컵 잡은 상태에서 제조)
-        self.__tpmSysFuncManager.brewDelonghiAmericano(self.__delonghi01Comm)
 
-        time.sleep(2)
 
-        while True:
+    def __makeDrinkPipelined(self, menuId:int):
+        '''
+        ### (파이프라인 모드) indy7L이 menuId 메뉴의 컵을 1번 드롱기 트레이에 내려놓고 추출 시작 (RecipeTable 'singleCupStage' -> 'singleBrew' 공정)
+        - 이전 음료가 추출되는 동안 컵을 받아 거치대A 에 내려놓고, 이전 음료를 픽업대A 로 옮긴 후 컵을 드롱기에 놓는다. (아이스는 드롱기에 놓기 직전에 얼음)
+        - 추출이 끝난 음료는 다음 음료의 컵을 받은 후(다음 주문이 없으면 바로) 픽업대A 로 옮긴다. (__pickupBrewingDrink)
+        '''
+        stagePlan :RecipePlanData = self.__recipe.getPlan(menuId, "singleCupStage", self.__indy7LDevice)
 
-            if MainData.isRunningTPMProgram == False:
-                return
+        # 제조할 수 없는 메뉴 -> 다음 메뉴로
+        if stagePlan == None:
+            CDRLog.print(f"Unknown Menu. orderId : {self.__orderId} Menu : {menuId}")
+            self.__menuId               = -1
+            return
 
-            # 픽업대A에 컵이 없고, 1번드롱기 제조가 완료되면 break
-            if self.__hasCupOnPickupATray == 0 and self.__delonghi01Status == DelonghiState.READY:
-                break
+        CDRLog.print(f"make {stagePlan.menuName} start")
 
-            time.sleep(1)
+        # 셀 상태 대기 중 프로그램 종료
+        if self.__runRecipePlan(stagePlan) == False:
+            return
 
-        # Indy7L이 픽업대A의 컵 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 17, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+        if self.__brewingDrinkJob != None and self.__pickupBrewingDrink(True) == False:
+            return
 
-        # Indy7L 그리퍼 열기
-        self.__tpmSysFuncManager.releaseDHGripper(self.__indy7LGripperComm) 
+        if self.__runRecipePlan(self.__recipe.getPlan(menuId, "singleBrew", self.__indy7LDevice)) == False:
+            return
 
-        # Indy7L이 홈위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 18, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
-        
-        
-        CDRLog.print(f"Hot Americano Make Complete. orderId : {self.__tpmSysFuncManager.getCRCOrderNumber()} ")
-        self.UI_reset_thread(slot='a',ordernum = self.__tpmSysFuncManager.getCRCOrderNumber())
+        self.__metrics.incCounter("delonghi_brew_total", {"delonghi" : 1})
+        self.__brewingDrinkJob      = DrinkJobData(self.__orderId, self.__orderNumber, self.__menuIndex, menuId)
         self.__menuId               = -1
 
 
 
-    def __makeIceAmericano(self):
+    def __pickupBrewingDrink(self, isNextCupStaged:bool) -> bool:
         '''
-        ### indy7L이 아이스 음료를 제조     
-        '''      
-        while True:
+        ### (파이프라인 모드) 추출이 끝난 음료를 픽업대A 로 옮기고 완료 처리 (주문의 마지막 음료이면 주문 완료)
+        - isNextCupStaged : 다음 음료의 컵이 거치대A 에 있으면 홈 위치로 돌아가지 않고 바로 다음 컵을 잡으러 간다.
+        - 반환값 : 픽업대에 놓으면 True, 프로그램이 종료되면 False
+        '''
+        drinkJob :DrinkJobData = self.__brewingDrinkJob
 
-            if MainData.isRunningTPMProgram == False:
-                return
+        with self.__traceManager.context(drinkJob.orderId, drinkJob.menuIndex):
+            if self.__runRecipePlan(self.__recipe.getPlan(drinkJob.menuId, "singlePickup", self.__indy7LDevice)) == False:
+                return False
 
-            # 1번드롱기에 컵이 없고, 1번드롱기가 제조 가능한 상태이면 break
-            if self.__hasCupOnDeloghi01Tray == 0 and self.__delonghi01Status == DelonghiState.READY:
-                break
+            if isNextCupStaged == False and self.__runRecipePlan(self.__recipe.getPlan(drinkJob.menuId, "singleHome", self.__indy7LDevice)) == False:
+                return False
 
-            time.sleep(1)
+        self.__brewingDrinkJob      = None
 
-        # Indy7L 그리퍼 닫기
-        self.__tpmSysFuncManager.holdDHGripper(self.__indy7LGripperComm) 
+        self.__metrics.incCounter("drinks_completed_total", {"menu" : drinkJob.menuId})
+        self.__metrics.markEvent("drinks_per_hour")
+        CDRLog.print(f"{self.__recipe.getMenuName(drinkJob.menuId)} Make Complete. orderId : {drinkJob.orderNumber} ")
+        self.UI_reset(slot='a',ordernum=drinkJob.orderNumber)
 
-        # Indy7L이 컵디스펜서의 아이스 음료컵을 받을 수 있는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 2, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
-        
-        # 컵 디스펜서에서 아이스 음료컵 배출
-        self.__reqDispensingIceCup()
-        #time.sleep(3)
+        if self.__brewingOrderReceiveTime >= 0:
+            self.__completeOrder(drinkJob.orderId, self.__brewingOrderReceiveTime)
+            self.__brewingOrderReceiveTime = -1.0
 
-        # Indy7L이 거치대A에 컵을 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 11, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+        return True
 
-        # Indy7L 그리퍼 열기 -> 컵은 거치대A에 place 
-        self.__tpmSysFuncManager.releaseDHGripper(self.__indy7LGripperComm) 
-        #time.sleep(2)
-        
-        # Indy7L 그리퍼 닫기
-        self.__tpmSysFuncManager.holdDHGripper(self.__indy7LGripperComm) 
 
-        # Indy7L이 제빙기로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 14, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
-        
-        # 얼음 추출 대기
-        time.sleep(8)
 
+    def __completeOrder(self, orderId:int, orderReceiveTime:float):
+        '''
+        ### 주문의 모든 음료가 픽업대에 놓임 -> CRC 서버에 주문 완료 전송
+        '''
+        self.__crcPublisher.publishOrderComplete(self.__tpmSysFuncManager.__storeId, orderId)
+        self.__orderIntake.completeOrder(orderId)
+        self.__metrics.observe("order_lead_time_seconds", time.time() - orderReceiveTime)
 
-        # Indy7L이 1번 드롱기 컵 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 15, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
 
-        # 1번 드롱기에서 아메리카노 제조 명령 전달 (Indy7이 컵 잡은 상태에서 제조)
-        self.__tpmSysFuncManager.brewDelonghiEspresso(self.__delonghi01Comm)
 
-        time.sleep(2)
+    def __runRecipePlan(self, plan:RecipePlanData) -> bool:
+        '''
+        ### 실행 계획이 끝날 때까지 진행 (장비 명령 완료/셀 상태 변경 알림마다 시작할 수 있는 단계 요청)
+        - 반환값 : 모든 단계가 끝나면 True, 프로그램이 종료되면 False
+        - 실패한 단계가 있으면 해당 예외를 다시 발생시킨다.
+        '''
+        recipeRun :RecipeRunData = self.__recipe.startRun(plan)
 
-        while True:
+        while MainData.isRunningTPMProgram == True:
 
-            if MainData.isRunningTPMProgram == False:
-                return
+            stateVersion :int = self.__stateVersion
 
-            # 픽업대A에 컵이 없고, 1번드롱기 제조가 완료되면 break
-            if self.__hasCupOnPickupATray == 0 and self.__delonghi01Status == DelonghiState.READY:
-                break
+            if self.__recipe.advanceRun(recipeRun, self.__cellState.getSnapshot()) == True:
 
-            time.sleep(1)
+                if recipeRun.exception != None:
+                    raise recipeRun.exception
+                return True
 
-        # Indy7L이 픽업대A의 컵 내려놓는 위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 17, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
+            # 확인 대기 단계(CONFIRM_STATE)는 최대 대기 시간에 다시 판단
+            self.__waitStateChanged(stateVersion, max(0.0, min(self.__stateWaitTimeoutSec, recipeRun.wakeTime - time.monotonic())))
 
-        # Indy7L 그리퍼 열기
-        self.__tpmSysFuncManager.releaseDHGripper(self.__indy7LGripperComm) 
+        return False
 
-        # Indy7L이 홈위치로 이동
-        self.__tpmSysFuncManager.sendIndyModbusCmd(self.__indy7LComm, self.__indyCmdAddr, 18, self.__indyFeedbackAddr, self.__indyStartFeedback, self.__indtFinFeedback)
 
-        
-        CDRLog.print(f"ICE Americano Make Complete. orderId : {self.__tpmSysFuncManager.getCRCOrderNumber()} ")
-        self.UI_reset_thread(slot='a',ordernum=self.__tpmSysFuncManager.getCRCOrderNumber())     
-        self.__menuId               = -1
 
+    def __notifyStateChanged(self):
+        '''
+        셀 상태 변경/장비 명령 완료 -> 대기 중인 커피 제조 쓰레드를 깨운다
+        '''
+        with self.__stateChangedCond:
+            self.__stateVersion += 1
+            self.__stateChangedCond.notify_all()
 
 
-    ##################################################################################################################################################################    
-    def UI_reset_thread(self, slot : str, ordernum : int) :
-        th_ = threading.Thread(target=self.UI_reset,args=(slot,ordernum,))
-        th_.start()
 
-    def UI_reset(self, slot : str, ordernum : int) :
-        msg = '$'+slot+str(ordernum)+'%'#'$b'+str(order_num)+'%'
+    def __waitStateChanged(self, stateVersion:int, timeoutSec:float):
+        '''
+        stateVersion 이후 알림이 오거나 timeoutSec 이 지날 때까지 대기
+        '''
+        with self.__stateChangedCond:
+            self.__stateChangedCond.wait_for(
+                lambda: self.__stateVersion != stateVersion or MainData.isRunningTPMProgram == False,
+                timeoutSec
+            )
 
-        self.__order_UI.write(msg,2)
-        
-        std_time = datetime.datetime.now()
-        while True :
-            cur_time = datetime.datetime.now()
-            time_itv = cur_time - std_time
-            if time_itv.total_seconds() > 30 :
-                if slot == 'a' :
-                    if self.__hasCupOnPickupATray == 0 :
-                        msg = '$'+slot+'0%'
-                        self.__order_UI.write(msg,2)
-                        break
-                    else :
-                        print('There is item remaining in Slot A')
-                    
-                elif slot == 'b' :
-                    if self.__hasCupOnPickupBTray == 0 :
-                        msg = '$'+slot+'0%'
-                        self.__order_UI.write(msg,2)
-                        break
-                    else :
-                        print('There is item remaining in Slot B')
-                    
-                elif slot == 'c' :
-                    if self.__hasCupOnPickupCTray == 0 :
-                        msg = '$'+slot+'0%'
-                        self.__order_UI.write(msg,2)
-                        break
-                    else :
-                        print('There is item remaining in Slot C')
-                
-                time.sleep(1)
 
 
-    def __reqDispensingHotCup(self) :
+    ##################################################################################################################################################################    
+    def UI_reset(self, slot : str, ordernum : int) :
         '''
-        컵 자판기 종이컵 배출 명령
+        ### 주문 UI 의 픽업대(slot) 에 주문 번호 표시 -> 픽업대가 비면 표시 해제 (OrderUIManager)
         '''
-        writeTcpIpResult    :bool           = False
-
-        while MainData.isRunningTPMProgram == True:
-
-            writeTcpIpResult = self.__cupDispenser.write('0203410201034A', 1)
+        self.__orderUIManager.showPickup(slot, ordernum)
 
-            if writeTcpIpResult == False:
-                time.sleep(0.1)
-                CDRLog.print("컵디스펜서 Hot 컵 배출 명령 전송 실패")
-            else:
-                time.sleep(3)
-                break    
 
-        
 
-    def __reqDispensingIceCup(self) :
+    def __fetchCRCOrderMenu(self) -> list[int]:
         '''
-        컵 자판기 플라스틱컵 배출 명령
+        ### CRC 서버의 현재 주문 메뉴 수신 (주문 접수 쓰레드) : 메뉴를 1개씩 더 이상 없을 때(-1)까지 받는다
         '''
-        writeTcpIpResult    :bool           = False
+        menuIdList :list[int] = []
 
-        while MainData.isRunningTPMProgram == True:
+        while True:
+            menuId :int = self.__tpmSysFuncManager.getCRCOrderMenu()
+            if menuId == -1:
+                break
+            menuIdList.append(menuId)
 
-            writeTcpIpResult = self.__cupDispenser.write('02034101010349', 1)
+        return menuIdList
 
-            if writeTcpIpResult == False:
-                time.sleep(0.1)
-                CDRLog.print("컵디스펜서 Ice 컵 배출 명령 전송 실패")
-            else:
-                time.sleep(3)
-                break 
 
     def __keyInputThreadHandler(self):
         '''
@@ -494,5 +596,13 @@ class SingleProcessController():
 
     def __terminateSystem(self):
         MainData.isRunningTPMProgram    = False
+        self.__statusPoller.stop()
+        self.__orderIntake.stop()
+        self.__crcPublisher.stop()
+        self.__delonghiMaintenance.stop()
+        self.__timerScheduler.stop()
+        self.__processRecord.close()
+        self.__metrics.stop()
+        self.__notifyStateChanged()
         sys.exit()
         
\ No newline at end of file
@@ -0,0 +1,69 @@
+import importlib
+import os
+import sys
+import types
+
+# 저장소 최상위 폴더를 import 경로에 추가 (const/data/manager 는 패키지 파일 없이 최상위에서 import 한다)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+
+
+class DelonghiState():
+    '''
+    const.delonghiState 대체 (테스트는 상태 값을 비교만 한다)
+    '''
+    READY                           = 0
+    NOT_READY                       = 1
+    ERR_FULL_GROUNDS                = 2
+    ERR_OPENED_GROUNDS_CONTAINER    = 3
+    ERR_POWERED_OFF                 = 4
+
+
+
+class CDRLog():
+    '''
+    cdrutils.log 대체
+    '''
+
+    @staticmethod
+    def print(msg):
+        print(msg)
+
+
+
+class TPMSysFuncManager():
+    '''
+    manager.tpmSysFuncManager 대체 (테스트는 필요한 함수만 가진 객체를 직접 전달한다)
+    '''
+    pass
+
+
+
+def addStubModule(moduleName:str, attrDict:dict):
+    '''
+    ### 장비/플랫폼 패키지가 설치되지 않은 환경에서만 대체 모듈 등록 (설치되어 있으면 실제 모듈 사용)
+    '''
+    try:
+        importlib.import_module(moduleName)
+        return
+
+    except ImportError:
+        pass
+
+    parentName, _, childName = moduleName.rpartition(".")
+    if parentName not in sys.modules:
+        sys.modules[parentName] = types.ModuleType(parentName)
+
+    module :types.ModuleType = types.ModuleType(moduleName)
+    for attrName, attrValue in attrDict.items():
+        setattr(module, attrName, attrValue)
+
+    sys.modules[moduleName] = module
+    setattr(sys.modules[parentName], childName, module)
+
+
+
+addStubModule("const.delonghiState", {"DelonghiState" : DelonghiState})
+addStubModule("cdrutils.log", {"CDRLog" : CDRLog})
+addStubModule("manager.tpmSysFuncManager", {"TPMSysFuncManager" : TPMSysFuncManager})
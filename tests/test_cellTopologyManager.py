@@ -0,0 +1,143 @@
+import json
+import os
+
+import pytest
+
+from data.cellTopologyData import CellTopologyData
+
+from manager.cellTopologyManager import CellTopologyManager
+
+
+TOPOLOGY_FILE_PATH  :str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "topology", "multiProcessTopology.json")
+# 기본 셀 구성에 없는 직접 제조 라인 (Indy7L + 1번 드롱기 + 픽업대A)
+DIRECT_LANE         :dict = {"robot": "Indy7L", "delonghi": 1, "pickupTray": "A", "isDirect": True}
+
+
+
+
+def loadConfig() -> dict:
+    with open(TOPOLOGY_FILE_PATH, "r", encoding = "utf-8") as topologyFile:
+        return json.load(topologyFile)
+
+
+
+def loadDirectLaneConfig() -> dict:
+    config :dict = loadConfig()
+    config["lanes"].append(dict(DIRECT_LANE))
+    return config
+
+
+
+def loadTopology(tmp_path, config:dict) -> CellTopologyData:
+    filePath :str = str(tmp_path / "topology.json")
+    with open(filePath, "w", encoding = "utf-8") as topologyFile:
+        json.dump(config, topologyFile, ensure_ascii = False)
+
+    return CellTopologyManager(filePath).load()
+
+
+
+def test_loadDefaultTopology():
+    topology :CellTopologyData = CellTopologyManager(TOPOLOGY_FILE_PATH).load()
+
+    assert [(lane.laneNum, lane.robotName, lane.delonghiNum, lane.pickupTrayName, lane.isDirect) for lane in topology.laneList] == [
+        (1, "UR5", 1, "B", False), (2, "Indy7R", 2, "C", False)
+    ]
+    assert CellTopologyManager.getLaneStateKeyDict(topology, topology.laneList[1]) == {
+        "delonghiTray" : "hasCupOnDelonghi02Tray", "delonghiStatus" : "delonghi02Status", "pickupTray" : "hasCupOnPickupCTray"
+    }
+    assert CellTopologyManager.getCellStateValueDict(topology)["delonghi01Status"] == -1
+
+
+
+def test_loadDirectLaneTopology(tmp_path):
+    topology :CellTopologyData = loadTopology(tmp_path, loadDirectLaneConfig())
+
+    assert [(lane.laneNum, lane.robotName, lane.delonghiNum, lane.pickupTrayName, lane.isDirect) for lane in topology.laneList] == [
+        (1, "UR5", 1, "B", False), (2, "Indy7R", 2, "C", False), (3, "Indy7L", 1, "A", True)
+    ]
+
+
+
+def test_loadMissingFile(tmp_path):
+    with pytest.raises(OSError):
+        CellTopologyManager(str(tmp_path / "none.json")).load()
+
+
+
+@pytest.mark.parametrize("laneIndex, key, value", [
+    (0, "robot", "UR10"),
+    (0, "delonghi", 9),
+    (0, "pickupTray", "Z"),
+    # 일반 라인 로봇이 컵 전달 로봇, 직접 제조 라인 로봇이 컵 전달 로봇이 아님
+    (0, "robot", "Indy7L"),
+    (2, "robot", "UR5"),
+])
+def test_laneReferenceError(tmp_path, laneIndex:int, key:str, value):
+    config :dict = loadDirectLaneConfig()
+    config["lanes"][laneIndex][key] = value
+
+    with pytest.raises(ValueError):
+        loadTopology(tmp_path, config)
+
+
+
+def test_unknownCupRobot(tmp_path):
+    config :dict = loadConfig()
+    config["cupRobot"] = "UR10"
+
+    with pytest.raises(ValueError):
+        loadTopology(tmp_path, config)
+
+
+
+def test_delonghiSharedByTwoLanes(tmp_path):
+    # 일반 라인 2개가 같은 드롱기 사용 -> 오류
+    config :dict = loadConfig()
+    config["lanes"][1]["delonghi"] = 1
+
+    with pytest.raises(ValueError):
+        loadTopology(tmp_path, config)
+
+    # 일반 라인 1개 + 직접 제조 라인 1개는 같은 드롱기 사용 가능
+    config = loadDirectLaneConfig()
+    assert loadTopology(tmp_path, config).laneList[2].delonghiNum == 1
+    config["lanes"][2]["delonghi"] = 2
+    assert loadTopology(tmp_path, config).laneList[2].delonghiNum == 2
+
+
+
+def test_traySharedByTwoLanes(tmp_path):
+    for laneIndex in [1, 2]:
+        config :dict = loadDirectLaneConfig()
+        config["lanes"][laneIndex]["pickupTray"] = "B"
+
+        with pytest.raises(ValueError):
+            loadTopology(tmp_path, config)
+
+
+
+def test_laneListError(tmp_path):
+    config :dict = loadConfig()
+    config["lanes"] = []
+
+    with pytest.raises(ValueError):
+        loadTopology(tmp_path, config)
+
+    # 직접 제조 라인만 있음
+    config = loadDirectLaneConfig()
+    config["lanes"] = config["lanes"][2:]
+
+    with pytest.raises(ValueError):
+        loadTopology(tmp_path, config)
+
+
+
+@pytest.mark.parametrize("sensorKey", ["hasCupOnDelonghi01Tray", "hasCupOnPickupBTray", "hasCupOnMiddleATray"])
+def test_sensorKeyDuplicate(tmp_path, sensorKey:str):
+    # 다른 드롱기/픽업대 또는 PlcSignalTable 과 같은 센서 이름 -> PLC 주소가 2곳에 설정됨
+    config :dict = loadConfig()
+    config["pickupTrays"][2]["sensorKey"] = sensorKey
+
+    with pytest.raises(ValueError):
+        loadTopology(tmp_path, config)
@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+
+from manager.crcPublishManager import CRCPublishManager
+
+
+
+
+class FakeCRCComm():
+
+    def isConnected(self) -> bool:
+        return True
+
+
+
+class FakeTPMSysFuncManager():
+    '''
+    publishCRCOrderComplete 가 resultFunc(orderId) 의 값을 반환 (releaseEvent 가 설정될 때까지 전송을 멈춘다)
+    '''
+
+    def __init__(self, resultFunc):
+        self.resultFunc                 = resultFunc
+        self.releaseEvent               :threading.Event = threading.Event()
+        self.releaseEvent.set()
+        self.sendingEvent               :threading.Event = threading.Event()
+        self.sentOrderIdList            :list[int]  = []
+
+    def publishCRCOrderComplete(self, crcComm, storeId:int, orderId:int):
+        self.sendingEvent.set()
+        self.releaseEvent.wait()
+
+        result = self.resultFunc(orderId)
+        if result == True:
+            self.sentOrderIdList.append(orderId)
+        return result
+
+
+
+def waitUntil(func, timeoutSec:float = 2.0) -> bool:
+    endTime :float = time.monotonic() + timeoutSec
+    while time.monotonic() < endTime:
+        if func() == True:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+
+def readSpoolOrderIdList(spoolFilePath) -> list[int]:
+    if spoolFilePath.exists() == False:
+        return []
+    return [json.loads(line)["orderId"] for line in spoolFilePath.read_text(encoding = "utf-8").splitlines() if line.strip() != ""]
+
+
+
+def writeSpool(spoolFilePath, orderIdList:list[int]):
+    spoolFilePath.write_text("".join(json.dumps({"storeId" : 1, "orderId" : orderId, "createTime" : 0.0, "attemptNum" : 0}) + "\n" for orderId in orderIdList),
+                             encoding = "utf-8")
+
+
+
+def test_sendAndDeduplicate(tmp_path):
+    tpmSysFuncManager :FakeTPMSysFuncManager = FakeTPMSysFuncManager(lambda orderId: True)
+    publisher :CRCPublishManager = CRCPublishManager(tpmSysFuncManager, FakeCRCComm(), str(tmp_path / "spool.jsonl"), batchWindowSec = 0.05)
+    publisher.start()
+
+    publisher.publishOrderComplete(1, 10)
+    publisher.publishOrderComplete(1, 10)
+    publisher.publishOrderComplete(1, 11)
+
+    assert waitUntil(lambda: publisher.getQueueNum() == 0 and len(tpmSysFuncManager.sentOrderIdList) == 2) == True
+    publisher.stop()
+
+    assert tpmSysFuncManager.sentOrderIdList == [10, 11]
+
+
+
+def test_noneResultIsNotSent(tmp_path):
+    spoolFilePath = tmp_path / "spool.jsonl"
+    tpmSysFuncManager :FakeTPMSysFuncManager = FakeTPMSysFuncManager(lambda orderId: None)
+    publisher :CRCPublishManager = CRCPublishManager(tpmSysFuncManager, FakeCRCComm(), str(spoolFilePath), batchWindowSec = 0.0, retrySec = 60.0)
+    publisher.start()
+
+    publisher.publishOrderComplete(1, 10)
+
+    # 전송 결과가 True 가 아니면 보내지 못한 메시지로 스풀 파일에 남는다
+    assert waitUntil(lambda: publisher.getFailNum() == 1) == True
+    publisher.stop()
+
+    assert publisher.getSentNum() == 0
+    assert readSpoolOrderIdList(spoolFilePath) == [10]
+
+
+
+def test_spoolKeptUntilSent(tmp_path):
+    spoolFilePath = tmp_path / "spool.jsonl"
+    writeSpool(spoolFilePath, [1, 2, 3])
+
+    tpmSysFuncManager :FakeTPMSysFuncManager = FakeTPMSysFuncManager(lambda orderId: orderId != 3)
+    tpmSysFuncManager.releaseEvent.clear()
+    publisher :CRCPublishManager = CRCPublishManager(tpmSysFuncManager, FakeCRCComm(), str(spoolFilePath), batchWindowSec = 0.0, retrySec = 60.0)
+    publisher.start()
+
+    # 전송 중에는 스풀 파일의 메시지를 지우지 않는다 (이 때 종료되면 다음 실행에서 다시 보낸다)
+    assert tpmSysFuncManager.sendingEvent.wait(2.0) == True
+    assert readSpoolOrderIdList(spoolFilePath) == [1, 2, 3]
+
+    # 보낸 메시지만 지운다
+    tpmSysFuncManager.releaseEvent.set()
+    assert waitUntil(lambda: publisher.getFailNum() == 1) == True
+    publisher.stop()
+
+    assert tpmSysFuncManager.sentOrderIdList == [1, 2]
+    assert readSpoolOrderIdList(spoolFilePath) == [3]
+
+
+
+def test_stopSpoolsInFlightMessage(tmp_path):
+    spoolFilePath = tmp_path / "spool.jsonl"
+    tpmSysFuncManager :FakeTPMSysFuncManager = FakeTPMSysFuncManager(lambda orderId: True)
+    tpmSysFuncManager.releaseEvent.clear()
+    publisher :CRCPublishManager = CRCPublishManager(tpmSysFuncManager, FakeCRCComm(), str(spoolFilePath), batchWindowSec = 0.0, stopTimeoutSec = 0.1)
+    publisher.start()
+
+    publisher.publishOrderComplete(1, 10)
+    assert tpmSysFuncManager.sendingEvent.wait(2.0) == True
+    publisher.publishOrderComplete(1, 11)
+
+    # 전송이 끝나지 않은 채 종료 -> 전송 중인 메시지와 대기열의 메시지를 스풀 파일에 저장
+    publisher.stop()
+    assert readSpoolOrderIdList(spoolFilePath) == [10, 11]
+
+    # 늦게 전송이 확인되어도 스풀 파일의 메시지는 그대로 둔다 (다음 실행에서 다시 보낼 수 있다)
+    tpmSysFuncManager.releaseEvent.set()
+    time.sleep(0.1)
+    assert readSpoolOrderIdList(spoolFilePath) == [10, 11]
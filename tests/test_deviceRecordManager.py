@@ -0,0 +1,81 @@
+import pickle
+
+from array import array
+
+import pytest
+
+from const.deviceRecordKind import DeviceRecordKind
+
+from manager.deviceRecordManager import DeviceRecordManager, RECORD_FILE_MAGIC, RECORD_HEADER
+
+
+
+
+class FakeDeviceVar():
+    '''
+    기록 모드에서 감싸는 통신 변수 (read 는 호출마다 다음 응답 반환)
+    '''
+
+    def __init__(self, eventCallback):
+        self.eventCallback = eventCallback
+        self.responseList = [
+            (True, [1, 2]),
+            b"\x01\x02\xff",
+            array("H", [0, 65535, 7]),
+            {1 : "a", "b" : (2, 3)},
+            object(),
+        ]
+
+    def read(self, address:int, count:int = 1):
+        return self.responseList.pop(0)
+
+
+
+def test_recordFileRoundTrip(tmp_path):
+    filePath :str = str(tmp_path / "device.bin")
+    recordManager :DeviceRecordManager = DeviceRecordManager(DeviceRecordManager.MODE_RECORD, filePath)
+    recordedVar = recordManager.createVar(FakeDeviceVar, "PLC", None)
+    resultList :list = [recordedVar.read(index, count = 2) for index in range(5)]
+    recordManager.close()
+
+    recordList = DeviceRecordManager.readRecordFile(filePath)
+    callList = [record for record in recordList if record.kind == DeviceRecordKind.CALL]
+
+    # tuple/list, bytes, array, 문자열이 아닌 dict key 는 기록 전과 같은 값으로 읽는다
+    assert [record.value for record in callList] == [((index,), {"count" : 2}) for index in range(5)]
+    assert [record.result.value for record in callList[:4]] == resultList[:4]
+    assert type(callList[0].result.value) == tuple
+    assert type(callList[2].result.value) == array
+    # JSON 으로 저장할 수 없는 값은 repr 문자열
+    assert callList[4].result.value == repr(resultList[4])
+
+
+
+def test_replayReturnsRecordedValue(tmp_path):
+    filePath :str = str(tmp_path / "device.bin")
+    recordManager :DeviceRecordManager = DeviceRecordManager(DeviceRecordManager.MODE_RECORD, filePath)
+    recordedVar = recordManager.createVar(FakeDeviceVar, "PLC", None)
+    recordedVar.read(0)
+    recordedVar.read(1)
+    recordManager.close()
+
+    replayManager :DeviceRecordManager = DeviceRecordManager(DeviceRecordManager.MODE_REPLAY, filePath)
+    replayVar = replayManager.createVar(FakeDeviceVar, "PLC", None)
+
+    assert replayVar.read(0) == (True, [1, 2])
+    assert replayVar.read(1) == b"\x01\x02\xff"
+    assert replayManager.getReport()["PLC"]["mismatchCount"] == 0
+
+
+
+def test_recordFileDoesNotUnpickle(tmp_path):
+    class Payload():
+        def __reduce__(self):
+            return (pytest.fail, ("기록 파일을 읽으면서 코드가 실행됨",))
+
+    valueBytes :bytes = pickle.dumps(Payload())
+    filePath = tmp_path / "device.bin"
+    filePath.write_bytes(RECORD_FILE_MAGIC + RECORD_HEADER.pack(DeviceRecordKind.DEVICE, 0, 0.0, 0, 0, len(valueBytes)) + valueBytes)
+
+    with pytest.raises(ValueError):
+        DeviceRecordManager.readRecordFile(str(filePath))
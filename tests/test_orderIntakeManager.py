@@ -0,0 +1,186 @@
+import threading
+import time
+
+from data.orderData import IntakeOrderData
+
+from manager.orderIntakeManager import OrderIntakeManager
+
+
+
+
+class FakeCRCServer():
+    '''
+    주문 목록을 순서대로 보내는 CRC 서버 (getCRCOrderId 로 다음 주문, fetchMenu 로 그 주문의 메뉴)
+    '''
+
+    def __init__(self, orderList:list[tuple[int, list[int]]]):
+        self.__lock                     :threading.Lock = threading.Lock()
+        self.__orderList                :list[tuple[int, list[int]]] = list(orderList)
+        self.__curOrder                 :tuple[int, list[int]] = None
+        self.fetchNum                   :int        = 0
+
+    def getCRCOrderId(self) -> int:
+        with self.__lock:
+            if len(self.__orderList) == 0:
+                return -1
+
+            self.__curOrder = self.__orderList.pop(0)
+            self.fetchNum   += 1
+            return self.__curOrder[0]
+
+    def getCRCOrderNumber(self) -> int:
+        return self.__curOrder[0]
+
+    def fetchMenu(self) -> list[int]:
+        return list(self.__curOrder[1])
+
+
+
+def waitUntil(func, timeoutSec:float = 2.0) -> bool:
+    endTime :float = time.monotonic() + timeoutSec
+    while func() == False:
+        if time.monotonic() > endTime:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+
+def addOrder(intake:OrderIntakeManager, orderId:int, menuIdList:list[int], receiveTime:float, priority:int = 0):
+    '''
+    접수 쓰레드 없이 대기열에 주문 추가 (받은 시간 지정)
+    '''
+    order :IntakeOrderData = IntakeOrderData(orderId, orderId, menuIdList, priority)
+    order.receiveTime = receiveTime
+    intake._OrderIntakeManager__addOrder(order)
+
+
+
+def popOrderIdList(intake:OrderIntakeManager) -> list[int]:
+    orderIdList :list[int] = []
+    while True:
+        order :IntakeOrderData = intake.popOrder()
+        if order == None:
+            return orderIdList
+        orderIdList.append(order.orderId)
+
+
+
+def test_popOrderPriority():
+    intake :OrderIntakeManager = OrderIntakeManager(None, None, maxWaitSec = 1e9, priorityStepSec = 60.0)
+
+    addOrder(intake, 1, [1000, 1001], 100.0)
+    addOrder(intake, 2, [1000], 110.0, priority = 1)
+    addOrder(intake, 3, [1001, 1001], 120.0)
+    addOrder(intake, 4, [1001], 130.0, priority = 1)
+
+    # 우선순위 1 -> 60초 먼저 받은 주문으로 취급 (2 : 50, 4 : 70), 같은 우선순위는 받은 순서
+    assert popOrderIdList(intake) == [2, 4, 1, 3]
+
+
+
+def test_popOrderPriorityAging():
+    intake :OrderIntakeManager = OrderIntakeManager(None, None, maxWaitSec = 1e9, priorityStepSec = 60.0)
+
+    # 우선순위가 낮아도 priorityStepSec 보다 오래 기다린 주문이 먼저
+    addOrder(intake, 1, [1000, 1001], 100.0)
+    addOrder(intake, 2, [1000], 161.0, priority = 1)
+    addOrder(intake, 3, [1000, 1000], 161.0)
+
+    assert popOrderIdList(intake) == [1, 2, 3]
+
+
+
+def test_popOrderSameTime():
+    intake :OrderIntakeManager = OrderIntakeManager(None, None, maxWaitSec = 1e9)
+
+    for orderId in [5, 3, 9, 1]:
+        addOrder(intake, orderId, [1000], 100.0)
+
+    assert popOrderIdList(intake) == [5, 3, 9, 1]
+
+
+
+def test_duplicateOrder():
+    intake :OrderIntakeManager = OrderIntakeManager(None, None, maxWaitSec = 1e9)
+
+    addOrder(intake, 1, [1000], 100.0)
+    addOrder(intake, 1, [1000], 101.0)
+    assert intake.getPendingNum() == 1
+
+    # 제조 중/최근 완료한 주문도 중복
+    intake.popOrder()
+    addOrder(intake, 1, [1000], 102.0)
+    intake.completeOrder(1)
+    addOrder(intake, 1, [1000], 103.0)
+
+    assert intake.getPendingNum() == 0
+    assert intake.getDuplicateNum() == 3
+
+
+
+def test_backpressureResume():
+    notifyList  :list[bool] = []
+    intake      :OrderIntakeManager = OrderIntakeManager(None, None, maxWaitSec = 100.0, resumeWaitSec = 50.0, drinkIntervalSec = 10.0,
+                                                         backpressureCallback = lambda isBackpressured, predictedWaitSec: notifyList.append(isBackpressured))
+
+    addOrder(intake, 1, [1000] * 5, 100.0)
+    addOrder(intake, 2, [1000] * 5, 101.0)
+    assert intake.isBackpressured() == False
+
+    # 예상 대기 시간 11잔 x 10초 > 100초 -> 접수 중단
+    addOrder(intake, 3, [1000], 102.0)
+    assert intake.isBackpressured() == True
+    assert notifyList == [True]
+
+    # 꺼낸 주문도 완료 전까지 예상 대기 시간에 포함
+    intake.popOrder()
+    assert intake.isBackpressured() == True
+
+    # 완료 후 6잔 x (학습한 처리 간격 <= 10초) < 50초 -> 접수 재개 (한 번만 알림)
+    intake.completeOrder(1)
+    assert intake.isBackpressured() == False
+    assert notifyList == [True, False]
+
+
+
+def test_intakeThreadBackpressureResume():
+    server  :FakeCRCServer = FakeCRCServer([(orderId, [1000, 1001]) for orderId in range(1, 11)])
+    intake  :OrderIntakeManager = OrderIntakeManager(server, server.fetchMenu, maxWaitSec = 50.0, resumeWaitSec = 30.0, drinkIntervalSec = 10.0)
+    intake.start()
+
+    try:
+        # 3번째 주문(6잔 x 10초 > 50초)까지 받고 접수 중단 -> CRC 서버에 주문이 남는다
+        assert waitUntil(lambda: intake.isBackpressured() == True)
+        time.sleep(0.2)
+        assert server.fetchNum == 3
+        assert intake.getPendingNum() == 3
+
+        # 주문 완료로 예상 대기 시간이 resumeWaitSec 아래로 줄어들면 다시 받는다
+        for _ in range(2):
+            order :IntakeOrderData = intake.popOrder()
+            assert order.menuIdList == [1000, 1001]
+            intake.completeOrder(order.orderId)
+
+        assert waitUntil(lambda: server.fetchNum > 3)
+
+    finally:
+        intake.stop()
+
+
+
+def test_intakeThreadMenuNotReady():
+    menuList    :list[list[int]] = [[], [], [1001]]
+    server      :FakeCRCServer = FakeCRCServer([(7, [])])
+    intake      :OrderIntakeManager = OrderIntakeManager(server, lambda: menuList.pop(0) if len(menuList) > 1 else menuList[0], maxWaitSec = 1e9)
+    intake.start()
+
+    try:
+        # 메뉴 정보가 올 때까지 같은 주문을 다시 요청 (다음 주문을 받지 않는다)
+        order :IntakeOrderData = intake.popOrder(2.0)
+        assert order.orderId == 7
+        assert order.menuIdList == [1001]
+        assert server.fetchNum == 1
+
+    finally:
+        intake.stop()
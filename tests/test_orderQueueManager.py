@@ -0,0 +1,72 @@
+from const.orderState import OrderState
+
+from data.orderData import DrinkJobData, OrderData
+
+from manager.orderQueueManager import OrderQueueManager
+
+
+
+
+def startWaitingJob(orderQueue:OrderQueueManager) -> DrinkJobData:
+    drinkJob :DrinkJobData = orderQueue.getWaitingJob()
+    if drinkJob != None:
+        orderQueue.setJobState(drinkJob, OrderState.BREW_START)
+    return drinkJob
+
+
+
+def test_orderCycleSplit():
+    orderQueue  :OrderQueueManager = OrderQueueManager()
+    order       :OrderData = orderQueue.addOrder(1, 1, [1000, 1001, 1000, 1001, 1000], 2)
+
+    assert [drinkJob.cycleIndex for drinkJob in order.drinkJobList] == [0, 0, 1, 1, 2]
+
+    # 첫 2잔을 시작하면 다음 순번은 첫 2잔이 픽업대에 놓일 때까지 기다린다
+    firstJobList :list[DrinkJobData] = [startWaitingJob(orderQueue), startWaitingJob(orderQueue)]
+    assert [drinkJob.menuIndex for drinkJob in firstJobList] == [0, 1]
+    assert orderQueue.getWaitingJob() == None
+
+    orderQueue.setJobState(firstJobList[0], OrderState.PICKUP_ENABLE)
+    assert orderQueue.getWaitingJob() == None
+
+    orderQueue.setJobState(firstJobList[1], OrderState.PICKUP_ENABLE)
+    assert orderQueue.getWaitingJob().menuIndex == 2
+
+
+
+def test_orderCycleOtherOrderFlows():
+    orderQueue  :OrderQueueManager = OrderQueueManager()
+    orderQueue.addOrder(1, 1, [1000, 1001, 1000], 2)
+    orderQueue.addOrder(2, 2, [1001], 2)
+
+    startWaitingJob(orderQueue)
+    startWaitingJob(orderQueue)
+
+    # 1번 주문의 다음 순번이 기다리는 동안 2번 주문의 음료를 제조
+    drinkJob :DrinkJobData = startWaitingJob(orderQueue)
+    assert (drinkJob.orderId, drinkJob.menuIndex) == (2, 0)
+    assert orderQueue.getWaitingJob() == None
+
+
+
+def test_orderWithoutCycleSplit():
+    orderQueue  :OrderQueueManager = OrderQueueManager()
+    order       :OrderData = orderQueue.addOrder(1, 1, [1000, -1, 1001, 1000])
+
+    # 빈 메뉴(-1) 제외, 나누지 않으면 모두 같은 순번
+    assert [drinkJob.menuId for drinkJob in order.drinkJobList] == [1000, 1001, 1000]
+    assert [startWaitingJob(orderQueue).menuIndex for _ in range(3)] == [0, 2, 3]
+
+
+
+def test_popCompletedOrderList():
+    orderQueue  :OrderQueueManager = OrderQueueManager(maxOrderNum = 2)
+    order1      :OrderData = orderQueue.addOrder(1, 1, [1000], 2)
+    orderQueue.addOrder(2, 2, [1001, 1001], 2)
+    assert orderQueue.isFull() == True
+
+    orderQueue.setJobState(order1.drinkJobList[0], OrderState.PICKUP_ENABLE)
+
+    assert [order.orderId for order in orderQueue.popCompletedOrderList()] == [1]
+    assert orderQueue.getOrderNum() == 1
+    assert orderQueue.popCompletedOrderList() == []
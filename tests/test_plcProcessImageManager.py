@@ -0,0 +1,108 @@
+import os
+from array import array
+
+import pytest
+
+from manager.cellTopologyManager import CellTopologyManager
+from manager.plcProcessImageManager import PlcProcessImageManager, PlcReadBlock
+
+
+TOPOLOGY_FILE_PATH  :str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "topology", "multiProcessTopology.json")
+
+
+
+
+class FakePlcVar():
+    '''
+    읽기 요청 주소 -> 응답 값 목록 (없는 주소는 0), 받은 요청 기록
+    '''
+
+    def __init__(self):
+        self.valueDict                  :dict[str, list[int]] = {}
+        self.requestList                :list[tuple[str, int]] = []
+
+    def read(self, address:str, count:int) -> list[int]:
+        self.requestList.append((address, count))
+        return list(self.valueDict.get(address, [0] * count))
+
+
+
+def getBlockTupleList(plcImage:PlcProcessImageManager) -> list[tuple[str, int, int]]:
+    return [(block.address, block.pointNum, block.offset) for block in plcImage.getBlockList()]
+
+
+
+def test_planBlockListMergesNearAddresses():
+    plcImage :PlcProcessImageManager = PlcProcessImageManager(FakePlcVar(), {
+        "m6" : "M6", "m0" : "M0", "m3" : "M3",
+        # X 는 16진수 번호 : X1A ~ X20 (26 ~ 32)
+        "x1a" : "X1A", "x20" : "X20",
+        # 워드와 워드의 비트는 같은 주소를 1번 읽는다, 간격이 maxGapNum(16) 보다 크면 다른 요청
+        "d100" : "D100", "d100Bit3" : "D100.3", "d200" : "D200",
+    })
+
+    assert getBlockTupleList(plcImage) == [("D100", 1, 0), ("D200", 1, 1), ("M000", 7, 2), ("X01A", 7, 9)]
+
+
+
+def test_planBlockListGapAndSizeLimit():
+    # 사이에 읽지 않는 주소가 maxGapNum 이하 -> 같은 요청 (M1 ~ M16), 초과 -> 다른 요청 (M18 ~ M34)
+    plcImage :PlcProcessImageManager = PlcProcessImageManager(FakePlcVar(), {"a" : "M0", "b" : "M17", "c" : "M35"}, maxGapNum = 16)
+    assert getBlockTupleList(plcImage) == [("M000", 18, 0), ("M035", 1, 18)]
+
+    # 요청 1회 최대 점 수
+    plcImage = PlcProcessImageManager(FakePlcVar(), {"a" : "M0", "b" : "M4", "c" : "M8"}, maxBlockPointNum = 8)
+    assert getBlockTupleList(plcImage) == [("M000", 5, 0), ("M008", 1, 5)]
+
+
+
+def test_parseSignalError():
+    for address in ["Q1", "M1.2", "D1.G", "M"]:
+        with pytest.raises(ValueError):
+            PlcProcessImageManager(FakePlcVar(), {"a" : address})
+
+
+
+def test_readAndDiff():
+    plcComm     :FakePlcVar = FakePlcVar()
+    plcImage    :PlcProcessImageManager = PlcProcessImageManager(plcComm, {"m0" : "M0", "m2" : "M2", "d100" : "D100", "d100Bit3" : "D100.3"})
+
+    plcComm.valueDict = {"M000" : [1, 0, 0], "D100" : [0x0008]}
+    image :array = plcImage.read()
+    assert plcComm.requestList == [("D100", 1), ("M000", 3)]
+
+    # 첫 diff 는 모든 신호
+    assert plcImage.diff(image) == {"m0" : 1, "m2" : 0, "d100" : 8, "d100Bit3" : 1}
+    # 같은 이미지 -> 바뀐 신호 없음
+    assert plcImage.diff(plcImage.read()) == {}
+
+    plcComm.valueDict = {"M000" : [1, 1, 1], "D100" : [0x0009]}
+    assert plcImage.diff(plcImage.read()) == {"m2" : 1, "d100" : 9}
+
+    plcComm.valueDict = {"M000" : [0, 1, 1], "D100" : [0x0001]}
+    image = plcImage.read()
+    assert plcImage.diff(image) == {"m0" : 0, "d100" : 1, "d100Bit3" : 0}
+    assert plcImage.getValue(image, "m2") == 1
+
+    with pytest.raises(KeyError):
+        plcImage.getValue(image, "unknown")
+
+
+
+def test_readResponseSizeError():
+    plcComm     :FakePlcVar = FakePlcVar()
+    plcImage    :PlcProcessImageManager = PlcProcessImageManager(plcComm, {"m0" : "M0", "m1" : "M1"})
+
+    plcComm.valueDict = {"M000" : [1]}
+    with pytest.raises(ValueError):
+        plcImage.read()
+
+
+
+def test_topologySignalDict():
+    # 기본 셀 구성 : 중간 거치대 A/B (PlcSignalTable) + 드롱기 트레이 2개 + 픽업대 3개를 M0 ~ M6 요청 1회로 읽는다
+    signalDict  :dict[str, str] = CellTopologyManager.getPlcSignalDict(CellTopologyManager(TOPOLOGY_FILE_PATH).load())
+    plcImage    :PlcProcessImageManager = PlcProcessImageManager(FakePlcVar(), signalDict)
+
+    assert sorted(signalDict.values()) == [f"M{num}" for num in range(7)]
+    assert getBlockTupleList(plcImage) == [("M000", 7, 0)]
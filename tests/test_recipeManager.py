@@ -0,0 +1,138 @@
+import json
+import os
+
+import pytest
+
+from data.cellTopologyData import CellTopologyData
+from data.recipeData import RecipeDeviceData
+
+from manager.cellStateManager import CellStateManager
+from manager.cellTopologyManager import CellTopologyManager
+from manager.recipeManager import RecipeManager
+from manager.robotCommandManager import RobotCommandManager
+from manager.timingModelManager import TimingModelManager
+
+
+TOPOLOGY_FILE_PATH  :str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "topology", "multiProcessTopology.json")
+
+
+
+
+class FakeTPMSysFuncManager():
+    '''
+    레시피 단계 함수 참조만 하고 실행하지 않는 TPMSysFuncManager
+    '''
+
+    def __getattr__(self, name:str):
+        return lambda *args: None
+
+
+
+
+def makeThreeLaneTopologyFile(tmp_path) -> str:
+    '''
+    기본 셀 구성에 3번 드롱기 + 픽업대 D + 로봇 1대로 일반 제조 라인을 추가한 셀 구성 파일
+    '''
+    with open(TOPOLOGY_FILE_PATH, "r", encoding = "utf-8") as topologyFile:
+        config :dict = json.load(topologyFile)
+
+    config["robots"].append({"name": "Indy7M", "address": ["192.168.3.104", 502], "gripperName": "Indy7M_그리퍼", "gripperAddress": ["192.168.3.190", 5000]})
+    config["delonghis"].append({"num": 3, "name": "3번 드롱기", "address": ["00:A0:50:00:00:03"], "statusKey": "delonghi03Status", "trayKey": "hasCupOnDelonghi03Tray", "trayAddress": "M8"})
+    config["pickupTrays"].append({"name": "D", "sensorKey": "hasCupOnPickupDTray", "sensorAddress": "M7", "uiSlot": "d"})
+    config["lanes"].append({"robot": "Indy7M", "delonghi": 3, "pickupTray": "D"})
+
+    filePath :str = str(tmp_path / "threeLaneTopology.json")
+    with open(filePath, "w", encoding = "utf-8") as topologyFile:
+        json.dump(config, topologyFile, ensure_ascii = False)
+
+    return filePath
+
+
+
+def makeDirectLaneTopologyFile(tmp_path) -> str:
+    '''
+    기본 셀 구성에 직접 제조 라인(Indy7L + 1번 드롱기 + 픽업대A)을 추가한 셀 구성 파일
+    '''
+    with open(TOPOLOGY_FILE_PATH, "r", encoding = "utf-8") as topologyFile:
+        config :dict = json.load(topologyFile)
+
+    config["lanes"].append({"robot": "Indy7L", "delonghi": 1, "pickupTray": "A", "isDirect": True})
+
+    filePath :str = str(tmp_path / "directLaneTopology.json")
+    with open(filePath, "w", encoding = "utf-8") as topologyFile:
+        json.dump(config, topologyFile, ensure_ascii = False)
+
+    return filePath
+
+
+
+def precompileTopology(topology:CellTopologyData, cellState:CellStateManager) -> int:
+    '''
+    MultiProcessController 와 같은 순서로 모든 공정의 실행 계획 변환, 반환값 : 변환한 실행 계획 수
+    '''
+    robotCommand    :RobotCommandManager = RobotCommandManager(None)
+    commDict        :dict[str, object]   = {}
+
+    for robot in topology.robotDict.values():
+        commDict[robot.name], commDict[robot.gripperName] = object(), object()
+        robotCommand.addRobot(commDict[robot.name], robot.name)
+        robotCommand.addRobot(commDict[robot.gripperName], robot.gripperName)
+
+    for delonghi in topology.delonghiDict.values():
+        commDict[delonghi.name] = object()
+        robotCommand.addRobot(commDict[delonghi.name], delonghi.name)
+
+    recipe          :RecipeManager       = RecipeManager(FakeTPMSysFuncManager(), robotCommand, lambda dispenserCode: None, timingModel = TimingModelManager(),
+                                                         cellState = cellState)
+    cupRobot                             = topology.robotDict[topology.cupRobotName]
+    cupDevice       :RecipeDeviceData    = RecipeDeviceData(cupRobot.name, commDict[cupRobot.name], commDict[cupRobot.gripperName], cupRobot.isURRobot)
+    planNum         :int                 = 0
+
+    for processName in ["multiCupStage", "multiIceStage", "multiCupHandoff"]:
+        planNum += recipe.precompile(processName, cupDevice)
+
+    for lane in topology.laneList:
+        robot                       = topology.robotDict[lane.robotName]
+        delonghi                    = topology.delonghiDict[lane.delonghiNum]
+        device  :RecipeDeviceData   = RecipeDeviceData(robot.name, commDict[robot.name], commDict[robot.gripperName], robot.isURRobot,
+                                                       delonghi.name, commDict[delonghi.name], CellTopologyManager.getLaneStateKeyDict(topology, lane))
+
+        for processName in (["multiDirectBrew", "multiDirectPickup"] if lane.isDirect == True else ["multiBrew", "multiPickup"]):
+            planNum += recipe.precompile(processName, device)
+
+    return planNum
+
+
+
+def test_precompileDefaultTopology():
+    topology    :CellTopologyData = CellTopologyManager(TOPOLOGY_FILE_PATH).load()
+    cellState   :CellStateManager = CellStateManager(CellTopologyManager.getCellStateValueDict(topology))
+
+    assert precompileTopology(topology, cellState) > 0
+
+
+
+def test_precompileDirectLaneTopology(tmp_path):
+    topology    :CellTopologyData = CellTopologyManager(makeDirectLaneTopologyFile(tmp_path)).load()
+    cellState   :CellStateManager = CellStateManager(CellTopologyManager.getCellStateValueDict(topology))
+
+    assert [lane.isDirect for lane in topology.laneList] == [False, False, True]
+    assert precompileTopology(topology, cellState) > 0
+
+
+
+def test_precompileThreeLaneTopology(tmp_path):
+    topology    :CellTopologyData = CellTopologyManager(makeThreeLaneTopologyFile(tmp_path)).load()
+    cellState   :CellStateManager = CellStateManager(CellTopologyManager.getCellStateValueDict(topology))
+
+    assert len([lane for lane in topology.laneList if lane.isDirect == False]) == 3
+    assert precompileTopology(topology, cellState) > 0
+
+
+
+def test_precompileUnknownStateKey(tmp_path):
+    # 셀 구성이 추가한 항목이 없는 셀 상태 저장소 -> 3번 드롱기 항목은 알 수 없는 셀 상태
+    topology    :CellTopologyData = CellTopologyManager(makeThreeLaneTopologyFile(tmp_path)).load()
+
+    with pytest.raises(KeyError):
+        precompileTopology(topology, CellStateManager())
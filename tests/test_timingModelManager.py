@@ -0,0 +1,113 @@
+import pytest
+
+from const.recipeStepType import RecipeStepType
+
+from data.recipeData import RecipeStepData
+from data.traceSpanData import TraceSpanData
+
+from manager.recipeManager import RecipeManager
+from manager.robotCommandManager import RobotCommandManager
+from manager.timingModelManager import TimingModelManager
+
+
+
+
+def test_predictPercentile():
+    timingModel :TimingModelManager = TimingModelManager(minSampleNum = 5)
+
+    for elapsedSec in [5.0, 1.0, 4.0, 2.0, 3.0]:
+        timingModel.record("UR5", "sendURCmd(3)", elapsedSec)
+
+    # 정렬된 샘플 1 ~ 5 의 선형 보간
+    assert timingModel.predict("UR5", "sendURCmd(3)") == 3.0
+    assert timingModel.predict("UR5", "sendURCmd(3)", 0.0) == 1.0
+    assert timingModel.predict("UR5", "sendURCmd(3)", 100.0) == 5.0
+    assert timingModel.predict("UR5", "sendURCmd(3)", 90.0) == pytest.approx(4.6)
+    assert timingModel.predict("UR5", "sendURCmd(3)", 99.0) == pytest.approx(4.96)
+
+
+
+def test_predictDefault():
+    timingModel :TimingModelManager = TimingModelManager(minSampleNum = 5)
+
+    for elapsedSec in [1.0, 2.0, 3.0, 4.0]:
+        timingModel.record("UR5", "sendURCmd(3)", elapsedSec)
+
+    # 샘플이 minSampleNum 보다 적거나 없는 동작 -> 기본값
+    assert timingModel.predict("UR5", "sendURCmd(3)", 50.0, 10.0) == 10.0
+    assert timingModel.predict("UR5", "sendURCmd(4)", 50.0, 7.0) == 7.0
+
+
+
+def test_predictAllDevices():
+    timingModel :TimingModelManager = TimingModelManager(minSampleNum = 4)
+
+    for elapsedSec in [10.0, 20.0]:
+        timingModel.record("1번 드롱기", "brew", elapsedSec)
+        timingModel.record("2번 드롱기", "brew", elapsedSec + 10.0)
+
+    # 장비별로는 샘플 부족, deviceName None 이면 모든 장비의 샘플 (10, 20, 20, 30)
+    assert timingModel.predict("1번 드롱기", "brew", 50.0, -1.0) == -1.0
+    assert timingModel.predict(None, "brew") == 20.0
+
+
+
+def test_recentSampleWindow():
+    timingModel :TimingModelManager = TimingModelManager(maxSampleNum = 5, minSampleNum = 1)
+
+    for elapsedSec in range(1, 11):
+        timingModel.record("Indy7L", "holdDHGripper", float(elapsedSec))
+
+    # 최근 5개 (6 ~ 10)
+    assert timingModel.predict("Indy7L", "holdDHGripper", 0.0) == 6.0
+    assert timingModel.getReport()[("Indy7L", "holdDHGripper")]["count"] == 5
+
+
+
+def test_recordSpan():
+    timingModel :TimingModelManager = TimingModelManager(minSampleNum = 1)
+
+    timingModel.recordSpan(TraceSpanData("sendIndyModbusCmd", "Indy7L", 10.0, 12.5, 14))
+    errorSpan   :TraceSpanData = TraceSpanData("sendIndyModbusCmd", "Indy7L", 20.0, 80.0, 14)
+    errorSpan.error = "timeout"
+    timingModel.recordSpan(errorSpan)
+
+    # 오류로 끝난 구간은 학습하지 않는다
+    assert timingModel.getReport()[("Indy7L", "sendIndyModbusCmd(14)")]["count"] == 1
+    assert timingModel.predict("Indy7L", "sendIndyModbusCmd(14)", 100.0) == 2.5
+
+
+
+def test_saveLoad(tmp_path):
+    filePath    :str = str(tmp_path / "timing" / "timing.json")
+    timingModel :TimingModelManager = TimingModelManager(filePath, minSampleNum = 1)
+    timingModel.record("UR5", "sendURCmd(3)", 4.0)
+    timingModel.record("UR5", "sendURCmd(3)", 6.0)
+    assert timingModel.save() == 1
+
+    loadedModel :TimingModelManager = TimingModelManager(filePath, minSampleNum = 1)
+    assert loadedModel.load() == 1
+    assert loadedModel.predict("UR5", "sendURCmd(3)") == 5.0
+
+    # 파일이 없으면 빈 상태
+    assert TimingModelManager(str(tmp_path / "none.json")).load() == 0
+
+
+
+@pytest.mark.parametrize("sampleSec, timeoutSec", [
+    # 샘플 부족 -> 기본값, 학습된 p99 가 기본값보다 짧으면 기본값, 길면 p99
+    (None, 30.0),
+    (5.0, 30.0),
+    (45.0, 45.0),
+])
+def test_confirmTimeoutSec(sampleSec:float, timeoutSec:float):
+    timingModel :TimingModelManager = TimingModelManager()
+    recipe      :RecipeManager = RecipeManager(None, RobotCommandManager(None), lambda dispenserCode: None, timingModel = timingModel)
+    step        :RecipeStepData = RecipeStepData(RecipeStepType.CONFIRM_STATE, "confirmState", "UR5 대기", -1, lambda cellSnapshot: False, ())
+    step.defaultSec = 30.0
+
+    if sampleSec != None:
+        for _ in range(10):
+            timingModel.record(step.deviceName, step.name, sampleSec)
+
+    assert recipe._RecipeManager__getConfirmTimeoutSec(step) == timeoutSec